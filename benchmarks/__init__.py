@@ -0,0 +1,3 @@
+"""
+Scripts de rendimiento del cliente (se ejecutan con ``python -m benchmarks.<script>``)
+"""
@@ -0,0 +1,145 @@
+"""
+Benchmark de la carga del portal de cliente (facturas + pagos del cliente).
+
+Simula lo que hace ``ClientDashboardView._load_stats`` para un cliente con
+muchas facturas:
+    - Anterior: ``get_my_facturas`` descarga todas las facturas, y
+      ``get_my_pagos`` vuelve a llamarlo y une pagos con facturas con
+      ``any(int(fid) == ...)`` (O(pagos × facturas)).
+    - Actual: filtro ``cliente_id`` enviado al backend, conjunto de IDs int
+      y una sola descarga de facturas compartida por ambas llamadas.
+
+El backend se sustituye por un objeto en memoria que cuenta las filas
+"transferidas" y aplica (o no, con ``--backend-ignora-filtro``) el filtro.
+
+Uso:
+    python -m benchmarks.bench_client_portal [--facturas-cliente 5000] [--facturas-otros 10000]
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List, Optional
+
+from src.api.rest_helpers import RESTHelpers
+
+CLIENTE_ID = 1
+
+
+def generate_dataset(facturas_cliente: int, facturas_otros: int, seed: int = 42):
+    """Facturas (con cliente_pagador anidado) y un pago por factura."""
+    rng = random.Random(seed)
+    owners = [CLIENTE_ID] * facturas_cliente + [rng.randint(2, 500) for _ in range(facturas_otros)]
+    rng.shuffle(owners)
+    facturas, pagos = [], []
+    for i, owner in enumerate(owners, start=1):
+        facturas.append({
+            "id_factura": i,
+            "cliente_pagador": {"id_cliente": owner, "nombre": f"Cliente {owner}"},
+            "total": round(rng.uniform(10, 5000), 2),
+            "estado": "PAGADA",
+        })
+        pagos.append({
+            "id_pago": i,
+            "factura": {"id_factura": i},
+            "cliente_id": owner,
+            "importe": facturas[-1]["total"],
+        })
+    return facturas, pagos
+
+
+class FakeAPI:
+    """Sustituto en memoria de RESTClient.get_all con contador de filas."""
+
+    def __init__(self, facturas: List[Dict], pagos: List[Dict], filtra: bool):
+        self.tables = {"facturas": facturas, "pagos": pagos}
+        self.filtra = filtra
+        self.user_id = CLIENTE_ID
+        self.peticiones = 0
+        self.filas = 0
+
+    def get_all(self, entity: str, params: Optional[Dict] = None):
+        rows = self.tables[entity]
+        if self.filtra and params and "cliente_id" in params:
+            cid = params["cliente_id"]
+            if entity == "facturas":
+                rows = [r for r in rows if r["cliente_pagador"]["id_cliente"] == cid]
+            else:
+                rows = [r for r in rows if r["cliente_id"] == cid]
+        self.peticiones += 1
+        self.filas += len(rows)
+        return {"success": True, "data": rows}
+
+
+# =====================================================================
+# IMPLEMENTACIÓN ANTERIOR (resumida, mismo algoritmo)
+# =====================================================================
+def legacy_my_facturas(api, cliente_id):
+    facturas = api.get_all("facturas")["data"]
+    my_facturas = []
+    for factura in facturas:
+        cliente_pagador = factura.get("cliente_pagador")
+        cliente_pagador_id = None
+        if isinstance(cliente_pagador, dict):
+            cliente_pagador_id = cliente_pagador.get("id_cliente") or cliente_pagador.get("id")
+        if cliente_pagador_id is not None and int(cliente_pagador_id) == int(cliente_id):
+            my_facturas.append(factura)
+    return my_facturas
+
+
+def legacy_my_pagos(api, cliente_id):
+    facturas = legacy_my_facturas(api, cliente_id)
+    factura_ids = [f.get("id_factura") or f.get("id") for f in facturas]
+    my_pagos = []
+    for pago in api.get_all("pagos")["data"]:
+        factura = pago.get("factura")
+        factura_id = factura.get("id_factura") if isinstance(factura, dict) else factura
+        if factura_id:
+            factura_id_int = int(factura_id)
+            if any(int(fid) == factura_id_int for fid in factura_ids if fid):
+                my_pagos.append(pago)
+    return my_pagos
+
+
+def legacy_dashboard(api):
+    facturas = legacy_my_facturas(api, CLIENTE_ID)
+    pagos = legacy_my_pagos(api, CLIENTE_ID)
+    return facturas, pagos
+
+
+def current_dashboard(api):
+    helpers = RESTHelpers(api)
+    facturas = helpers.get_my_facturas(CLIENTE_ID)["data"]
+    pagos = helpers.get_my_pagos(CLIENTE_ID, facturas=facturas)["data"]
+    return facturas, pagos
+
+
+def run(label: str, func, api: FakeAPI):
+    start = time.perf_counter()
+    facturas, pagos = func(api)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}{elapsed * 1000:10.1f} ms  {api.peticiones:3d} peticiones  "
+          f"{api.filas:8d} filas recibidas  ({len(facturas)} facturas, {len(pagos)} pagos)")
+    return facturas, pagos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--facturas-cliente", type=int, default=5000, help="Facturas del cliente")
+    parser.add_argument("--facturas-otros", type=int, default=10000, help="Facturas de otros clientes")
+    parser.add_argument("--backend-ignora-filtro", action="store_true",
+                        help="Simular un backend que no filtra por cliente_id")
+    args = parser.parse_args()
+
+    facturas, pagos = generate_dataset(args.facturas_cliente, args.facturas_otros)
+    filtra = not args.backend_ignora_filtro
+    print(f"Cliente con {args.facturas_cliente} facturas de {len(facturas)} "
+          f"(backend {'filtra' if filtra else 'no filtra'} por cliente_id)")
+
+    legacy = run("Anterior", legacy_dashboard, FakeAPI(facturas, pagos, filtra))
+    current = run("Actual", current_dashboard, FakeAPI(facturas, pagos, filtra))
+    assert [len(x) for x in legacy] == [len(x) for x in current], "Los resultados no coinciden"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark de decodificación de una respuesta grande de facturas.
+
+Compara el camino anterior de ``RESTClient._request`` (``response.json()``
+sobre el texto decodificado + recorrido del sobre) con ``json_codec`` sobre
+los bytes, para cada backend disponible (json, orjson, msgspec).
+
+Uso:
+    python -m benchmarks.bench_json_decode [--size-mb 50] [--repeat 3]
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, List, Tuple
+
+from benchmarks.dataset import generate_facturas
+from src.api import json_codec
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def build_payload(size_mb: float) -> bytes:
+    """Genera un sobre {"success", "data": [facturas]} de aproximadamente ``size_mb`` MB."""
+    sample = generate_facturas(1000)
+    row_bytes = len(json.dumps(sample, ensure_ascii=False).encode("utf-8")) / len(sample)
+    count = int(size_mb * 1024 * 1024 / row_bytes)
+    envelope = {"success": True, "data": generate_facturas(count)}
+    return json.dumps(envelope, ensure_ascii=False).encode("utf-8")
+
+
+def legacy_decode(content: bytes):
+    """Réplica del camino anterior: texto -> json -> varias pasadas por el sobre."""
+    json_data = json.loads(content.decode("utf-8"))
+    if json_data:
+        if "data" in json_data:
+            if json_data["data"] is None:
+                json_data["data"] = []
+        elif "dataObj" in json_data:
+            value = json_data.pop("dataObj")
+            json_data["data"] = [] if value is None else value
+        else:
+            json_data["data"] = []
+        data = json_data.get("data")
+        return [] if data is None else data
+    return []
+
+
+def time_best(func: Callable[[bytes], object], content: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=50.0, help="Tamaño aproximado de la respuesta")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se toma la mejor)")
+    args = parser.parse_args()
+
+    content = build_payload(args.size_mb)
+    print(f"Respuesta: {len(content) / 1024 / 1024:.1f} MB | backend activo: {json_codec.BACKEND}")
+
+    candidates: List[Tuple[str, Callable[[bytes], object]]] = [
+        ("anterior (text + json + sobre)", legacy_decode),
+        ("json (bytes) + unwrap", lambda c: json_codec.unwrap_envelope(json.loads(c))),
+    ]
+    if orjson is not None:
+        candidates.append(("orjson + unwrap", lambda c: json_codec.unwrap_envelope(orjson.loads(c))))
+    if msgspec is not None:
+        decoder = msgspec.json.Decoder()
+        candidates.append(("msgspec + unwrap", lambda c: json_codec.unwrap_envelope(decoder.decode(c))))
+
+    baseline = None
+    for label, func in candidates:
+        elapsed = time_best(func, content, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{label:<34} {elapsed * 1000:>9.1f} ms  ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
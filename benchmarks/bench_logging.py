@@ -0,0 +1,75 @@
+"""
+Benchmark del coste de logging por petición.
+
+Compara el logging anterior (f-strings con el payload completo, formateados
+aunque el nivel no los emita) con el actual (formato perezoso ``%s`` y
+payload recortado con ``truncated``), con LOG_LEVEL=INFO como en producción.
+
+Uso:
+    python -m benchmarks.bench_logging [--rows 5000] [--requests 50]
+"""
+
+import argparse
+import io
+import logging
+import time
+
+from benchmarks.dataset import generate_facturas
+from src.utils.logging_config import LOG_FORMAT, log_sampled, truncated
+
+logger = logging.getLogger("benchmarks.logging")
+
+
+def legacy_request_logging(result: dict, entity: str):
+    """Mensajes que emitían _request/create/ReportLoader antes del cambio."""
+    json_data = result
+    logger.debug(f"Respuesta JSON cruda: {json_data}")
+    data = json_data.get("data")
+    logger.debug(f"data encontrado: {data} (type: {type(data)})")
+    logger.debug(f"Data extraída antes de validación: {data} (type: {type(data)})")
+    logger.debug(f"Data final: {data} (type: {type(data)})")
+    logger.info(f"[REPORT_LOADER] Respuesta completa: {result}")
+    logger.info(f"create({entity}) - Data recibida: {result.get('data')}")
+
+
+def lazy_request_logging(result: dict, entity: str):
+    """Mensajes equivalentes con la nueva utilidad de logging."""
+    log_sampled(logger, logging.DEBUG, f"request:GET /{entity}", "%s %s", "GET", entity)
+    logger.debug("[REPORT_LOADER] Respuesta completa: %s", truncated(result))
+    logger.info("create(%s) - Resultado: success=%s, error=%s", entity, result.get("success"), result.get("error"))
+    logger.debug("create(%s) - Data recibida: %s", entity, truncated(result.get("data")))
+
+
+def cpu_per_call(func, result: dict, requests: int) -> float:
+    start = time.process_time()
+    for _ in range(requests):
+        func(result, "facturas")
+    return (time.process_time() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Facturas en cada respuesta")
+    parser.add_argument("--requests", type=int, default=50, help="Peticiones simuladas")
+    args = parser.parse_args()
+
+    # Los mensajes se escriben en memoria para medir el formateo, no la consola
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    result = {"success": True, "data": generate_facturas(args.rows)}
+    legacy = cpu_per_call(legacy_request_logging, result, args.requests)
+    lazy = cpu_per_call(lazy_request_logging, result, args.requests)
+
+    print(f"Respuesta de {args.rows} facturas, {args.requests} peticiones (LOG_LEVEL=INFO)")
+    print(f"Logging anterior : {legacy * 1000:9.2f} ms CPU/petición")
+    print(f"Logging perezoso : {lazy * 1000:9.2f} ms CPU/petición")
+    if lazy:
+        print(f"CPU ahorrada     : {(legacy - lazy) * 1000:9.2f} ms/petición ({legacy / lazy:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
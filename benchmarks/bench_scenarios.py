@@ -0,0 +1,370 @@
+"""
+Escenarios de extremo a extremo contra el backend falso, con control de
+regresiones.
+
+Escenarios:
+    cargar_facturas    Ventana de facturas: clientes y empleados, listado
+                       proyectado, normalización y almacén de la tabla
+    filtrar_pagos      Filtro de pagos por nombre de cliente
+    dashboard_kpis     Indicadores del dashboard: carga completa, 10 facturas
+                       modificadas y sincronización incremental
+    generar_informe    Los cinco informes: datos, gráfico y PDF
+    exportar_facturas  Exportar ``--exports`` facturas (100) a PDF
+
+El cliente es el ``RESTClient`` real (sin caché local) con las peticiones
+desviadas a ``FakeBackend`` (``benchmarks/fake_backend.py``) sobre un
+dataset de ``--scale`` facturas. Cada escenario se repite ``--repeat`` veces
+con un cliente nuevo y se toma el mejor tiempo. Los escenarios de informes y
+exportación necesitan matplotlib; si falta, se omiten.
+
+Referencias: los resultados se comparan con ``benchmarks/baselines.json``
+(mismo perfil: escala y opciones) y el proceso termina con código 1 si un
+escenario tarda más que la referencia más ``--tolerance`` o hace más
+peticiones. ``--save-baseline`` guarda los resultados como nueva referencia
+(las referencias dependen de la máquina: regenerarlas al cambiar de equipo).
+
+Uso:
+    python -m benchmarks.bench_scenarios [--scale 10k] [--scenarios cargar_facturas,filtrar_pagos]
+        [--repeat 3] [--latency 0.005] [--backend-actual] [--save-baseline] [--spans]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+# Los gráficos se generan sin pantalla
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from benchmarks.dataset import ADMIN_EMAIL, PASSWORD, SCALES, Dataset, parse_scale, scale_label
+from benchmarks.fake_backend import FAKE_BASE_URL, FakeBackend, connect
+from src.api import json_codec
+from src.data.column_store import ColumnStore
+from src.data.sync import EntitySync
+from src.utils.perf import recorder
+from src.utils.settings import Settings
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# Diferencias menores se consideran ruido aunque superen la tolerancia relativa
+NOISE_FLOOR = 0.005
+
+# Columnas de las tablas (las de FacturasWindow y PagosWindow)
+FACTURAS_COLUMNS = ("id", "cliente_nombre", "empleado_nombre", "fecha", "total", "estado")
+PAGOS_COLUMNS = ("id", "factura_id", "cliente_nombre", "fecha", "importe", "metodo_pago", "estado")
+
+
+class Context:
+    """Lo que recibe cada escenario: cliente recién creado, backend y dataset."""
+
+    def __init__(self, api, backend: FakeBackend, dataset: Dataset, workdir: str, args):
+        self.api = api
+        self.backend = backend
+        self.dataset = dataset
+        self.workdir = workdir
+        self.args = args
+
+
+class _TableStub:
+    """Sustituto de ``DataTable`` sin Tk: solo construye el almacén de la tabla."""
+
+    def __init__(self):
+        self.store = ColumnStore()
+
+    def set_data(self, rows):
+        self.store = ColumnStore.from_rows(rows)
+        return self.store
+
+
+def headless_view(window_cls, api, entity: str, columns):
+    """
+    Ventana CRUD sin widgets: los métodos de carga, normalización y filtrado
+    son los reales de ``window_cls``.
+    """
+    view = window_cls.__new__(window_cls)
+    view.api = api
+    view.entity_name = entity
+    view.columns = [{"name": name} for name in columns]
+    view.client_mode = False
+    view.data = []
+    view.clientes, view.empleados, view.facturas = [], [], []
+    view.sync = EntitySync(entity, (window_cls.list_id_field, "id"))
+    view.table = _TableStub()
+    return view
+
+
+# =====================================================================
+# ESCENARIOS
+# =====================================================================
+def scenario_cargar_facturas(ctx: Context) -> Dict[str, Any]:
+    from src.ui.entities.facturas_window import FacturasWindow
+
+    view = headless_view(FacturasWindow, ctx.api, "facturas", FACTURAS_COLUMNS)
+    view._load_related()
+    fields = view._list_fields()
+    # Lo mismo que ``BaseCRUDWindow._sync_list`` (sin el planificador)
+    result = view.sync.sync(
+        lambda params: ctx.api.get_all("facturas", params=params, fields=fields),
+        normalize=view._normalize_timed,
+    )
+    if not result.get("success"):
+        raise RuntimeError(result.get("error"))
+    store = view.table.set_data(result["data"].upserted)
+    return {"rows": len(store)}
+
+
+def scenario_filtrar_pagos(ctx: Context) -> Dict[str, Any]:
+    from src.ui.entities.pagos_window import PagosWindow
+
+    view = headless_view(PagosWindow, ctx.api, "pagos", PAGOS_COLUMNS)
+    view._load_related()
+    cliente = ctx.dataset["clientes"][len(ctx.dataset["clientes"]) // 2]
+    view._on_filter({"cliente_nombre": cliente["nombre"]})
+    return {"rows": len(view.table.store)}
+
+
+def scenario_dashboard_kpis(ctx: Context) -> Dict[str, Any]:
+    result = ctx.api.get_kpis()
+    if not result.get("success"):
+        raise RuntimeError(result.get("error"))
+    for factura in ctx.dataset["facturas"][:10]:
+        ctx.api.update("facturas", factura["id_factura"], {"notas": "Revisada"})
+    result = ctx.api.get_kpis()
+    if not result.get("success"):
+        raise RuntimeError(result.get("error"))
+    return {"rows": sum(result["data"]["counts"].values())}
+
+
+def scenario_generar_informe(ctx: Context) -> Dict[str, Any]:
+    from src.reports.chart_factory import ChartFactory
+    from src.reports.exporters.report_exporter import ReportExporter
+    from src.reports.report_loader import ReportLoader
+    from src.ui.reports.report_definitions import (get_chart_config, get_chart_type,
+                                                   get_loader_method_name, get_report_options)
+
+    loader = ReportLoader(ctx.api)
+    hasta = ctx.dataset.today
+    desde = (hasta - timedelta(days=365)).isoformat()
+    hasta = hasta.isoformat()
+    points = 0
+    for i, name in enumerate(get_report_options()):
+        data = getattr(loader, get_loader_method_name(name))(desde, hasta)
+        chart_type, chart_config = get_chart_type(name), get_chart_config(name)
+        labels, values = chart_config["data_extractor"](data)
+        points += len(values)
+        # Como ``ReportsWindow._render_report``
+        if chart_type == "bar":
+            ChartFactory.bar_chart(labels, values, name, chart_config.get("ylabel", ""))
+        elif chart_type == "pie":
+            ChartFactory.pie_chart(labels, values, name)
+        else:
+            ChartFactory.line_chart(labels, values, name, chart_config.get("xlabel", ""),
+                                    chart_config.get("ylabel", ""))
+        ReportExporter.export_report(title=name, data=data, chart_type=chart_type,
+                                     chart_config=chart_config, desde=desde, hasta=hasta,
+                                     path=os.path.join(ctx.workdir, f"informe_{i}.pdf"), format="pdf")
+    return {"rows": points}
+
+
+def scenario_exportar_facturas(ctx: Context) -> Dict[str, Any]:
+    from src.ui.entities.facturas.facturas_export import FacturaExporter
+
+    clientes = ctx.api.get_clientes().get("data") or []
+    empleados = ctx.api.get_all("empleados").get("data") or []
+    exporter = FacturaExporter(ctx.api, clientes, empleados)
+    facturas = ctx.dataset["facturas"][:ctx.args.exports]
+    for factura in facturas:
+        exporter.export_pdf({"id_factura": factura["id_factura"]},
+                            os.path.join(ctx.workdir, f"factura_{factura['id_factura']}.pdf"))
+    return {"rows": len(facturas)}
+
+
+SCENARIOS: Dict[str, Callable[[Context], Dict[str, Any]]] = {
+    "cargar_facturas": scenario_cargar_facturas,
+    "filtrar_pagos": scenario_filtrar_pagos,
+    "dashboard_kpis": scenario_dashboard_kpis,
+    "generar_informe": scenario_generar_informe,
+    "exportar_facturas": scenario_exportar_facturas,
+}
+
+
+# =====================================================================
+# EJECUCIÓN
+# =====================================================================
+def new_client(backend: FakeBackend, email: str = ADMIN_EMAIL):
+    """``RESTClient`` conectado a ``backend`` con la sesión de ``email`` iniciada."""
+    from src.api.rest_client import RESTClient
+
+    api = RESTClient(base_url=FAKE_BASE_URL)
+    connect(api, backend)
+    result = api.login(email, PASSWORD)
+    if not result.get("success"):
+        raise RuntimeError(f"Login en el backend falso: {result.get('error')}")
+    return api
+
+
+def close_client(api):
+    """Cierra la sesión, los hilos del planificador y las conexiones de ``api``."""
+    api.logout()
+    api.scheduler.close()
+    api.session.close()
+
+
+def run_scenario(name: str, backend: FakeBackend, dataset: Dataset, args) -> Dict[str, Any]:
+    """
+    Ejecuta un escenario ``args.repeat`` veces.
+
+    Returns:
+        Mejor tiempo (``seconds``), peticiones, bytes recibidos y filas; o
+        ``skipped`` con el motivo si falta una dependencia
+    """
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(args.repeat):
+        api = new_client(backend)
+        backend.reset_stats()
+        recorder.clear()
+        with tempfile.TemporaryDirectory(prefix="crm-bench-") as workdir:
+            ctx = Context(api, backend, dataset, workdir, args)
+            # Sin el recolector durante la medida: sus pausas son la mayor fuente de ruido
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            try:
+                extra = SCENARIOS[name](ctx)
+            except ImportError as e:
+                return {"skipped": f"falta {e.name or e}"}
+            finally:
+                elapsed = time.perf_counter() - start
+                gc.enable()
+        stats = backend.stats()
+        result = {"seconds": round(elapsed, 4), "requests": stats["requests"],
+                  "wire_bytes": stats["bytes_sent"], "rows": extra.get("rows", 0),
+                  "spans": recorder.summary()}
+        close_client(api)
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def profile_key(args) -> str:
+    """Perfil de la referencia: escala y opciones que cambian los resultados."""
+    parts = [scale_label(args.scale)]
+    if args.backend_actual:
+        parts.append("backend-actual")
+    if args.latency:
+        parts.append(f"latency={args.latency * 1000:g}ms")
+    return ",".join(parts)
+
+
+def load_baselines(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def compare(name: str, result: Dict[str, Any], baseline: Optional[Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """Regresiones de ``result`` frente a ``baseline`` (lista vacía si no hay)."""
+    if not baseline or "seconds" not in result:
+        return []
+    problems = []
+    limit = baseline["seconds"] * (1 + tolerance)
+    if result["seconds"] > limit and result["seconds"] - baseline["seconds"] > NOISE_FLOOR:
+        problems.append(f"{name}: {result['seconds'] * 1000:.0f} ms frente a "
+                        f"{baseline['seconds'] * 1000:.0f} ms de referencia")
+    if result["requests"] > baseline.get("requests", result["requests"]):
+        problems.append(f"{name}: {result['requests']} peticiones frente a {baseline['requests']}")
+    return problems
+
+
+def print_spans(spans: Dict[str, Dict[str, Any]], limit: int = 6):
+    top = sorted(spans.items(), key=lambda item: item[1]["p50_ms"] * item[1]["count"], reverse=True)
+    for op, stats in top[:limit]:
+        print(f"      {op[:40]:<41}{stats['count']:>6} x p50 {stats['p50_ms']:>8.1f} ms"
+              f"  p95 {stats['p95_ms']:>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=parse_scale, default=SCALES["10k"], help="Facturas (1k, 10k, 100k, 1m)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="Escenarios separados por comas (por defecto todos)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se toma la mejor)")
+    parser.add_argument("--exports", type=int, default=100, help="Facturas en exportar_facturas")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latencia simulada por petición (s)")
+    parser.add_argument("--backend-actual", action="store_true",
+                        help="Backend sin proyección ni sincronización incremental (como el actual)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del dataset")
+    parser.add_argument("--baselines", default=BASELINES_PATH, help="Fichero de referencias")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Margen sobre la referencia (0.25 = +25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar los resultados como referencia")
+    parser.add_argument("--no-compare", action="store_true", help="No comparar con las referencias")
+    parser.add_argument("--spans", action="store_true", help="Mostrar las operaciones más costosas de cada escenario")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Escenarios desconocidos: {', '.join(unknown)} (disponibles: {', '.join(SCENARIOS)})")
+
+    # Cada repetición empieza sin caché en disco
+    Settings.LOCAL_CACHE = False
+    start = time.perf_counter()
+    dataset = Dataset.generate(args.scale, seed=args.seed)
+    backend = FakeBackend(dataset, delta=not args.backend_actual, projection=not args.backend_actual,
+                          latency=args.latency)
+    profile = profile_key(args)
+    print(f"Dataset ({time.perf_counter() - start:.1f} s): {dataset.summary()}")
+    print(f"Perfil: {profile} | JSON: {json_codec.BACKEND} | Python {platform.python_version()}")
+
+    baselines = load_baselines(args.baselines)
+    reference = {} if args.no_compare else baselines.get(profile, {}).get("scenarios", {})
+    if not args.no_compare and not reference:
+        print(f"Sin referencias para el perfil '{profile}' en {args.baselines}")
+    print()
+    print(f"{'Escenario':<20}{'Tiempo':>11}{'Ref.':>11}{'Dif.':>8}{'Petic.':>8}{'KB':>10}{'Filas':>9}")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    regressions: List[str] = []
+    for name in names:
+        result = run_scenario(name, backend, dataset, args)
+        if "skipped" in result:
+            print(f"{name:<20}  omitido ({result['skipped']})")
+            continue
+        results[name] = result
+        base = reference.get(name)
+        ref_text = f"{base['seconds'] * 1000:9.0f}ms" if base else f"{'-':>11}"
+        diff_text = f"{(result['seconds'] / base['seconds'] - 1) * 100:+7.0f}%" if base else f"{'':>8}"
+        print(f"{name:<20}{result['seconds'] * 1000:9.0f}ms{ref_text}{diff_text}{result['requests']:>8}"
+              f"{result['wire_bytes'] / 1024:>10.0f}{result['rows']:>9}")
+        if args.spans:
+            print_spans(result["spans"])
+        regressions += compare(name, result, base, args.tolerance)
+
+    if args.save_baseline and results:
+        entry = baselines.setdefault(profile, {"scenarios": {}})
+        entry.update({"recorded": date.today().isoformat(), "python": platform.python_version(),
+                      "json_backend": json_codec.BACKEND})
+        for name, result in results.items():
+            entry["scenarios"][name] = {key: result[key] for key in ("seconds", "requests", "wire_bytes", "rows")}
+        with open(args.baselines, "w", encoding="utf-8") as fh:
+            json.dump(baselines, fh, indent=2, sort_keys=True, ensure_ascii=False)
+            fh.write("\n")
+        print(f"\nReferencias guardadas en {args.baselines} (perfil '{profile}')")
+    elif regressions:
+        print(f"\nRegresiones (tolerancia {args.tolerance:.0%}):")
+        for problem in regressions:
+            print(f"  - {problem}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
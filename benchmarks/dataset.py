@@ -0,0 +1,324 @@
+"""
+Generador de datos sintéticos con la forma del backend ``crudxtart``.
+
+Clientes, empleados (con su rol), productos, presupuestos, facturas y pagos
+coherentes entre sí: las facturas apuntan a clientes y empleados que
+existen, los pagos a facturas (las pagadas tienen su pago completo, algunas
+emitidas o vencidas uno parcial) y las fechas caen en los dos últimos años
+con la fecha de modificación (``updated_at``) posterior a la de emisión.
+
+El tamaño se indica con el número de facturas (``1k`` a ``1m``); el resto de
+entidades crece en proporción. Con la misma semilla y fecha de referencia el
+resultado es siempre el mismo.
+
+Uso:
+    python -m benchmarks.dataset [--scale 10k] [--out datos.json]
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+Record = Dict[str, Any]
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+ENTITIES = ("roles_empleado", "clientes", "empleados", "productos", "presupuestos", "facturas", "pagos")
+
+ROLES = [
+    {"id_rol": 1, "nombre_rol": "ADMIN"},
+    {"id_rol": 2, "nombre_rol": "EMPLEADO"},
+    {"id_rol": 3, "nombre_rol": "COMERCIAL"},
+]
+
+# Credenciales del empleado administrador (el primero) de cualquier dataset
+ADMIN_EMAIL = "admin@crm.local"
+PASSWORD = "bench"
+
+NOMBRES = ["Ana", "Luis", "Marta", "Jorge", "Lucía", "Pablo", "Elena", "Sergio", "Carmen", "David",
+           "Laura", "Javier", "Sara", "Raúl", "Paula", "Andrés", "Nuria", "Diego", "Irene", "Óscar"]
+APELLIDOS = ["García", "Martínez", "López", "Sánchez", "Pérez", "Gómez", "Martín", "Jiménez",
+             "Ruiz", "Hernández", "Díaz", "Moreno", "Álvarez", "Romero", "Navarro", "Torres"]
+CALLES = ["Gran Vía", "Calle Mayor", "Av. de la Constitución", "Paseo del Prado", "Calle Alcalá"]
+CIUDADES = ["Madrid", "Barcelona", "Valencia", "Sevilla", "Bilbao", "Zaragoza", "Málaga"]
+CATEGORIAS = ["Software", "Hardware", "Consultoría", "Formación", "Soporte", "Licencias"]
+METODOS_PAGO = ["TRANSFERENCIA", "TARJETA", "EFECTIVO"]
+
+# Estados de factura (las pendientes son de fecha futura, como en la aplicación)
+ESTADOS_FACTURA = [("PAGADA", 0.55), ("EMITIDA", 0.25), ("VENCIDA", 0.12), ("ANULADA", 0.05),
+                   ("PENDIENTE", 0.03)]
+ESTADOS_PRESUPUESTO = [("APROBADO", 0.45), ("RECHAZADO", 0.25), ("PENDIENTE", 0.30)]
+
+HISTORY_DAYS = 730
+
+
+def parse_scale(value: str) -> int:
+    """"10k" -> 10000; acepta también un número ("2500") y los sufijos k/m."""
+    text = str(value).strip().lower().replace("_", "")
+    if text in SCALES:
+        return SCALES[text]
+    factor = 1
+    if text.endswith("k"):
+        factor, text = 1_000, text[:-1]
+    elif text.endswith("m"):
+        factor, text = 1_000_000, text[:-1]
+    try:
+        count = int(float(text) * factor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Escala no válida: {value!r} (p. ej. 1k, 10k, 100k, 1m)")
+    if count <= 0:
+        raise argparse.ArgumentTypeError(f"Escala no válida: {value!r}")
+    return count
+
+
+def scale_label(count: int) -> str:
+    """10000 -> "10k" (el número tal cual si no es una escala predefinida)."""
+    return next((label for label, value in SCALES.items() if value == count), str(count))
+
+
+def entity_counts(facturas: int) -> Dict[str, int]:
+    """Registros de cada entidad para un dataset de ``facturas`` facturas."""
+    return {
+        "clientes": max(50, facturas // 50),
+        "empleados": max(10, min(200, facturas // 500)),
+        "productos": max(20, min(2000, facturas // 100)),
+        "presupuestos": facturas,
+        "facturas": facturas,
+    }
+
+
+def _weighted(rng: random.Random, options) -> str:
+    values = [value for value, _ in options]
+    weights = [weight for _, weight in options]
+    return rng.choices(values, weights)[0]
+
+
+class Dataset:
+    """
+    Tablas del backend sintético.
+
+    Attributes:
+        tables: Registros por entidad (``ENTITIES``), con los nombres de campo del backend
+        today: Fecha de referencia (las fechas son anteriores; las pendientes, posteriores)
+    """
+
+    def __init__(self, tables: Dict[str, List[Record]], today: date, seed: int = 42):
+        self.tables = tables
+        self.today = today
+        self.seed = seed
+
+    def __getitem__(self, entity: str) -> List[Record]:
+        return self.tables[entity]
+
+    def summary(self) -> str:
+        return ", ".join(f"{len(self.tables[entity])} {entity}" for entity in ENTITIES
+                         if entity != "roles_empleado")
+
+    # =====================================================================
+    # GENERACIÓN
+    # =====================================================================
+    @classmethod
+    def generate(cls, facturas: int, seed: int = 42, today: Optional[date] = None) -> "Dataset":
+        """
+        Genera un dataset con ``facturas`` facturas.
+
+        Args:
+            facturas: Número de facturas (y de presupuestos)
+            seed: Semilla del generador
+            today: Fecha de referencia (por defecto hoy)
+        """
+        today = today or date.today()
+        rng = random.Random(seed)
+        counts = entity_counts(facturas)
+        # Fechas precalculadas: formatear millones de fechas es lo más caro
+        first = today - timedelta(days=HISTORY_DAYS)
+        days = [(first + timedelta(days=i)).isoformat() for i in range(HISTORY_DAYS + 61)]
+        stamps = [f"{day}T{rng.randint(8, 19):02d}:{rng.randint(0, 59):02d}:00" for day in days]
+
+        clientes = cls._clientes(rng, counts["clientes"], days)
+        empleados = cls._empleados(rng, counts["empleados"], stamps)
+        productos = cls._productos(rng, counts["productos"], stamps)
+        presupuestos = cls._presupuestos(rng, counts["presupuestos"], clientes, empleados, productos,
+                                         days, stamps)
+        facturas_rows = cls._facturas(rng, counts["facturas"], clientes, empleados, presupuestos,
+                                      days, stamps)
+        pagos = cls._pagos(rng, facturas_rows, days, stamps)
+        tables = {
+            "roles_empleado": [dict(rol) for rol in ROLES],
+            "clientes": clientes,
+            "empleados": empleados,
+            "productos": productos,
+            "presupuestos": presupuestos,
+            "facturas": facturas_rows,
+            "pagos": pagos,
+        }
+        return cls(tables, today, seed)
+
+    @staticmethod
+    def _clientes(rng, count, days) -> List[Record]:
+        rows = []
+        for i in range(1, count + 1):
+            nombre = rng.choice(NOMBRES)
+            apellidos = f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+            alta = rng.randrange(HISTORY_DAYS)
+            rows.append({
+                "id_cliente": i,
+                "nombre": f"{nombre} {i}",
+                "apellidos": apellidos,
+                "email": f"cliente{i}@mail.com",
+                "telefono": f"6{rng.randint(10000000, 99999999)}",
+                "direccion": f"{rng.choice(CALLES)} {rng.randint(1, 200)}, {rng.choice(CIUDADES)}",
+                "tipo_cliente": "EMPRESA" if rng.random() < 0.3 else "PARTICULAR",
+                "fecha_alta": days[alta],
+                "updated_at": f"{days[alta]}T09:00:00",
+            })
+        return rows
+
+    @staticmethod
+    def _empleados(rng, count, stamps) -> List[Record]:
+        rows = []
+        for i in range(1, count + 1):
+            rol = ROLES[0] if i == 1 else rng.choice(ROLES[1:])
+            rows.append({
+                "id_empleado": i,
+                "nombre": "Admin" if i == 1 else rng.choice(NOMBRES),
+                "apellidos": rng.choice(APELLIDOS),
+                "email": ADMIN_EMAIL if i == 1 else f"empleado{i}@crm.local",
+                "telefono": f"9{rng.randint(10000000, 99999999)}",
+                "id_rol": dict(rol),
+                "updated_at": stamps[rng.randrange(HISTORY_DAYS)],
+            })
+        return rows
+
+    @staticmethod
+    def _productos(rng, count, stamps) -> List[Record]:
+        rows = []
+        for i in range(1, count + 1):
+            categoria = rng.choice(CATEGORIAS)
+            rows.append({
+                "id_producto": i,
+                "nombre": f"{categoria} {i}",
+                "descripcion": f"Producto {i} de {categoria.lower()}",
+                "categoria": categoria,
+                "precio": round(rng.uniform(5, 2500), 2),
+                "activo": rng.random() < 0.9,
+                "updated_at": stamps[rng.randrange(HISTORY_DAYS)],
+            })
+        return rows
+
+    @staticmethod
+    def _presupuestos(rng, count, clientes, empleados, productos, days, stamps) -> List[Record]:
+        rows = []
+        for i in range(1, count + 1):
+            cliente = rng.choice(clientes)["id_cliente"]
+            producto = rng.choice(productos)
+            opened = rng.randrange(HISTORY_DAYS)
+            estado = _weighted(rng, ESTADOS_PRESUPUESTO)
+            closed = None if estado == "PENDIENTE" else min(HISTORY_DAYS, opened + rng.randint(1, 45))
+            rows.append({
+                "id_Presupuesto": i,
+                "id_empleado": rng.choice(empleados)["id_empleado"],
+                "id_cliente_pagador": cliente,
+                "id_cliente_beneficiario": cliente,
+                "id_producto": producto["id_producto"],
+                "presupuesto": round(producto["precio"] * rng.randint(1, 10), 2),
+                "estado": estado,
+                "fecha_apertura": days[opened],
+                "fecha_cierre": days[closed] if closed is not None else None,
+                "updated_at": stamps[closed if closed is not None else opened],
+            })
+        return rows
+
+    @staticmethod
+    def _facturas(rng, count, clientes, empleados, presupuestos, days, stamps) -> List[Record]:
+        rows = []
+        aprobados = [p for p in presupuestos if p["estado"] == "APROBADO"] or presupuestos
+        for i in range(1, count + 1):
+            cliente = rng.choice(clientes)
+            empleado = rng.choice(empleados)
+            estado = _weighted(rng, ESTADOS_FACTURA)
+            if estado == "PENDIENTE":
+                emitted = HISTORY_DAYS + rng.randint(1, 60)
+            elif estado == "VENCIDA":
+                emitted = rng.randrange(HISTORY_DAYS - 30)
+            else:
+                emitted = rng.randrange(HISTORY_DAYS)
+            presupuesto = rng.choice(aprobados)
+            rows.append({
+                "id_factura": i,
+                "num_factura": f"F{days[min(emitted, len(days) - 1)][:4]}-{i:07d}",
+                # Objetos anidados independientes, como al decodificar el JSON
+                "cliente_pagador": {"id_cliente": cliente["id_cliente"], "nombre": cliente["nombre"],
+                                    "email": cliente["email"]},
+                "empleado": {"id_empleado": empleado["id_empleado"], "nombre": empleado["nombre"]},
+                "id_presupuesto": presupuesto["id_Presupuesto"],
+                "fecha": days[emitted],
+                "total": round(rng.uniform(10, 5000), 2),
+                "estado": estado,
+                "notas": None if rng.random() < 0.8 else f"Nota de la factura {i}",
+                "updated_at": stamps[min(emitted, HISTORY_DAYS)],
+            })
+        return rows
+
+    @staticmethod
+    def _pagos(rng, facturas, days, stamps) -> List[Record]:
+        rows = []
+        day_index = {day: i for i, day in enumerate(days)}
+        for factura in facturas:
+            estado = factura["estado"]
+            if estado == "PAGADA":
+                parts = [factura["total"]] if rng.random() < 0.85 else [
+                    round(factura["total"] / 2, 2), round(factura["total"] - round(factura["total"] / 2, 2), 2)]
+            elif estado in ("EMITIDA", "VENCIDA") and rng.random() < 0.2:
+                parts = [round(factura["total"] * rng.uniform(0.1, 0.6), 2)]
+            else:
+                continue
+            emitted = day_index[factura["fecha"]]
+            for amount in parts:
+                paid = min(HISTORY_DAYS, emitted + rng.randint(0, 40))
+                rows.append({
+                    "id_pago": len(rows) + 1,
+                    "factura": {"id_factura": factura["id_factura"]},
+                    "cliente_pagador": {"id_cliente": factura["cliente_pagador"]["id_cliente"]},
+                    "importe": amount,
+                    "fecha_pago": days[paid],
+                    "metodo_pago": rng.choice(METODOS_PAGO),
+                    "estado": "CANCELADA" if rng.random() < 0.02 else "COMPLETADO",
+                    "updated_at": stamps[paid],
+                })
+        return rows
+
+    # =====================================================================
+    # EXPORTACIÓN
+    # =====================================================================
+    def dump(self, path: str):
+        """Guarda las tablas en un JSON ({entidad: [registros]})."""
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.tables, fh, ensure_ascii=False)
+
+
+def generate_facturas(count: int, seed: int = 42) -> List[Record]:
+    """Solo las facturas de un dataset de ``count`` facturas (para los micro-benchmarks)."""
+    return Dataset.generate(count, seed=seed).tables["facturas"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=parse_scale, default=SCALES["10k"], help="Facturas (1k, 10k, 100k, 1m)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla")
+    parser.add_argument("--out", help="Guardar las tablas en este fichero JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    dataset = Dataset.generate(args.scale, seed=args.seed)
+    print(f"Generado en {time.perf_counter() - start:.1f} s: {dataset.summary()}")
+    if args.out:
+        dataset.dump(args.out)
+        print(f"Guardado en {args.out}")
+
+
+if __name__ == "__main__":
+    main()
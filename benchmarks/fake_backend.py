@@ -0,0 +1,449 @@
+"""
+Backend falso del API ``crudxtart`` para los benchmarks (sin red).
+
+``FakeBackend`` sirve un ``Dataset`` (``benchmarks/dataset.py``) con el
+comportamiento que el cliente espera del backend Java:
+
+- ``POST /login`` con el email y la contraseña de un empleado o cliente
+- ``GET /<entidad>`` con ``id``, filtros (``cliente_id``, ``id_presupuesto``,
+  ``nombre``...), proyección (``fields``) y sincronización incremental
+  (``updated_since``, con las bajas como registros ``deleted``)
+- ``POST``/``PUT``/``DELETE`` sobre las entidades
+- ``GET /informes/...`` calculados sobre los datos
+
+Todas las respuestas usan el sobre ``{"success", "data"}`` y se comprimen
+con gzip si el cliente lo acepta. La proyección y el modo incremental se
+pueden desactivar para simular el backend actual, que no los admite.
+
+``FakeBackendAdapter`` es un adaptador de transporte de requests: montado
+en ``RESTClient.session`` (ver ``connect``), cada petición recorre el camino
+completo del cliente (planificador, reintentos, circuit breaker,
+descompresión, decodificación JSON) pero la resuelve ``FakeBackend`` en el
+mismo proceso. ``latency`` y ``bandwidth`` simulan la red.
+"""
+
+import gzip
+import io
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+from benchmarks.dataset import ENTITIES, PASSWORD, Dataset, Record
+from src.api.endpoints import Endpoints
+from src.utils.settings import Settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+FAKE_BASE_URL = "http://fake-backend.local/crudxtart"
+
+ID_FIELDS = dict(Endpoints.ID_FIELDS, roles_empleado="id_rol")
+
+# Respuestas menores no se comprimen (como los servidores habituales)
+COMPRESS_MIN_SIZE = 1024
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found"}
+
+
+def _dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _nested(row: Record, key: str, inner: str) -> Any:
+    value = row.get(key)
+    return value.get(inner) if isinstance(value, dict) else None
+
+
+# Filtros por relación que el cliente envía y no son campos de primer nivel
+RELATION_FILTERS: Dict[Tuple[str, str], Callable[[Record], Any]] = {
+    ("facturas", "cliente_id"): lambda row: _nested(row, "cliente_pagador", "id_cliente"),
+    ("facturas", "id_cliente"): lambda row: _nested(row, "cliente_pagador", "id_cliente"),
+    ("pagos", "cliente_id"): lambda row: _nested(row, "cliente_pagador", "id_cliente"),
+    ("pagos", "factura_id"): lambda row: _nested(row, "factura", "id_factura"),
+    ("pagos", "id_factura"): lambda row: _nested(row, "factura", "id_factura"),
+    ("presupuestos", "cliente_id"): lambda row: row.get("id_cliente_pagador"),
+}
+
+# Filtros de texto (búsqueda parcial sin distinguir mayúsculas)
+TEXT_FILTERS = {"nombre", "apellidos", "email", "telefono"}
+
+
+def project(row: Record, fields: List[str]) -> Record:
+    """Solo los campos pedidos ("cliente_pagador.id_cliente" -> {"cliente_pagador": {"id_cliente": ...}})."""
+    result: Record = {}
+    for field in fields:
+        key, _, inner = field.partition(".")
+        if key not in row:
+            continue
+        value = row[key]
+        if inner and isinstance(value, dict):
+            if inner in value:
+                result.setdefault(key, {})[inner] = value[inner]
+        else:
+            result[key] = value
+    return result
+
+
+class FakeBackend:
+    """
+    Backend en memoria sobre un ``Dataset``.
+
+    Args:
+        dataset: Datos que se sirven (se modifican con las escrituras)
+        delta: Admitir ``updated_since`` (si no, se ignora como el backend actual)
+        projection: Admitir ``fields``
+        compress: Comprimir con gzip las respuestas si el cliente lo acepta
+        latency: Segundos añadidos a cada respuesta
+        bandwidth: Bytes por segundo de la "red" (None = sin límite)
+    """
+
+    def __init__(self, dataset: Dataset, delta: bool = True, projection: bool = True,
+                 compress: bool = True, latency: float = 0.0, bandwidth: Optional[float] = None):
+        self.dataset = dataset
+        self.delta = delta
+        self.projection = projection
+        self.compress = compress
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._lock = threading.RLock()
+        self._index: Dict[str, Dict[Any, Record]] = {}
+        self._tombstones: Dict[str, List[Record]] = defaultdict(list)
+        self._version: Dict[str, int] = defaultdict(int)
+        self._cache: Dict[Tuple, Tuple[int, bytes, bytes]] = {}
+        # Las escrituras reciben una marca posterior a cualquiera del dataset
+        self._last_stamp = max((row.get("updated_at") or "" for entity in ENTITIES
+                                for row in dataset.tables.get(entity, ())), default="")
+        self.requests: Counter = Counter()
+        self.bytes_sent = 0
+
+    # =====================================================================
+    # ESTADO
+    # =====================================================================
+    def rows(self, entity: str) -> Dict[Any, Record]:
+        """Registros de ``entity`` por ID (el índice se crea la primera vez)."""
+        index = self._index.get(entity)
+        if index is None:
+            id_field = ID_FIELDS.get(entity, "id")
+            index = self._index[entity] = {row[id_field]: row for row in self.dataset.tables.get(entity, [])}
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        """Peticiones por ruta y bytes enviados (tras comprimir)."""
+        with self._lock:
+            return {"requests": sum(self.requests.values()), "by_route": dict(self.requests),
+                    "bytes_sent": self.bytes_sent}
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests.clear()
+            self.bytes_sent = 0
+
+    def _stamp(self) -> str:
+        now = datetime.now().replace(microsecond=0)
+        last = datetime.fromisoformat(self._last_stamp) if self._last_stamp else now
+        self._last_stamp = max(now, last + timedelta(seconds=1)).isoformat()
+        return self._last_stamp
+
+    def _touch(self, entity: str):
+        self._version[entity] += 1
+        self.dataset.tables[entity] = list(self.rows(entity).values())
+
+    # =====================================================================
+    # PETICIONES
+    # =====================================================================
+    def handle(self, method: str, path: str, params: Dict[str, str], body: Optional[bytes],
+               accept_encoding: str = "") -> Tuple[int, bytes, Dict[str, str]]:
+        """
+        Resuelve una petición.
+
+        Args:
+            method: Método HTTP
+            path: Ruta relativa a la base del API ("/facturas")
+            params: Parámetros de consulta
+            body: Cuerpo (JSON) o None
+            accept_encoding: Cabecera Accept-Encoding del cliente
+
+        Returns:
+            (estado HTTP, cuerpo, cabeceras)
+        """
+        method = method.upper()
+        parts = [part for part in path.split("/") if part]
+        route = f"{method} /{'/'.join(parts[:2])}" if parts else f"{method} /"
+        gzip_ok = self.compress and "gzip" in accept_encoding
+        payload = json.loads(body) if body else None
+
+        with self._lock:
+            self.requests[route] += 1
+            if method == "GET" and len(parts) == 1 and parts[0] in ENTITIES and not params:
+                # Listados completos: el cuerpo se reutiliza mientras no haya escrituras
+                status, content, encoded = self._cached_list(parts[0], gzip_ok)
+            else:
+                status, data = self._dispatch(method, parts, params, payload)
+                content = _dumps(data)
+                encoded = None
+            headers = {"Content-Type": "application/json;charset=UTF-8"}
+            if gzip_ok and len(content) >= COMPRESS_MIN_SIZE:
+                content = encoded if encoded is not None else gzip.compress(content, compresslevel=5)
+                headers["Content-Encoding"] = "gzip"
+            headers["Content-Length"] = str(len(content))
+            self.bytes_sent += len(content)
+
+        delay = self.latency + (len(content) / self.bandwidth if self.bandwidth else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        return status, content, headers
+
+    def _cached_list(self, entity: str, gzip_ok: bool) -> Tuple[int, bytes, Optional[bytes]]:
+        key = (entity,)
+        cached = self._cache.get(key)
+        if cached is None or cached[0] != self._version[entity]:
+            content = _dumps({"success": True, "data": list(self.rows(entity).values())})
+            cached = (self._version[entity], content, b"")
+        version, content, compressed = cached
+        if gzip_ok and not compressed and len(content) >= COMPRESS_MIN_SIZE:
+            compressed = gzip.compress(content, compresslevel=5)
+        self._cache[key] = (version, content, compressed)
+        return 200, content, compressed or None
+
+    def _dispatch(self, method: str, parts: List[str], params: Dict[str, str],
+                  payload: Any) -> Tuple[int, Any]:
+        if not parts:
+            return self._error(404, "Ruta no encontrada")
+        head = parts[0]
+        if head == "login" and method == "POST":
+            return self._login(payload or {})
+        if head == "logout":
+            return 200, {"success": True, "data": None}
+        if head == "informes" and method == "GET" and len(parts) == 2:
+            report = REPORTS.get(parts[1])
+            if report is None:
+                return self._error(404, f"Informe no encontrado: {parts[1]}")
+            return 200, {"success": True, "data": report(self, params.get("desde"), params.get("hasta"))}
+        if head not in ENTITIES or len(parts) != 1:
+            return self._error(404, f"Ruta no encontrada: /{'/'.join(parts)}")
+        if method == "GET":
+            return self._list(head, params)
+        if method == "POST":
+            return self._create(head, payload)
+        if method == "PUT":
+            return self._update(head, params, payload)
+        if method == "DELETE":
+            return self._delete(head, params)
+        return self._error(400, f"Método no soportado: {method}")
+
+    @staticmethod
+    def _error(status: int, message: str) -> Tuple[int, Any]:
+        return status, {"success": False, "data": {"error": message}}
+
+    # =====================================================================
+    # ENTIDADES
+    # =====================================================================
+    def _login(self, payload: Dict) -> Tuple[int, Any]:
+        email = payload.get("email")
+        for entity in ("empleados", "clientes"):
+            for row in self.rows(entity).values():
+                if row.get("email") == email:
+                    if payload.get("password") != PASSWORD:
+                        break
+                    return 200, {"success": True, "data": dict(row)}
+        return self._error(401, "Credenciales inválidas")
+
+    def _list(self, entity: str, params: Dict[str, str]) -> Tuple[int, Any]:
+        params = dict(params)
+        index = self.rows(entity)
+        if "id" in params:
+            row = index.get(self._parse_id(params["id"]))
+            if row is None:
+                return self._error(404, f"No existe el registro {params['id']}")
+            return 200, {"success": True, "data": row}
+
+        fields_param = params.pop(Settings.API_FIELDS_PARAM, None)
+        since = params.pop(Settings.API_SYNC_PARAM, None)
+        rows = index.values()
+        if since is not None and self.delta:
+            timestamp = Settings.API_SYNC_TIMESTAMP_FIELD
+            rows = [row for row in rows if (row.get(timestamp) or "") >= since]
+            rows += [row for row in self._tombstones[entity] if row[timestamp] >= since]
+        for key, value in params.items():
+            rows = self._filter(entity, rows, key, value)
+        rows = list(rows)
+        if fields_param and self.projection:
+            fields = [field for field in fields_param.split(",") if field]
+            rows = [row if row.get("deleted") else project(row, fields) for row in rows]
+        return 200, {"success": True, "data": rows}
+
+    @staticmethod
+    def _filter(entity: str, rows, key: str, value: str):
+        relation = RELATION_FILTERS.get((entity, key))
+        if relation is not None:
+            return [row for row in rows if str(relation(row)) == value]
+        if key in TEXT_FILTERS:
+            needle = value.lower()
+            return [row for row in rows if needle in str(row.get(key) or "").lower()]
+        # Igualdad sobre un campo de primer nivel; los parámetros desconocidos se ignoran
+        return [row for row in rows if key not in row or str(row.get(key)) == value]
+
+    @staticmethod
+    def _parse_id(value: Any) -> Any:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return value
+
+    def _create(self, entity: str, payload: Any) -> Tuple[int, Any]:
+        if not isinstance(payload, dict):
+            return self._error(400, "Cuerpo no válido")
+        index = self.rows(entity)
+        id_field = ID_FIELDS.get(entity, "id")
+        row = dict(payload)
+        row[id_field] = max(index, default=0) + 1
+        row[Settings.API_SYNC_TIMESTAMP_FIELD] = self._stamp()
+        index[row[id_field]] = row
+        self._touch(entity)
+        return 201, {"success": True, "data": row}
+
+    def _update(self, entity: str, params: Dict[str, str], payload: Any) -> Tuple[int, Any]:
+        if not isinstance(payload, dict):
+            return self._error(400, "Cuerpo no válido")
+        id_field = ID_FIELDS.get(entity, "id")
+        # PagosServlet recibe el ID en ``id_pago``; el resto, en el cuerpo
+        record_id = self._parse_id(params.get(id_field) or params.get("id") or payload.get(id_field))
+        row = self.rows(entity).get(record_id)
+        if row is None:
+            return self._error(404, f"No existe el registro {record_id}")
+        row.update(payload)
+        row[id_field] = record_id
+        row[Settings.API_SYNC_TIMESTAMP_FIELD] = self._stamp()
+        self._touch(entity)
+        return 200, {"success": True, "data": row}
+
+    def _delete(self, entity: str, params: Dict[str, str]) -> Tuple[int, Any]:
+        record_id = self._parse_id(params.get("id"))
+        row = self.rows(entity).pop(record_id, None)
+        if row is None:
+            return self._error(404, f"No existe el registro {record_id}")
+        id_field = ID_FIELDS.get(entity, "id")
+        self._tombstones[entity].append({id_field: record_id, "deleted": True,
+                                         Settings.API_SYNC_TIMESTAMP_FIELD: self._stamp()})
+        self._touch(entity)
+        return 200, {"success": True, "data": None}
+
+    # =====================================================================
+    # INFORMES
+    # =====================================================================
+    def _facturas_between(self, desde: Optional[str], hasta: Optional[str]) -> List[Record]:
+        return [row for row in self.rows("facturas").values()
+                if row.get("estado") != "ANULADA"
+                and (not desde or (row.get("fecha") or "") >= desde)
+                and (not hasta or (row.get("fecha") or "") <= hasta)]
+
+    def _presupuestos_between(self, desde: Optional[str], hasta: Optional[str]) -> List[Record]:
+        return [row for row in self.rows("presupuestos").values()
+                if (not desde or (row.get("fecha_apertura") or "") >= desde)
+                and (not hasta or (row.get("fecha_apertura") or "") <= hasta)]
+
+    def _ventas_empleado(self, desde, hasta) -> List[Dict[str, Any]]:
+        totals: Dict[Any, float] = defaultdict(float)
+        for row in self._facturas_between(desde, hasta):
+            totals[_nested(row, "empleado", "id_empleado")] += row.get("total") or 0
+        empleados = self.rows("empleados")
+        result = []
+        for empleado_id, total in totals.items():
+            empleado = empleados.get(empleado_id) or {}
+            nombre = f"{empleado.get('nombre', '')} {empleado.get('apellidos', '')}".strip()
+            result.append({"nombre": nombre or f"ID {empleado_id}", "total": round(total, 2)})
+        return sorted(result, key=lambda item: item["total"], reverse=True)
+
+    def _presupuestos_estado(self, desde, hasta) -> Dict[str, int]:
+        return dict(Counter(row.get("estado") for row in self._presupuestos_between(desde, hasta)))
+
+    def _facturacion_mensual(self, desde, hasta) -> Dict[str, float]:
+        totals: Dict[str, float] = defaultdict(float)
+        for row in self._facturas_between(desde, hasta):
+            totals[(row.get("fecha") or "")[:7]] += row.get("total") or 0
+        return {month: round(total, 2) for month, total in sorted(totals.items()) if month}
+
+    def _ventas_producto(self, desde, hasta) -> List[Dict[str, Any]]:
+        totals: Dict[Any, float] = defaultdict(float)
+        for row in self._presupuestos_between(desde, hasta):
+            if row.get("estado") == "APROBADO":
+                totals[row.get("id_producto")] += row.get("presupuesto") or 0
+        productos = self.rows("productos")
+        result = [{"producto": (productos.get(producto_id) or {}).get("nombre", f"ID {producto_id}"),
+                   "total": round(total, 2)} for producto_id, total in totals.items()]
+        return sorted(result, key=lambda item: item["total"], reverse=True)[:15]
+
+    def _ratio_conversion(self, desde, hasta) -> Dict[str, int]:
+        estados = Counter(row.get("estado") for row in self._presupuestos_between(desde, hasta))
+        return {"Aprobados": estados.get("APROBADO", 0), "Rechazados": estados.get("RECHAZADO", 0),
+                "Pendientes": estados.get("PENDIENTE", 0)}
+
+
+REPORTS: Dict[str, Callable[[FakeBackend, Optional[str], Optional[str]], Any]] = {
+    "ventas-empleado": FakeBackend._ventas_empleado,
+    "presupuestos-estado": FakeBackend._presupuestos_estado,
+    "facturacion-mensual": FakeBackend._facturacion_mensual,
+    "ventas-producto": FakeBackend._ventas_producto,
+    "ratio-conversion": FakeBackend._ratio_conversion,
+}
+
+
+# =====================================================================
+# TRANSPORTE
+# =====================================================================
+class FakeBackendAdapter(HTTPAdapter):
+    """
+    Adaptador de requests que responde con ``FakeBackend`` en lugar de abrir
+    una conexión.
+
+    Args:
+        backend: Backend que resuelve las peticiones
+        base_url: URL base del API (se quita de la ruta)
+    """
+
+    def __init__(self, backend: FakeBackend, base_url: str = FAKE_BASE_URL):
+        super().__init__()
+        self.backend = backend
+        self.base_path = urlsplit(base_url).path.rstrip("/")
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = urlsplit(request.url)
+        path = url.path
+        if self.base_path and path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        status, content, headers = self.backend.handle(
+            request.method, path, params, body, request.headers.get("Accept-Encoding", "")
+        )
+        raw = HTTPResponse(
+            body=io.BytesIO(content),
+            headers=headers,
+            status=status,
+            reason=REASONS.get(status, ""),
+            preload_content=False,
+            decode_content=True,
+        )
+        return self.build_response(request, raw)
+
+
+def connect(api, backend: FakeBackend, base_url: str = FAKE_BASE_URL) -> FakeBackendAdapter:
+    """Dirige las peticiones de ``api`` (un ``RESTClient``) a ``backend``."""
+    adapter = FakeBackendAdapter(backend, base_url)
+    api.session.mount(base_url, adapter)
+    Endpoints.BASE_URL = base_url
+    return adapter
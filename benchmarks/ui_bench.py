@@ -0,0 +1,509 @@
+"""
+Benchmark de la interfaz Tk sin pantalla visible.
+
+Mide, para cada vista, con datos sintéticos servidos por el backend falso:
+    1ª pintura   Desde que se crea la vista hasta que muestra los datos y Tk
+                 ha procesado el dibujado pendiente
+    Redibujo     Mediana de ``--redraws`` redibujados (ordenar la tabla,
+                 cambiar los valores de las tarjetas, cambiar de informe)
+    Python KB    Memoria de Python retenida por la vista (tracemalloc, en
+                 una construcción aparte para no distorsionar los tiempos)
+    RSS KB       Crecimiento del proceso, que incluye lo que reserva Tk
+
+Vistas:
+    data_table           DataTable suelto con las facturas del dataset
+    clientes ... pagos   Ventanas CRUD (``BaseCRUDWindow``) con su carga real
+    dashboard_admin      Dashboards (el de cliente inicia sesión como cliente)
+    dashboard_empleado
+    dashboard_cliente
+    informes             ReportsWindow: ventana y primer informe generado
+
+Sin ``DISPLAY`` se arranca un Xvfb propio (o se puede ejecutar con
+``xvfb-run -a``); con pantalla, la ventana se coloca fuera de ella. Las
+vistas de customtkinter se omiten si no está instalado. Los resultados se
+comparan con ``benchmarks/baselines.json`` (perfil ``ui,<escala>``) como en
+``bench_scenarios``.
+
+Uso:
+    python -m benchmarks.ui_bench [--scale 10k] [--targets data_table,facturas]
+        [--repeat 3] [--redraws 10] [--save-baseline]
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tkinter as tk
+import tracemalloc
+from datetime import date, timedelta
+from tkinter import messagebox
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import customtkinter as ctk
+except ImportError:  # pragma: no cover - dependencia opcional
+    ctk = None
+
+try:
+    import ttkbootstrap as tb
+except ImportError:  # pragma: no cover - dependencia opcional
+    tb = None
+
+from benchmarks.bench_scenarios import (BASELINES_PATH, FACTURAS_COLUMNS, NOISE_FLOOR, close_client,
+                                        load_baselines, new_client)
+from benchmarks.dataset import ADMIN_EMAIL, SCALES, Dataset, parse_scale, scale_label
+from benchmarks.fake_backend import FakeBackend
+from src.utils.settings import Settings
+from src.utils.styles import configure_styles
+
+WINDOW_SIZE = (1200, 800)
+# Espera máxima a que una vista muestre sus datos (s)
+READY_TIMEOUT = 60.0
+
+
+class UIContext:
+    """Lo que recibe cada vista: cliente con sesión, dataset y datos ya preparados."""
+
+    def __init__(self, root, api, dataset: Dataset, table_rows: List[Dict]):
+        self.root = root
+        self.api = api
+        self.dataset = dataset
+        self.table_rows = table_rows
+        self.hasta = dataset.today.isoformat()
+        self.desde = (dataset.today - timedelta(days=365)).isoformat()
+
+
+class UITarget:
+    """
+    Vista a medir.
+
+    Args:
+        build: Crea y empaqueta la vista (``build(ctx)``)
+        ready: True cuando la vista muestra sus datos (se comprueba bombeando
+               el bucle de eventos)
+        redraw: Un redibujado (``redraw(view, state, i)``)
+        prepare: Prepara ``state`` para los redibujados (``prepare(view, ctx)``,
+                 fuera de la medida)
+        email: Usuario con el que se inicia sesión
+    """
+
+    def __init__(self, build: Callable[[UIContext], Any], ready: Callable[[Any], bool],
+                 redraw: Callable[[Any, Any, int], None],
+                 prepare: Optional[Callable[[Any, UIContext], Any]] = None, email: str = ADMIN_EMAIL):
+        self.build = build
+        self.ready = ready
+        self.redraw = redraw
+        self.prepare = prepare
+        self.email = email
+
+
+# =====================================================================
+# PANTALLA Y BUCLE DE EVENTOS
+# =====================================================================
+def start_xvfb() -> subprocess.Popen:
+    """Arranca Xvfb en un display libre y apunta ``DISPLAY`` a él."""
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        sys.exit("Sin pantalla: instala Xvfb o ejecuta con 'xvfb-run -a python -m benchmarks.ui_bench'")
+    # Con -displayfd, Xvfb elige un display libre y lo escribe cuando ya acepta conexiones
+    read_fd, write_fd = os.pipe()
+    width, height = WINDOW_SIZE
+    proc = subprocess.Popen(
+        [xvfb, "-displayfd", str(write_fd), "-screen", "0", f"{width + 200}x{height + 200}x24", "-nolisten", "tcp"],
+        pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    os.close(write_fd)
+    with os.fdopen(read_fd) as fh:
+        display = fh.readline().strip()
+    if not display:
+        proc.kill()
+        sys.exit("No se pudo arrancar Xvfb")
+    os.environ["DISPLAY"] = f":{display}"
+    return proc
+
+
+def create_root(offscreen: bool) -> tk.Tk:
+    """Raíz con el mismo tema que la aplicación (ver ``main.py`` y ``MainWindow.show``)."""
+    root = tb.Window(themename="cosmo") if tb is not None else tk.Tk()
+    configure_styles()
+    if ctk is not None:
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("blue")
+    width, height = WINDOW_SIZE
+    # Fuera de la pantalla sigue mapeada, así que Tk la dibuja igual
+    position = f"+{-width - 100}+0" if offscreen else "+0+0"
+    root.geometry(f"{width}x{height}{position}")
+    root.update()
+    return root
+
+
+def pump(root, api, ready: Callable[[], bool], errors: List[BaseException],
+         timeout: float = READY_TIMEOUT):
+    """
+    Procesa eventos, temporizadores (``after``) y resultados del planificador
+    hasta que ``ready()`` sea cierto, como el ``mainloop`` de la aplicación.
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        if errors:
+            raise errors.pop(0)
+        if ready():
+            break
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"La vista no mostró datos en {timeout:.0f} s")
+        api.scheduler.dispatch()
+        root.update()
+        time.sleep(0.001)
+    # El dibujado de Tk se hace en tareas pendientes
+    root.update()
+    if errors:
+        raise errors.pop(0)
+
+
+def rss_bytes() -> Optional[int]:
+    """Memoria residente del proceso (Linux; None en otros sistemas)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def disable_dialogs():
+    """Los avisos modales bloquearían la ejecución sin pantalla: se convierten en errores."""
+    def fail(title=None, message=None, **kwargs):
+        raise RuntimeError(f"{title}: {message}")
+
+    for name in ("showerror", "showwarning", "showinfo"):
+        setattr(messagebox, name, fail)
+
+
+# =====================================================================
+# VISTAS
+# =====================================================================
+def table_rows(dataset: Dataset) -> List[Dict]:
+    """Facturas con las columnas de la tabla de ``FacturasWindow``."""
+    return [
+        {"id": f["id_factura"], "cliente_nombre": f["cliente_pagador"]["nombre"],
+         "empleado_nombre": f["empleado"]["nombre"], "fecha": f["fecha"],
+         "total": f["total"], "estado": f["estado"]}
+        for f in dataset["facturas"]
+    ]
+
+
+def _packed(view):
+    view.pack(fill="both", expand=True)
+    return view
+
+
+def _sort_redraw(table, i: int):
+    # Como pulsar la cabecera: alterna columnas y sentido
+    names = [col["name"] for col in table.columns]
+    table._sort_by_column(names[(i // 2) % len(names)])
+
+
+def _build_table(ctx: UIContext):
+    from src.widgets.data_table import DataTable
+
+    table = _packed(DataTable(ctx.root, [{"name": name} for name in FACTURAS_COLUMNS]))
+    table.set_data(ctx.table_rows)
+    return table
+
+
+def crud_target(module: str, class_name: str, autoload: bool = True) -> UITarget:
+    """
+    Ventana CRUD. Las que no cargan al abrirse (``autoload=False``) cargan
+    con ``_load_data``, como el botón "Actualizar".
+    """
+    def build(ctx: UIContext):
+        window_cls = getattr(importlib.import_module(module), class_name)
+        view = _packed(window_cls(ctx.root, ctx.api))
+        if not autoload:
+            view._load_data()
+        return view
+
+    return UITarget(
+        build,
+        ready=lambda view: bool(view.table.tree.get_children()) and view._sync_job is None,
+        redraw=lambda view, state, i: _sort_redraw(view.table, i),
+    )
+
+
+def dashboard_target(module: str, class_name: str, email: str = ADMIN_EMAIL) -> UITarget:
+    """Dashboard; cada redibujado alterna los valores reales de las tarjetas con "-"."""
+    def build(ctx: UIContext):
+        view_cls = getattr(importlib.import_module(module), class_name)
+        return _packed(view_cls(ctx.root, ctx.api, None))
+
+    def ready(view) -> bool:
+        if view.cards is None:
+            raise RuntimeError("El dashboard no cargó las estadísticas")
+        return True
+
+    def redraw(view, items, i: int):
+        if i % 2 == 0:
+            items = [(item[0], "-") + tuple(item[2:]) for item in items]
+        view._apply_stats(items)
+
+    return UITarget(build, ready, redraw, prepare=lambda view, ctx: view._fetch_stats(), email=email)
+
+
+def _build_reports(ctx: UIContext):
+    from src.ui.reports_window import ReportsWindow
+
+    view = _packed(ReportsWindow(ctx.root, ctx.api))
+    view._switch_tab(view.active_tab, ctx.desde, ctx.hasta)
+    return view
+
+
+def _report_state(view, ctx: UIContext):
+    from src.ui.reports.report_definitions import get_report_options
+
+    return list(get_report_options()), ctx.desde, ctx.hasta
+
+
+def _report_redraw(view, state, i: int):
+    # Cambiar de informe: datos, figura y FigureCanvasTkAgg.draw
+    names, desde, hasta = state
+    view._switch_tab(names[(i + 1) % len(names)], desde, hasta)
+
+
+TARGETS: Dict[str, UITarget] = {
+    "data_table": UITarget(_build_table, ready=lambda table: True,
+                           redraw=lambda table, state, i: _sort_redraw(table, i)),
+    "clientes": crud_target("src.ui.entities.clientes_window", "ClientesWindow", autoload=False),
+    "empleados": crud_target("src.ui.entities.empleados_window", "EmpleadosWindow", autoload=False),
+    "productos": crud_target("src.ui.entities.productos_window", "ProductosWindow"),
+    "presupuestos": crud_target("src.ui.entities.presupuestos_window", "PresupuestosWindow"),
+    "facturas": crud_target("src.ui.entities.facturas_window", "FacturasWindow"),
+    "pagos": crud_target("src.ui.entities.pagos_window", "PagosWindow"),
+    "dashboard_admin": dashboard_target("src.ui.dashboard.dashboard_admin", "AdminDashboardView"),
+    "dashboard_empleado": dashboard_target("src.ui.dashboard.dashboard_employee", "EmployeeDashboardView"),
+    "dashboard_cliente": dashboard_target("src.ui.dashboard.dashboard_client", "ClientDashboardView",
+                                          email="cliente1@mail.com"),
+    "informes": UITarget(_build_reports, ready=lambda view: view.canvas_widget is not None,
+                         redraw=_report_redraw, prepare=_report_state),
+}
+
+
+# =====================================================================
+# MEDIDA
+# =====================================================================
+def open_view(target: UITarget, root, backend: FakeBackend, dataset: Dataset, rows: List[Dict],
+              errors: List[BaseException], measure: Callable[[Callable[[], Any]], Any]):
+    """Abre la vista con un cliente nuevo; ``measure`` envuelve construcción y carga."""
+    api = new_client(backend, target.email)
+    # Los resultados del planificador se entregan en el bucle de eventos (ver ``pump``)
+    api.scheduler.ui_attached = True
+    ctx = UIContext(root, api, dataset, rows)
+
+    def first_paint():
+        view = target.build(ctx)
+        pump(root, api, lambda: target.ready(view), errors)
+        return view
+
+    try:
+        view = measure(first_paint)
+    except BaseException:
+        close_client(api)
+        raise
+    return ctx, view
+
+
+def close_view(ctx: UIContext, view):
+    ctx.api.scheduler.cancel_view()
+    view.destroy()
+    ctx.root.update()
+    close_client(ctx.api)
+
+
+def run_target(name: str, root, backend: FakeBackend, dataset: Dataset, rows: List[Dict],
+               errors: List[BaseException], args) -> Dict[str, Any]:
+    """
+    Mide una vista: ``args.repeat`` aperturas (mejor 1ª pintura, redibujos de
+    esa apertura) y una más bajo tracemalloc para la memoria de Python.
+
+    Returns:
+        first_paint/redraw en segundos y memoria en bytes; o ``skipped``
+        con el motivo si falta una dependencia
+    """
+    target = TARGETS[name]
+    best: Optional[Dict[str, Any]] = None
+    try:
+        for _ in range(args.repeat):
+            timing: Dict[str, float] = {}
+
+            def timed_open(func):
+                gc.collect()
+                gc.disable()
+                rss_before = rss_bytes()
+                start = time.perf_counter()
+                try:
+                    return func()
+                finally:
+                    timing["first_paint"] = time.perf_counter() - start
+                    gc.enable()
+                    rss_after = rss_bytes()
+                    if rss_before is not None and rss_after is not None:
+                        timing["rss_bytes"] = rss_after - rss_before
+
+            ctx, view = open_view(target, root, backend, dataset, rows, errors, timed_open)
+            try:
+                state = target.prepare(view, ctx) if target.prepare else None
+                redraws = []
+                for i in range(args.redraws):
+                    start = time.perf_counter()
+                    target.redraw(view, state, i)
+                    root.update_idletasks()
+                    redraws.append(time.perf_counter() - start)
+                    if errors:
+                        raise errors.pop(0)
+            finally:
+                close_view(ctx, view)
+            result = {"first_paint": round(timing["first_paint"], 4),
+                      "redraw": round(statistics.median(redraws), 4) if redraws else None,
+                      "rss_bytes": timing.get("rss_bytes")}
+            if best is None or result["first_paint"] < best["first_paint"]:
+                best = result
+
+        def traced_open(func):
+            gc.collect()
+            tracemalloc.start()
+            try:
+                func()
+                best["py_bytes"] = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+
+        ctx, view = open_view(target, root, backend, dataset, rows, errors, traced_open)
+        close_view(ctx, view)
+    except ImportError as e:
+        return {"skipped": f"falta {e.name or e}"}
+    return best
+
+
+def compare(name: str, result: Dict[str, Any], baseline: Optional[Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """Regresiones de 1ª pintura y redibujo frente a ``baseline``."""
+    if not baseline:
+        return []
+    problems = []
+    for metric, label in (("first_paint", "1ª pintura"), ("redraw", "redibujo")):
+        current, reference = result.get(metric), baseline.get(metric)
+        if current is None or reference is None:
+            continue
+        if current > reference * (1 + tolerance) and current - reference > NOISE_FLOOR:
+            problems.append(f"{name}: {label} {current * 1000:.0f} ms frente a {reference * 1000:.0f} ms")
+    return problems
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:9.1f}ms" if value is not None else f"{'-':>11}"
+
+
+def _kb(value: Optional[int]) -> str:
+    return f"{value / 1024:>11.0f}" if value is not None else f"{'-':>11}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=parse_scale, default=SCALES["10k"], help="Facturas (1k, 10k, 100k, 1m)")
+    parser.add_argument("--targets", default=",".join(TARGETS), help="Vistas separadas por comas (por defecto todas)")
+    parser.add_argument("--repeat", type=int, default=3, help="Aperturas de cada vista (se toma la mejor)")
+    parser.add_argument("--redraws", type=int, default=10, help="Redibujados por apertura")
+    parser.add_argument("--xvfb", action="store_true", help="Usar un Xvfb propio aunque haya DISPLAY")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del dataset")
+    parser.add_argument("--baselines", default=BASELINES_PATH, help="Fichero de referencias")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Margen sobre la referencia (0.25 = +25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar los resultados como referencia")
+    parser.add_argument("--no-compare", action="store_true", help="No comparar con las referencias")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.targets.split(",") if name.strip()]
+    unknown = [name for name in names if name not in TARGETS]
+    if unknown:
+        parser.error(f"Vistas desconocidas: {', '.join(unknown)} (disponibles: {', '.join(TARGETS)})")
+
+    xvfb = start_xvfb() if args.xvfb or not os.environ.get("DISPLAY") else None
+    try:
+        # Sin caché en disco ni refrescos periódicos del dashboard durante la medida
+        Settings.LOCAL_CACHE = False
+        Settings.DASHBOARD_REFRESH_INTERVAL = 0
+        disable_dialogs()
+
+        dataset = Dataset.generate(args.scale, seed=args.seed)
+        backend = FakeBackend(dataset)
+        rows = table_rows(dataset)
+        root = create_root(offscreen=xvfb is None)
+        errors: List[BaseException] = []
+        root.report_callback_exception = lambda exc, value, tb_: errors.append(value)
+
+        profile = f"ui,{scale_label(args.scale)}"
+        print(f"Dataset: {dataset.summary()}")
+        print(f"Perfil: {profile} | Tk {root.tk.call('info', 'patchlevel')} | Python {platform.python_version()}"
+              f" | {'Xvfb' if xvfb else 'DISPLAY ' + os.environ.get('DISPLAY', '')}")
+
+        baselines = load_baselines(args.baselines)
+        reference = {} if args.no_compare else baselines.get(profile, {}).get("targets", {})
+        if not args.no_compare and not reference:
+            print(f"Sin referencias para el perfil '{profile}' en {args.baselines}")
+        print()
+        print(f"{'Vista':<20}{'1ª pintura':>11}{'Ref.':>11}{'Redibujo':>11}{'Ref.':>11}"
+              f"{'Python KB':>11}{'RSS KB':>11}")
+
+        results: Dict[str, Dict[str, Any]] = {}
+        regressions: List[str] = []
+        failed: List[str] = []
+        for name in names:
+            try:
+                result = run_target(name, root, backend, dataset, rows, errors, args)
+            except Exception as e:
+                print(f"{name:<20}  error: {e}")
+                failed.append(name)
+                errors.clear()
+                # Lo que haya quedado de la vista no debe afectar a las siguientes
+                for child in root.winfo_children():
+                    child.destroy()
+                continue
+            if "skipped" in result:
+                print(f"{name:<20}  omitido ({result['skipped']})")
+                continue
+            results[name] = result
+            base = reference.get(name) or {}
+            print(f"{name:<20}{_ms(result['first_paint'])}{_ms(base.get('first_paint'))}"
+                  f"{_ms(result['redraw'])}{_ms(base.get('redraw'))}"
+                  f"{_kb(result.get('py_bytes'))}{_kb(result.get('rss_bytes'))}")
+            regressions += compare(name, result, base, args.tolerance)
+        root.destroy()
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    if args.save_baseline and results:
+        entry = baselines.setdefault(profile, {"targets": {}})
+        entry.update({"recorded": date.today().isoformat(), "python": platform.python_version()})
+        entry["targets"].update(results)
+        with open(args.baselines, "w", encoding="utf-8") as fh:
+            json.dump(baselines, fh, indent=2, sort_keys=True, ensure_ascii=False)
+            fh.write("\n")
+        print(f"\nReferencias guardadas en {args.baselines} (perfil '{profile}')")
+    elif regressions:
+        print(f"\nRegresiones (tolerancia {args.tolerance:.0%}):")
+        for problem in regressions:
+            print(f"  - {problem}")
+    if failed:
+        print(f"\nVistas con errores: {', '.join(failed)}")
+    if failed or (regressions and not args.save_baseline):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
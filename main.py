@@ -9,6 +9,7 @@ import ttkbootstrap as tb
 
 from src.api.rest_client import RESTClient
 from src.utils.settings import Settings
+from src.utils.logging_config import configure_logging
 from src.ui.login_window import LoginWindow
 from src.utils.styles import configure_styles
 
@@ -16,6 +17,8 @@ from src.utils.styles import configure_styles
 def main():
     """Punto de entrada principal de la aplicación"""
 
+    configure_logging(Settings.LOG_LEVEL)
+
     root = tb.Window(themename="cosmo")
     root.withdraw()
 
@@ -24,7 +27,7 @@ def main():
     # Crear cliente REST con configuración desde settings
     api_client = RESTClient(
         base_url=Settings.get_api_url(),
-        timeout=Settings.get_timeout()
+        timeout=Settings.API_READ_TIMEOUT
     )
 
     print(f"[MODO REST] Conectando a {Settings.get_api_url()}")
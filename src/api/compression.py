@@ -0,0 +1,108 @@
+"""
+Negociación de compresión de respuestas y medición de bytes transferidos.
+
+``accept_encoding`` devuelve las codificaciones que urllib3 sabe descomprimir
+en este entorno (gzip y deflate siempre; brotli y zstd si están instalados
+``brotli``/``brotlicffi`` y ``zstandard``). ``TransferStats`` acumula por
+endpoint los bytes recibidos por la red y los bytes ya descomprimidos, y
+avisa de los endpoints que devuelven respuestas grandes sin comprimir.
+"""
+
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from src.utils.logging_config import log_sampled
+from src.utils.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+def accept_encoding() -> str:
+    """Valor de la cabecera Accept-Encoding según los descompresores disponibles."""
+    try:
+        # urllib3 ya incluye br/zstd solo si puede decodificarlos
+        from urllib3.util.request import ACCEPT_ENCODING
+        encodings = [e.strip() for e in ACCEPT_ENCODING.split(",") if e.strip()]
+    except ImportError:
+        encodings = ["gzip", "deflate"]
+    # Preferencia: zstd y br comprimen mejor los JSON repetitivos que gzip
+    order = {"zstd": 0, "br": 1, "gzip": 2, "deflate": 3}
+    encodings.sort(key=lambda e: order.get(e, 9))
+    return ", ".join(encodings)
+
+
+class _EndpointTransfer:
+    __slots__ = ("responses", "wire_bytes", "decoded_bytes", "uncompressed", "encodings")
+
+    def __init__(self):
+        self.responses = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+        # Respuestas grandes que llegaron sin Content-Encoding
+        self.uncompressed = 0
+        self.encodings: Counter = Counter()
+
+
+class TransferStats:
+    """
+    Bytes por endpoint: transferidos (comprimidos) frente a decodificados.
+
+    Args:
+        min_size: Tamaño (bytes decodificados) a partir del cual una respuesta
+                  sin comprimir se marca como tal
+    """
+
+    def __init__(self, min_size: Optional[int] = None):
+        self.min_size = Settings.HTTP_COMPRESSION_MIN_SIZE if min_size is None else min_size
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointTransfer] = {}
+
+    def record(self, endpoint: str, encoding: str, wire_bytes: int, decoded_bytes: int):
+        """
+        Registra una respuesta.
+
+        Args:
+            endpoint: Clave del endpoint (sin IDs ni query)
+            encoding: Valor de Content-Encoding ("" si no viene comprimida)
+            wire_bytes: Bytes leídos de la red
+            decoded_bytes: Bytes tras descomprimir
+        """
+        encoding = (encoding or "identity").lower()
+        uncompressed = encoding == "identity" and decoded_bytes >= self.min_size
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = _EndpointTransfer()
+            entry.responses += 1
+            entry.wire_bytes += wire_bytes
+            entry.decoded_bytes += decoded_bytes
+            entry.encodings[encoding] += 1
+            if uncompressed:
+                entry.uncompressed += 1
+        if uncompressed:
+            log_sampled(logger, logging.WARNING, f"uncompressed:{endpoint}",
+                        "Respuesta sin comprimir de %s (%d bytes); revisar la compresión del backend",
+                        endpoint, decoded_bytes)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Resumen por endpoint, ordenado por bytes transferidos."""
+        with self._lock:
+            items = list(self._endpoints.items())
+            result = {}
+            for endpoint, entry in sorted(items, key=lambda item: -item[1].wire_bytes):
+                result[endpoint] = {
+                    "responses": entry.responses,
+                    "wire_bytes": entry.wire_bytes,
+                    "decoded_bytes": entry.decoded_bytes,
+                    "ratio": round(entry.wire_bytes / entry.decoded_bytes, 3) if entry.decoded_bytes else 1.0,
+                    "uncompressed": entry.uncompressed,
+                    "encodings": dict(entry.encodings),
+                }
+            return result
+
+    def uncompressed_endpoints(self) -> List[str]:
+        """Endpoints que han devuelto respuestas grandes sin comprimir."""
+        with self._lock:
+            return sorted(endpoint for endpoint, entry in self._endpoints.items() if entry.uncompressed)
@@ -44,6 +44,23 @@ class Endpoints:
     # Dashboard
     DASHBOARD_STATS = "/dashboard/stats"
     
+    # Nombre del ID de cada entidad (ver ANALISIS_SERVLETS.md)
+    ID_FIELDS = {
+        "clientes": "id_cliente",
+        "empleados": "id_empleado",
+        "productos": "id_producto",
+        "facturas": "id_factura",
+        "presupuestos": "id_Presupuesto",
+        "pagos": "id_pago",
+        "factura_productos": "id_factura_producto",
+        "roles": "id_rol",
+    }
+    
+    @staticmethod
+    def id_field(entity: str) -> str:
+        """Campo ID de una entidad ("facturas" -> "id_factura")"""
+        return Endpoints.ID_FIELDS.get(entity, f"id_{entity[:-1]}" if entity.endswith("s") else f"id_{entity}")
+    
     @staticmethod
     def build_url(endpoint: str, **kwargs) -> str:
         """Construye una URL completa reemplazando parámetros"""
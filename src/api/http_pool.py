@@ -0,0 +1,164 @@
+"""
+Pool de conexiones HTTP del cliente REST.
+
+``create_session`` monta en la sesión de requests un ``HTTPAdapter`` con el
+tamaño de pool, el bloqueo y el keep-alive configurados en ``Settings``
+(variables ``HTTP_POOL_*`` y ``HTTP_KEEPALIVE*``). ``PoolMetrics`` cuenta las
+peticiones simultáneas para saber si el pool se queda corto: si
+``saturated`` crece, hay hilos esperando (o abriendo conexiones que luego se
+descartan) y conviene subir ``HTTP_POOL_MAXSIZE``.
+"""
+
+import logging
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from src.api.compression import accept_encoding
+from src.utils.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+def keepalive_socket_options(idle: int) -> List[Tuple[int, int, int]]:
+    """Opciones de socket para TCP keep-alive (las que el sistema soporte)."""
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Linux: TCP_KEEPIDLE; macOS: TCP_KEEPALIVE; Windows no expone ninguna de las dos
+    idle_option = getattr(socket, "TCP_KEEPIDLE", None) or getattr(socket, "TCP_KEEPALIVE", None)
+    if idle_option is not None and idle > 0:
+        options.append((socket.IPPROTO_TCP, idle_option, idle))
+        interval = getattr(socket, "TCP_KEEPINTVL", None)
+        if interval is not None:
+            options.append((socket.IPPROTO_TCP, interval, max(1, idle // 4)))
+    return options
+
+
+class TunedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter que aplica opciones de socket (keep-alive) a su pool."""
+
+    def __init__(self, socket_options: Optional[List[Tuple[int, int, int]]] = None, **kwargs):
+        self._socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self._socket_options is not None:
+            kwargs["socket_options"] = self._socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Conexiones abiertas por los pools de urllib3 (nuevas, no reutilizadas)."""
+        pools = getattr(self.poolmanager, "pools", None)
+        opened = 0
+        hosts = 0
+        if pools is not None:
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    hosts += 1
+                    opened += getattr(pool, "num_connections", 0)
+        return {"hosts": hosts, "connections_opened": opened}
+
+
+def create_session(pool_connections: Optional[int] = None,
+                   pool_maxsize: Optional[int] = None,
+                   pool_block: Optional[bool] = None,
+                   keepalive: Optional[bool] = None) -> Tuple[requests.Session, TunedHTTPAdapter]:
+    """
+    Crea la sesión de requests con el adaptador configurado.
+
+    Args:
+        pool_connections: Número de pools (hosts) que se mantienen
+        pool_maxsize: Conexiones reutilizables por host
+        pool_block: Si True, al llenarse el pool se espera a una conexión libre
+                    en lugar de abrir una nueva que luego se descarta
+        keepalive: Activar TCP keep-alive y la cabecera ``Connection: keep-alive``
+
+    Returns:
+        (sesión, adaptador)
+    """
+    pool_connections = pool_connections or Settings.HTTP_POOL_CONNECTIONS
+    pool_maxsize = pool_maxsize or Settings.HTTP_POOL_MAXSIZE
+    pool_block = Settings.HTTP_POOL_BLOCK if pool_block is None else pool_block
+    keepalive = Settings.HTTP_KEEPALIVE if keepalive is None else keepalive
+
+    adapter = TunedHTTPAdapter(
+        socket_options=keepalive_socket_options(Settings.HTTP_KEEPALIVE_IDLE) if keepalive else None,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        # Los reintentos los gestiona RESTClient (ver resilience.py)
+        max_retries=0,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Connection"] = "keep-alive" if keepalive else "close"
+    if Settings.HTTP_COMPRESSION:
+        session.headers["Accept-Encoding"] = accept_encoding()
+    else:
+        session.headers["Accept-Encoding"] = "identity"
+    logger.debug("Pool HTTP: connections=%s maxsize=%s block=%s keepalive=%s",
+                 pool_connections, pool_maxsize, pool_block, keepalive)
+    return session, adapter
+
+
+class PoolMetrics:
+    """
+    Métricas de uso del pool: peticiones simultáneas frente a su tamaño.
+
+    Args:
+        pool_maxsize: Conexiones por host del pool
+    """
+
+    def __init__(self, pool_maxsize: int):
+        self.pool_maxsize = pool_maxsize
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak = 0
+        self._requests = 0
+        self._saturated = 0
+        self._busy_since: Optional[float] = None
+        self._saturated_seconds = 0.0
+
+    @contextmanager
+    def track(self):
+        """Contexto alrededor de cada petición HTTP."""
+        with self._lock:
+            self._requests += 1
+            if self._in_flight >= self.pool_maxsize:
+                # No queda conexión libre: esperará (pool_block) o abrirá una de más
+                self._saturated += 1
+            self._in_flight += 1
+            self._peak = max(self._peak, self._in_flight)
+            if self._in_flight > self.pool_maxsize and self._busy_since is None:
+                self._busy_since = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                if self._in_flight <= self.pool_maxsize and self._busy_since is not None:
+                    self._saturated_seconds += time.monotonic() - self._busy_since
+                    self._busy_since = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            saturated_seconds = self._saturated_seconds
+            if self._busy_since is not None:
+                saturated_seconds += time.monotonic() - self._busy_since
+            return {
+                "pool_maxsize": self.pool_maxsize,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak,
+                "requests": self._requests,
+                "saturated": self._saturated,
+                "saturated_ratio": round(self._saturated / self._requests, 4) if self._requests else 0.0,
+                "saturated_seconds": round(saturated_seconds, 3),
+            }
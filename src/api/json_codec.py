@@ -0,0 +1,73 @@
+"""
+Decodificación JSON de las respuestas del backend.
+
+Usa ``orjson`` o ``msgspec`` si están instalados (decodifican directamente
+desde los bytes de ``response.content`` y son varias veces más rápidos con
+listados grandes); si no, la librería estándar ``json``.
+"""
+
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgspec = None
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+    _decode = orjson.loads
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _decode = msgspec.json.Decoder().decode
+else:
+    BACKEND = "json"
+    _decode = json.loads
+
+
+def loads(content: bytes) -> Any:
+    """
+    Decodifica un cuerpo JSON (bytes o str).
+
+    Raises:
+        ValueError: Si el contenido no es JSON válido (con cualquier backend)
+    """
+    try:
+        return _decode(content)
+    except ValueError:
+        raise
+    except Exception as e:
+        # msgspec.DecodeError no hereda de ValueError
+        raise ValueError(str(e)) from e
+
+
+def unwrap_envelope(payload: Any) -> Any:
+    """
+    Extrae el contenido útil del sobre del backend en un solo paso.
+
+    El backend Java devuelve ``{"success": true, "data": ...}`` o, en el
+    formato antiguo, ``{"success": true, "dataObj": ...}``. ``data`` tiene
+    prioridad; null o ausente se convierte en lista vacía. Una lista directa
+    se devuelve tal cual.
+    """
+    if not payload:
+        return []
+    if isinstance(payload, dict):
+        if "data" in payload:
+            data = payload["data"]
+        else:
+            data = payload.get("dataObj")
+        return [] if data is None else data
+    return payload
+
+
+logger.debug("Decodificador JSON: %s", BACKEND)
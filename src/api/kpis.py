@@ -0,0 +1,93 @@
+"""
+Indicadores del dashboard (facturación, pendiente de cobro, vencidas,
+conversión) mantenidos al día con sincronización incremental.
+
+``KpiService`` sincroniza facturas, pagos y presupuestos con ``EntitySync``
+sobre la caché local del usuario, con los registros completos (las ventanas
+guardan sus listados proyectados aparte, ver ``view_key``): la primera vez
+en la sesión parte de lo guardado en disco y después solo pide lo
+modificado. Los cambios de cada sincronización se integran en ``KpiEngine``
+(``src/data/kpi.py``), que recalcula los indicadores sin volver a recorrer
+los registros.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from src.api.endpoints import Endpoints
+from src.data.kpi import KpiEngine
+from src.data.local_store import LocalStore
+from src.data.sync import EntitySync
+
+logger = logging.getLogger(__name__)
+
+
+class KpiService:
+    """
+    Indicadores del dashboard de admin/empleado.
+
+    Args:
+        api: Instancia de RESTClient
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self.engine = KpiEngine()
+        self._lock = threading.Lock()
+        self._syncs: Dict[str, EntitySync] = {}
+        self._offline_revision = 0
+        self.attach(None)
+
+    def attach(self, store: Optional[LocalStore]):
+        """Empieza de cero con la caché local del usuario (o sin ella)."""
+        with self._lock:
+            self._syncs = {
+                entity: EntitySync(entity, (Endpoints.id_field(entity), "id"), store=store)
+                for entity in KpiEngine.ENTITIES
+            }
+            self.engine.reset()
+
+    def clear(self):
+        """Olvida los datos (al cerrar sesión)."""
+        self.attach(None)
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Sincroniza las tres entidades y devuelve los indicadores.
+
+        Si una entidad no se puede sincronizar pero ya estaba cargada, se
+        calcula con lo que había.
+
+        Returns:
+            Dict con 'success' y 'data' (ver ``KpiEngine.compute``) o 'error'
+        """
+        with self._lock:
+            full = False
+            offline = getattr(self.api, "offline", None)
+            if offline is not None:
+                # Igual que los listados: sin conexión o tras reenviar la cola,
+                # los IDs temporales obligan a recargar completo
+                full = offline.active or offline.revision != self._offline_revision
+                self._offline_revision = offline.revision
+            for entity, sync in self._syncs.items():
+                # El motor guarda la única copia de los registros; ``EntitySync``
+                # solo la marca de agua y los hashes
+                rows = sync.restore()
+                if rows is not None:
+                    self.engine.load(entity, rows)
+                result = sync.sync(
+                    lambda params, entity=entity: self.api.get_all(entity, params=params),
+                    full=full,
+                )
+                if not result.get("success"):
+                    if not sync.loaded:
+                        return result
+                    logger.warning("KPI: no se pudo sincronizar /%s: %s", entity, result.get("error"))
+                    continue
+                delta = result["data"]
+                if delta.full:
+                    self.engine.load(entity, delta.upserted)
+                elif delta.changed:
+                    self.engine.apply(entity, delta.upserted, delta.deleted)
+        return {"success": True, "data": self.engine.compute()}
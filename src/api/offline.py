@@ -0,0 +1,544 @@
+"""
+Modo sin conexión: lecturas desde la caché local y escrituras en cola.
+
+Cuando el backend deja de responder (error de conexión), ``RESTClient``
+pasa a modo sin conexión:
+
+- Los GET se sirven desde la ``LocalStore`` del usuario (listados completos,
+  por ``id`` o por cliente).
+- ``create``/``update``/``delete`` se guardan en la cola persistente
+  (``WriteQueue``) y se aplican ya a la caché local, de modo que las
+  ventanas muestran el cambio al momento.
+- Un sondeo periódico (``OFFLINE_PROBE_INTERVAL``) detecta la vuelta del
+  backend; entonces la cola se reenvía en orden. Antes de cada modificación
+  o baja se compara el registro del servidor con el que se editó: si otro
+  usuario lo ha cambiado entretanto, la escritura queda como conflicto y no
+  se envía.
+
+Si el backend no está disponible al iniciar sesión, se puede entrar con las
+credenciales del último login correcto en este equipo (``OfflineCredentials``,
+durante ``OFFLINE_LOGIN_DAYS`` días).
+
+Con conexión las escrituras siguen siendo síncronas: las ventanas necesitan
+el ID que asigna el backend (facturas y sus líneas, por ejemplo).
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from src.api.endpoints import Endpoints
+from src.api.reference_cache import REFERENCE_ID_KEYS, entity_of
+from src.api.scheduler import BACKGROUND, request_context
+from src.data.local_store import LIST_VIEW, LocalStore, encode_rows, view_key
+from src.data.sync import parse_timestamp
+from src.data.write_queue import CONFLICT, FAILED, QueuedWrite, WriteQueue, is_temp_id
+from src.utils.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Tipos de error de red que devuelve ``RESTClient._send`` en "network_error"
+NETWORK_TIMEOUT = "timeout"
+NETWORK_CONNECTION = "connection"
+NETWORK_CIRCUIT = "circuit"
+
+PBKDF2_ITERATIONS = 200_000
+
+
+def id_keys_for(entity: str) -> Tuple[str, ...]:
+    """Claves del ID de una entidad en los registros del backend."""
+    if entity in REFERENCE_ID_KEYS:
+        return REFERENCE_ID_KEYS[entity]
+    return (Endpoints.id_field(entity), "id")
+
+
+def _comparable(value: Any) -> Any:
+    """Valor de un campo para comparar: las relaciones anidadas valen por su ID."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if str(key).lower().startswith("id") and not isinstance(item, (dict, list)):
+                return item
+    return value
+
+
+def same_value(a: Any, b: Any) -> bool:
+    """
+    True si dos valores de un campo son el mismo dato.
+
+    ``{"id_cliente": 3, ...}`` equivale a ``3`` y los números se comparan por
+    valor (``10``, ``10.0`` y ``"10.00"`` son iguales).
+    """
+    a, b = _comparable(a), _comparable(b)
+    if isinstance(a, bool) or isinstance(b, bool):
+        return a is b
+    if a == b:
+        return True
+    if isinstance(a, (int, float)) or isinstance(b, (int, float)):
+        try:
+            return float(a) == float(b)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+# =====================================================================
+# CREDENCIALES PARA ENTRAR SIN CONEXIÓN
+# =====================================================================
+class OfflineCredentials:
+    """
+    Verificador de las credenciales del último login correcto de cada usuario.
+
+    Se guarda un hash PBKDF2 de la contraseña (nunca la contraseña) y los
+    datos de usuario normalizados, en ``offline_users.json`` dentro del
+    directorio de la caché local.
+
+    Args:
+        path: Fichero JSON (por defecto en ``Settings.get_cache_dir()``)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(Settings.get_cache_dir(), "offline_users.json")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(base_url: str, username: str) -> str:
+        text = f"{base_url}|{username.strip().lower()}"
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _hash(password: str, salt: bytes, iterations: int) -> bytes:
+        return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, data: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        # Solo legible por el usuario
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def remember(self, base_url: str, username: str, password: str, user: Dict[str, Any]):
+        """Guarda las credenciales tras un login correcto con el backend."""
+        salt = os.urandom(16)
+        entry = {
+            "salt": salt.hex(),
+            "iterations": PBKDF2_ITERATIONS,
+            "hash": self._hash(password, salt, PBKDF2_ITERATIONS).hex(),
+            "user": user,
+            "saved_at": time.time(),
+        }
+        with self._lock:
+            try:
+                data = self._read()
+                data[self._key(base_url, username)] = entry
+                self._write(data)
+            except OSError as e:
+                logger.warning("No se pudieron guardar las credenciales sin conexión: %s", e)
+
+    def verify(self, base_url: str, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """
+        Comprueba las credenciales contra las del último login correcto.
+
+        Returns:
+            Datos del usuario normalizados, o None si no coinciden o han caducado
+        """
+        with self._lock:
+            entry = self._read().get(self._key(base_url, username))
+        if not isinstance(entry, dict):
+            return None
+        if time.time() - float(entry.get("saved_at", 0)) > Settings.OFFLINE_LOGIN_DAYS * 86400:
+            logger.info("Credenciales sin conexión caducadas para %s", username)
+            return None
+        try:
+            salt = bytes.fromhex(entry["salt"])
+            expected = bytes.fromhex(entry["hash"])
+            digest = self._hash(password, salt, int(entry["iterations"]))
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not hmac.compare_digest(digest, expected):
+            return None
+        return entry.get("user")
+
+
+# =====================================================================
+# MODO SIN CONEXIÓN
+# =====================================================================
+class OfflineManager:
+    """
+    Estado de conexión de un ``RESTClient`` y su cola de escrituras.
+
+    Args:
+        api: Cliente REST (se usan ``_send`` y ``_create_now``/``_update_now``/
+             ``_delete_now`` para reenviar la cola)
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self.store: Optional[LocalStore] = None
+        self.queue: Optional[WriteQueue] = None
+        self.active = False
+        self.reason: Optional[str] = None
+        # Cambia al entrar o salir del modo sin conexión y tras reenviar la
+        # cola: las ventanas recargan entonces el listado completo
+        self.revision = 0
+        self.replaying = False
+        self.last_replay: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        self._probe_timer: Optional[threading.Timer] = None
+        # Credenciales de una sesión iniciada sin conexión (solo en memoria)
+        # para abrir la sesión en el backend cuando vuelva
+        self._pending_login: Optional[Tuple[str, str]] = None
+
+    @property
+    def available(self) -> bool:
+        """True si se puede trabajar sin conexión (modo activado y caché abierta)."""
+        return Settings.OFFLINE_MODE and self.store is not None
+
+    # =====================================================================
+    # SESIÓN
+    # =====================================================================
+    def attach(self, store: Optional[LocalStore]):
+        """Usa la caché del usuario; si quedaron escrituras de otra sesión, se reenvían."""
+        self.store = store
+        self.queue = WriteQueue(store) if store is not None else None
+        if self.queue is not None and not self.active and len(self.queue):
+            logger.info("Hay %d escrituras pendientes de una sesión anterior", len(self.queue))
+            self._replay_async()
+
+    def detach(self):
+        """Suelta la caché y para el sondeo (logout)."""
+        with self._lock:
+            self._cancel_probe()
+            self.active = False
+            self.reason = None
+            self._pending_login = None
+        self.store = None
+        self.queue = None
+
+    def start_offline_session(self, username: str, password: str):
+        """Sesión iniciada sin backend: al volver la conexión se hará el login."""
+        self._pending_login = (username, password)
+        self.mark_offline("login sin conexión")
+
+    # =====================================================================
+    # ESTADO DE CONEXIÓN
+    # =====================================================================
+    def mark_offline(self, reason: str = NETWORK_CONNECTION):
+        """Pasa a modo sin conexión (si está disponible) y empieza a sondear el backend."""
+        if not self.available:
+            return
+        with self._lock:
+            if self.active:
+                return
+            self.active = True
+            self.reason = reason
+            self.revision += 1
+            self._schedule_probe()
+        logger.warning("Backend no disponible (%s): modo sin conexión", reason)
+
+    def mark_online(self):
+        """El backend vuelve a responder: se reenvía la cola en segundo plano."""
+        with self._lock:
+            if not self.active:
+                return
+            self.active = False
+            self.reason = None
+            self.revision += 1
+            self._cancel_probe()
+        logger.info("Conexión recuperada con el backend")
+        self._replay_async()
+
+    def _schedule_probe(self):
+        self._cancel_probe()
+        timer = threading.Timer(Settings.OFFLINE_PROBE_INTERVAL, self._probe)
+        timer.daemon = True
+        self._probe_timer = timer
+        timer.start()
+
+    def _cancel_probe(self):
+        if self._probe_timer is not None:
+            self._probe_timer.cancel()
+            self._probe_timer = None
+
+    def _probe(self):
+        """Comprueba si el backend responde (cualquier respuesta HTTP vale)."""
+        try:
+            self.api.session.head(Endpoints.BASE_URL, timeout=Settings.API_CONNECT_TIMEOUT)
+        except requests.exceptions.RequestException:
+            with self._lock:
+                if self.active:
+                    self._schedule_probe()
+            return
+        self.api.breakers.reset()
+        self.mark_online()
+
+    def status(self) -> Dict[str, Any]:
+        """Estado para la barra de estado: conexión y escrituras pendientes."""
+        counts = self.queue.counts() if self.queue is not None else {}
+        return {
+            "offline": self.active,
+            "reason": self.reason,
+            "pending": counts.get("pending", 0),
+            "conflicts": counts.get(CONFLICT, 0),
+            "failed": counts.get(FAILED, 0),
+            "replaying": self.replaying,
+            "last_replay": self.last_replay,
+        }
+
+    # =====================================================================
+    # LECTURAS
+    # =====================================================================
+    def read(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Sirve un GET desde la caché local.
+
+        Se admiten el listado completo, ``?id=`` y ``?cliente_id=``; la lista
+        de campos (proyección) se ignora. Si no hay registros completos de la
+        entidad se sirve el listado proyectado de su ventana.
+
+        Returns:
+            Dict con 'success' y 'data' o 'error' (con ``offline=True``)
+        """
+        entity = entity_of(endpoint)
+        store = self.store
+        params = {key: value for key, value in (params or {}).items()
+                  if key != Settings.API_FIELDS_PARAM and value is not None}
+        data: Any = None
+        if store is not None and "/" not in endpoint.strip("/").split("?", 1)[0]:
+            key = self._read_key(store, entity)
+            if not params:
+                data = store.load(key)
+            elif set(params) == {"id"}:
+                data = store.get(key, params["id"])
+            elif len(params) == 1 and set(params) <= {"cliente_id", "id_cliente"}:
+                data = store.load(key, next(iter(params.values())))
+            elif set(params) == {Settings.API_SYNC_PARAM}:
+                # Los cambios locales ya están en la caché; del backend no llega nada
+                data = {"changed": [], "deleted": []}
+        if data is None:
+            return {"success": False, "offline": True,
+                    "error": f"Sin conexión: {endpoint} no está disponible en la caché local"}
+        return {"success": True, "data": data, "offline": True}
+
+    @staticmethod
+    def _read_key(store: LocalStore, entity: str) -> str:
+        """Clave de la caché con los registros de la entidad (completos si los hay)."""
+        if store.marker(entity) is None:
+            view = view_key(entity, LIST_VIEW)
+            if store.marker(view) is not None:
+                return view
+        return entity
+
+    @staticmethod
+    def _write_keys(store: LocalStore, entity: str) -> List[str]:
+        """Claves de la caché donde se guarda la entidad (la escritura va a todas)."""
+        keys = [key for key in (entity, view_key(entity, LIST_VIEW)) if store.marker(key) is not None]
+        return keys or [entity]
+
+    # =====================================================================
+    # ESCRITURAS
+    # =====================================================================
+    def should_queue(self, result: Dict[str, Any]) -> bool:
+        """True si una escritura fallida debe ir a la cola (el backend no es alcanzable)."""
+        return (not result.get("success") and self.active
+                and result.get("network_error") in (NETWORK_CONNECTION, NETWORK_CIRCUIT))
+
+    def queue_write(self, method: str, entity: str, entity_id: Any = None,
+                    payload: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Guarda una escritura en la cola y la aplica ya a la caché local.
+
+        Returns:
+            Dict con 'success', 'data' (el registro tal como queda en local)
+            y ``queued=True``
+        """
+        store, queue = self.store, self.queue
+        if store is None or queue is None:
+            return {"success": False, "error": "Sin conexión con el servidor"}
+        id_keys = id_keys_for(entity)
+        base = (store.get(self._read_key(store, entity), entity_id)
+                if entity_id is not None and method != "POST" else None)
+        entry = queue.enqueue(method, entity, entity_id, payload, base)
+
+        row: Optional[Dict[str, Any]] = None
+        if method != "DELETE":
+            row = dict(base or {})
+            row.update(payload or {})
+            row[id_keys[0]] = entry.entity_id if entry is not None and method == "POST" else entity_id
+        for key in self._write_keys(store, entity):
+            if row is None:
+                store.write(key, deleted=[entity_id])
+            else:
+                store.write(key, rows=encode_rows([row], id_keys))
+
+        self.api.helpers.invalidate_client_snapshot()
+        self.api.reference_cache.invalidate(entity)
+        logger.info("%s /%s guardado sin conexión (%d pendientes)", method, entity, len(queue))
+        return {"success": True, "data": row, "queued": True}
+
+    # =====================================================================
+    # REENVÍO DE LA COLA
+    # =====================================================================
+    def _replay_async(self):
+        def task():
+            with request_context(BACKGROUND):
+                self.replay()
+
+        threading.Thread(target=task, name="offline-replay", daemon=True).start()
+
+    def replay(self) -> Dict[str, int]:
+        """
+        Reenvía la cola en orden.
+
+        Se detiene en el primer error de red (la escritura sigue pendiente).
+        Una modificación o baja cuyo registro ha cambiado en el servidor queda
+        como ``conflict``; una escritura rechazada por el backend, como ``failed``.
+
+        Returns:
+            Contadores ``sent``, ``conflicts``, ``failed`` y ``pending``
+        """
+        summary = {"sent": 0, "conflicts": 0, "failed": 0, "pending": 0}
+        queue = self.queue
+        if queue is None or not self._replay_lock.acquire(blocking=False):
+            return summary
+        self.replaying = True
+        touched = set()
+        try:
+            if self._pending_login is not None:
+                username, password = self._pending_login
+                login = self.api.login(username, password)
+                if not login.get("success"):
+                    logger.warning("No se pudo abrir la sesión al recuperar la conexión: %s",
+                                   login.get("error"))
+                    summary["pending"] = len(queue)
+                    return summary
+                self._pending_login = None
+
+            while not self.active:
+                # Se relee en cada paso: ``remap`` cambia las escrituras siguientes
+                entry = queue.first()
+                if entry is None:
+                    break
+                outcome = self._replay_one(queue, entry)
+                if outcome is None:
+                    break
+                touched.add(entry.entity)
+                summary[outcome] += 1
+            summary["pending"] = len(queue)
+        finally:
+            self.replaying = False
+            self._replay_lock.release()
+            if touched:
+                self._after_replay(touched)
+        self.last_replay = summary
+        if summary["sent"] or summary["conflicts"] or summary["failed"]:
+            logger.info("Cola sin conexión reenviada: %s", summary)
+        return summary
+
+    def _replay_one(self, queue: WriteQueue, entry: QueuedWrite) -> Optional[str]:
+        """Envía una escritura; None si hay que parar (sin conexión)."""
+        if entry.method in ("PUT", "DELETE") and entry.base is not None and not is_temp_id(entry.entity_id):
+            current = self.api._send("GET", f"/{entry.entity}", params={"id": entry.entity_id})
+            if current.get("network_error"):
+                self.mark_offline(current["network_error"])
+                return None
+            server = current.get("data")
+            if isinstance(server, list):
+                server = server[0] if server else None
+            if not current.get("success") or not isinstance(server, dict):
+                if entry.method == "DELETE":
+                    # Ya no existe en el servidor: la baja está hecha
+                    queue.complete(entry.seq)
+                    return "sent"
+                queue.mark(entry.seq, CONFLICT, "El registro ya no existe en el servidor")
+                return "conflicts"
+            fields = entry.payload.keys() if entry.method == "PUT" and entry.payload else None
+            if self._changed_since(entry.base, server, fields):
+                logger.warning("Conflicto en %s /%s id=%s: modificado en el servidor",
+                               entry.method, entry.entity, entry.entity_id)
+                queue.mark(entry.seq, CONFLICT, "El registro se modificó en el servidor")
+                return "conflicts"
+
+        if entry.method == "POST":
+            result = self.api._create_now(entry.entity, entry.payload or {})
+        elif entry.method == "PUT":
+            result = self.api._update_now(entry.entity, entry.entity_id, entry.payload or {})
+        else:
+            result = self.api._delete_now(entry.entity, entry.entity_id)
+
+        if result.get("network_error"):
+            return None
+        if not result.get("success"):
+            queue.mark(entry.seq, FAILED, str(result.get("error"))[:500])
+            return "failed"
+        if entry.method == "POST":
+            real_id = self._created_id(entry.entity, result.get("data"))
+            if real_id is not None:
+                queue.remap(entry.entity_id, real_id)
+            else:
+                logger.warning("El alta de /%s no devolvió ID; las escrituras que dependan de %s fallarán",
+                               entry.entity, entry.entity_id)
+        queue.complete(entry.seq)
+        return "sent"
+
+    @staticmethod
+    def _created_id(entity: str, data: Any) -> Any:
+        if isinstance(data, dict):
+            for key in id_keys_for(entity):
+                value = data.get(key)
+                if value is not None and not isinstance(value, dict):
+                    return value
+        return None
+
+    @staticmethod
+    def _changed_since(base: Dict[str, Any], server: Dict[str, Any],
+                       fields: Optional[Any] = None) -> bool:
+        """
+        True si el registro del servidor ya no es el que se editó sin conexión.
+
+        Solo cuentan los campos que toca la escritura (``fields``; todos los
+        de ``base`` en las bajas): un cambio en el servidor de otro campo no
+        choca con la modificación. Con la misma marca de tiempo en ambos el
+        registro no ha cambiado.
+        """
+        field = Settings.API_SYNC_TIMESTAMP_FIELD
+        if (base.get(field) is not None and server.get(field) is not None
+                and parse_timestamp(base[field]) == parse_timestamp(server[field])):
+            return False
+        keys = base.keys() if fields is None else fields
+        return any(not same_value(base[key], server[key])
+                   for key in keys if key != field and key in base and key in server)
+
+    def _after_replay(self, entities):
+        """Tras reenviar, lo guardado en local (con IDs temporales) se descarta."""
+        store = self.store
+        for entity in entities:
+            self.api.reference_cache.invalidate(entity)
+            if store is not None:
+                store.invalidate(entity)
+        self.api.helpers.invalidate_client_snapshot()
+        with self._lock:
+            self.revision += 1
+
+    def conflicts(self) -> List[QueuedWrite]:
+        """Escrituras que no se han enviado por conflicto o error."""
+        if self.queue is None:
+            return []
+        return [entry for entry in self.queue.entries(None) if entry.status in (CONFLICT, FAILED)]
@@ -0,0 +1,432 @@
+"""
+Precarga en segundo plano de la vista a la que probablemente se irá después.
+
+``MainWindow`` avisa de cada cambio de vista (``navigate``) y el prefetcher
+aprende dos cosas:
+
+- Las transiciones habituales entre vistas (Presupuestos → Facturas,
+  Facturas → Pagos...), contadas por usuario y guardadas en la caché local.
+- Los GET que hace cada vista al abrirse (los interactivos de los primeros
+  segundos, hechos desde la interfaz o desde el planificador de peticiones).
+  La marca de agua de una sincronización incremental (``updated_since``) no
+  se guarda: al precargar se usa la actual de la entidad, la misma que
+  enviará la ventana al abrirse (ver ``EntitySync.restore``).
+
+Cuando el usuario lleva un rato sin generar peticiones y el pool de
+conexiones tiene hueco, se repiten en segundo plano los GET de las vistas
+más probables y se guardan en una caché de un solo uso con caducidad corta
+(``PREFETCH_TTL``): la primera petición idéntica de la interfaz se sirve de
+ella y la entrada desaparece.
+
+Las peticiones del usuario siempre van primero: la precarga solo arranca
+sin peticiones en curso, hace una sola a la vez, se cancela al cambiar de
+vista y, si el usuario pide lo mismo que se está precargando, comparte la
+petición en curso (``SingleFlight``) en lugar de repetirla.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+from src.api.reference_cache import entity_of
+from src.api.scheduler import INTERACTIVE, PREFETCH, current_priority, request_context
+from src.api.single_flight import SingleFlight, copy_result
+from src.data.local_store import LIST_VIEW, LocalStore, view_key
+from src.utils.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Transiciones conocidas de antemano (el uso real las va ajustando)
+DEFAULT_TRANSITIONS: Dict[str, Dict[str, int]] = {
+    "Presupuestos": {"Facturas": 2},
+    "Facturas": {"Pagos": 2},
+}
+# Peso de una indicación explícita (ej: tras generar una factura)
+HINT_WEIGHT = 3
+# Probabilidad mínima de una transición para precargar su destino
+MIN_PROBABILITY = 0.25
+# Vistas destino que se precargan como máximo tras cada navegación
+MAX_TARGETS = 2
+# Segundos tras abrir una vista durante los que se anotan sus GET
+LEARN_SECONDS = 5.0
+MAX_LOADS_PER_VIEW = 8
+
+_META_KEY = "prefetch_model"
+# Valor de ``API_SYNC_PARAM`` en los GET aprendidos: se sustituye al precargar
+WATERMARK = "<high_water>"
+
+# (endpoint, params) de un GET que hace una vista al abrirse
+Load = Tuple[str, Optional[Dict[str, Any]]]
+
+
+def learned_load(endpoint: str, params: Optional[Dict[str, Any]]) -> Load:
+    """GET tal como se aprende: sin la marca de agua concreta de la sincronización."""
+    if not params:
+        return endpoint, None
+    params = dict(params)
+    if params.get(Settings.API_SYNC_PARAM) is not None:
+        params[Settings.API_SYNC_PARAM] = WATERMARK
+    return endpoint, params
+
+
+class PrefetchCache:
+    """
+    Resultados precargados: se entregan una sola vez y caducan a los ``ttl`` segundos.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = Settings.PREFETCH_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, Dict[str, Any]]] = {}
+        self.hits = 0
+        self.expired = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.monotonic() - entry[0] < self.ttl
+
+    def put(self, key: Hashable, result: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+
+    def take(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Resultado precargado para ``key`` (lo retira), o None."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.ttl:
+                self.expired += 1
+                return None
+            self.hits += 1
+        # Solo lo recibe un llamador (se retira) y nadie más tiene sus filas:
+        # ``_run`` guarda únicamente resultados no compartidos o ya copiados
+        return entry[1]
+
+    def discard_entity(self, entity: str):
+        """Descarta lo precargado de una entidad (tras escribir en ella)."""
+        with self._lock:
+            for key in [key for key in self._entries if entity_of(key[1]) == entity]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class NavigationModel:
+    """Transiciones entre vistas y GET de cada vista, aprendidos del uso."""
+
+    def __init__(self):
+        self.transitions: Dict[str, Dict[str, int]] = {
+            view: dict(targets) for view, targets in DEFAULT_TRANSITIONS.items()
+        }
+        self.loads: Dict[str, List[Load]] = {}
+
+    def record(self, source: str, target: str, weight: int = 1):
+        if source and target and source != target:
+            targets = self.transitions.setdefault(source, {})
+            targets[target] = targets.get(target, 0) + weight
+
+    def predict(self, view: str, limit: int = MAX_TARGETS) -> List[Tuple[str, float]]:
+        """Vistas más probables después de ``view`` con su probabilidad."""
+        targets = self.transitions.get(view) or {}
+        total = sum(targets.values())
+        if not total:
+            return []
+        ranked = sorted(targets.items(), key=lambda item: item[1], reverse=True)
+        return [(target, count / total) for target, count in ranked[:limit]
+                if count / total >= MIN_PROBABILITY]
+
+    def to_json(self) -> str:
+        return json.dumps({"transitions": self.transitions, "loads": self.loads})
+
+    @classmethod
+    def from_json(cls, text: Optional[str]) -> "NavigationModel":
+        model = cls()
+        if not text:
+            return model
+        try:
+            data = json.loads(text)
+            for view, targets in (data.get("transitions") or {}).items():
+                model.transitions[view] = {target: int(count) for target, count in targets.items()}
+            for view, loads in (data.get("loads") or {}).items():
+                model.loads[view] = [learned_load(endpoint, params) for endpoint, params in loads]
+        except (ValueError, TypeError, AttributeError):
+            logger.debug("Modelo de navegación guardado no válido; se empieza de cero")
+        return model
+
+
+class _Task:
+    __slots__ = ("generation", "view", "endpoint", "params")
+
+    def __init__(self, generation: int, view: str, endpoint: str, params: Optional[Dict[str, Any]]):
+        self.generation = generation
+        self.view = view
+        self.endpoint = endpoint
+        self.params = params
+
+
+class Prefetcher:
+    """
+    Planificador de precargas de un ``RESTClient``.
+
+    Args:
+        api: Cliente REST (se usan ``_send``, ``_single_flight``, ``pool_metrics`` y ``offline``)
+        idle_delay: Segundos sin peticiones antes de precargar
+        ttl: Segundos que vale un resultado precargado
+    """
+
+    def __init__(self, api, idle_delay: Optional[float] = None, ttl: Optional[float] = None):
+        self.api = api
+        self.enabled = Settings.PREFETCH
+        self.idle_delay = Settings.PREFETCH_IDLE_DELAY if idle_delay is None else idle_delay
+        self.cache = PrefetchCache(ttl)
+        self.model = NavigationModel()
+        self.store: Optional[LocalStore] = None
+        self.view: Optional[str] = None
+        self._view_since = 0.0
+        self._view_loads: List[Load] = []
+        self._cond = threading.Condition()
+        self._tasks: Deque[_Task] = deque()
+        # Se incrementa al cambiar de vista: las tareas anteriores se descartan
+        self._generation = 0
+        self._user_in_flight = 0
+        self._last_activity = time.monotonic()
+        self._worker: Optional[threading.Thread] = None
+        # Precarga en curso y si el usuario ha pedido lo mismo entretanto
+        # (entonces el resultado ya le ha llegado y no se guarda)
+        self._current_key: Optional[Hashable] = None
+        self._claimed = False
+        self.prefetched = 0
+        self.cancelled = 0
+
+    # =====================================================================
+    # SESIÓN
+    # =====================================================================
+    def attach(self, store: Optional[LocalStore]):
+        """Carga el modelo de navegación guardado del usuario."""
+        self.store = store
+        text = None
+        if store is not None:
+            rows = store.query("SELECT value FROM meta WHERE key = ?", (_META_KEY,))
+            text = rows[0][0] if rows else None
+        self.model = NavigationModel.from_json(text)
+
+    def clear(self):
+        """Cancela lo pendiente y olvida lo precargado (logout)."""
+        with self._cond:
+            self._generation += 1
+            self._tasks.clear()
+            self.view = None
+            self._view_loads = []
+        self.cache.clear()
+        self.store = None
+        self.model = NavigationModel()
+
+    def _save(self):
+        if self.store is None:
+            return
+        try:
+            self.store.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               (_META_KEY, self.model.to_json()))
+        except Exception as e:
+            logger.debug("No se pudo guardar el modelo de navegación: %s", e)
+
+    # =====================================================================
+    # NAVEGACIÓN
+    # =====================================================================
+    def navigate(self, view: str):
+        """
+        La interfaz pasa a ``view``: se aprende la transición, se cancelan las
+        precargas pendientes y se programan las de las vistas siguientes.
+        """
+        with self._cond:
+            previous = self.view
+            self._finish_view()
+            self.view = view
+            self._view_since = time.monotonic()
+            self._view_loads = []
+            self._last_activity = self._view_since
+            self._generation += 1
+            self.cancelled += len(self._tasks)
+            self._tasks.clear()
+        if previous:
+            self.model.record(previous, view)
+        self._save()
+        for target, probability in self.model.predict(view):
+            logger.debug("Precarga: %s → %s (p=%.2f)", view, target, probability)
+            self._schedule(target)
+
+    def hint(self, view: str):
+        """Indicación explícita de la vista siguiente (ej: tras generar una factura)."""
+        if self.view:
+            self.model.record(self.view, view, HINT_WEIGHT)
+            self._save()
+        self._schedule(view)
+
+    def _finish_view(self):
+        """Guarda los GET anotados de la vista que se abandona."""
+        if self.view and self._view_loads:
+            self.model.loads[self.view] = self._view_loads[:MAX_LOADS_PER_VIEW]
+
+    def _schedule(self, view: str):
+        if not self.enabled or view == self.view:
+            return
+        loads = self.model.loads.get(view) or []
+        if not loads:
+            return
+        with self._cond:
+            for endpoint, params in loads:
+                self._tasks.append(_Task(self._generation, view, endpoint, params))
+            self._ensure_worker()
+            self._cond.notify_all()
+
+    # =====================================================================
+    # PETICIONES DEL USUARIO
+    # =====================================================================
+    def take(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Resultado precargado de un GET (una sola vez), o None."""
+        return self.cache.take(key) if self.enabled else None
+
+    @contextmanager
+    def user_request(self, key: Hashable, endpoint: str, params: Optional[Dict[str, Any]] = None):
+        """
+        Contexto de cada GET que no es una precarga: la precarga espera a que
+        no quede ninguno en curso. Los interactivos recién abierta una vista
+        (desde la interfaz o desde los hilos del planificador, que es donde
+        cargan los listados) se anotan como carga de esa vista; los de
+        segundo plano no.
+        """
+        with self._cond:
+            self._user_in_flight += 1
+            self._last_activity = time.monotonic()
+            if key == self._current_key:
+                self._claimed = True
+            if (self.view and current_priority() == INTERACTIVE
+                    and self._last_activity - self._view_since <= LEARN_SECONDS
+                    and len(self._view_loads) < MAX_LOADS_PER_VIEW):
+                load = learned_load(endpoint, params)
+                if load not in self._view_loads:
+                    self._view_loads.append(load)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._user_in_flight -= 1
+                self._last_activity = time.monotonic()
+                self._cond.notify_all()
+
+    def invalidate(self, entity: str):
+        self.cache.discard_entity(entity)
+
+    # =====================================================================
+    # HILO DE PRECARGA
+    # =====================================================================
+    def _ensure_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="prefetch", daemon=True)
+            self._worker.start()
+
+    def _has_capacity(self) -> bool:
+        """True si el pool tiene hueco de sobra (la mitad libre)."""
+        metrics = self.api.pool_metrics.snapshot()
+        return metrics["in_flight"] < max(1, metrics["pool_maxsize"] // 2)
+
+    def _wait_idle(self, task: _Task) -> bool:
+        """Espera a que el usuario esté inactivo; False si la tarea se ha cancelado."""
+        with self._cond:
+            while True:
+                if task.generation != self._generation:
+                    self.cancelled += 1
+                    return False
+                idle_for = time.monotonic() - self._last_activity
+                if self._user_in_flight == 0 and idle_for >= self.idle_delay:
+                    if self._has_capacity():
+                        return True
+                    idle_for = 0.0
+                self._cond.wait(timeout=max(0.05, self.idle_delay - idle_for))
+
+    def _watermark(self, entity: str) -> Any:
+        """
+        Marca de agua guardada de la entidad: la que enviará ``EntitySync``
+        al restaurar el listado (el de la ventana si es proyectado).
+        """
+        store = self.store
+        if store is None:
+            return None
+        for key in (view_key(entity, LIST_VIEW), entity):
+            marker = store.marker(key)
+            if marker is not None:
+                return marker.get("high_water")
+        return None
+
+    def _resolve(self, endpoint: str, params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Parámetros de un GET aprendido con la marca de agua actual."""
+        if not params or params.get(Settings.API_SYNC_PARAM) != WATERMARK:
+            return params
+        params = dict(params)
+        high_water = self._watermark(entity_of(endpoint))
+        if high_water is None:
+            # Sin marca la ventana pedirá el listado completo
+            del params[Settings.API_SYNC_PARAM]
+        else:
+            params[Settings.API_SYNC_PARAM] = high_water
+        return params or None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._tasks:
+                    self._worker = None
+                    return
+                task = self._tasks.popleft()
+            if not self._wait_idle(task) or self.api.offline.active:
+                continue
+            params = self._resolve(task.endpoint, task.params)
+            key = SingleFlight.make_key("GET", task.endpoint, params)
+            if key in self.cache:
+                continue
+            kwargs = {"params": params} if params else {}
+            with self._cond:
+                self._current_key, self._claimed = key, False
+            try:
+                with request_context(PREFETCH):
+                    result = self.api._single_flight.do(
+                        key, lambda: self.api._send("GET", task.endpoint, **kwargs),
+                        share=copy_result)
+            except Exception as e:
+                logger.debug("Precarga de %s fallida: %s", task.endpoint, e)
+                continue
+            finally:
+                with self._cond:
+                    claimed = self._claimed
+                    self._current_key = None
+            if result.get("success") and not claimed:
+                self.cache.put(key, result)
+                self.prefetched += 1
+                logger.debug("Precargado %s para %s", task.endpoint, task.view)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            pending = len(self._tasks)
+        return {
+            "enabled": self.enabled,
+            "view": self.view,
+            "prefetched": self.prefetched,
+            "hits": self.cache.hits,
+            "expired": self.cache.expired,
+            "cached": len(self.cache),
+            "pending": pending,
+            "cancelled": self.cancelled,
+            "predictions": self.model.predict(self.view) if self.view else [],
+        }
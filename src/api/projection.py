@@ -0,0 +1,124 @@
+"""
+Selección de campos (proyección) en los listados.
+
+Las tablas solo muestran unas pocas columnas, pero los listados del backend
+incluyen todos los campos y los objetos relacionados anidados. Si el backend
+admite el parámetro ``fields`` (``?fields=id_factura,total,cliente_pagador.id_cliente``)
+se le pide solo lo necesario; el registro completo se sigue obteniendo con
+``get_by_id`` al editar o exportar.
+
+Como no todos los backends lo soportan, en modo ``auto`` se detecta por
+entidad con la primera respuesta: si trae campos que no se pidieron, el
+backend ignora el parámetro y deja de enviarse.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from src.utils.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Estado del soporte por entidad
+UNKNOWN = "unknown"
+SUPPORTED = "supported"
+UNSUPPORTED = "unsupported"
+
+
+def top_level_fields(fields: Iterable[str]) -> set:
+    """Claves de primer nivel de una lista de campos ("cliente.id" -> "cliente")."""
+    return {field.split(".", 1)[0] for field in fields}
+
+
+class FieldSelection:
+    """
+    Decide si se envía la proyección y aprende si el backend la soporta.
+
+    Args:
+        mode: "auto" (detectar), "on" (enviar siempre) u "off" (no enviar nunca)
+        param: Nombre del parámetro de consulta
+    """
+
+    def __init__(self, mode: Optional[str] = None, param: Optional[str] = None):
+        self.mode = (mode or Settings.API_FIELD_SELECTION).lower()
+        self.param = param or Settings.API_FIELDS_PARAM
+        self._lock = threading.Lock()
+        self._support: Dict[str, str] = {}
+
+    def support(self, entity: str) -> str:
+        with self._lock:
+            return self._support.get(entity, UNKNOWN)
+
+    def should_send(self, entity: str, fields: Optional[Sequence[str]]) -> bool:
+        if not fields or self.mode == "off":
+            return False
+        if self.mode == "on":
+            return True
+        return self.support(entity) != UNSUPPORTED
+
+    def params_for(self, params: Optional[Dict], fields: Sequence[str]) -> Dict[str, Any]:
+        """Copia de ``params`` con la lista de campos añadida."""
+        merged = dict(params or {})
+        merged[self.param] = ",".join(fields)
+        return merged
+
+    def observe(self, entity: str, fields: Sequence[str], rows: Any) -> str:
+        """
+        Aprende de una respuesta proyectada si el backend respetó ``fields``.
+
+        Returns:
+            Estado resultante para la entidad
+        """
+        if self.mode != "auto" or not isinstance(rows, list) or not rows:
+            return self.support(entity)
+        allowed = top_level_fields(fields) | {"id"}
+        sample = [row for row in rows[:20] if isinstance(row, dict)]
+        extra = set()
+        for row in sample:
+            extra.update(key for key in row.keys() if key not in allowed)
+        state = UNSUPPORTED if extra else SUPPORTED
+        with self._lock:
+            previous = self._support.get(entity, UNKNOWN)
+            self._support[entity] = state
+        if previous != state:
+            if state == UNSUPPORTED:
+                logger.info("El backend ignora '%s' en /%s (campos extra: %s); se piden registros completos",
+                            self.param, entity, ", ".join(sorted(extra)[:5]))
+            else:
+                logger.info("El backend admite '%s' en /%s", self.param, entity)
+        return state
+
+    def mark_unsupported(self, entity: str):
+        with self._lock:
+            self._support[entity] = UNSUPPORTED
+
+    def states(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._support)
+
+
+def fields_from_columns(columns: List[Dict], id_field: Optional[str] = None,
+                        derived: Iterable[str] = (), extra: Iterable[str] = ()) -> List[str]:
+    """
+    Campos a pedir para una tabla a partir de sus columnas.
+
+    Args:
+        columns: Definición de columnas del ``DataTable``
+        id_field: Nombre del ID en el backend (ej: "id_factura")
+        derived: Columnas calculadas en el cliente (no existen en el backend)
+        extra: Campos del backend necesarios para calcular las columnas derivadas
+
+    Returns:
+        Lista sin duplicados, en orden
+    """
+    derived = set(derived)
+    fields: List[str] = []
+    if id_field:
+        fields.append(id_field)
+    for column in columns:
+        name = column.get("name")
+        if name and name != "id" and name not in derived:
+            fields.append(name)
+    fields.extend(extra)
+    return list(dict.fromkeys(fields))
@@ -0,0 +1,191 @@
+"""
+Datos de referencia (clientes, productos, empleados, roles) con caché local.
+
+Estos listados se piden sin filtros desde casi todas las ventanas. Con la
+caché local (``LocalStore``) abierta, la primera petición de la sesión
+devuelve al instante lo guardado en la sesión anterior y lo revalida en
+segundo plano; durante ``LOCAL_CACHE_TTL`` segundos las siguientes se
+sirven de memoria. Tras una escritura en la entidad se vuelve a pedir al
+backend de forma síncrona, para que el registro creado o editado aparezca.
+
+Esto vale para los selectores y datos auxiliares; el listado de la propia
+ventana ("Actualizar") usa ``refresh`` y siempre va al backend, para ver los
+cambios de otros usuarios.
+
+Cada llamada recibe sus propios diccionarios (se decodifican de nuevo desde
+los bytes guardados), igual que si vinieran de la red.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from src.api.endpoints import Endpoints
+from src.api.scheduler import BACKGROUND, request_context
+from src.data.local_store import LocalStore, dumps, encode_rows, loads
+from src.utils.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Entidad -> endpoint del listado completo
+REFERENCE_ENDPOINTS = {
+    "clientes": "/clientes",
+    "productos": "/productos",
+    "empleados": "/empleados",
+    "roles_empleado": Endpoints.ROLES_EMPLEADO,
+}
+# Claves del ID de cada entidad en el backend
+REFERENCE_ID_KEYS = {
+    "clientes": ("id_cliente", "id"),
+    "productos": ("id_producto", "id"),
+    "empleados": ("id_empleado", "id"),
+    "roles_empleado": ("id_rol", "id"),
+}
+
+
+def entity_of(endpoint: str) -> str:
+    """"/clientes?id=3" -> "clientes"."""
+    return endpoint.split("?", 1)[0].strip("/").split("/", 1)[0]
+
+
+class ReferenceCache:
+    """
+    Listados de referencia servidos desde memoria o disco y revalidados.
+
+    Args:
+        fetch: Función que hace el GET de un endpoint y devuelve el dict de
+               ``RESTClient`` ({'success', 'data'|'error'})
+        ttl: Segundos que un listado revalidado se sirve sin volver a pedirlo
+    """
+
+    def __init__(self, fetch: Callable[[str], Dict[str, Any]], ttl: Optional[float] = None):
+        self._fetch = fetch
+        self.ttl = Settings.LOCAL_CACHE_TTL if ttl is None else ttl
+        self.store: Optional[LocalStore] = None
+        self._lock = threading.Lock()
+        # Listado serializado por entidad y momento de su última revalidación
+        self._payloads: Dict[str, bytes] = {}
+        self._fresh_at: Dict[str, float] = {}
+        # Entidades modificadas en esta sesión: lo guardado ya no vale
+        self._dirty: Set[str] = set()
+        self._refreshing: Set[str] = set()
+        # Se incrementa en cada escritura: una revalidación lanzada antes no
+        # debe guardar datos anteriores a la escritura
+        self._generation: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def handles(entity: str) -> bool:
+        return entity in REFERENCE_ENDPOINTS
+
+    # =====================================================================
+    # SESIÓN
+    # =====================================================================
+    def attach(self, store: Optional[LocalStore]):
+        """Usa ``store`` como respaldo en disco (None = solo memoria)."""
+        with self._lock:
+            self.store = store
+
+    def clear(self):
+        """Olvida los datos en memoria y suelta la caché en disco (logout)."""
+        with self._lock:
+            self.store = None
+            self._payloads.clear()
+            self._fresh_at.clear()
+            self._dirty.clear()
+
+    def invalidate(self, entity: str):
+        """Marca una entidad como modificada: la próxima lectura irá al backend."""
+        if not self.handles(entity):
+            return
+        with self._lock:
+            self._dirty.add(entity)
+            self._generation[entity] = self._generation.get(entity, 0) + 1
+            self._payloads.pop(entity, None)
+            self._fresh_at.pop(entity, None)
+
+    # =====================================================================
+    # LECTURA
+    # =====================================================================
+    def get(self, entity: str) -> Dict[str, Any]:
+        """
+        Listado completo de una entidad de referencia.
+
+        Returns:
+            Dict con 'success' y 'data' o 'error'
+        """
+        now = time.monotonic()
+        with self._lock:
+            dirty = entity in self._dirty
+            payload = None if dirty else self._payloads.get(entity)
+            fresh = payload is not None and now - self._fresh_at.get(entity, 0.0) < self.ttl
+            store = self.store
+        if payload is None and not dirty and store is not None:
+            payload = store.load_payload(entity)
+            if payload is not None:
+                with self._lock:
+                    self._payloads.setdefault(entity, payload)
+        if payload is None:
+            self.misses += 1
+            return self.refresh(entity)
+        self.hits += 1
+        if not fresh:
+            self._revalidate_async(entity)
+        return {"success": True, "data": loads(payload)}
+
+    def refresh(self, entity: str) -> Dict[str, Any]:
+        """Pide el listado al backend y actualiza memoria y disco."""
+        with self._lock:
+            generation = self._generation.get(entity, 0)
+        result = self._fetch(REFERENCE_ENDPOINTS[entity])
+        data = result.get("data")
+        if not result.get("success") or not isinstance(data, list):
+            return result
+        # Se serializa antes de devolverlo: el llamador puede modificar los registros
+        payload = dumps(data)
+        with self._lock:
+            if self._generation.get(entity, 0) != generation:
+                # Ha habido una escritura mientras tanto
+                return result
+            self._payloads[entity] = payload
+            self._fresh_at[entity] = time.monotonic()
+            self._dirty.discard(entity)
+            store = self.store
+        if store is not None:
+            store.write_async(entity, rows=encode_rows(data, REFERENCE_ID_KEYS[entity]), replace=True)
+        return result
+
+    def _revalidate_async(self, entity: str):
+        with self._lock:
+            if entity in self._refreshing:
+                return
+            self._refreshing.add(entity)
+
+        def task():
+            try:
+                with request_context(BACKGROUND):
+                    result = self.refresh(entity)
+                if not result.get("success"):
+                    logger.info("No se pudo revalidar /%s: %s", entity, result.get("error"))
+            finally:
+                with self._lock:
+                    self._refreshing.discard(entity)
+
+        threading.Thread(target=task, name=f"revalidate-{entity}", daemon=True).start()
+
+    def warm(self, entities: Optional[Iterable[str]] = None):
+        """Revalida en segundo plano los listados (los que haya en disco quedan listos ya)."""
+        for entity in entities or REFERENCE_ENDPOINTS:
+            self._revalidate_async(entity)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "cached": sorted(self._payloads),
+                "refreshing": sorted(self._refreshing),
+                "persistent": self.store is not None,
+            }
@@ -0,0 +1,187 @@
+"""
+Resiliencia de las peticiones al backend: reintentos y circuit breaker.
+
+- ``RetryPolicy``: reintenta solo métodos idempotentes (GET, PUT, DELETE)
+  ante errores transitorios (timeout, conexión rechazada, 502/503/504), con
+  espera exponencial y jitter para no sincronizar a todos los clientes.
+- ``CircuitBreaker``: tras varios fallos seguidos de un endpoint deja de
+  llamarlo durante un tiempo (falla al instante) y después deja pasar una
+  única petición de prueba antes de cerrarse de nuevo.
+
+Los valores por defecto salen de ``Settings`` (variables de entorno
+``API_RETRY_*`` y ``API_CIRCUIT_*``).
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from src.utils.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUS = frozenset({502, 503, 504})
+
+
+# =====================================================================
+# REINTENTOS
+# =====================================================================
+class RetryPolicy:
+    """
+    Política de reintentos con backoff exponencial y "full jitter".
+
+    Args:
+        max_attempts: Intentos totales (1 = sin reintentos)
+        backoff_base: Espera base en segundos (se duplica en cada intento)
+        backoff_max: Espera máxima entre intentos
+    """
+
+    def __init__(self, max_attempts: Optional[int] = None,
+                 backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None):
+        self.max_attempts = max(1, max_attempts if max_attempts is not None else Settings.API_RETRY_ATTEMPTS)
+        self.backoff_base = backoff_base if backoff_base is not None else Settings.API_RETRY_BACKOFF
+        self.backoff_max = backoff_max if backoff_max is not None else Settings.API_RETRY_BACKOFF_MAX
+        self._random = random.Random()
+
+    @staticmethod
+    def is_idempotent(method: str) -> bool:
+        return method.upper() in IDEMPOTENT_METHODS
+
+    def can_retry(self, method: str, attempt: int) -> bool:
+        """True si tras el intento ``attempt`` (desde 1) se puede reintentar."""
+        return attempt < self.max_attempts and self.is_idempotent(method)
+
+    def delay(self, attempt: int) -> float:
+        """Espera antes del siguiente intento: aleatoria en [0, base * 2^(intento-1)]."""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return self._random.uniform(0, cap)
+
+
+# =====================================================================
+# CIRCUIT BREAKER
+# =====================================================================
+class CircuitBreaker:
+    """
+    Circuit breaker de un endpoint.
+
+    Estados: ``closed`` (normal), ``open`` (falla al instante hasta que pasa
+    ``reset_timeout``) y ``half_open`` (se permite una petición de prueba).
+
+    Args:
+        failure_threshold: Fallos consecutivos que abren el circuito
+        reset_timeout: Segundos en abierto antes de probar de nuevo
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: Optional[int] = None,
+                 reset_timeout: Optional[float] = None):
+        self.failure_threshold = max(1, failure_threshold or Settings.API_CIRCUIT_THRESHOLD)
+        self.reset_timeout = reset_timeout if reset_timeout is not None else Settings.API_CIRCUIT_RESET
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def retry_after(self) -> float:
+        """Segundos que faltan para volver a probar (0 si no está abierto)."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Indica si la petición puede salir a la red."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # Semiabierto: una sola petición de prueba a la vez
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuito cerrado de nuevo tras una petición correcta")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """Libera la prueba del estado semiabierto sin contar éxito ni fallo (no llegó a salir)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("Circuito abierto tras %d fallos; se reintentará en %.0f s",
+                                   self._failures, self.reset_timeout)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    """Un ``CircuitBreaker`` por endpoint (ruta sin query ni IDs numéricos)."""
+
+    _NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+    def __init__(self, failure_threshold: Optional[int] = None,
+                 reset_timeout: Optional[float] = None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def endpoint_key(cls, endpoint: str) -> str:
+        """"/presupuestos/12/generar-facturas?x=1" -> "/presupuestos/{id}/generar-facturas"."""
+        path = endpoint.split("?", 1)[0]
+        return cls._NUMERIC_SEGMENT.sub("/{id}", path) or "/"
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        key = self.endpoint_key(endpoint)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._breakers[key] = breaker
+            return breaker
+
+    def states(self) -> Dict[str, str]:
+        """Estado de cada endpoint conocido (para diagnóstico)."""
+        with self._lock:
+            items = list(self._breakers.items())
+        return {key: breaker.state for key, breaker in items}
+
+    def reset(self):
+        """Cierra todos los circuitos (el backend vuelve a responder)."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            breaker.record_success()
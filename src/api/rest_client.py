@@ -4,15 +4,32 @@ Cliente REST profesional para comunicación con el backend Java/Jakarta
 
 import requests
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, Sequence
 from enum import Enum
 
+from src.api import json_codec
 from src.api.endpoints import Endpoints
+from src.api.compression import TransferStats
+from src.api.http_pool import PoolMetrics, create_session
+from src.api.kpis import KpiService
+from src.api.offline import (NETWORK_CIRCUIT, NETWORK_CONNECTION, NETWORK_TIMEOUT,
+                             OfflineCredentials, OfflineManager)
+from src.api.prefetch import Prefetcher
+from src.api.projection import SUPPORTED, FieldSelection
+from src.api.reference_cache import ReferenceCache, entity_of
+from src.api.resilience import RETRYABLE_STATUS, CircuitBreakerRegistry, RetryPolicy
+from src.api.scheduler import (INTERACTIVE, CancelledError, RequestScheduler, current_priority,
+                               current_token, on_worker)
+from src.api.single_flight import SingleFlight, copy_result
+from src.data.local_store import LocalStore
+from src.data.presupuesto_index import PresupuestoFacturasIndex
 from src.utils.exceptions import APIError, AuthenticationError, NetworkError
+from src.utils.logging_config import log_sampled, truncated
+from src.utils.perf import recorder, span
+from src.utils.settings import Settings
 
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -29,14 +46,45 @@ class RESTClient:
     Maneja errores, timeouts, logging y autenticación.
     """
 
-    def __init__(self, base_url: Optional[str] = None, timeout: int = 30):
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 30,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 breakers: Optional[CircuitBreakerRegistry] = None):
         """
         Args:
             base_url: URL base del backend (opcional, usa Endpoints.BASE_URL por defecto)
-            timeout: Timeout en segundos para las peticiones
+            timeout: Timeout de lectura en segundos (la conexión usa Settings.API_CONNECT_TIMEOUT)
+            retry_policy: Política de reintentos (por defecto desde Settings)
+            breakers: Circuit breakers por endpoint (por defecto desde Settings)
         """
-        self.session = requests.Session()
-        self.timeout = timeout
+        # Sesión con pool de conexiones y keep-alive configurables (Settings.HTTP_*)
+        self.session, self._http_adapter = create_session()
+        self.pool_metrics = PoolMetrics(getattr(self._http_adapter, "_pool_maxsize", Settings.HTTP_POOL_MAXSIZE))
+        # Bytes recibidos por endpoint (comprimidos frente a decodificados)
+        self.transfer_stats = TransferStats()
+        # Proyección de campos en listados (Settings.API_FIELD_SELECTION)
+        self.field_selection = FieldSelection()
+        # (conexión, lectura): un backend caído falla en segundos, no en ``timeout``
+        self.timeout = (Settings.API_CONNECT_TIMEOUT, timeout)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = breakers or CircuitBreakerRegistry()
+        # GET idénticos en curso comparten una única petición
+        self._single_flight = SingleFlight()
+        # Índice presupuesto -> facturas, alimentado con los listados de facturas
+        self.presupuesto_facturas = PresupuestoFacturasIndex()
+        # Caché local en disco (se abre tras el login, una por usuario) y
+        # listados de referencia servidos desde ella
+        self.local_store: Optional[LocalStore] = None
+        self._local_store_key: Optional[str] = None
+        self.reference_cache = ReferenceCache(lambda endpoint: self._request("GET", endpoint))
+        # Modo sin conexión: lecturas desde la caché local y escrituras en cola
+        self.offline = OfflineManager(self)
+        self.offline_credentials = OfflineCredentials()
+        # Precarga en segundo plano de la vista siguiente más probable
+        self.prefetch = Prefetcher(self)
+        # Cargas en segundo plano por prioridad, canceladas al cambiar de vista
+        self.scheduler = RequestScheduler()
+        # Indicadores del dashboard, sincronizados de forma incremental
+        self.kpis = KpiService(self)
         self.token: Optional[str] = None
         self.user_role: Optional[str] = None
         
@@ -69,8 +117,8 @@ class RESTClient:
         """
         try:
             url = Endpoints.build_url(Endpoints.AUTH_LOGIN)
-            logger.info(f"Intentando login para usuario: {username}")
-            logger.info(f"URL de login: {url}")
+            logger.info("Intentando login para usuario: %s", username)
+            logger.debug("URL de login: %s", url)
             
             response = self.session.post(
                 url,
@@ -81,28 +129,28 @@ class RESTClient:
 
             if response.status_code == 401:
                 error_msg = "Credenciales inválidas"
-                logger.warning(f"Login fallido para {username}: {error_msg}")
+                logger.warning("Login fallido para %s: %s", username, error_msg)
                 return {"success": False, "error": error_msg}
 
             if response.status_code == 404:
                 error_msg = f"Endpoint no encontrado (404). Verifique que el backend esté ejecutándose y la URL sea correcta.\nURL intentada: {url}\nBase URL: {Endpoints.BASE_URL}"
-                logger.error(f"Error en login: {error_msg}")
+                logger.error("Error en login: %s", error_msg)
                 return {"success": False, "error": error_msg}
 
             if response.status_code != 200:
                 error_msg = response.text or f"Error HTTP {response.status_code}"
-                logger.error(f"Error en login (HTTP {response.status_code}): {error_msg}")
-                logger.error(f"URL intentada: {url}")
+                logger.error("Error en login (HTTP %s): %s", response.status_code, truncated(error_msg))
+                logger.error("URL intentada: %s", url)
                 return {"success": False, "error": f"Error HTTP {response.status_code}: {error_msg[:200]}"}
 
-            data = response.json()
-            logger.info(f"Respuesta del backend (login): {data}")
+            data = json_codec.loads(response.content)
+            logger.debug("Respuesta del backend (login): %s", truncated(data))
 
             # El backend Java devuelve {"success": true, "data": {...}} para login
             # Extraer datos del usuario desde la respuesta
             user_data = data.get("data", data)  # Login usa "data", no "dataObj"
             
-            logger.info(f"user_data extraído: {user_data}")
+            logger.debug("user_data extraído: %s", truncated(user_data))
             
             # Normalizar estructura del backend Java a formato esperado
             # El backend Java devuelve: id_empleado, id_rol como objeto, etc.
@@ -154,8 +202,7 @@ class RESTClient:
             self.user_id = user_id  # Usar la variable directamente
             self.username = normalized_data.get("nombre", username)
 
-            logger.info(f"user_id: {self.user_id}, user_role: {self.user_role}, username: {self.username}")
-            logger.info(f"normalized_data: {normalized_data}")
+            logger.debug("user_id: %s, user_role: %s, username: %s", self.user_id, self.user_role, self.username)
             
             # Retornar datos normalizados
             user_data = normalized_data
@@ -164,21 +211,26 @@ class RESTClient:
             # No necesitamos token para autenticación, la sesión HTTP se mantiene automáticamente
             if self.token:
                 self.session.headers.update({"Authorization": f"Bearer {self.token}"})
-                logger.info(f"Login exitoso para {username} (rol: {self.user_role})")
+                logger.info("Login exitoso para %s (rol: %s)", username, self.user_role)
             else:
                 # El backend Java usa sesiones HTTP, no tokens
                 # La sesión se mantiene mediante cookies automáticamente
-                logger.info(f"Login exitoso para {username} (rol: {self.user_role}) - Sesión HTTP activa")
+                logger.info("Login exitoso para %s (rol: %s) - Sesión HTTP activa", username, self.user_role)
 
+            self._open_local_store(normalized_data)
+            if Settings.OFFLINE_MODE and self.local_store is not None:
+                # Para poder entrar la próxima vez aunque el backend no responda
+                self.offline_credentials.remember(Endpoints.BASE_URL, username, password, normalized_data)
             return {"success": True, "data": user_data}
 
-        except requests.exceptions.Timeout:
-            error_msg = "Timeout al conectar con el servidor"
-            logger.error(error_msg)
-            return {"success": False, "error": error_msg}
         except requests.exceptions.ConnectionError:
+            # Incluye el timeout de conexión: el backend no es alcanzable
             error_msg = "No se pudo conectar con el servidor"
             logger.error(error_msg)
+            return self._offline_login(username, password, error_msg)
+        except requests.exceptions.Timeout:
+            error_msg = "Timeout al conectar con el servidor"
+            logger.error(error_msg)
             return {"success": False, "error": error_msg}
         except requests.exceptions.RequestException as e:
             error_msg = f"Error de red: {str(e)}"
@@ -189,84 +241,230 @@ class RESTClient:
             logger.error(error_msg, exc_info=True)
             return {"success": False, "error": error_msg}
 
+    def _offline_login(self, username: str, password: str, error_msg: str) -> Dict[str, Any]:
+        """
+        Inicia sesión sin backend con las credenciales del último login correcto.
+
+        Returns:
+            Dict con 'success' y 'data' (y ``offline=True``) o el error de conexión
+        """
+        if not (Settings.OFFLINE_MODE and Settings.LOCAL_CACHE):
+            return {"success": False, "error": error_msg}
+        user = self.offline_credentials.verify(Endpoints.BASE_URL, username, password)
+        if user is None:
+            return {"success": False, "error": error_msg}
+        self.token = None
+        self.user_role = (user.get("rol") or "").upper().strip()
+        self.user_id = user.get("id")
+        self.username = user.get("nombre") or username
+        self._open_local_store(user)
+        if self.local_store is None:
+            return {"success": False, "error": error_msg}
+        self.offline.start_offline_session(username, password)
+        logger.info("Sesión iniciada sin conexión para %s (rol: %s)", username, self.user_role)
+        return {"success": True, "data": dict(user), "offline": True}
+
     def logout(self):
         """Cierra la sesión del usuario"""
-        if self.token:
+        if self.token and not self.offline.active:
             try:
                 url = Endpoints.build_url(Endpoints.AUTH_LOGOUT)
                 self.session.post(url, timeout=self.timeout)
             except Exception as e:
-                logger.warning(f"Error al hacer logout en el servidor: {e}")
+                logger.warning("Error al hacer logout en el servidor: %s", e)
         
         self.token = None
         self.user_role = None
         self.user_id = None
         self.username = None
+        self.presupuesto_facturas.clear()
+        self.helpers.invalidate_client_snapshot()
+        self.scheduler.cancel_view()
+        self.reference_cache.clear()
+        self.prefetch.clear()
+        self.kpis.clear()
+        self.offline.detach()
+        if self.local_store is not None:
+            self.local_store.close()
+            self.local_store = None
+            self._local_store_key = None
         self.session.headers.pop("Authorization", None)
         logger.info("Sesión cerrada")
 
+    def _open_local_store(self, user: Dict[str, Any]):
+        """Abre la caché local del usuario y revalida en segundo plano los datos de referencia."""
+        user_key = f"{user.get('tipo')}:{user.get('id')}"
+        if self.local_store is not None and self._local_store_key == user_key:
+            # Login al recuperar la conexión: la caché (y su cola) ya está abierta
+            return
+        if self.local_store is not None:
+            self.offline.detach()
+            self.local_store.close()
+        self.local_store = LocalStore.open_for(Endpoints.BASE_URL, user_key)
+        self._local_store_key = user_key if self.local_store is not None else None
+        self.reference_cache.attach(self.local_store)
+        self.offline.attach(self.local_store)
+        self.prefetch.attach(self.local_store)
+        self.kpis.attach(self.local_store)
+        if self.local_store is not None and self.user_role != UserRole.CLIENTE.value:
+            # Lo guardado en la sesión anterior ya se puede mostrar; esto lo pone al día
+            self.reference_cache.warm()
+
     # -----------------------------------------------------
     # PETICIÓN GENÉRICA
     # -----------------------------------------------------
     def _request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Realiza una petición HTTP y devuelve siempre un dict {'success', 'data'|'error'}."""
+        method = method.upper()
+        with span(f"http {method} {CircuitBreakerRegistry.endpoint_key(endpoint)}") as item:
+            result = self._dispatch(method, endpoint, **kwargs)
+            if item is not None:
+                item.attrs["success"] = bool(result.get("success"))
+            return result
+
+    def _dispatch(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """``_request`` sin cronometrar: caché offline, agrupación de GET e invalidaciones."""
+        if method == "GET":
+            if self.offline.active:
+                return self.offline.read(endpoint, kwargs.get("params"))
+            # Los GET idénticos simultáneos se agrupan: se decodifica una vez y
+            # cada llamador recibe su propia copia de las filas
+            key = SingleFlight.make_key(method, endpoint, kwargs.get("params"))
+            prefetched = self.prefetch.take(key)
+            if prefetched is not None:
+                return prefetched
+            with self.prefetch.user_request(key, endpoint, kwargs.get("params")):
+                result = self._single_flight.do(
+                    key, lambda: self._send(method, endpoint, **kwargs), share=copy_result)
+            if result.get("cancelled") and not self._is_cancelled():
+                # Se había unido a la petición de una vista ya cerrada
+                result = self._send(method, endpoint, **kwargs)
+            if result.get("network_error") == NETWORK_CONNECTION:
+                self.offline.mark_offline()
+                if self.offline.active:
+                    cached = self.offline.read(endpoint, kwargs.get("params"))
+                    if cached.get("success"):
+                        return cached
+            return result
+        result = self._send(method, endpoint, **kwargs)
+        if result.get("network_error") == NETWORK_CONNECTION:
+            self.offline.mark_offline()
+        if result.get("success"):
+            # Una escritura puede cambiar facturas/pagos del portal de cliente
+            self.helpers.invalidate_client_snapshot()
+            self.reference_cache.invalidate(entity_of(endpoint))
+            self.prefetch.invalidate(entity_of(endpoint))
+        return result
+
+    @staticmethod
+    def _blocks_ui() -> bool:
+        """True si quien espera la respuesta es la interfaz (no un hilo del planificador)."""
+        return current_priority() == INTERACTIVE and not on_worker()
+
+    @staticmethod
+    def _is_cancelled() -> bool:
+        token = current_token()
+        return token is not None and token.cancelled
+
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """Profundidad de la cola del planificador y tiempos de espera por prioridad."""
+        return self.scheduler.stats()
+
+    def get_coalescing_stats(self) -> Dict[str, int]:
+        """Contadores de peticiones GET ejecutadas y ahorradas por agrupación."""
+        return self._single_flight.stats()
+
+    def _record_transfer(self, endpoint: str, response: requests.Response):
+        """Anota los bytes de red y descomprimidos de una respuesta."""
+        decoded = len(response.content or b"")
+        try:
+            # urllib3: bytes leídos del socket (antes de descomprimir)
+            wire = response.raw.tell()
+        except Exception:
+            wire = 0
+        if not wire:
+            wire = int(response.headers.get("Content-Length") or decoded)
+        self.transfer_stats.record(
+            CircuitBreakerRegistry.endpoint_key(endpoint),
+            response.headers.get("Content-Encoding", ""),
+            wire,
+            decoded,
+        )
+        recorder.count_request(wire)
+
+    def get_transfer_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Bytes transferidos por endpoint.
+
+        Por endpoint: ``wire_bytes`` (por la red), ``decoded_bytes`` (tras
+        descomprimir), ``ratio`` y ``uncompressed`` (respuestas grandes que
+        llegaron sin comprimir; ver también ``transfer_stats.uncompressed_endpoints()``).
+        """
+        return self.transfer_stats.snapshot()
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Uso del pool de conexiones HTTP.
+
+        ``saturated`` cuenta las peticiones que empezaron sin conexión libre;
+        si no es 0 con la concurrencia habitual, subir ``HTTP_POOL_MAXSIZE``.
+        ``connections_opened`` muy por encima de ``pool_maxsize`` indica
+        conexiones que se abren y descartan (sin keep-alive efectivo).
+        """
+        stats = self.pool_metrics.snapshot()
+        stats.update(self._http_adapter.pool_stats())
+        return stats
+
+    def _send(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """Envía la petición HTTP y normaliza la respuesta."""
+        if self._is_cancelled():
+            # La vista que la pidió ya no existe
+            return {"success": False, "error": "Petición cancelada", "cancelled": True}
+        breaker = self.breakers.get(endpoint)
+        if not breaker.allow():
+            error_msg = (f"El servidor no responde en {endpoint}; "
+                         f"se reintentará en {breaker.retry_after():.0f} s")
+            log_sampled(logger, logging.WARNING, f"circuit:{endpoint}", "Circuito abierto: %s %s", method, endpoint)
+            return {"success": False, "error": error_msg, "network_error": NETWORK_CIRCUIT}
+
         try:
             url = Endpoints.build_url(endpoint)
-            logger.debug(f"{method} {url}")
+            log_sampled(logger, logging.DEBUG, f"request:{method} {endpoint}", "%s %s", method, url)
             
             # Asegurar que el timeout esté en kwargs
             if "timeout" not in kwargs:
                 kwargs["timeout"] = self.timeout
             
-            response = self.session.request(method, url, **kwargs)
+            try:
+                # Las de segundo plano esperan a que terminen las interactivas
+                with self.scheduler.admit():
+                    response = self._send_with_retries(method, url, endpoint, **kwargs)
+            except CancelledError:
+                # Cancelada antes de salir: no dice nada del servidor
+                breaker.release()
+                return {"success": False, "error": "Petición cancelada", "cancelled": True}
+            except requests.exceptions.RequestException:
+                breaker.record_failure()
+                raise
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            self._record_transfer(endpoint, response)
 
             # Respuestas exitosas
             if response.status_code in (200, 201):
-                try:
-                    json_data = response.json() if response.content else None
-                    logger.debug(f"Respuesta JSON cruda: {json_data}")
-                    if json_data:
-                        # El backend Java ahora devuelve {"success": true, "data": {...}} 
-                        # o {"success": true, "dataObj": {...}} (formato antiguo)
-                        # Priorizar "data" sobre "dataObj" para compatibilidad
-                        if "data" in json_data:
-                            data_value = json_data["data"]
-                            logger.debug(f"data encontrado: {data_value} (type: {type(data_value)})")
-                            # Si data es null, convertir a lista vacía (backend devuelve [] cuando no hay datos)
-                            if data_value is None:
-                                json_data["data"] = []
-                                logger.debug("data era None, convertido a lista vacía []")
-                        elif "dataObj" in json_data:
-                            # Compatibilidad con formato antiguo
-                            data_value = json_data.pop("dataObj")
-                            logger.debug(f"dataObj extraído: {data_value} (type: {type(data_value)})")
-                            if data_value is None:
-                                json_data["data"] = []
-                                logger.debug("dataObj era None, convertido a lista vacía []")
-                            else:
-                                json_data["data"] = data_value
-                        # Si no tiene "data" ni "dataObj", puede ser una lista directa
-                        elif isinstance(json_data, list):
-                            return {"success": True, "data": json_data}
-                        # Si solo tiene "success", el dataObj puede estar vacío
-                        else:
-                            json_data["data"] = []
-                    
-                    # Extraer data de manera segura
-                    if json_data:
-                        data = json_data.get("data")
-                        logger.debug(f"Data extraída antes de validación: {data} (type: {type(data)})")
-                        # Si data es None, devolver lista vacía para operaciones de lista
-                        # (el backend Java devuelve null cuando no hay resultados)
-                        if data is None:
-                            data = []
-                            logger.debug("Data era None, convertido a lista vacía []")
-                        logger.debug(f"Data final: {data} (type: {type(data)})")
-                        return {"success": True, "data": data}
+                content = response.content
+                if not content:
                     return {"success": True, "data": []}
+                try:
+                    with span("json.decode", bytes=len(content)):
+                        json_data = json_codec.loads(content)
                 except ValueError:
                     # Si no es JSON válido, devolver el texto
                     return {"success": True, "data": response.text}
+                # {"success", "data"} o {"success", "dataObj"} (formato antiguo) o lista directa
+                return {"success": True, "data": json_codec.unwrap_envelope(json_data)}
 
             # Sin contenido (204)
             if response.status_code == 204:
@@ -285,11 +483,11 @@ class RESTClient:
                     endpoint,
                 )
             else:
-                logger.error(f"Error {response.status_code} en {method} {endpoint}: {error_msg}")
+                logger.error("Error %s en %s %s: %s", response.status_code, method, endpoint, truncated(error_msg))
             
             # Intentar extraer el mensaje de error del JSON si está disponible
             try:
-                error_json = response.json()
+                error_json = json_codec.loads(response.content)
                 if isinstance(error_json, dict):
                     # El backend puede devolver {"success": false, "data": {"error": "..."}}
                     if "data" in error_json and isinstance(error_json["data"], dict):
@@ -301,30 +499,132 @@ class RESTClient:
             
             return {"success": False, "error": error_msg}
 
-        except requests.exceptions.Timeout:
-            error_msg = f"Timeout al realizar {method} {endpoint}"
-            logger.error(error_msg)
-            return {"success": False, "error": error_msg}
         except requests.exceptions.ConnectionError:
+            # Incluye el timeout de conexión: el backend no es alcanzable
             error_msg = "No se pudo conectar con el servidor"
             logger.error(error_msg)
-            return {"success": False, "error": error_msg}
+            return {"success": False, "error": error_msg, "network_error": NETWORK_CONNECTION}
+        except requests.exceptions.Timeout:
+            error_msg = f"Timeout al realizar {method} {endpoint}"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg, "network_error": NETWORK_TIMEOUT}
         except requests.exceptions.RequestException as e:
             error_msg = f"Error de red: {str(e)}"
             logger.error(error_msg)
             return {"success": False, "error": error_msg}
         except Exception as e:
+            # Sin resultado anotado, la prueba del circuito semiabierto quedaría ocupada
+            breaker.release()
             error_msg = f"Error inesperado: {str(e)}"
             logger.error(error_msg, exc_info=True)
             return {"success": False, "error": error_msg}
 
+    def _send_with_retries(self, method: str, url: str, endpoint: str, **kwargs) -> requests.Response:
+        """
+        Envía la petición reintentando los errores transitorios.
+
+        Solo se reintentan métodos idempotentes; un POST que llega al backend
+        y falla al leer la respuesta podría haber creado el registro. Tampoco
+        se reintenta lo que espera la interfaz (interactivo fuera de los hilos
+        del planificador): el backoff la dejaría congelada.
+        """
+        retry = not self._blocks_ui()
+        attempt = 1
+        while True:
+            try:
+                with self.pool_metrics.track():
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                if not retry or not self.retry_policy.can_retry(method, attempt) or self._is_cancelled():
+                    raise
+                reason = type(e).__name__
+            else:
+                if (response.status_code not in RETRYABLE_STATUS or not retry or self._is_cancelled()
+                        or not self.retry_policy.can_retry(method, attempt)):
+                    return response
+                reason = f"HTTP {response.status_code}"
+            delay = self.retry_policy.delay(attempt)
+            logger.warning("%s %s falló (%s); reintento %d/%d en %.2f s",
+                           method, endpoint, reason, attempt, self.retry_policy.max_attempts - 1, delay)
+            time.sleep(delay)
+            attempt += 1
+
     # -----------------------------------------------------
     # CRUD GENÉRICO
     # -----------------------------------------------------
-    def get_all(self, entity: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """Obtiene todos los registros de una entidad"""
-        return self._request("GET", f"/{entity}", params=params)
+    def get_all(self, entity: str, params: Optional[Dict] = None,
+                fields: Optional[Sequence[str]] = None, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Obtiene todos los registros de una entidad.
+
+        Args:
+            entity: Entidad (ej: "facturas")
+            params: Parámetros de consulta opcionales
+            fields: Campos necesarios (proyección). Solo se envían si el backend
+                    los admite; los registros pueden venir incompletos, así que
+                    para editar o exportar debe usarse ``get_by_id``.
+            refresh: Pedirlo al backend aunque sea un listado de referencia en
+                     caché (cargas que pide el usuario, como "Actualizar")
+        """
+        if not params and not fields and self.reference_cache.handles(entity):
+            if refresh:
+                return self.reference_cache.refresh(entity)
+            # Clientes, productos, empleados para selectores: memoria o caché
+            # local, revalidados en segundo plano
+            return self.reference_cache.get(entity)
+        # Sin conexión la proyección no aplica: se lee de la caché local
+        projected = not self.offline.active and self.field_selection.should_send(entity, fields)
+        if not projected:
+            result = self._request("GET", f"/{entity}", params=params)
+        else:
+            result = self._get_projected(entity, params, fields)
+            projected = result.pop("_projected", True)
+        if entity == "facturas" and result.get("success") and isinstance(result.get("data"), list):
+            # Sin filtros es el listado completo: el índice pasa a ser exhaustivo
+            # (salvo si la proyección ha podido quitar los campos de enlace)
+            if params or projected:
+                self.presupuesto_facturas.add_facturas(result["data"])
+            else:
+                self.presupuesto_facturas.rebuild(result["data"])
+        return result
     
+    def _get_projected(self, entity: str, params: Optional[Dict], fields: Sequence[str]) -> Dict[str, Any]:
+        """GET con proyección; detecta si el backend la ignora o la malinterpreta."""
+        selection = self.field_selection
+        confirmed = selection.support(entity) == SUPPORTED
+        result = self._request("GET", f"/{entity}", params=selection.params_for(params, fields))
+        if not result.get("success"):
+            if confirmed or selection.mode == "on":
+                return result
+            # Un backend que no conoce el parámetro puede rechazarlo
+            selection.mark_unsupported(entity)
+            result = self._request("GET", f"/{entity}", params=params)
+            result["_projected"] = False
+            return result
+        data = result.get("data")
+        if data == [] and not confirmed and selection.mode == "auto":
+            # Un backend que trata ``fields`` como filtro devolvería una lista vacía
+            fallback = self._request("GET", f"/{entity}", params=params)
+            if fallback.get("success") and fallback.get("data"):
+                selection.mark_unsupported(entity)
+                fallback["_projected"] = False
+                return fallback
+            return result
+        selection.observe(entity, fields, data)
+        return result
+
+    def get_prefetch_stats(self) -> Dict[str, Any]:
+        """Precargas hechas, aprovechadas (``hits``) y caducadas sin usar."""
+        return self.prefetch.stats()
+
+    def get_reference_cache_stats(self) -> Dict[str, Any]:
+        """Aciertos y fallos de la caché de datos de referencia."""
+        return self.reference_cache.stats()
+
+    def get_field_selection_support(self) -> Dict[str, str]:
+        """Soporte de proyección detectado por entidad (supported/unsupported)."""
+        return self.field_selection.states()
+
     def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Realiza una petición GET genérica a cualquier endpoint.
@@ -346,7 +646,8 @@ class RESTClient:
         cliente_id: Optional[int] = None,
         nombre: Optional[str] = None,
         email: Optional[str] = None,
-        telefono: Optional[str] = None
+        telefono: Optional[str] = None,
+        refresh: bool = False
     ) -> Dict[str, Any]:
         """
         Obtiene clientes con filtros opcionales.
@@ -356,6 +657,7 @@ class RESTClient:
             nombre: Filtro por nombre (búsqueda parcial, case-insensitive)
             email: Filtro por email (búsqueda parcial, case-insensitive)
             telefono: Filtro por teléfono (búsqueda parcial)
+            refresh: Sin filtros, pedir el listado al backend en vez de a la caché
             
         Returns:
             Dict con 'success' y 'data' (lista o objeto Cliente) o 'error'
@@ -390,9 +692,13 @@ class RESTClient:
             if telefono:
                 params['telefono'] = telefono
         
-        logger.info(f"get_clientes - Parámetros: {params}")
-        result = self._request("GET", "/clientes", params=params if params else None)
-        logger.info(f"get_clientes - Resultado: success={result.get('success')}, data type={type(result.get('data'))}")
+        logger.debug("get_clientes - Parámetros: %s", params)
+        if not params:
+            cache = self.reference_cache
+            result = cache.refresh("clientes") if refresh else cache.get("clientes")
+        else:
+            result = self._request("GET", "/clientes", params=params)
+        logger.debug("get_clientes - Resultado: success=%s, data=%s", result.get("success"), truncated(result.get("data")))
         return result
 
     def get_by_id(self, entity: str, entity_id: int) -> Dict[str, Any]:
@@ -401,27 +707,33 @@ class RESTClient:
         return self._request("GET", f"/{entity}", params={"id": entity_id})
 
     def create(self, entity: str, payload: Dict) -> Dict[str, Any]:
-        """Crea un nuevo registro"""
-        logger.info(f"create({entity}) - Payload: {payload}")
+        """Crea un nuevo registro (sin conexión, se guarda en la cola)"""
+        if self.offline.active:
+            return self.offline.queue_write("POST", entity, None, payload)
+        result = self._create_now(entity, payload)
+        if self.offline.should_queue(result):
+            return self.offline.queue_write("POST", entity, None, payload)
+        return result
+
+    def _create_now(self, entity: str, payload: Dict) -> Dict[str, Any]:
+        logger.debug("create(%s) - Payload: %s", entity, truncated(payload))
         result = self._request("POST", f"/{entity}", json=payload)
-        logger.info(f"create({entity}) - Resultado: success={result.get('success')}, error={result.get('error')}")
-        logger.info(f"create({entity}) - Data recibida: {result.get('data')}")
+        logger.info("create(%s) - Resultado: success=%s, error=%s", entity, result.get("success"), result.get("error"))
+        logger.debug("create(%s) - Data recibida: %s", entity, truncated(result.get("data")))
         return result
 
     def update(self, entity: str, entity_id: int, payload: Dict) -> Dict[str, Any]:
-        """Actualiza un registro existente"""
+        """Actualiza un registro existente (sin conexión, se guarda en la cola)"""
+        if self.offline.active:
+            return self.offline.queue_write("PUT", entity, entity_id, payload)
+        result = self._update_now(entity, entity_id, payload)
+        if self.offline.should_queue(result):
+            return self.offline.queue_write("PUT", entity, entity_id, payload)
+        return result
+
+    def _update_now(self, entity: str, entity_id: int, payload: Dict) -> Dict[str, Any]:
         # El backend Java espera el ID en el payload para PUT
-        # Mapeo de nombres de ID según el documento ANALISIS_SERVLETS.md
-        id_mapping = {
-            "clientes": "id_cliente",
-            "empleados": "id_empleado",
-            "productos": "id_producto",
-            "facturas": "id_factura",
-            "presupuestos": "id_Presupuesto",
-            "pagos": "id_pago",
-            "factura_productos": "id_factura_producto",
-            "roles": "id_rol"
-        }
+        # (nombres de ID en Endpoints.ID_FIELDS)
         
         # Caso especial: PagosServlet usa query param id_pago
         if entity == "pagos":
@@ -429,37 +741,66 @@ class RESTClient:
         
         # Para otros endpoints, agregar el ID al payload solo si no está ya presente
         payload_with_id = payload.copy()
-        id_key = id_mapping.get(entity, f"id_{entity[:-1]}" if entity.endswith("s") else f"id_{entity}")
+        id_key = Endpoints.id_field(entity)
         # Solo agregar si no está ya presente (evitar duplicación)
         if id_key not in payload_with_id:
             payload_with_id[id_key] = entity_id
         
-        logger.info(f"update({entity}) - Payload final: {payload_with_id}")
+        logger.debug("update(%s) - Payload final: %s", entity, truncated(payload_with_id))
         result = self._request("PUT", f"/{entity}", json=payload_with_id)
-        logger.info(f"update({entity}) - Resultado: success={result.get('success')}, error={result.get('error')}")
-        logger.info(f"update({entity}) - Data recibida: {result.get('data')}")
+        logger.info("update(%s) - Resultado: success=%s, error=%s", entity, result.get("success"), result.get("error"))
+        logger.debug("update(%s) - Data recibida: %s", entity, truncated(result.get("data")))
         return result
 
     def delete(self, entity: str, entity_id: int) -> Dict[str, Any]:
-        """Elimina un registro usando query param (formato Java backend)"""
+        """Elimina un registro (sin conexión, se guarda en la cola)"""
+        if self.offline.active:
+            return self.offline.queue_write("DELETE", entity, entity_id)
+        result = self._delete_now(entity, entity_id)
+        if self.offline.should_queue(result):
+            return self.offline.queue_write("DELETE", entity, entity_id)
+        return result
+
+    def _delete_now(self, entity: str, entity_id: int) -> Dict[str, Any]:
         # El backend Java usa query params: /clientes?id=1
-        return self._request("DELETE", f"/{entity}", params={"id": entity_id})
+        result = self._request("DELETE", f"/{entity}", params={"id": entity_id})
+        if entity == "facturas" and result.get("success"):
+            self.presupuesto_facturas.remove_factura(entity_id)
+        return result
+
+    def get_offline_status(self) -> Dict[str, Any]:
+        """Conexión con el backend y escrituras pendientes de enviar."""
+        return self.offline.status()
     
     # ---------------------------------------------------------
     # Dashboard Stats
     # ---------------------------------------------------------
-    def get_dashboard_stats(self) -> Dict[str, Any]:
-        """Obtiene estadísticas generales para admin/empleado."""
-        return self.helpers.get_dashboard_stats()
+    def get_dashboard_stats(self, known: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Obtiene estadísticas generales para admin/empleado (``known``: conteos ya conocidos)."""
+        return self.helpers.get_dashboard_stats(known)
+
+    def get_kpis(self) -> Dict[str, Any]:
+        """Indicadores del dashboard (facturado en el mes, pendiente de cobro, vencidas, conversión)."""
+        return self.kpis.refresh()
     
     def get_my_facturas(self, cliente_id: Optional[int] = None) -> Dict[str, Any]:
         """Obtiene las facturas del cliente actual"""
         return self.helpers.get_my_facturas(cliente_id)
     
-    def get_my_pagos(self, cliente_id: Optional[int] = None) -> Dict[str, Any]:
-        """Obtiene los pagos del cliente actual"""
-        return self.helpers.get_my_pagos(cliente_id)
+    def get_my_pagos(self, cliente_id: Optional[int] = None,
+                     facturas: Optional[list] = None) -> Dict[str, Any]:
+        """Obtiene los pagos del cliente actual (reutiliza ``facturas`` si se pasan)"""
+        return self.helpers.get_my_pagos(cliente_id, facturas)
     
+    def get_facturas_presupuesto(self, presupuesto_id: int, refresh: bool = False) -> Dict[str, Any]:
+        """Obtiene las facturas generadas desde un presupuesto (``refresh``: sin usar el índice)"""
+        return self.helpers.get_facturas_presupuesto(presupuesto_id, refresh)
+
+    def get_client_snapshot(self, cliente_id: Optional[int] = None,
+                            refresh: bool = False) -> Dict[str, Any]:
+        """Facturas, pagos, presupuestos y agregados del cliente (en caché por sesión)"""
+        return self.helpers.get_client_snapshot(cliente_id, refresh)
+
     def get_roles_empleado(self) -> Dict[str, Any]:
         """Obtiene todos los roles de empleado."""
         return self.helpers.get_roles_empleado()
@@ -3,12 +3,75 @@ Módulo helper con métodos específicos del cliente REST.
 Contiene métodos de conveniencia para dashboard, clientes, etc.
 """
 
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Set
 import logging
+import threading
+
+from src.data.presupuesto_index import _as_int, presupuesto_de_factura
+from src.utils.logging_config import truncated
 
 logger = logging.getLogger(__name__)
 
 
+def _to_int(value: Any) -> Optional[int]:
+    """Convierte un ID a int (None si no es un número)."""
+    if value is None or isinstance(value, dict):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _factura_cliente_id(factura: Dict) -> Optional[int]:
+    """ID del cliente pagador de una factura (objeto anidado o ID directo)."""
+    cliente_pagador = factura.get("cliente_pagador")
+    if isinstance(cliente_pagador, dict):
+        cliente_id = cliente_pagador.get("id_cliente") or cliente_pagador.get("id")
+        if cliente_id:
+            return _to_int(cliente_id)
+    for key in ("id_cliente", "cliente_id"):
+        cliente_id = factura.get(key)
+        if cliente_id:
+            return _to_int(cliente_id)
+    return _to_int(cliente_pagador)
+
+
+def _pago_factura_id(pago: Dict) -> Optional[int]:
+    """ID de la factura de un pago (objeto anidado o ID directo)."""
+    factura = pago.get("factura")
+    factura_id = None
+    if isinstance(factura, dict):
+        factura_id = factura.get("id_factura") or factura.get("id")
+    elif factura:
+        factura_id = factura
+    if not factura_id:
+        factura_id = pago.get("id_factura") or pago.get("factura_id")
+    return _to_int(factura_id)
+
+
+def _factura_id_set(facturas: List[Dict]) -> Set[int]:
+    """Conjunto de IDs (int) de una lista de facturas."""
+    ids: Set[int] = set()
+    for f in facturas:
+        if isinstance(f, dict):
+            factura_id = _to_int(f.get("id_factura") or f.get("id"))
+            if factura_id is not None:
+                ids.add(factura_id)
+    return ids
+
+
+def _presupuesto_es_de_cliente(presupuesto: Dict, cliente_id: int) -> bool:
+    return (_to_int(presupuesto.get("id_cliente_pagador")) == cliente_id
+            or _to_int(presupuesto.get("id_cliente_beneficiario")) == cliente_id)
+
+
+def _as_list(result: Dict[str, Any]) -> List:
+    data = result.get("data") if result.get("success") else None
+    return data if isinstance(data, list) else []
+
+
 class RESTHelpers:
     """Clase helper con métodos específicos del cliente REST."""
     
@@ -18,62 +81,78 @@ class RESTHelpers:
             api: Instancia de RESTClient
         """
         self.api = api
+        # Instantánea del portal de cliente (por cliente_id) durante la sesión
+        self._client_snapshots: Dict[int, Dict[str, Any]] = {}
+        self._snapshot_lock = threading.Lock()
     
-    def get_dashboard_stats(self) -> Dict[str, Any]:
+    def get_dashboard_stats(self, known: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
         """
         Obtiene estadísticas generales para admin/empleado.
         Calcula conteos de todas las entidades.
         
+        Args:
+            known: Conteos ya conocidos (p. ej. los de ``get_kpis``); esas
+                   entidades no se vuelven a pedir
+        
         Returns:
             Dict con 'success' y 'data' (diccionario con estadísticas) o 'error'
         """
         try:
-            stats = {}
+            stats = dict(known or {})
             
             # Obtener conteos de cada entidad
-            clientes_res = self.api.get_all("clientes")
-            if clientes_res.get("success"):
-                clientes_data = clientes_res.get("data", [])
-                stats["clientes"] = len(clientes_data) if isinstance(clientes_data, list) else 0
+            if "clientes" not in stats:
+                clientes_res = self.api.get_all("clientes")
+                if clientes_res.get("success"):
+                    clientes_data = clientes_res.get("data", [])
+                    stats["clientes"] = len(clientes_data) if isinstance(clientes_data, list) else 0
             
-            empleados_res = self.api.get_all("empleados")
-            if empleados_res.get("success"):
-                empleados_data = empleados_res.get("data", [])
-                stats["empleados"] = len(empleados_data) if isinstance(empleados_data, list) else 0
+            if "empleados" not in stats:
+                empleados_res = self.api.get_all("empleados")
+                if empleados_res.get("success"):
+                    empleados_data = empleados_res.get("data", [])
+                    stats["empleados"] = len(empleados_data) if isinstance(empleados_data, list) else 0
             
-            productos_res = self.api.get_all("productos")
-            if productos_res.get("success"):
-                productos_data = productos_res.get("data", [])
-                stats["productos"] = len(productos_data) if isinstance(productos_data, list) else 0
+            if "productos" not in stats:
+                productos_res = self.api.get_all("productos")
+                if productos_res.get("success"):
+                    productos_data = productos_res.get("data", [])
+                    stats["productos"] = len(productos_data) if isinstance(productos_data, list) else 0
             
-            try:
-                presupuestos_res = self.api.get_all("presupuestos")
-                if presupuestos_res.get("success"):
-                    presupuestos_data = presupuestos_res.get("data", [])
-                    stats["presupuestos"] = len(presupuestos_data) if isinstance(presupuestos_data, list) else 0
-            except Exception as e:
-                logger.warning(f"Error al cargar presupuestos para estadísticas: {e}")
-                stats["presupuestos"] = 0
+            if "presupuestos" not in stats:
+                try:
+                    presupuestos_res = self.api.get_all("presupuestos")
+                    if presupuestos_res.get("success"):
+                        presupuestos_data = presupuestos_res.get("data", [])
+                        stats["presupuestos"] = len(presupuestos_data) if isinstance(presupuestos_data, list) else 0
+                except Exception as e:
+                    logger.warning("Error al cargar presupuestos para estadísticas: %s", e)
+                    stats["presupuestos"] = 0
             
-            facturas_res = self.api.get_all("facturas")
-            if facturas_res.get("success"):
-                facturas_data = facturas_res.get("data", [])
-                stats["facturas"] = len(facturas_data) if isinstance(facturas_data, list) else 0
+            if "facturas" not in stats:
+                facturas_res = self.api.get_all("facturas")
+                if facturas_res.get("success"):
+                    facturas_data = facturas_res.get("data", [])
+                    stats["facturas"] = len(facturas_data) if isinstance(facturas_data, list) else 0
             
-            pagos_res = self.api.get_all("pagos")
-            if pagos_res.get("success"):
-                pagos_data = pagos_res.get("data", [])
-                stats["pagos"] = len(pagos_data) if isinstance(pagos_data, list) else 0
+            if "pagos" not in stats:
+                pagos_res = self.api.get_all("pagos")
+                if pagos_res.get("success"):
+                    pagos_data = pagos_res.get("data", [])
+                    stats["pagos"] = len(pagos_data) if isinstance(pagos_data, list) else 0
             
             return {"success": True, "data": stats}
         except Exception as e:
-            logger.error(f"Error obteniendo estadísticas: {e}")
+            logger.error("Error obteniendo estadísticas: %s", e)
             return {"success": False, "data": {}}
     
     def get_my_facturas(self, cliente_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Obtiene las facturas del cliente actual.
         
+        El filtro ``cliente_id`` se envía al backend; el resultado se vuelve a
+        filtrar aquí por si el backend lo ignora y devuelve todas las facturas.
+        
         Args:
             cliente_id: ID del cliente (opcional, usa user_id si no se proporciona)
         
@@ -83,68 +162,30 @@ class RESTHelpers:
         if cliente_id is None:
             cliente_id = self.api.user_id
         
-        if cliente_id is None:
+        cliente_id_int = _to_int(cliente_id)
+        if cliente_id_int is None:
             return {"success": False, "error": "No se pudo identificar el cliente"}
         
-        # Obtener todas las facturas y filtrar por cliente
-        result = self.api.get_all("facturas")
-        if result.get("success") and result.get("data"):
-            facturas = result["data"]
-            # Asegurar que facturas es una lista
-            if not isinstance(facturas, list):
-                facturas = []
-            
-            # Filtrar facturas del cliente
-            # El backend Java devuelve facturas con cliente_pagador como objeto o como ID directo
-            my_facturas = []
-            for factura in facturas:
-                if not isinstance(factura, dict):
-                    continue
-                
-                # Intentar obtener el ID del cliente de diferentes formas
-                cliente_pagador_id = None
-                
-                # 1. Desde objeto anidado cliente_pagador
-                cliente_pagador = factura.get("cliente_pagador")
-                if isinstance(cliente_pagador, dict):
-                    cliente_pagador_id = cliente_pagador.get("id_cliente") or cliente_pagador.get("id")
-                
-                # 2. Desde campo directo id_cliente
-                if not cliente_pagador_id:
-                    cliente_pagador_id = factura.get("id_cliente")
-                
-                # 3. Desde campo directo cliente_id
-                if not cliente_pagador_id:
-                    cliente_pagador_id = factura.get("cliente_id")
-                
-                # 4. Si cliente_pagador es directamente un ID
-                if not cliente_pagador_id and not isinstance(cliente_pagador, dict):
-                    cliente_pagador_id = cliente_pagador
-                
-                # Comparar IDs (convertir a int para comparación segura)
-                try:
-                    if cliente_pagador_id is not None:
-                        cliente_pagador_id_int = int(cliente_pagador_id)
-                        cliente_id_int = int(cliente_id)
-                        if cliente_pagador_id_int == cliente_id_int:
-                            my_facturas.append(factura)
-                except (ValueError, TypeError):
-                    # Si no se puede convertir, comparar directamente
-                    if cliente_pagador_id == cliente_id:
-                        my_facturas.append(factura)
-            
-            logger.info(f"get_my_facturas: cliente_id={cliente_id}, encontradas {len(my_facturas)} facturas")
-            return {"success": True, "data": my_facturas}
+        result = self.api.get_all("facturas", params={"cliente_id": cliente_id_int})
+        facturas = result.get("data") if result.get("success") else None
+        if not isinstance(facturas, list):
+            return {"success": True, "data": []}
         
-        # Si no hay éxito o no hay data, devolver lista vacía
-        return {"success": True, "data": []}
+        my_facturas = [
+            f for f in facturas
+            if isinstance(f, dict) and _factura_cliente_id(f) == cliente_id_int
+        ]
+        logger.info("get_my_facturas: cliente_id=%s, encontradas %d facturas", cliente_id, len(my_facturas))
+        return {"success": True, "data": my_facturas}
     
-    def get_my_pagos(self, cliente_id: Optional[int] = None) -> Dict[str, Any]:
+    def get_my_pagos(self, cliente_id: Optional[int] = None,
+                     facturas: Optional[List[Dict]] = None) -> Dict[str, Any]:
         """
         Obtiene los pagos del cliente actual.
         
         Args:
             cliente_id: ID del cliente (opcional, usa user_id si no se proporciona)
+            facturas: Facturas del cliente ya descargadas (evita pedirlas otra vez)
         
         Returns:
             Dict con 'success' y 'data' (lista de pagos) o 'error'
@@ -152,77 +193,185 @@ class RESTHelpers:
         if cliente_id is None:
             cliente_id = self.api.user_id
         
-        if cliente_id is None:
+        cliente_id_int = _to_int(cliente_id)
+        if cliente_id_int is None:
             return {"success": False, "error": "No se pudo identificar el cliente"}
         
-        # Obtener todas las facturas del cliente primero
-        facturas_res = self.get_my_facturas(cliente_id)
-        if not facturas_res.get("success"):
-            return {"success": True, "data": []}
-        
-        facturas = facturas_res.get("data")
-        # Asegurar que facturas es una lista
         if facturas is None:
-            facturas = []
-        elif not isinstance(facturas, list):
+            facturas_res = self.get_my_facturas(cliente_id_int)
+            if not facturas_res.get("success"):
+                return {"success": True, "data": []}
+            facturas = facturas_res.get("data")
+        if not isinstance(facturas, list):
             facturas = []
         
-        # Obtener IDs de facturas de diferentes formas
-        factura_ids = []
-        for f in facturas:
-            if not isinstance(f, dict):
-                continue
-            # Intentar obtener ID de diferentes campos
-            factura_id = f.get("id_factura") or f.get("id")
-            if factura_id:
-                factura_ids.append(factura_id)
+        # Conjunto de IDs (int) de las facturas del cliente: pertenencia O(1)
+        factura_ids = _factura_id_set(facturas)
         
         if not factura_ids:
-            logger.info(f"get_my_pagos: cliente_id={cliente_id}, no hay facturas, retornando pagos vacíos")
+            logger.info("get_my_pagos: cliente_id=%s, no hay facturas, retornando pagos vacíos", cliente_id)
             return {"success": True, "data": []}
         
-        # Obtener todos los pagos y filtrar por facturas del cliente
-        pagos_res = self.api.get_all("pagos")
-        if pagos_res.get("success") and pagos_res.get("data"):
-            pagos = pagos_res["data"]
-            # Asegurar que pagos es una lista
-            if not isinstance(pagos, list):
-                pagos = []
-            
-            my_pagos = []
-            for pago in pagos:
-                if not isinstance(pago, dict):
-                    continue
-                
-                # Intentar obtener el ID de la factura de diferentes formas
-                factura_id = None
-                factura = pago.get("factura")
-                
-                if isinstance(factura, dict):
-                    factura_id = factura.get("id_factura") or factura.get("id")
-                elif factura:
-                    factura_id = factura
-                
-                # También verificar campo directo id_factura
-                if not factura_id:
-                    factura_id = pago.get("id_factura") or pago.get("factura_id")
-                
-                # Comparar IDs (convertir a int para comparación segura)
-                if factura_id:
-                    try:
-                        factura_id_int = int(factura_id)
-                        if any(int(fid) == factura_id_int for fid in factura_ids if fid):
-                            my_pagos.append(pago)
-                    except (ValueError, TypeError):
-                        # Si no se puede convertir, comparar directamente
-                        if factura_id in factura_ids:
-                            my_pagos.append(pago)
-            
-            logger.info(f"get_my_pagos: cliente_id={cliente_id}, factura_ids={factura_ids}, encontrados {len(my_pagos)} pagos")
-            return {"success": True, "data": my_pagos}
+        pagos_res = self.api.get_all("pagos", params={"cliente_id": cliente_id_int})
+        pagos = pagos_res.get("data") if pagos_res.get("success") else None
+        if not isinstance(pagos, list):
+            return {"success": True, "data": []}
+        
+        my_pagos = [
+            p for p in pagos
+            if isinstance(p, dict) and _pago_factura_id(p) in factura_ids
+        ]
+        logger.info("get_my_pagos: cliente_id=%s, %d facturas, encontrados %d pagos", cliente_id, len(factura_ids), len(my_pagos))
+        logger.debug("get_my_pagos: factura_ids=%s", truncated(factura_ids))
+        return {"success": True, "data": my_pagos}
+    
+    # -----------------------------------------------------
+    # INSTANTÁNEA DEL PORTAL DE CLIENTE
+    # -----------------------------------------------------
+    def get_client_snapshot(self, cliente_id: Optional[int] = None,
+                            refresh: bool = False) -> Dict[str, Any]:
+        """
+        Facturas, pagos y presupuestos del cliente con sus agregados.
+        
+        Las tres colecciones se piden en paralelo, una sola vez por sesión:
+        el dashboard y las ventanas "Mis Facturas", "Mis Pagos" y "Mis
+        Presupuestos" comparten el resultado. ``refresh=True`` (botón
+        Actualizar) fuerza una nueva descarga.
+        
+        Args:
+            cliente_id: ID del cliente (opcional, usa user_id si no se proporciona)
+            refresh: Ignorar la instantánea en caché
+        
+        Returns:
+            Dict con 'success' y 'data' ({"facturas", "pagos", "presupuestos",
+            "stats"}) o 'error'
+        """
+        if cliente_id is None:
+            cliente_id = self.api.user_id
+        cliente_id_int = _to_int(cliente_id)
+        if cliente_id_int is None:
+            return {"success": False, "error": "No se pudo identificar el cliente"}
+        
+        with self._snapshot_lock:
+            cached = None if refresh else self._client_snapshots.get(cliente_id_int)
+        if cached is not None:
+            return {"success": True, "data": cached}
+        
+        params = {"cliente_id": cliente_id_int}
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="client-snapshot") as pool:
+            facturas_f = pool.submit(self.get_my_facturas, cliente_id_int)
+            pagos_f = pool.submit(self.api.get_all, "pagos", params)
+            presupuestos_f = pool.submit(self.api.get_all, "presupuestos")
+            facturas_res = facturas_f.result()
+            pagos_res = pagos_f.result()
+            presupuestos_res = presupuestos_f.result()
+        
+        if not facturas_res.get("success"):
+            return facturas_res
+        
+        facturas = _as_list(facturas_res)
+        factura_ids = _factura_id_set(facturas)
+        pagos = [
+            p for p in _as_list(pagos_res)
+            if isinstance(p, dict) and _pago_factura_id(p) in factura_ids
+        ]
+        presupuestos = [
+            p for p in _as_list(presupuestos_res)
+            if isinstance(p, dict) and _presupuesto_es_de_cliente(p, cliente_id_int)
+        ]
         
-        return {"success": True, "data": []}
+        snapshot = {
+            "facturas": facturas,
+            "pagos": pagos,
+            "presupuestos": presupuestos,
+            "stats": self._client_stats(facturas, pagos, presupuestos),
+        }
+        # Solo se guarda si todo llegó bien; si no, el próximo acceso reintenta
+        if pagos_res.get("success") and presupuestos_res.get("success"):
+            with self._snapshot_lock:
+                self._client_snapshots[cliente_id_int] = snapshot
+        logger.info("get_client_snapshot: cliente_id=%s, %s", cliente_id_int, snapshot["stats"])
+        return {"success": True, "data": snapshot}
     
+    @staticmethod
+    def _client_stats(facturas: List[Dict], pagos: List[Dict], presupuestos: List[Dict]) -> Dict[str, Any]:
+        """Agregados del dashboard de cliente (una pasada por colección)."""
+        total_facturado = 0.0
+        facturas_pendientes = 0
+        for f in facturas:
+            try:
+                total_facturado += float(f.get("total") or 0)
+            except (TypeError, ValueError):
+                pass
+            if str(f.get("estado") or "").upper() == "PENDIENTE":
+                facturas_pendientes += 1
+        total_pagado = 0.0
+        for p in pagos:
+            try:
+                total_pagado += float(p.get("importe") or 0)
+            except (TypeError, ValueError):
+                pass
+        presupuestos_por_estado: Dict[str, int] = {}
+        for p in presupuestos:
+            estado = str(p.get("estado") or "").upper()
+            presupuestos_por_estado[estado] = presupuestos_por_estado.get(estado, 0) + 1
+        return {
+            "facturas": len(facturas),
+            "pagos": len(pagos),
+            "presupuestos": len(presupuestos),
+            "total_facturado": round(total_facturado, 2),
+            "total_pagado": round(total_pagado, 2),
+            "facturas_pendientes": facturas_pendientes,
+            "presupuestos_por_estado": presupuestos_por_estado,
+        }
+    
+    def invalidate_client_snapshot(self):
+        """Descarta las instantáneas (tras escrituras o al cerrar sesión)."""
+        with self._snapshot_lock:
+            self._client_snapshots.clear()
+    
+    def get_facturas_presupuesto(self, presupuesto_id: int, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Obtiene las facturas generadas desde un presupuesto.
+
+        Consulta primero el índice en memoria; si no puede responder, pide al
+        backend ``/facturas?id_presupuesto=<id>``. Si el backend ignora el
+        filtro (llegan facturas de otros presupuestos), se indexan las que
+        traen enlace y se filtra aquí.
+
+        Args:
+            presupuesto_id: ID del presupuesto
+            refresh: Preguntar siempre al backend (antes de facturar: otro
+                     usuario puede haberlo hecho ya)
+
+        Returns:
+            Dict con 'success' y 'data' (lista de facturas) o 'error'
+        """
+        index = self.api.presupuesto_facturas
+        presupuesto = _as_int(presupuesto_id)
+        if not refresh and index.tiene_facturas(presupuesto_id) is not None:
+            return {"success": True, "data": index.facturas_de(presupuesto_id)}
+
+        result = self.api._request("GET", "/facturas", params={"id_presupuesto": presupuesto_id})
+        if not result.get("success"):
+            return result
+        facturas = result.get("data") or []
+        if not isinstance(facturas, list):
+            facturas = [facturas] if isinstance(facturas, dict) else []
+
+        vinculados = {presupuesto_de_factura(f) for f in facturas if isinstance(f, dict)}
+        if vinculados - {presupuesto, None}:
+            # Facturas de otro presupuesto: el backend no filtra. Se indexan las
+            # enlazadas; el índice no se da por completo (esto no es un listado
+            # sincronizado y las facturas sin enlace no se pueden atribuir)
+            logger.debug("El backend no filtra facturas por presupuesto; se filtra en el cliente")
+            index.add_facturas(facturas)
+            index.mark_consultado(presupuesto_id)
+        else:
+            # Filtradas por el backend (aunque no traigan el campo de enlace)
+            index.add(presupuesto_id, facturas)
+        return {"success": True, "data": index.facturas_de(presupuesto_id)}
+
     def get_roles_empleado(self) -> Dict[str, Any]:
         """
         Obtiene todos los roles de empleado.
@@ -232,8 +381,8 @@ class RESTHelpers:
         """
         # El endpoint es /roles_empleado según endpoints.py
         from src.api.endpoints import Endpoints
-        logger.info(f"Llamando a get_roles_empleado con endpoint: {Endpoints.ROLES_EMPLEADO}")
-        result = self.api._request("GET", Endpoints.ROLES_EMPLEADO)
-        logger.info(f"Respuesta de get_roles_empleado: {result}")
+        logger.debug("Llamando a get_roles_empleado con endpoint: %s", Endpoints.ROLES_EMPLEADO)
+        result = self.api.reference_cache.get("roles_empleado")
+        logger.debug("Respuesta de get_roles_empleado: %s", truncated(result))
         return result
 
@@ -0,0 +1,422 @@
+"""
+Planificador de peticiones con prioridades y cancelación por vista.
+
+Las cargas que se lanzan con ``RequestScheduler.submit`` se ejecutan en un
+pequeño grupo de hilos por orden de prioridad (``INTERACTIVE`` antes que
+``BACKGROUND`` y ``PREFETCH``); uno de los hilos queda siempre libre para
+las interactivas. El resultado se entrega en el hilo de la interfaz
+(``dispatch``, que ``MainWindow`` llama periódicamente).
+
+Cada vista tiene un ``CancellationToken`` (``view_token``). Al cambiar de
+vista, ``MainWindow._clear_frame`` lo cancela: las peticiones de esa vista
+que no han salido se descartan, las que están en curso no se reintentan y
+sus resultados ya no llegan a la interfaz (que ya no existe).
+
+El contexto de cada hilo (``request_context``) indica a ``RESTClient`` la
+prioridad y el token de la petición: las de segundo plano (revalidaciones,
+precarga, reenvío de la cola sin conexión) esperan a que no haya ninguna
+interactiva en curso antes de salir a la red.
+"""
+
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from src.utils.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Prioridades (menor = antes)
+INTERACTIVE = 0
+BACKGROUND = 1
+PREFETCH = 2
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", PREFETCH: "prefetch"}
+
+# Máximo que una petición de segundo plano espera a que terminen las interactivas
+BACKGROUND_MAX_WAIT = 5.0
+
+
+class CancelledError(Exception):
+    """La petición se ha cancelado (su vista ya no existe)."""
+
+
+class CancellationToken:
+    """Marca compartida por las peticiones de una vista."""
+
+    __slots__ = ("_event", "reason")
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelada"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CancelledError(self.reason or "cancelada")
+
+
+# =====================================================================
+# CONTEXTO POR HILO
+# =====================================================================
+_context = threading.local()
+
+
+@contextmanager
+def request_context(priority: Optional[int] = None, token: Optional[CancellationToken] = None):
+    """Prioridad y token de las peticiones hechas dentro del bloque (en este hilo)."""
+    previous = (getattr(_context, "priority", None), getattr(_context, "token", None))
+    if priority is not None:
+        _context.priority = priority
+    if token is not None:
+        _context.token = token
+    try:
+        yield
+    finally:
+        _context.priority, _context.token = previous
+
+
+def current_priority() -> int:
+    """Prioridad del hilo actual (interactiva si no se ha indicado)."""
+    priority = getattr(_context, "priority", None)
+    return INTERACTIVE if priority is None else priority
+
+
+def current_token() -> Optional[CancellationToken]:
+    return getattr(_context, "token", None)
+
+
+def on_worker() -> bool:
+    """True si el hilo actual es uno de los del planificador."""
+    return getattr(_context, "worker", False)
+
+
+# =====================================================================
+# PETICIONES PLANIFICADAS
+# =====================================================================
+class ScheduledRequest:
+    """
+    Trabajo en cola del planificador.
+
+    Attributes:
+        priority: Prioridad
+        token: Token de cancelación (el de la vista al encolarlo)
+        state: ``queued``, ``running``, ``done`` o ``cancelled``
+        result: Valor devuelto por la función (cuando ``done``)
+        wait_time: Segundos que esperó en la cola
+    """
+
+    __slots__ = ("func", "priority", "token", "callback", "errback", "enqueued_at",
+                 "wait_time", "state", "result", "error", "_done")
+
+    def __init__(self, func: Callable[[], Any], priority: int, token: Optional[CancellationToken],
+                 callback: Optional[Callable[[Any], None]], errback: Optional[Callable[[BaseException], None]]):
+        self.func = func
+        self.priority = priority
+        self.token = token
+        self.callback = callback
+        self.errback = errback
+        self.enqueued_at = time.monotonic()
+        self.wait_time = 0.0
+        self.state = "queued"
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.state == "cancelled" or (self.token is not None and self.token.cancelled)
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """Espera el resultado (para pruebas y benchmarks; la interfaz usa ``callback``)."""
+        self._done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class _PriorityStats:
+    __slots__ = ("submitted", "executed", "cancelled", "wait_total", "wait_max", "recent")
+
+    def __init__(self):
+        self.submitted = 0
+        self.executed = 0
+        self.cancelled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.recent: Deque[float] = deque(maxlen=256)
+
+    def snapshot(self) -> Dict[str, Any]:
+        waits = sorted(self.recent)
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        return {
+            "submitted": self.submitted,
+            "executed": self.executed,
+            "cancelled": self.cancelled,
+            "wait_avg_ms": round(self.wait_total / self.executed * 1000, 2) if self.executed else 0.0,
+            "wait_p95_ms": round(p95 * 1000, 2),
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+        }
+
+
+class RequestScheduler:
+    """
+    Cola de peticiones por prioridad ejecutada por ``workers`` hilos.
+
+    Args:
+        workers: Hilos de ejecución (uno se reserva para las interactivas)
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = max(2, workers or Settings.API_SCHEDULER_WORKERS)
+        self._cond = threading.Condition()
+        self._heap: List = []
+        self._seq = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._running = {INTERACTIVE: 0, BACKGROUND: 0, PREFETCH: 0}
+        # Peticiones interactivas en la red ahora mismo (de cualquier hilo)
+        self._interactive_in_flight = 0
+        self._results: "queue.SimpleQueue[ScheduledRequest]" = queue.SimpleQueue()
+        # True cuando la interfaz llama a ``dispatch`` periódicamente
+        self.ui_attached = False
+        self.view_token = CancellationToken()
+        self._stats = {priority: _PriorityStats() for priority in PRIORITY_NAMES}
+        self._peak_depth = 0
+        self._closed = False
+
+    # =====================================================================
+    # VISTAS
+    # =====================================================================
+    def cancel_view(self) -> CancellationToken:
+        """Cancela las peticiones de la vista actual; devuelve el token de la nueva."""
+        with self._cond:
+            old, self.view_token = self.view_token, CancellationToken()
+            old.cancel("la vista se ha cerrado")
+            # Lo que aún no ha salido se descarta ya
+            kept = []
+            for item in self._heap:
+                job = item[2]
+                if job.token is old:
+                    self._finish_cancelled(job)
+                else:
+                    kept.append(item)
+            if len(kept) != len(self._heap):
+                heapq.heapify(kept)
+                self._heap = kept
+        return self.view_token
+
+    # =====================================================================
+    # ENCOLAR
+    # =====================================================================
+    def submit(self, func: Callable[[], Any], priority: int = INTERACTIVE,
+               token: Optional[CancellationToken] = None,
+               callback: Optional[Callable[[Any], None]] = None,
+               errback: Optional[Callable[[BaseException], None]] = None) -> ScheduledRequest:
+        """
+        Encola ``func`` (que hace las peticiones que necesite).
+
+        Args:
+            func: Trabajo a ejecutar en un hilo del planificador
+            priority: ``INTERACTIVE``, ``BACKGROUND`` o ``PREFETCH``
+            token: Token de cancelación (por defecto, el de la vista actual en
+                   las interactivas; las de segundo plano no se cancelan)
+            callback: Recibe el resultado en el hilo de la interfaz
+            errback: Recibe la excepción en el hilo de la interfaz
+
+        Returns:
+            La petición planificada
+        """
+        if token is None and priority == INTERACTIVE:
+            token = self.view_token
+        job = ScheduledRequest(func, priority, token, callback, errback)
+        with self._cond:
+            self._stats[priority].submitted += 1
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self._peak_depth = max(self._peak_depth, len(self._heap))
+            self._ensure_workers()
+            self._cond.notify()
+        return job
+
+    def _ensure_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._run, name=f"api-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_job(self) -> Optional[ScheduledRequest]:
+        """Siguiente trabajo ejecutable (con el bloqueo tomado)."""
+        if not self._heap:
+            return None
+        priority = self._heap[0][0]
+        if priority != INTERACTIVE:
+            busy = sum(self._running.values())
+            if busy >= self.workers - 1:
+                # El último hilo libre queda para las interactivas
+                return None
+        return heapq.heappop(self._heap)[2]
+
+    def _run(self):
+        _context.worker = True
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                job.wait_time = time.monotonic() - job.enqueued_at
+                if job.cancelled:
+                    self._finish_cancelled(job)
+                    continue
+                job.state = "running"
+                self._running[job.priority] += 1
+            try:
+                with request_context(job.priority, job.token):
+                    job.result = job.func()
+            except BaseException as e:  # se entrega al errback
+                job.error = e
+            finally:
+                with self._cond:
+                    self._running[job.priority] -= 1
+                    stats = self._stats[job.priority]
+                    stats.executed += 1
+                    stats.wait_total += job.wait_time
+                    stats.wait_max = max(stats.wait_max, job.wait_time)
+                    stats.recent.append(job.wait_time)
+                    self._cond.notify_all()
+            if job.cancelled:
+                self._finish_cancelled(job, count=False)
+                continue
+            job.state = "done"
+            job._done.set()
+            self._deliver(job)
+
+    def _finish_cancelled(self, job: ScheduledRequest, count: bool = True):
+        job.state = "cancelled"
+        if job.error is None:
+            job.error = CancelledError(job.token.reason if job.token else "cancelada")
+        if count:
+            self._stats[job.priority].cancelled += 1
+        job._done.set()
+
+    # =====================================================================
+    # ENTREGA EN EL HILO DE LA INTERFAZ
+    # =====================================================================
+    def _deliver(self, job: ScheduledRequest):
+        if job.callback is None and job.errback is None:
+            return
+        if self.ui_attached:
+            self._results.put(job)
+        else:
+            self._invoke(job)
+
+    @staticmethod
+    def _invoke(job: ScheduledRequest):
+        try:
+            if job.error is not None:
+                if job.errback is not None:
+                    job.errback(job.error)
+                else:
+                    logger.error("Error en una petición planificada: %s", job.error)
+            elif job.callback is not None:
+                job.callback(job.result)
+        except Exception:
+            logger.exception("Error en el callback de una petición planificada")
+
+    def dispatch(self, limit: int = 50) -> int:
+        """
+        Ejecuta los callbacks pendientes (llamar desde el hilo de la interfaz).
+
+        Returns:
+            Número de callbacks ejecutados
+        """
+        handled = 0
+        while handled < limit:
+            try:
+                job = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if job.token is not None and job.token.cancelled:
+                # La vista que lo pidió ya no existe
+                continue
+            self._invoke(job)
+            handled += 1
+        return handled
+
+    # =====================================================================
+    # ADMISIÓN EN LA RED
+    # =====================================================================
+    @contextmanager
+    def admit(self):
+        """
+        Contexto de cada petición HTTP de ``RESTClient``.
+
+        Las de segundo plano esperan (hasta ``BACKGROUND_MAX_WAIT``) a que no
+        haya interactivas en curso; las canceladas no salen.
+        """
+        token = current_token()
+        if token is not None:
+            token.raise_if_cancelled()
+        priority = current_priority()
+        with self._cond:
+            if priority == INTERACTIVE:
+                self._interactive_in_flight += 1
+            else:
+                deadline = time.monotonic() + BACKGROUND_MAX_WAIT
+                while self._interactive_in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                # La vista pudo cerrarse mientras esperaba
+                if token is not None:
+                    token.raise_if_cancelled()
+        try:
+            yield
+        finally:
+            if priority == INTERACTIVE:
+                with self._cond:
+                    self._interactive_in_flight -= 1
+                    self._cond.notify_all()
+
+    # =====================================================================
+    # MÉTRICAS
+    # =====================================================================
+    def stats(self) -> Dict[str, Any]:
+        """Profundidad de la cola, hilos ocupados y tiempos de espera por prioridad."""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _seq, _job in self._heap:
+                depth[PRIORITY_NAMES[priority]] += 1
+            return {
+                "workers": self.workers,
+                "queue_depth": len(self._heap),
+                "queue_depth_by_priority": depth,
+                "peak_queue_depth": self._peak_depth,
+                "running": {PRIORITY_NAMES[p]: n for p, n in self._running.items()},
+                "interactive_in_flight": self._interactive_in_flight,
+                "by_priority": {PRIORITY_NAMES[p]: s.snapshot() for p, s in self._stats.items()},
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for _priority, _seq, job in self._heap:
+                self._finish_cancelled(job)
+            self._heap.clear()
+            self._cond.notify_all()
@@ -0,0 +1,116 @@
+"""
+Agrupación de peticiones idénticas en curso (single-flight).
+
+Si varios componentes piden lo mismo a la vez (por ejemplo el dashboard y
+una ventana que carga clientes en segundo plano), solo la primera petición
+sale a la red; el resto espera y recibe el mismo resultado ya decodificado.
+
+Los llamadores modifican las filas que reciben (normalización para la
+tabla), así que cuando una llamada se comparte cada uno recibe su propia
+copia (``copy_result``).
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+Result = Dict[str, Any]
+
+logger = logging.getLogger(__name__)
+
+
+def copy_result(result: Result) -> Result:
+    """Copia de un resultado de ``RESTClient`` con sobre y filas propios."""
+    if not isinstance(result, dict):
+        return result
+    copied = dict(result)
+    data = copied.get("data")
+    if isinstance(data, list):
+        copied["data"] = [dict(row) if isinstance(row, dict) else row for row in data]
+    elif isinstance(data, dict):
+        copied["data"] = dict(data)
+    return copied
+
+
+class _Call:
+    """Petición en curso compartida por el líder y sus seguidores."""
+
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Ejecuta una sola vez las llamadas concurrentes con la misma clave."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    @staticmethod
+    def make_key(method: str, endpoint: str, params: Optional[Dict] = None) -> Hashable:
+        """Clave de una petición: método, endpoint y parámetros (sin importar el orden)."""
+        if not params:
+            return (method.upper(), endpoint, ())
+        items = tuple(sorted((str(k), repr(v)) for k, v in params.items()))
+        return (method.upper(), endpoint, items)
+
+    def do(self, key: Hashable, func: Callable[[], Any],
+           share: Optional[Callable[[Any], Any]] = None) -> Any:
+        """
+        Ejecuta ``func`` o espera al resultado de una llamada en curso con la misma clave.
+
+        Las excepciones del líder se propagan también a los seguidores.
+
+        Args:
+            key: Clave de la llamada (``make_key``)
+            func: Llamada a ejecutar
+            share: Copia del resultado para cada llamador si la llamada se ha
+                   compartido (el líder incluido: el original no lo recibe nadie)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            logger.debug("Petición agrupada con otra en curso: %s", key)
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return share(call.result) if share is not None else call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                # Ya no se puede unir nadie: ``waiters`` es definitivo
+                shared = call.waiters > 0
+            call.event.set()
+        return share(call.result) if share is not None and shared else call.result
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores: peticiones ejecutadas, ahorradas y en curso."""
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "saved": self._coalesced,
+                "in_flight": len(self._calls),
+            }
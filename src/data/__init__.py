@@ -0,0 +1,13 @@
+"""
+Capa de datos en memoria del cliente (almacenamiento columnar, índices, caché)
+"""
+
+from .column_store import ColumnStore, RowView, StringPool
+from .repository import RecordSet
+
+__all__ = [
+    "ColumnStore",
+    "RecordSet",
+    "RowView",
+    "StringPool",
+]
@@ -0,0 +1,631 @@
+"""
+Almacenamiento columnar en memoria para los datos de las tablas.
+
+Cada columna se guarda en un array tipado (enteros, decimales o booleanos) o,
+si es texto, como códigos enteros que apuntan a un pool de cadenas internadas:
+los valores repetidos (estado, metodo_pago, nombres de cliente...) se guardan
+una sola vez. Los objetos anidados del backend (``factura``, ``cliente_pagador``)
+se aplanan en columnas hijas y se reconstruyen al leer la fila.
+
+``RowView`` es una vista tipo diccionario sobre una fila, de forma que el
+código existente que usa ``row.get(...)`` o ``row["campo"] = valor`` sigue
+funcionando sin materializar un dict por registro.
+"""
+
+from array import array
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+# Marcador interno para "clave ausente" (distinto de None)
+_MISSING = object()
+
+KIND_INT = "int"
+KIND_FLOAT = "float"
+KIND_BOOL = "bool"
+KIND_STR = "str"
+KIND_STRUCT = "struct"
+KIND_OBJ = "obj"
+
+# Tipo de array y valor nulo para cada tipo de columna
+_TYPECODES = {
+    KIND_INT: "q",
+    KIND_FLOAT: "d",
+    KIND_BOOL: "b",
+    KIND_STR: "l",
+    KIND_STRUCT: "b",
+}
+_INT_NULL = -(2 ** 63)
+_FLOAT_NULL = float("nan")
+_SMALL_NULL = -1  # bool, str y struct
+
+
+class StringPool:
+    """Pool de cadenas internadas: cada texto distinto se guarda una sola vez."""
+
+    __slots__ = ("_strings", "_codes")
+
+    def __init__(self):
+        self._strings: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        """Devuelve el código de ``value``, añadiéndolo al pool si no existe."""
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(value)
+            self._codes[value] = code
+        return code
+
+    def code_of(self, value: str) -> Optional[int]:
+        """Código de ``value`` o None si nunca se ha internado."""
+        return self._codes.get(value)
+
+    def get(self, code: int) -> str:
+        return self._strings[code]
+
+    def codes_where(self, predicate: Callable[[str], bool]) -> set:
+        """Códigos de las cadenas que cumplen ``predicate`` (una evaluación por valor distinto)."""
+        return {code for code, text in enumerate(self._strings) if predicate(text)}
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+class _Column:
+    """Datos de una columna: valores codificados, marcas de ausencia e hijos (struct)."""
+
+    __slots__ = ("kind", "values", "missing", "children")
+
+    def __init__(self, kind: str, values, missing: Optional[bytearray] = None,
+                 children: Optional[List[str]] = None):
+        self.kind = kind
+        self.values = values
+        # bytearray con 1 en las filas donde la clave no existe (None si no hay ninguna)
+        self.missing = missing
+        # Nombres (con prefijo) de las columnas hijas de un struct
+        self.children = children
+
+
+def _infer_kind(values: Sequence) -> str:
+    """Deduce el tipo de columna más compacto capaz de guardar ``values``."""
+    kind = None
+    for value in values:
+        if value is None or value is _MISSING:
+            continue
+        value_type = type(value)
+        if value_type is bool:
+            current = KIND_BOOL
+        elif value_type is int:
+            current = KIND_INT
+        elif value_type is float:
+            current = KIND_FLOAT
+        elif value_type is str:
+            current = KIND_STR
+        elif value_type is dict:
+            current = KIND_STRUCT
+        else:
+            return KIND_OBJ
+        if kind is None:
+            kind = current
+        elif kind != current:
+            return KIND_OBJ
+    # Columna vacía o solo con nulos: se guarda como texto (códigos -1)
+    return kind or KIND_STR
+
+
+class ColumnStore:
+    """
+    Almacén columnar de filas.
+
+    Sustituye a ``List[Dict]`` en ``DataTable`` y en las ventanas de entidades.
+    Las selecciones (filtros) y ordenaciones trabajan con listas de índices de
+    fila, nunca copiando registros.
+    """
+
+    def __init__(self):
+        self.pool = StringPool()
+        self._columns: Dict[str, _Column] = {}
+        # Columnas de primer nivel, en orden de aparición
+        self._top_level: Dict[str, None] = {}
+        self._length = 0
+        self._indexes: Dict[str, Dict[Any, int]] = {}
+
+    # =====================================================================
+    # CONSTRUCCIÓN
+    # =====================================================================
+    @classmethod
+    def from_rows(cls, rows: Optional[Iterable]) -> "ColumnStore":
+        """
+        Construye un almacén a partir de una lista de diccionarios.
+
+        Si ``rows`` ya es un ``ColumnStore`` se devuelve tal cual (sin copia).
+        """
+        if isinstance(rows, ColumnStore):
+            return rows
+        store = cls()
+        if not rows:
+            return store
+        records = [row for row in rows if isinstance(row, Mapping)]
+        store._length = len(records)
+        for name in cls._collect_keys(records):
+            store._top_level[name] = None
+            store._build_column(name, [row.get(name, _MISSING) for row in records])
+        return store
+
+    @staticmethod
+    def _collect_keys(records: Sequence[Mapping]) -> List[str]:
+        keys: Dict[str, None] = {}
+        for row in records:
+            for key in row:
+                if key not in keys:
+                    keys[key] = None
+        return list(keys)
+
+    def _build_column(self, name: str, values: List[Any]):
+        """Crea la columna ``name`` (y sus hijas si es un struct) a partir de ``values``."""
+        kind = _infer_kind(values)
+        missing = None
+        if any(value is _MISSING for value in values):
+            missing = bytearray(1 if value is _MISSING else 0 for value in values)
+
+        if kind == KIND_STRUCT:
+            markers = array("b", (
+                _SMALL_NULL if value is _MISSING else (1 if isinstance(value, dict) else 0)
+                for value in values
+            ))
+            nested = [value if isinstance(value, dict) else {} for value in values]
+            children = []
+            for key in self._collect_keys(nested):
+                child_name = f"{name}.{key}"
+                children.append(child_name)
+                self._build_column(child_name, [value.get(key, _MISSING) for value in nested])
+            self._columns[name] = _Column(KIND_STRUCT, markers, missing, children)
+            return
+
+        if kind == KIND_OBJ:
+            self._columns[name] = _Column(KIND_OBJ, [
+                None if value is _MISSING else value for value in values
+            ], missing)
+            return
+
+        try:
+            encoded = array(_TYPECODES[kind], (self._encode(kind, value) for value in values))
+        except (OverflowError, TypeError):
+            # Enteros fuera de rango de 64 bits: se guardan como objetos
+            self._columns[name] = _Column(KIND_OBJ, [
+                None if value is _MISSING else value for value in values
+            ], missing)
+            return
+        self._columns[name] = _Column(kind, encoded, missing)
+
+    def _encode(self, kind: str, value: Any):
+        if value is None or value is _MISSING:
+            if kind == KIND_INT:
+                return _INT_NULL
+            if kind == KIND_FLOAT:
+                return _FLOAT_NULL
+            return _SMALL_NULL
+        if kind == KIND_STR:
+            return self.pool.intern(value)
+        if kind == KIND_BOOL:
+            return 1 if value else 0
+        return value
+
+    def _decode(self, column: _Column, index: int):
+        raw = column.values[index]
+        kind = column.kind
+        if kind == KIND_STR:
+            return None if raw < 0 else self.pool.get(raw)
+        if kind == KIND_INT:
+            return None if raw == _INT_NULL else raw
+        if kind == KIND_FLOAT:
+            return None if raw != raw else raw
+        if kind == KIND_BOOL:
+            return None if raw < 0 else bool(raw)
+        if kind == KIND_STRUCT:
+            if raw <= 0:
+                return None
+            result = {}
+            for child_name in column.children:
+                child = self._columns[child_name]
+                if child.missing is not None and child.missing[index]:
+                    continue
+                result[child_name.rsplit(".", 1)[1]] = self._decode(child, index)
+            return result
+        return raw
+
+    # =====================================================================
+    # ACCESO
+    # =====================================================================
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator["RowView"]:
+        for index in range(self._length):
+            yield RowView(self, index)
+
+    def __getitem__(self, index: int) -> "RowView":
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return RowView(self, index)
+
+    @property
+    def columns(self) -> List[str]:
+        """Nombres de las columnas de primer nivel."""
+        return list(self._top_level)
+
+    def column_kind(self, name: str) -> Optional[str]:
+        column = self._columns.get(name)
+        return column.kind if column else None
+
+    def has(self, index: int, name: str) -> bool:
+        column = self._columns.get(name)
+        if column is None or name not in self._top_level:
+            return False
+        return column.missing is None or not column.missing[index]
+
+    def value(self, index: int, name: str, default: Any = None) -> Any:
+        """Valor de la columna ``name`` en la fila ``index`` (``default`` si no existe)."""
+        column = self._columns.get(name)
+        if column is None:
+            return default
+        if column.missing is not None and column.missing[index]:
+            return default
+        return self._decode(column, index)
+
+    def column_values(self, name: str, rows: Optional[Iterable[int]] = None) -> List[Any]:
+        """Valores decodificados de una columna (en el orden de ``rows``)."""
+        column = self._columns.get(name)
+        indices = range(self._length) if rows is None else rows
+        if column is None:
+            return [None for _ in indices]
+        missing = column.missing
+        return [
+            None if missing is not None and missing[i] else self._decode(column, i)
+            for i in indices
+        ]
+
+    def row_dict(self, index: int) -> Dict[str, Any]:
+        """Materializa la fila ``index`` como un diccionario independiente."""
+        result = {}
+        for name in self._top_level:
+            column = self._columns[name]
+            if column.missing is not None and column.missing[index]:
+                continue
+            result[name] = self._decode(column, index)
+        return result
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Materializa todas las filas (para exportaciones o depuración)."""
+        return [self.row_dict(index) for index in range(self._length)]
+
+    # =====================================================================
+    # MODIFICACIÓN
+    # =====================================================================
+    def set_value(self, index: int, name: str, value: Any):
+        """Asigna ``value`` a la columna ``name`` de la fila ``index``."""
+        if name not in self._columns:
+            self._add_column(name, value)
+            self._top_level[name] = None
+        self._assign(name, index, value)
+        self._indexes.pop(name, None)
+
+    def unset(self, index: int, name: str):
+        """Elimina la clave ``name`` de la fila ``index``."""
+        column = self._columns.get(name)
+        if column is None:
+            raise KeyError(name)
+        if column.missing is None:
+            column.missing = bytearray(self._length)
+        column.missing[index] = 1
+        self._indexes.pop(name, None)
+
+    def append(self, row: Mapping) -> int:
+        """Añade una fila al final y devuelve su índice."""
+        index = self._length
+        self._length += 1
+        for column_name in self._top_level:
+            self._append_null(self._columns[column_name], missing=True)
+        for key, value in row.items():
+            self.set_value(index, key, value)
+        self._indexes.clear()
+        return index
+
+    def update(self, index: int, row: Mapping, replace: bool = False):
+        """
+        Actualiza la fila ``index`` con los campos de ``row``.
+
+        Con ``replace=True`` las claves que no estén en ``row`` se eliminan.
+        """
+        if replace:
+            for name in self._top_level:
+                if name not in row and self.has(index, name):
+                    self.unset(index, name)
+        for key, value in row.items():
+            self.set_value(index, key, value)
+
+    def apply_changes(self, rows: Iterable[Mapping], deleted: Iterable = (), key: str = "id"):
+        """
+        Integra registros nuevos o modificados (completos) y quita los eliminados.
+
+        Args:
+            rows: Registros; sustituyen a la fila con el mismo ``key``
+            deleted: Valores de ``key`` de las filas eliminadas
+            key: Columna que identifica cada fila
+        """
+        rows = list(rows)
+        # Posiciones antes de modificar nada: ``find`` usa un índice que se
+        # invalida al escribir en la columna
+        positions = [self.find(key, row.get(key)) for row in rows]
+        drop = [index for index in (self.find(key, value) for value in deleted) if index is not None]
+        for row, index in zip(rows, positions):
+            if index is None:
+                self.append(row)
+            else:
+                self.update(index, row, replace=True)
+        self.delete_rows(drop)
+
+    def delete_rows(self, indices: Iterable[int]):
+        """Elimina las filas indicadas (los índices posteriores se desplazan)."""
+        drop = set(indices)
+        if not drop:
+            return
+        keep = [i for i in range(self._length) if i not in drop]
+        for column in self._columns.values():
+            if isinstance(column.values, array):
+                column.values = array(column.values.typecode, (column.values[i] for i in keep))
+            else:
+                column.values = [column.values[i] for i in keep]
+            if column.missing is not None:
+                column.missing = bytearray(column.missing[i] for i in keep)
+        self._length = len(keep)
+        self._indexes.clear()
+
+    def _add_column(self, name: str, sample: Any):
+        """Crea una columna nueva, ausente en todas las filas existentes."""
+        kind = _infer_kind([sample])
+        missing = bytearray(b"\x01") * self._length
+        if kind == KIND_STRUCT:
+            values = array("b", [_SMALL_NULL]) * self._length
+            self._columns[name] = _Column(kind, values, missing, [])
+        elif kind == KIND_OBJ:
+            self._columns[name] = _Column(kind, [None] * self._length, missing)
+        else:
+            null = self._encode(kind, None)
+            self._columns[name] = _Column(kind, array(_TYPECODES[kind], [null]) * self._length, missing)
+
+    def _append_null(self, column: _Column, missing: bool):
+        if isinstance(column.values, array):
+            column.values.append(self._encode(column.kind, None))
+        else:
+            column.values.append(None)
+        if missing:
+            if column.missing is None:
+                column.missing = bytearray(len(column.values) - 1)
+            column.missing.append(1)
+        elif column.missing is not None:
+            column.missing.append(0)
+        for child_name in column.children or ():
+            self._append_null(self._columns[child_name], missing=True)
+
+    def _assign(self, name: str, index: int, value: Any):
+        column = self._columns[name]
+        if column.kind == KIND_STRUCT:
+            if value is not None and not isinstance(value, dict):
+                self._promote(name)
+                column = self._columns[name]
+            else:
+                column.values[index] = 1 if value is not None else 0
+                nested = value or {}
+                for child_name in list(column.children):
+                    key = child_name.rsplit(".", 1)[1]
+                    if key in nested:
+                        self._assign(child_name, index, nested[key])
+                    else:
+                        self._mark_missing(self._columns[child_name], index)
+                for key, child_value in nested.items():
+                    child_name = f"{name}.{key}"
+                    if child_name not in self._columns:
+                        self._add_column(child_name, child_value)
+                        column.children.append(child_name)
+                        self._assign(child_name, index, child_value)
+                self._clear_missing(column, index)
+                return
+        elif column.kind != KIND_OBJ and value is not None:
+            if _infer_kind([value]) != column.kind:
+                self._promote(name)
+                column = self._columns[name]
+            else:
+                try:
+                    column.values[index] = self._encode(column.kind, value)
+                except OverflowError:
+                    self._promote(name)
+                    column = self._columns[name]
+                else:
+                    self._clear_missing(column, index)
+                    return
+        if column.kind == KIND_OBJ:
+            column.values[index] = value
+        else:
+            column.values[index] = self._encode(column.kind, None)
+        self._clear_missing(column, index)
+
+    @staticmethod
+    def _mark_missing(column: _Column, index: int):
+        if column.missing is None:
+            column.missing = bytearray(len(column.values))
+        column.missing[index] = 1
+
+    @staticmethod
+    def _clear_missing(column: _Column, index: int):
+        if column.missing is not None:
+            column.missing[index] = 0
+
+    def _promote(self, name: str):
+        """Convierte una columna tipada en columna de objetos (tipos mezclados)."""
+        column = self._columns[name]
+        values = [self._decode(column, i) for i in range(self._length)]
+        for child_name in column.children or ():
+            self._drop_column(child_name)
+        self._columns[name] = _Column(KIND_OBJ, values, column.missing)
+
+    def _drop_column(self, name: str):
+        column = self._columns.pop(name, None)
+        if column is not None:
+            for child_name in column.children or ():
+                self._drop_column(child_name)
+
+    # =====================================================================
+    # BÚSQUEDA, FILTRADO Y ORDENACIÓN (por columnas)
+    # =====================================================================
+    def find(self, name: str, value: Any) -> Optional[int]:
+        """Índice de la primera fila cuyo ``name`` vale ``value`` (con índice hash en caché)."""
+        index = self._indexes.get(name)
+        if index is None:
+            index = {}
+            for row, item in enumerate(self.column_values(name)):
+                if item is not None and item not in index:
+                    try:
+                        index[item] = row
+                    except TypeError:
+                        continue
+            self._indexes[name] = index
+        try:
+            return index.get(value)
+        except TypeError:
+            return None
+
+    def select(self, predicate: Callable[["RowView"], bool],
+               rows: Optional[Iterable[int]] = None) -> List[int]:
+        """Índices de las filas para las que ``predicate(RowView)`` es verdadero."""
+        indices = range(self._length) if rows is None else rows
+        return [i for i in indices if predicate(RowView(self, i))]
+
+    def select_equals(self, name: str, value: Any,
+                      rows: Optional[Iterable[int]] = None) -> List[int]:
+        """Índices de las filas cuyo valor en ``name`` es igual a ``value``."""
+        indices = range(self._length) if rows is None else rows
+        column = self._columns.get(name)
+        if column is None:
+            return []
+        if column.kind == KIND_STR and isinstance(value, str):
+            code = self.pool.code_of(value)
+            if code is None:
+                return []
+            codes = column.values
+            return [i for i in indices if codes[i] == code]
+        if column.kind in (KIND_INT, KIND_FLOAT) and isinstance(value, (int, float)) \
+                and not isinstance(value, bool):
+            data = column.values
+            missing = column.missing
+            return [i for i in indices if data[i] == value and (missing is None or not missing[i])]
+        values = self.column_values(name)
+        return [i for i in indices if values[i] == value]
+
+    def select_contains(self, name: str, text: str,
+                        rows: Optional[Iterable[int]] = None) -> List[int]:
+        """Índices de las filas cuyo valor en ``name`` contiene ``text`` (sin distinguir mayúsculas)."""
+        indices = range(self._length) if rows is None else rows
+        column = self._columns.get(name)
+        if column is None:
+            return []
+        needle = text.strip().lower()
+        if column.kind == KIND_STR:
+            # Una comparación por valor distinto, no por fila
+            matching = self.pool.codes_where(lambda s: needle in s.lower())
+            codes = column.values
+            return [i for i in indices if codes[i] in matching]
+        values = self.column_values(name)
+        return [i for i in indices if values[i] is not None and needle in str(values[i]).lower()]
+
+    def sort_rows(self, rows: Iterable[int], name: str, reverse: bool = False) -> List[int]:
+        """
+        Ordena ``rows`` por la columna ``name``.
+
+        Usa la misma clave que la tabla (texto en minúsculas) para mantener el
+        comportamiento de ordenación existente; en columnas de texto la clave
+        se calcula una sola vez por valor distinto del pool.
+        """
+        keys = self.sort_keys(name)
+        return sorted(rows, key=keys.__getitem__, reverse=reverse)
+
+    def sort_keys(self, name: str) -> List[str]:
+        column = self._columns.get(name)
+        if column is None:
+            return [""] * self._length
+        missing = column.missing
+        if column.kind == KIND_STR:
+            lowered = [self.pool.get(code).lower() for code in range(len(self.pool))]
+            codes = column.values
+            return [
+                "" if missing is not None and missing[i]
+                else ("none" if codes[i] < 0 else lowered[codes[i]])
+                for i in range(self._length)
+            ]
+        return [
+            "" if missing is not None and missing[i] else str(self._decode(column, i)).lower()
+            for i in range(self._length)
+        ]
+
+
+class RowView(MutableMapping):
+    """
+    Vista tipo diccionario de una fila de un ``ColumnStore``.
+
+    Las lecturas van directamente a las columnas y las escrituras se guardan
+    en el almacén. Los objetos anidados se reconstruyen en cada lectura, por
+    lo que modificar el dict devuelto no altera la fila: hay que reasignarlo.
+
+    No es un ``dict``: el código que recorre filas de la tabla debe comprobar
+    ``Mapping`` (``copy()`` da un ``dict`` independiente).
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: ColumnStore, index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    def __getitem__(self, key):
+        value = self._store.value(self._index, key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        return self._store.value(self._index, key, default)
+
+    def __setitem__(self, key, value):
+        self._store.set_value(self._index, key, value)
+
+    def __delitem__(self, key):
+        if not self._store.has(self._index, key):
+            raise KeyError(key)
+        self._store.unset(self._index, key)
+
+    def __contains__(self, key) -> bool:
+        return self._store.has(self._index, key)
+
+    def __iter__(self):
+        store, index = self._store, self._index
+        return (name for name in store.columns if store.has(index, name))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._store.row_dict(self._index)
+
+    def copy(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __repr__(self) -> str:
+        return f"RowView({self._index}, {self.to_dict()!r})"
@@ -0,0 +1,420 @@
+"""
+Indicadores (KPI) del dashboard calculados en el cliente.
+
+``KpiEngine`` guarda de facturas, pagos y presupuestos solo lo que necesitan
+los indicadores, en columnas tipadas (``array``): mes y día de emisión,
+total, importe cobrado y estado de cada factura; mes y estado de cada
+presupuesto. Los pagos solo se acumulan en el importe cobrado de su factura.
+
+Las sincronizaciones incrementales llegan con ``apply`` (altas,
+modificaciones y bajas): cada registro cambiado reemplaza su fila y su
+aportación a lo cobrado, sin recorrer el resto. El cálculo (``compute``)
+agrega las columnas de una vez por mes con numpy (``bincount`` sobre vistas
+de los arrays, sin copiarlos) o, si no está instalado, en un bucle.
+
+Indicadores:
+    - Facturado en el mes en curso (y por mes)
+    - Pendiente de cobro: total de las facturas no pagadas menos lo cobrado
+    - Facturas vencidas: estado VENCIDA, o sin pagar tras ``KPI_OVERDUE_DAYS``
+    - Conversión: presupuestos aprobados sobre los ya decididos
+"""
+
+import logging
+import threading
+from array import array
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.data.sync import parse_timestamp
+from src.utils.settings import Settings
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependencia opcional
+    np = None
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+
+# Estado de factura
+FACTURA_ABIERTA = 0
+FACTURA_PAGADA = 1
+FACTURA_VENCIDA = 2
+
+# Estado de presupuesto
+PRESUPUESTO_PENDIENTE = 0
+PRESUPUESTO_APROBADO = 1
+PRESUPUESTO_RECHAZADO = 2
+
+_FACTURA_ESTADOS = {"PAGADA": FACTURA_PAGADA, "VENCIDA": FACTURA_VENCIDA}
+_PRESUPUESTO_ESTADOS = {"APROBADO": PRESUPUESTO_APROBADO, "RECHAZADO": PRESUPUESTO_RECHAZADO}
+
+# Mes o día desconocido (registro sin fecha)
+NO_DATE = -1
+
+
+def month_key(day: date) -> int:
+    """Número de mes absoluto (año * 12 + mes - 1)."""
+    return day.year * 12 + day.month - 1
+
+
+def month_label(key: int) -> str:
+    """Etiqueta "YYYY-MM" de un número de mes."""
+    return f"{key // 12:04d}-{key % 12 + 1:02d}"
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """Fecha de un campo del backend ("YYYY-MM-DD", ISO 8601 o epoch)."""
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value.strip()[:10])
+        except ValueError:
+            pass
+    seconds = parse_timestamp(value)
+    if seconds is None:
+        return None
+    try:
+        return date.fromtimestamp(seconds)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _as_id(value: Any) -> Any:
+    if value is None or isinstance(value, (dict, bool)):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _record_id(row: Record, id_keys: Tuple[str, ...]) -> Any:
+    for key in id_keys:
+        value = _as_id(row.get(key))
+        if value is not None:
+            return value
+    return None
+
+
+def _pago_factura(pago: Record) -> Any:
+    """ID de la factura de un pago (objeto anidado o ID directo)."""
+    factura = pago.get("factura")
+    if isinstance(factura, dict):
+        factura = factura.get("id_factura") or factura.get("id")
+    return _as_id(factura or pago.get("id_factura") or pago.get("factura_id"))
+
+
+class _Columns:
+    """
+    Columnas tipadas de una colección, con una fila por registro.
+
+    Las filas de los registros eliminados quedan marcadas como no vivas y se
+    reutilizan en las altas siguientes.
+    """
+
+    def __init__(self, columns: Dict[str, str]):
+        self._typecodes = columns
+        self.clear()
+
+    def clear(self):
+        self.live = array("b")
+        self.cols = {name: array(code) for name, code in self._typecodes.items()}
+        self._slots: Dict[Any, int] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def slot(self, record_id: Any) -> Optional[int]:
+        return self._slots.get(record_id)
+
+    def put(self, record_id: Any, values: Dict[str, Any]) -> int:
+        slot = self._slots.get(record_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self.live)
+                self.live.append(0)
+                for column in self.cols.values():
+                    column.append(0)
+            self._slots[record_id] = slot
+        self.live[slot] = 1
+        for name, value in values.items():
+            self.cols[name][slot] = value
+        return slot
+
+    def drop(self, record_id: Any) -> Optional[int]:
+        slot = self._slots.pop(record_id, None)
+        if slot is not None:
+            self.live[slot] = 0
+            self._free.append(slot)
+        return slot
+
+
+class KpiEngine:
+    """
+    Indicadores del dashboard sobre las facturas, pagos y presupuestos locales.
+
+    Args:
+        months: Meses de las series de tendencia (incluido el actual)
+        overdue_days: Días sin pagar a partir de los que una factura está vencida
+    """
+
+    ENTITIES = ("facturas", "pagos", "presupuestos")
+
+    def __init__(self, months: Optional[int] = None, overdue_days: Optional[int] = None):
+        self.months = max(1, months or Settings.KPI_TREND_MONTHS)
+        self.overdue_days = Settings.KPI_OVERDUE_DAYS if overdue_days is None else overdue_days
+        self._lock = threading.RLock()
+        self._facturas = _Columns({"month": "q", "day": "q", "total": "d", "paid": "d", "estado": "b"})
+        self._presupuestos = _Columns({"month": "q", "estado": "b"})
+        # Pagos: aportación de cada uno (factura, importe) y total cobrado por factura
+        self._pagos: Dict[Any, Tuple[Any, float]] = {}
+        self._paid: Dict[Any, float] = {}
+        self.version = 0
+        self._cached: Optional[Tuple[Tuple[int, date], Dict[str, Any]]] = None
+
+    # =====================================================================
+    # ACTUALIZACIÓN
+    # =====================================================================
+    def reset(self):
+        with self._lock:
+            for entity in self.ENTITIES:
+                self._clear(entity)
+            self.version += 1
+
+    def load(self, entity: str, rows: Iterable[Record]):
+        """Sustituye todos los registros de ``entity`` (carga completa)."""
+        with self._lock:
+            self._clear(entity)
+            self._upsert(entity, rows)
+            self.version += 1
+            logger.debug("KPI: /%s cargado de nuevo (%s)", entity, self.counts())
+
+    def apply(self, entity: str, upserted: Iterable[Record] = (), deleted: Iterable[Any] = ()):
+        """Integra los cambios de una sincronización incremental."""
+        with self._lock:
+            self._upsert(entity, upserted)
+            for record_id in deleted:
+                self._delete(entity, _as_id(record_id))
+            self.version += 1
+
+    def _clear(self, entity: str):
+        if entity == "facturas":
+            self._facturas.clear()
+        elif entity == "presupuestos":
+            self._presupuestos.clear()
+        elif entity == "pagos":
+            self._pagos.clear()
+            self._paid.clear()
+            paid = self._facturas.cols["paid"]
+            for slot in range(len(paid)):
+                paid[slot] = 0.0
+
+    def _upsert(self, entity: str, rows: Iterable[Record]):
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            if entity == "facturas":
+                self._put_factura(row)
+            elif entity == "pagos":
+                self._put_pago(row)
+            elif entity == "presupuestos":
+                self._put_presupuesto(row)
+
+    def _delete(self, entity: str, record_id: Any):
+        if entity == "facturas":
+            self._facturas.drop(record_id)
+        elif entity == "presupuestos":
+            self._presupuestos.drop(record_id)
+        elif entity == "pagos":
+            previous = self._pagos.pop(record_id, None)
+            if previous is not None:
+                self._add_paid(previous[0], -previous[1])
+
+    def _put_factura(self, row: Record):
+        factura_id = _record_id(row, ("id_factura", "id"))
+        if factura_id is None:
+            return
+        emitted = parse_date(row.get("fecha") or row.get("fecha_emision"))
+        self._facturas.put(factura_id, {
+            "month": month_key(emitted) if emitted else NO_DATE,
+            "day": emitted.toordinal() if emitted else NO_DATE,
+            "total": _to_float(row.get("total")),
+            "paid": self._paid.get(factura_id, 0.0),
+            "estado": _FACTURA_ESTADOS.get(str(row.get("estado") or "").upper(), FACTURA_ABIERTA),
+        })
+
+    def _put_pago(self, row: Record):
+        pago_id = _record_id(row, ("id_pago", "id"))
+        if pago_id is None:
+            return
+        previous = self._pagos.pop(pago_id, None)
+        if previous is not None:
+            self._add_paid(previous[0], -previous[1])
+        factura_id = _pago_factura(row)
+        # Un pago cancelado cuenta como pago, pero no como cobrado
+        cancelled = str(row.get("estado") or "").upper() == "CANCELADA"
+        amount = 0.0 if cancelled else _to_float(row.get("importe"))
+        self._pagos[pago_id] = (factura_id, amount)
+        self._add_paid(factura_id, amount)
+
+    def _add_paid(self, factura_id: Any, amount: float):
+        if factura_id is None:
+            return
+        total = self._paid.get(factura_id, 0.0) + amount
+        if abs(total) < 1e-9:
+            self._paid.pop(factura_id, None)
+            total = 0.0
+        else:
+            self._paid[factura_id] = total
+        # Una factura que aún no ha llegado lo recoge de ``_paid`` al darse de alta
+        slot = self._facturas.slot(factura_id)
+        if slot is not None:
+            self._facturas.cols["paid"][slot] = total
+
+    def _put_presupuesto(self, row: Record):
+        presupuesto_id = _record_id(row, ("id_Presupuesto", "id_presupuesto", "id"))
+        if presupuesto_id is None:
+            return
+        opened = parse_date(row.get("fecha_apertura"))
+        self._presupuestos.put(presupuesto_id, {
+            "month": month_key(opened) if opened else NO_DATE,
+            "estado": _PRESUPUESTO_ESTADOS.get(str(row.get("estado") or "").upper(), PRESUPUESTO_PENDIENTE),
+        })
+
+    # =====================================================================
+    # CÁLCULO
+    # =====================================================================
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {"facturas": len(self._facturas), "pagos": len(self._pagos),
+                    "presupuestos": len(self._presupuestos)}
+
+    def compute(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Indicadores a fecha ``today`` (hoy por defecto).
+
+        Returns:
+            Dict con ``revenue_month``, ``outstanding``, ``overdue`` y
+            ``conversion`` (None sin presupuestos decididos), sus series
+            mensuales ``*_trend`` (la última es el mes en curso), ``months``
+            (etiquetas "YYYY-MM") y ``counts``
+        """
+        today = today or date.today()
+        with self._lock:
+            key = (self.version, today)
+            if self._cached is not None and self._cached[0] == key:
+                return self._cached[1]
+            current = month_key(today)
+            start = current - self.months + 1
+            cutoff = today.toordinal() - self.overdue_days
+            aggregate = self._aggregate_numpy if np is not None else self._aggregate_python
+            result = aggregate(start, current, cutoff)
+            result["months"] = [month_label(m) for m in range(start, current + 1)]
+            result["counts"] = {"facturas": len(self._facturas), "pagos": len(self._pagos),
+                                "presupuestos": len(self._presupuestos)}
+            self._cached = (key, result)
+            return result
+
+    @staticmethod
+    def _summary(revenue: List[float], outstanding_by_month: List[float], overdue_by_month: List[int],
+                 approved: List[int], decided: List[int], outstanding: float, overdue: int,
+                 approved_total: int, decided_total: int) -> Dict[str, Any]:
+        # La conversión global cuenta todos los presupuestos, no solo los del periodo
+        return {
+            "revenue_month": round(revenue[-1], 2),
+            "revenue_trend": [round(v, 2) for v in revenue],
+            "outstanding": round(outstanding, 2),
+            "outstanding_trend": [round(v, 2) for v in outstanding_by_month],
+            "overdue": overdue,
+            "overdue_trend": overdue_by_month,
+            "conversion": approved_total / decided_total if decided_total else None,
+            "conversion_trend": [a / d if d else 0.0 for a, d in zip(approved, decided)],
+        }
+
+    def _aggregate_numpy(self, start: int, current: int, cutoff: int) -> Dict[str, Any]:
+        n = current - start + 1
+        f = self._facturas
+        # Vistas sobre los arrays (sin copia); no sobreviven a esta llamada
+        live = np.frombuffer(f.live, dtype=np.int8).astype(bool)
+        month = np.frombuffer(f.cols["month"], dtype=np.int64)
+        day = np.frombuffer(f.cols["day"], dtype=np.int64)
+        total = np.frombuffer(f.cols["total"], dtype=np.float64)
+        paid = np.frombuffer(f.cols["paid"], dtype=np.float64)
+        estado = np.frombuffer(f.cols["estado"], dtype=np.int8)
+
+        unpaid = live & (estado != FACTURA_PAGADA)
+        due = np.where(unpaid, np.maximum(total - paid, 0.0), 0.0)
+        overdue = unpaid & ((estado == FACTURA_VENCIDA) | ((day != NO_DATE) & (day < cutoff)))
+        in_range = live & (month >= start) & (month <= current)
+        index = month[in_range] - start
+        revenue = np.bincount(index, weights=total[in_range], minlength=n)
+        due_by_month = np.bincount(index, weights=due[in_range], minlength=n)
+        overdue_by_month = np.bincount(index, weights=overdue[in_range], minlength=n)
+
+        p = self._presupuestos
+        p_live = np.frombuffer(p.live, dtype=np.int8).astype(bool)
+        p_month = np.frombuffer(p.cols["month"], dtype=np.int64)
+        p_estado = np.frombuffer(p.cols["estado"], dtype=np.int8)
+        p_range = p_live & (p_month >= start) & (p_month <= current)
+        p_index = p_month[p_range] - start
+        approved = np.bincount(p_index, weights=(p_estado[p_range] == PRESUPUESTO_APROBADO), minlength=n)
+        decided = np.bincount(p_index, weights=(p_estado[p_range] != PRESUPUESTO_PENDIENTE), minlength=n)
+        approved_all = int(np.count_nonzero(p_live & (p_estado == PRESUPUESTO_APROBADO)))
+        decided_all = int(np.count_nonzero(p_live & (p_estado != PRESUPUESTO_PENDIENTE)))
+
+        return self._summary(revenue.tolist(), due_by_month.tolist(),
+                             [int(v) for v in overdue_by_month.tolist()],
+                             [int(v) for v in approved.tolist()], [int(v) for v in decided.tolist()],
+                             float(due.sum()), int(np.count_nonzero(overdue)), approved_all, decided_all)
+
+    def _aggregate_python(self, start: int, current: int, cutoff: int) -> Dict[str, Any]:
+        n = current - start + 1
+        revenue = [0.0] * n
+        due_by_month = [0.0] * n
+        overdue_by_month = [0] * n
+        outstanding = 0.0
+        overdue_count = 0
+        f = self._facturas
+        for live, month, day, total, paid, estado in zip(
+                f.live, f.cols["month"], f.cols["day"], f.cols["total"], f.cols["paid"], f.cols["estado"]):
+            if not live:
+                continue
+            due = 0.0
+            is_overdue = False
+            if estado != FACTURA_PAGADA:
+                due = max(total - paid, 0.0)
+                is_overdue = estado == FACTURA_VENCIDA or (day != NO_DATE and day < cutoff)
+            outstanding += due
+            overdue_count += is_overdue
+            if start <= month <= current:
+                i = month - start
+                revenue[i] += total
+                due_by_month[i] += due
+                overdue_by_month[i] += is_overdue
+
+        approved = [0] * n
+        decided = [0] * n
+        approved_all = decided_all = 0
+        p = self._presupuestos
+        for live, month, estado in zip(p.live, p.cols["month"], p.cols["estado"]):
+            if not live or estado == PRESUPUESTO_PENDIENTE:
+                continue
+            decided_all += 1
+            approved_all += estado == PRESUPUESTO_APROBADO
+            if start <= month <= current:
+                decided[month - start] += 1
+                approved[month - start] += estado == PRESUPUESTO_APROBADO
+
+        return self._summary(revenue, due_by_month, overdue_by_month, approved, decided,
+                             outstanding, overdue_count, approved_all, decided_all)
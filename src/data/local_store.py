@@ -0,0 +1,348 @@
+"""
+Caché local persistente (SQLite) de los listados del backend.
+
+Guarda entre sesiones los registros de cada entidad (tal como los devuelve
+el backend) con algunas columnas indexadas (ID, cliente, nombre, fecha de
+modificación) y una marca de sincronización por entidad. Al arrancar, las
+ventanas muestran lo último conocido y se reconcilian con el backend después
+(ver ``src/api/reference_cache.py`` y ``EntitySync``).
+
+Bajo el nombre de la entidad solo se guardan registros completos; los
+listados proyectados (solo algunos campos) van a una clave propia (ver
+``view_key``) para que los indicadores y el modo sin conexión no los tomen
+por completos.
+
+Hay un fichero por backend y usuario en ``Settings.get_cache_dir()``, de
+modo que un usuario nunca ve datos cacheados de otro. Las escrituras van a
+un hilo propio para no bloquear la interfaz. La tabla ``outbox`` guarda las
+escrituras hechas sin conexión (ver ``src/data/write_queue.py``).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.utils.settings import Settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# 2: los listados proyectados dejan de compartir la clave de la entidad
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    entity      TEXT NOT NULL,
+    record_id   TEXT NOT NULL,
+    cliente_id  INTEGER,
+    nombre      TEXT,
+    updated_at  TEXT,
+    data        BLOB NOT NULL,
+    PRIMARY KEY (entity, record_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_records_cliente ON records (entity, cliente_id);
+CREATE INDEX IF NOT EXISTS idx_records_nombre ON records (entity, nombre);
+CREATE INDEX IF NOT EXISTS idx_records_updated ON records (entity, updated_at);
+CREATE TABLE IF NOT EXISTS sync_markers (
+    entity      TEXT PRIMARY KEY,
+    high_water  TEXT,
+    support     TEXT,
+    synced_at   REAL NOT NULL,
+    full_at     REAL,
+    row_count   INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    method      TEXT NOT NULL,
+    entity      TEXT NOT NULL,
+    entity_id   TEXT,
+    payload     BLOB,
+    base        BLOB,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    error       TEXT,
+    created_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Fila lista para insertar: (record_id, cliente_id, nombre, updated_at, data)
+EncodedRow = Tuple[str, Optional[int], Optional[str], Optional[str], bytes]
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(value, default=str, ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _cliente_id(row: Dict) -> Optional[int]:
+    for key in ("cliente_pagador", "cliente"):
+        nested = row.get(key)
+        if isinstance(nested, dict):
+            value = nested.get("id_cliente") or nested.get("id")
+            break
+    else:
+        value = row.get("id_cliente") or row.get("cliente_id")
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def encode_rows(rows: Iterable[Dict], id_keys: Sequence[str],
+                timestamp_field: Optional[str] = None) -> List[EncodedRow]:
+    """
+    Serializa registros para ``LocalStore.write``.
+
+    Se hace en el hilo que llama, antes de que la normalización de la
+    ventana modifique los diccionarios.
+    """
+    timestamp_field = timestamp_field or Settings.API_SYNC_TIMESTAMP_FIELD
+    encoded: List[EncodedRow] = []
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        record_id = None
+        for key in id_keys:
+            value = row.get(key)
+            if value is not None and not isinstance(value, dict):
+                record_id = value
+                break
+        if record_id is None:
+            continue
+        nombre = row.get("nombre") or row.get("nombre_rol") or row.get("razon_social")
+        updated = row.get(timestamp_field)
+        encoded.append((
+            str(record_id),
+            _cliente_id(row),
+            str(nombre).lower() if nombre else None,
+            str(updated) if updated is not None else None,
+            dumps(row),
+        ))
+    return encoded
+
+
+# Vista del listado de las ventanas con proyección (ver ``BaseCRUDWindow``)
+LIST_VIEW = "list"
+
+
+def view_key(entity: str, view: str) -> str:
+    """Clave en la caché de una vista parcial de la entidad (ej: "facturas:list")."""
+    return f"{entity}:{view}"
+
+
+def cache_path(base_url: str, user_key: str, directory: Optional[str] = None) -> str:
+    """Fichero de caché para un backend y usuario."""
+    digest = hashlib.blake2b(f"{base_url}|{user_key}".encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(directory or Settings.get_cache_dir(), f"cache_{digest}.sqlite3")
+
+
+class LocalStore:
+    """
+    Base de datos SQLite con los registros de cada entidad.
+
+    Args:
+        path: Fichero SQLite (":memory:" para pruebas)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-store")
+        self._pending: List[Future] = []
+
+    @classmethod
+    def open_for(cls, base_url: str, user_key: str,
+                 directory: Optional[str] = None) -> Optional["LocalStore"]:
+        """
+        Abre la caché de un usuario; None si está desactivada o no se puede abrir.
+        """
+        if not Settings.LOCAL_CACHE:
+            return None
+        path = cache_path(base_url, user_key, directory)
+        try:
+            return cls(path)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("No se pudo abrir la caché local %s: %s", path, e)
+            return None
+
+    def _migrate(self):
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is not None and int(row[0]) != SCHEMA_VERSION:
+                # Caché de otra versión: se descarta, se volverá a descargar
+                logger.info("Caché local de la versión %s; se vacía", row[0])
+                self._conn.executescript("DELETE FROM records; DELETE FROM sync_markers;")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                               (str(SCHEMA_VERSION),))
+
+    # =====================================================================
+    # LECTURA
+    # =====================================================================
+    def marker(self, entity: str) -> Optional[Dict[str, Any]]:
+        """Marca de sincronización de una entidad (None si nunca se guardó)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT high_water, support, synced_at, full_at, row_count FROM sync_markers WHERE entity = ?",
+                (entity,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"high_water": row[0], "support": row[1], "synced_at": row[2],
+                "full_at": row[3], "row_count": row[4]}
+
+    def load_payload(self, entity: str, cliente_id: Optional[int] = None) -> Optional[bytes]:
+        """
+        Registros de una entidad como un array JSON (para decodificarlos de una vez).
+
+        Returns:
+            Bytes del array, o None si la entidad no se ha guardado nunca
+        """
+        if self.marker(entity) is None:
+            return None
+        sql = "SELECT data FROM records WHERE entity = ?"
+        args: Tuple = (entity,)
+        if cliente_id is not None:
+            sql += " AND cliente_id = ?"
+            args = (entity, int(cliente_id))
+        # Mismo orden que el backend (IDs numéricos ascendentes)
+        sql += " ORDER BY CAST(record_id AS INTEGER), record_id"
+        with self._lock:
+            blobs = [row[0] for row in self._conn.execute(sql, args)]
+        return b"[" + b",".join(bytes(blob) for blob in blobs) + b"]"
+
+    def load(self, entity: str, cliente_id: Optional[int] = None) -> Optional[List[Dict]]:
+        """Registros de una entidad (None si no hay nada guardado)."""
+        payload = self.load_payload(entity, cliente_id)
+        return None if payload is None else loads(payload)
+
+    def get(self, entity: str, record_id: Any) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM records WHERE entity = ? AND record_id = ?",
+                (entity, str(record_id)),
+            ).fetchone()
+        return loads(row[0]) if row is not None else None
+
+    # =====================================================================
+    # ESCRITURA
+    # =====================================================================
+    def write(self, entity: str, rows: Sequence[EncodedRow] = (),
+              deleted: Iterable[Any] = (), replace: bool = False, full: bool = False,
+              high_water: Any = None, support: Optional[str] = None):
+        """
+        Escribe registros de una entidad en una transacción.
+
+        Args:
+            entity: Entidad
+            rows: Filas de ``encode_rows``
+            deleted: IDs a borrar
+            replace: Si True, ``rows`` es el listado completo (se borra lo demás)
+            full: El llamador ha comparado el listado completo (sin ``replace``)
+            high_water: Marca de agua de la sincronización (None = conservar)
+            support: Soporte del delta detectado (None = conservar)
+        """
+        with self._lock:
+            conn = self._conn
+            previous = self.marker(entity) or {}
+            now = time.time()
+            conn.execute("BEGIN")
+            try:
+                if replace:
+                    conn.execute("DELETE FROM records WHERE entity = ?", (entity,))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO records (entity, record_id, cliente_id, nombre, updated_at, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(entity,) + row for row in rows],
+                )
+                ids = [(entity, str(record_id)) for record_id in deleted]
+                if ids:
+                    conn.executemany("DELETE FROM records WHERE entity = ? AND record_id = ?", ids)
+                count = conn.execute("SELECT COUNT(*) FROM records WHERE entity = ?", (entity,)).fetchone()[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO sync_markers "
+                    "(entity, high_water, support, synced_at, full_at, row_count) VALUES (?, ?, ?, ?, ?, ?)",
+                    (entity,
+                     str(high_water) if high_water is not None else previous.get("high_water"),
+                     support or previous.get("support"),
+                     now, now if (replace or full) else previous.get("full_at"), count),
+                )
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+
+    def write_async(self, entity: str, **kwargs) -> Future:
+        """``write`` en el hilo de escritura (los errores solo se registran)."""
+        def task():
+            try:
+                self.write(entity, **kwargs)
+            except sqlite3.Error as e:
+                logger.warning("No se pudo guardar /%s en la caché local: %s", entity, e)
+
+        future = self._writer.submit(task)
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(future)
+        return future
+
+    def execute(self, sql: str, args: Sequence = ()) -> sqlite3.Cursor:
+        """Ejecuta una sentencia (autocommit) bajo el bloqueo de la conexión."""
+        with self._lock:
+            return self._conn.execute(sql, args)
+
+    def query(self, sql: str, args: Sequence = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def invalidate(self, entity: str):
+        """Olvida una entidad y sus vistas (la próxima carga irá al backend)."""
+        prefix = view_key(entity, "")
+        with self._lock:
+            for table in ("records", "sync_markers"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE entity = ? OR substr(entity, 1, ?) = ?",
+                    (entity, len(prefix), prefix))
+
+    def flush(self, timeout: Optional[float] = None):
+        """Espera a que terminen las escrituras pendientes."""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+
+    def close(self):
+        self.flush(timeout=10)
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,190 @@
+"""
+Índice presupuesto → facturas generadas.
+
+El backend enlaza las facturas con su presupuesto mediante un campo
+(``id_presupuesto`` o el objeto ``presupuesto``) o, en versiones antiguas,
+solo con el texto "Presupuesto #<id>" en las notas. El índice se alimenta con
+las facturas que ya se descargan (listados, generación desde presupuesto) para
+responder "¿este presupuesto ya está facturado?" sin recorrer todas las
+facturas cada vez.
+
+Las respuestas negativas caducan (``Settings.PRESUPUESTO_FACTURAS_TTL``): otro
+usuario puede facturar el presupuesto mientras tanto, así que pasado ese
+tiempo se vuelve a preguntar al backend.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.utils.settings import Settings
+
+Record = Dict[str, Any]
+
+_NOTAS_PRESUPUESTO = re.compile(r"presupuesto\s*#\s*(\d+)", re.IGNORECASE)
+_ID_KEYS = ("id_presupuesto", "id_Presupuesto", "presupuesto_id")
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def presupuesto_de_factura(factura: Record) -> Optional[int]:
+    """
+    ID del presupuesto del que procede una factura (o None).
+
+    Se busca primero en los campos de relación y, si no hay, en las notas.
+    """
+    for key in _ID_KEYS:
+        value = factura.get(key)
+        if isinstance(value, dict):
+            value = value.get("id_Presupuesto") or value.get("id_presupuesto") or value.get("id")
+        if value is not None:
+            return _as_int(value)
+    presupuesto = factura.get("presupuesto")
+    if isinstance(presupuesto, dict):
+        value = presupuesto.get("id_Presupuesto") or presupuesto.get("id_presupuesto") or presupuesto.get("id")
+        if value is not None:
+            return _as_int(value)
+    notas = factura.get("notas")
+    if isinstance(notas, str) and notas:
+        match = _NOTAS_PRESUPUESTO.search(notas)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def _factura_id(factura: Record) -> Any:
+    return factura.get("id_factura") or factura.get("id")
+
+
+class PresupuestoFacturasIndex:
+    """
+    Mapa presupuesto → facturas, mantenido de forma incremental.
+
+    ``tiene_facturas`` distingue tres casos: True (hay facturas indexadas),
+    False (se sabe que no hay: hace menos de ``ttl`` segundos que el índice
+    contenía todas las facturas o que ese presupuesto se consultó al backend)
+    y None (no se sabe, o el dato ha caducado).
+
+    Args:
+        ttl: Segundos que vale una respuesta negativa (None = Settings)
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self._lock = threading.Lock()
+        self.ttl = Settings.PRESUPUESTO_FACTURAS_TTL if ttl is None else ttl
+        self._facturas: Dict[int, Dict[Any, Record]] = {}
+        # factura -> presupuesto, para poder quitarla al eliminarla
+        self._presupuesto_por_factura: Dict[Any, int] = {}
+        # presupuesto -> momento (monotónico) de la última consulta al backend
+        self._consultados: Dict[int, float] = {}
+        # Momento del último listado completo (None = nunca)
+        self._completo_at: Optional[float] = None
+
+    @property
+    def completo(self) -> bool:
+        """True si el índice contiene todas las facturas (y no ha caducado)."""
+        return self._fresh(self._completo_at)
+
+    def _fresh(self, at: Optional[float]) -> bool:
+        return at is not None and time.monotonic() - at < self.ttl
+
+    # =====================================================================
+    # ALIMENTACIÓN
+    # =====================================================================
+    def rebuild(self, facturas: Iterable[Record]):
+        """Reconstruye el índice desde el listado completo de facturas."""
+        with self._lock:
+            self._facturas.clear()
+            self._presupuesto_por_factura.clear()
+            self._consultados.clear()
+            self._add_locked(facturas)
+            self._completo_at = time.monotonic()
+
+    def add_facturas(self, facturas: Iterable[Record]):
+        """Añade facturas sueltas (listados filtrados, respuestas de creación)."""
+        with self._lock:
+            self._add_locked(facturas)
+
+    def add(self, presupuesto_id: Any, facturas: Iterable[Record]):
+        """Registra facturas generadas desde un presupuesto concreto."""
+        presupuesto_id = _as_int(presupuesto_id)
+        if presupuesto_id is None:
+            return
+        with self._lock:
+            bucket = self._facturas.setdefault(presupuesto_id, {})
+            for factura in facturas or []:
+                if not isinstance(factura, dict):
+                    continue
+                factura_id = _factura_id(factura)
+                key = factura_id if factura_id is not None else id(factura)
+                bucket[key] = factura
+                if factura_id is not None:
+                    self._presupuesto_por_factura[factura_id] = presupuesto_id
+            self._consultados[presupuesto_id] = time.monotonic()
+
+    def mark_consultado(self, presupuesto_id: Any):
+        """Indica que el backend ya devolvió todas las facturas de ese presupuesto."""
+        presupuesto_id = _as_int(presupuesto_id)
+        if presupuesto_id is not None:
+            with self._lock:
+                self._consultados[presupuesto_id] = time.monotonic()
+
+    def remove_factura(self, factura_id: Any):
+        """Quita una factura eliminada."""
+        with self._lock:
+            presupuesto_id = self._presupuesto_por_factura.pop(factura_id, None)
+            if presupuesto_id is None and isinstance(factura_id, str) and factura_id.isdigit():
+                factura_id = int(factura_id)
+                presupuesto_id = self._presupuesto_por_factura.pop(factura_id, None)
+            if presupuesto_id is not None:
+                bucket = self._facturas.get(presupuesto_id)
+                if bucket is not None:
+                    bucket.pop(factura_id, None)
+                    if not bucket:
+                        del self._facturas[presupuesto_id]
+
+    def clear(self):
+        with self._lock:
+            self._facturas.clear()
+            self._presupuesto_por_factura.clear()
+            self._consultados.clear()
+            self._completo_at = None
+
+    def _add_locked(self, facturas: Iterable[Record]):
+        for factura in facturas or []:
+            if not isinstance(factura, dict):
+                continue
+            presupuesto_id = presupuesto_de_factura(factura)
+            if presupuesto_id is None:
+                continue
+            factura_id = _factura_id(factura)
+            key = factura_id if factura_id is not None else id(factura)
+            self._facturas.setdefault(presupuesto_id, {})[key] = factura
+            if factura_id is not None:
+                self._presupuesto_por_factura[factura_id] = presupuesto_id
+
+    # =====================================================================
+    # CONSULTA
+    # =====================================================================
+    def tiene_facturas(self, presupuesto_id: Any) -> Optional[bool]:
+        """True/False si se sabe, None si habría que preguntar al backend."""
+        presupuesto_id = _as_int(presupuesto_id)
+        if presupuesto_id is None:
+            return False
+        with self._lock:
+            if self._facturas.get(presupuesto_id):
+                return True
+            if self.completo or self._fresh(self._consultados.get(presupuesto_id)):
+                return False
+            return None
+
+    def facturas_de(self, presupuesto_id: Any) -> List[Record]:
+        presupuesto_id = _as_int(presupuesto_id)
+        with self._lock:
+            return list(self._facturas.get(presupuesto_id, {}).values())
@@ -0,0 +1,149 @@
+"""
+Conjuntos de registros relacionados en memoria (clientes, empleados, productos...).
+
+Las ventanas cargan una vez los datos relacionados y, tras crear o editar un
+registro, lo integran con ``upsert`` en lugar de volver a descargar todo del
+backend. Los oyentes registrados con ``subscribe`` reciben cada registro
+integrado para refrescar sus índices y selectores.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Record = Dict[str, Any]
+
+
+def record_id(record: Record, id_keys: Tuple[str, ...]) -> Any:
+    """ID de un registro: la primera de ``id_keys`` con valor (o None)."""
+    for key in id_keys:
+        value = record.get(key)
+        if value is not None and not isinstance(value, dict):
+            return value
+    return None
+
+
+class RecordSet:
+    """
+    Lista de registros con acceso por ID y actualización incremental.
+
+    La lista ``records`` se modifica en el sitio, de modo que el código que
+    ya guarda una referencia (exportadores, normalizadores) ve los cambios.
+
+    Args:
+        id_keys: Claves de las que se lee el ID, en orden de preferencia
+                 (ej: ("id_cliente", "id")). El ID se copia siempre en "id".
+        records: Registros iniciales
+    """
+
+    def __init__(self, id_keys: Tuple[str, ...] = ("id",),
+                 records: Optional[Iterable[Record]] = None):
+        self.id_keys = id_keys
+        self.records: List[Record] = []
+        self._by_id: Dict[Any, Record] = {}
+        self._listeners: List[Callable[[Record], None]] = []
+        if records:
+            self.replace(records)
+
+    # =====================================================================
+    # LECTURA
+    # =====================================================================
+    def record_id(self, record: Record) -> Any:
+        """ID de un registro según ``id_keys`` (o None)."""
+        return record_id(record, self.id_keys)
+
+    def get(self, record_id: Any) -> Optional[Record]:
+        record = self._by_id.get(record_id)
+        if record is None and isinstance(record_id, str) and record_id.strip().isdigit():
+            record = self._by_id.get(int(record_id))
+        return record
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __contains__(self, record_id: Any) -> bool:
+        return self.get(record_id) is not None
+
+    # =====================================================================
+    # ESCRITURA
+    # =====================================================================
+    def replace(self, records: Iterable[Record]) -> List[Record]:
+        """
+        Sustituye todo el contenido (carga completa desde el backend).
+
+        Returns:
+            La lista de registros (misma instancia que ``self.records``)
+        """
+        self.records[:] = []
+        self._by_id.clear()
+        for record in records or []:
+            if not isinstance(record, dict):
+                continue
+            record_id = self.record_id(record)
+            if record_id is not None:
+                record.setdefault("id", record_id)
+                self._by_id[record_id] = record
+            self.records.append(record)
+        return self.records
+
+    def upsert(self, record: Record) -> Optional[Record]:
+        """
+        Integra un registro creado o actualizado.
+
+        Si ya existe un registro con el mismo ID se actualiza en el sitio
+        (conservando los campos que la respuesta no incluya); si no, se añade.
+
+        Args:
+            record: Registro devuelto por el backend
+
+        Returns:
+            El registro almacenado, o None si no tiene ID
+        """
+        if not isinstance(record, dict):
+            return None
+        record_id = self.record_id(record)
+        if record_id is None:
+            logger.debug("Registro sin ID en upsert; se ignora")
+            return None
+
+        stored = self._by_id.get(record_id)
+        if stored is None:
+            stored = dict(record)
+            self._by_id[record_id] = stored
+            self.records.append(stored)
+        else:
+            stored.update(record)
+        stored["id"] = record_id
+
+        for listener in list(self._listeners):
+            try:
+                listener(stored)
+            except Exception:
+                logger.exception("Error en oyente de RecordSet")
+        return stored
+
+    def remove(self, record_id: Any) -> bool:
+        record = self._by_id.pop(record_id, None)
+        if record is None:
+            return False
+        self.records[:] = [r for r in self.records if r is not record]
+        return True
+
+    def subscribe(self, listener: Callable[[Record], None]) -> Callable[[], None]:
+        """
+        Registra un oyente llamado con cada registro integrado por ``upsert``.
+
+        Returns:
+            Función que cancela la suscripción
+        """
+        self._listeners.append(listener)
+
+        def unsubscribe():
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
@@ -0,0 +1,143 @@
+"""
+Índice de búsqueda en memoria para los selectores (clientes, productos, facturas).
+
+El índice guarda por cada registro su ID y una etiqueta de texto; las
+etiquetas se generan de forma perezosa la primera vez que se busca, y cada
+búsqueda devuelve solo los N primeros resultados (primero los que empiezan
+por el texto, luego los que lo contienen).
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+Record = Dict[str, Any]
+
+
+# =====================================================================
+# ETIQUETAS DE REGISTROS
+# =====================================================================
+def cliente_nombre(cliente: Record) -> str:
+    """Nombre visible de un cliente (razón social, nombre + apellidos o nombre)."""
+    nombre = cliente.get("nombre", "") or ""
+    apellidos = cliente.get("apellidos", "") or ""
+    razon_social = cliente.get("razon_social", "") or ""
+    if razon_social:
+        return razon_social
+    if apellidos:
+        return f"{nombre} {apellidos}".strip()
+    return nombre or "N/A"
+
+
+def cliente_label(cliente: Record) -> str:
+    tipo = cliente.get("tipo_cliente")
+    base = f"{cliente.get('id', cliente.get('id_cliente', ''))} - {cliente_nombre(cliente)}"
+    return f"{base} ({tipo})" if tipo else base
+
+
+def producto_label(producto: Record) -> str:
+    return f"{producto.get('id', producto.get('id_producto', ''))} - {producto.get('nombre', '')} (€{producto.get('precio', 0)})"
+
+
+def factura_label(factura: Record) -> str:
+    try:
+        total = f"{float(factura.get('total') or 0):.2f}"
+    except (TypeError, ValueError):
+        total = str(factura.get("total"))
+    label = f"{factura.get('id', factura.get('id_factura', ''))} - Total: €{total}"
+    numero = factura.get("num_factura")
+    return f"{label} ({numero})" if numero else label
+
+
+class SearchIndex:
+    """
+    Índice ID → etiqueta con búsqueda por texto.
+
+    Args:
+        records: Registros (dicts) a indexar
+        label: Función que genera la etiqueta de un registro
+        id_keys: Claves de las que se lee el ID, en orden de preferencia
+    """
+
+    def __init__(self, records: Optional[Iterable[Record]] = None,
+                 label: Callable[[Record], str] = str,
+                 id_keys: Tuple[str, ...] = ("id",)):
+        self._label = label
+        self._id_keys = id_keys
+        self._records: Dict[Any, Record] = {}
+        # (id, etiqueta, etiqueta en minúsculas); se construye en la primera búsqueda
+        self._entries: Optional[List[Tuple[Any, str, str]]] = None
+        if records:
+            self.update(records)
+
+    def _record_id(self, record: Record) -> Any:
+        for key in self._id_keys:
+            value = record.get(key)
+            if value is not None:
+                return value
+        return None
+
+    def update(self, records: Iterable[Record]):
+        """Añade o reemplaza registros (por ID)."""
+        for record in records:
+            if not hasattr(record, "get"):
+                continue
+            record_id = self._record_id(record)
+            if record_id is not None:
+                self._records[record_id] = record
+        self._entries = None
+
+    def remove(self, record_id: Any):
+        if self._records.pop(record_id, None) is not None:
+            self._entries = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, record_id: Any) -> bool:
+        return record_id in self._records
+
+    def resolve_id(self, record_id: Any) -> Any:
+        """ID tal como está en el índice (acepta el ID como texto o número)."""
+        if record_id not in self._records and isinstance(record_id, str) and record_id.strip().isdigit():
+            return int(record_id)
+        return record_id
+
+    def get(self, record_id: Any) -> Optional[Record]:
+        """Registro con ese ID (o None)."""
+        return self._records.get(self.resolve_id(record_id))
+
+    def label_of(self, record_id: Any) -> Optional[str]:
+        record = self.get(record_id)
+        return self._label(record) if record is not None else None
+
+    def _ensure_entries(self) -> List[Tuple[Any, str, str]]:
+        if self._entries is None:
+            entries = []
+            for record_id, record in self._records.items():
+                text = self._label(record)
+                entries.append((record_id, text, text.lower()))
+            self._entries = entries
+        return self._entries
+
+    def search(self, text: str, limit: int = 20) -> List[Tuple[Any, str]]:
+        """
+        Devuelve hasta ``limit`` pares (id, etiqueta) que coinciden con ``text``.
+
+        Primero las etiquetas que empiezan por el texto (o cuyo ID coincide),
+        después las que lo contienen. Sin texto devuelve los primeros registros.
+        """
+        entries = self._ensure_entries()
+        needle = (text or "").strip().lower()
+        if not needle:
+            return [(record_id, label) for record_id, label, _ in entries[:limit]]
+
+        prefix: List[Tuple[Any, str]] = []
+        contains: List[Tuple[Any, str]] = []
+        for record_id, label, lowered in entries:
+            position = lowered.find(needle)
+            if position == 0:
+                prefix.append((record_id, label))
+                if len(prefix) >= limit:
+                    break
+            elif position > 0 and len(contains) < limit:
+                contains.append((record_id, label))
+        return (prefix + contains)[:limit]
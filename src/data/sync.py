@@ -0,0 +1,453 @@
+"""
+Sincronización incremental (delta) de los listados de entidades.
+
+Tras la primera carga completa, "Actualizar" pide al backend solo los
+registros modificados desde la última marca de agua
+(``?updated_since=<marca>``) y se los entrega a quien los muestra (la tabla
+de la ventana, el motor de indicadores), que guarda la única copia de los
+registros: ``EntitySync`` solo conserva la marca de agua y un hash por ID.
+Las bajas llegan como registros con ``deleted``/``deleted_at`` (o en una
+respuesta ``{"changed": [...], "deleted": [ids]}``).
+
+Si el backend no expone la fecha de modificación o ignora el parámetro
+(devuelve registros anteriores a la marca), se descarga el listado completo
+y se compara por hash de contenido: la red mueve lo mismo que antes, pero a
+la tabla solo llegan las filas que han cambiado. Cada
+``API_SYNC_FULL_INTERVAL`` segundos se hace además una reconciliación
+completa para detectar las bajas que el backend no informa.
+
+Con una ``LocalStore`` los registros (sin normalizar) y la marca de agua se
+guardan en disco: en la siguiente sesión ``restore`` muestra lo guardado al
+instante y la primera sincronización ya es incremental.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.data.local_store import LocalStore, encode_rows
+from src.data.repository import Record, record_id
+from src.utils.settings import Settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Estado del soporte de ``updated_since`` por entidad
+UNKNOWN = "unknown"
+SUPPORTED = "supported"
+UNSUPPORTED = "unsupported"
+
+# Modos de la sincronización devuelta en ``SyncDelta.mode``
+FULL = "full"
+DELTA = "delta"
+HASH = "hash"
+
+# Campos que marcan un registro eliminado en una respuesta delta
+TOMBSTONE_FIELDS = ("deleted", "deleted_at", "eliminado")
+
+
+def row_hash(row: Record) -> bytes:
+    """Hash del contenido de un registro (independiente del orden de las claves)."""
+    if orjson is not None:
+        try:
+            payload = orjson.dumps(row, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            payload = json.dumps(row, sort_keys=True, default=str).encode("utf-8")
+    else:
+        payload = json.dumps(row, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=12).digest()
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """
+    Convierte una marca de tiempo del backend a segundos (para compararlas).
+
+    Acepta números (epoch en segundos o milisegundos) y fechas ISO 8601.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000.0 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return None
+        try:
+            return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            try:
+                return parse_timestamp(float(text))
+            except ValueError:
+                return None
+    return None
+
+
+def _is_tombstone(row: Record) -> bool:
+    for field in TOMBSTONE_FIELDS:
+        value = row.get(field)
+        if value not in (None, False, 0, "", "false", "0"):
+            return True
+    return False
+
+
+class SyncDelta:
+    """
+    Resultado de una sincronización.
+
+    Attributes:
+        mode: ``full`` (``upserted`` es el listado completo), ``delta`` o ``hash``
+        upserted: Registros nuevos o modificados (ya normalizados, con "id")
+        deleted: IDs eliminados (solo los que se conocían)
+        received: Filas recibidas del backend
+    """
+
+    __slots__ = ("mode", "upserted", "deleted", "received")
+
+    def __init__(self, mode: str, upserted: List[Record], deleted: List[Any], received: int):
+        self.mode = mode
+        self.upserted = upserted
+        self.deleted = deleted
+        self.received = received
+
+    @property
+    def full(self) -> bool:
+        return self.mode == FULL
+
+    @property
+    def changed(self) -> int:
+        return len(self.upserted) + len(self.deleted)
+
+    def __repr__(self) -> str:
+        return (f"SyncDelta(mode={self.mode!r}, upserted={len(self.upserted)}, "
+                f"deleted={len(self.deleted)}, received={self.received})")
+
+
+class EntitySync:
+    """
+    Marca de agua y hashes de un listado sincronizado.
+
+    No guarda los registros: ``restore`` y ``sync`` devuelven las filas y el
+    llamador las aplica a su propio almacén (``DataTable.apply_changes``,
+    ``KpiEngine.apply``).
+
+    Args:
+        entity: Entidad (ej: "pagos"), solo para los logs
+        id_keys: Claves del ID en los registros del backend, en orden de
+                 preferencia (el ID se copia siempre en "id")
+        mode: "auto" (detectar soporte), "on" (confiar siempre en el backend)
+              u "off" (solo comparación por hash)
+        param: Parámetro de consulta con la marca de agua
+        timestamp_field: Campo con la fecha de modificación de cada registro
+        full_interval: Segundos entre reconciliaciones completas (0 = nunca)
+        store: Caché local donde persistir el listado (opcional)
+        store_key: Clave en ``store`` (por defecto la entidad; los listados
+                   proyectados usan una propia, ver ``view_key``)
+    """
+
+    def __init__(self, entity: str, id_keys: Tuple[str, ...] = ("id",),
+                 mode: Optional[str] = None, param: Optional[str] = None,
+                 timestamp_field: Optional[str] = None,
+                 full_interval: Optional[float] = None,
+                 store: Optional[LocalStore] = None,
+                 store_key: Optional[str] = None):
+        self.entity = entity
+        self.mode = (mode or Settings.API_SYNC_MODE).lower()
+        self.param = param or Settings.API_SYNC_PARAM
+        self.timestamp_field = timestamp_field or Settings.API_SYNC_TIMESTAMP_FIELD
+        self.full_interval = Settings.API_SYNC_FULL_INTERVAL if full_interval is None else full_interval
+        self.id_keys = tuple(id_keys)
+        self.support = UNKNOWN if self.mode == "auto" else (UNSUPPORTED if self.mode == "off" else SUPPORTED)
+        self._high_water: Any = None
+        self._high_water_key: Optional[float] = None
+        self._hashes: Dict[Any, bytes] = {}
+        self._last_full = 0.0
+        self.store = store
+        self.store_key = store_key or entity
+        self._restored = False
+
+    # =====================================================================
+    # ESTADO
+    # =====================================================================
+    @property
+    def high_water(self) -> Any:
+        """Marca de agua actual (valor tal cual lo envía el backend)."""
+        return self._high_water
+
+    @property
+    def loaded(self) -> bool:
+        return self._last_full > 0 or self._restored
+
+    def record_id(self, row: Record) -> Any:
+        """ID de un registro del backend según ``id_keys`` (o None)."""
+        return record_id(row, self.id_keys)
+
+    def _known_id(self, value: Any) -> Any:
+        """ID tal como está guardado (acepta "12" por 12), o None si no se conoce."""
+        if value in self._hashes:
+            return value
+        if isinstance(value, str) and value.strip().isdigit() and int(value) in self._hashes:
+            return int(value)
+        return None
+
+    def restore(self, normalize: Optional[Callable[[List[Record]], List[Record]]] = None
+                ) -> Optional[List[Record]]:
+        """
+        Carga el listado guardado en la caché local (sin ir al backend).
+
+        Returns:
+            Las filas guardadas (normalizadas) o None si no había nada; tras
+            restaurar, la siguiente ``sync`` será incremental
+        """
+        if self.store is None or self.loaded:
+            return None
+        marker = self.store.marker(self.store_key)
+        rows = self.store.load(self.store_key) if marker is not None else None
+        if rows is None:
+            return None
+        self._hashes = {}
+        for row in rows:
+            row_id = self.record_id(row)
+            if row_id is not None:
+                self._hashes[row_id] = row_hash(row)
+        self._high_water = marker.get("high_water")
+        self._high_water_key = parse_timestamp(self._high_water)
+        if self._high_water_key is None:
+            self._high_water = None
+        if self.mode == "auto" and marker.get("support") in (SUPPORTED, UNSUPPORTED):
+            self.support = marker["support"]
+        if marker.get("full_at"):
+            # Antigüedad de la última reconciliación completa, en el reloj monotónico
+            self._last_full = time.monotonic() - max(0.0, time.time() - marker["full_at"])
+        self._restored = True
+        logger.debug("/%s restaurado de la caché local: %d registros", self.entity, len(rows))
+        return self._prepare(rows, normalize)
+
+    def reset(self):
+        """Olvida el estado: la próxima sincronización será completa."""
+        self._hashes.clear()
+        self._high_water = None
+        self._high_water_key = None
+        self._last_full = 0.0
+        self._restored = False
+
+    def forget(self, record_id: Any) -> Optional[Any]:
+        """
+        Olvida un registro eliminado desde esta misma ventana.
+
+        Returns:
+            El ID con el que estaba guardado (para quitarlo de la tabla), o None
+        """
+        stored_id = self._known_id(record_id)
+        if stored_id is None:
+            return None
+        del self._hashes[stored_id]
+        self._persist(deleted=[stored_id])
+        return stored_id
+
+    def _needs_full(self) -> bool:
+        if not self.loaded:
+            return True
+        return bool(self.full_interval) and time.monotonic() - self._last_full >= self.full_interval
+
+    def _persist(self, rows: Iterable[Record] = (), deleted: Iterable[Any] = (),
+                 replace: bool = False, full: bool = False):
+        """Guarda en la caché local las filas del backend (antes de normalizarlas)."""
+        if self.store is None:
+            return
+        self.store.write_async(
+            self.store_key,
+            rows=encode_rows(rows, self.id_keys, self.timestamp_field),
+            deleted=list(deleted),
+            replace=replace,
+            full=full,
+            high_water=self._high_water,
+            support=self.support,
+        )
+
+    def _advance(self, rows: Iterable[Record]):
+        """Sube la marca de agua con las fechas de ``rows``."""
+        for row in rows:
+            value = row.get(self.timestamp_field)
+            key = parse_timestamp(value)
+            if key is not None and (self._high_water_key is None or key > self._high_water_key):
+                self._high_water, self._high_water_key = value, key
+
+    # =====================================================================
+    # SINCRONIZACIÓN
+    # =====================================================================
+    def sync(self, fetch: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]],
+             normalize: Optional[Callable[[List[Record]], List[Record]]] = None,
+             full: bool = False) -> Dict[str, Any]:
+        """
+        Sincroniza el listado.
+
+        Args:
+            fetch: Función que hace el GET con los parámetros indicados (None =
+                   listado completo) y devuelve el dict de ``RESTClient``
+            normalize: Función que prepara las filas para la tabla (se llama
+                       solo con las filas nuevas o modificadas)
+            full: Forzar una carga completa
+
+        Returns:
+            Dict con 'success' y 'data' (``SyncDelta``) o 'error'
+        """
+        if full or self._needs_full():
+            return self._sync_full(fetch, normalize)
+
+        if self.support == UNSUPPORTED or self._high_water is None:
+            # Sin marca de agua utilizable: listado completo comparado por hash
+            result = fetch(None)
+            if not result.get("success"):
+                return result
+            return self._apply_hashed(self._rows_of(result.get("data")), normalize)
+
+        result = fetch({self.param: self._high_water})
+        if not result.get("success"):
+            if self.support != UNKNOWN:
+                return result
+            # Un backend que no conoce el parámetro puede rechazarlo; si el
+            # listado sin él funciona, el problema era el parámetro
+            fallback = fetch(None)
+            if not fallback.get("success"):
+                return fallback
+            self._mark_unsupported("rechaza la petición delta")
+            return self._apply_hashed(self._rows_of(fallback.get("data")), normalize)
+
+        changed, deleted = self._split_payload(result.get("data"))
+        if self.support == UNKNOWN and not self._confirms_delta(changed):
+            # Ha devuelto registros anteriores a la marca: ignora el parámetro
+            # y la respuesta es el listado completo
+            self._mark_unsupported("devuelve registros anteriores a la marca de agua")
+            return self._apply_hashed(changed, normalize)
+        if any(self.record_id(row) is None for row in changed):
+            logger.debug("Delta de /%s con registros sin ID; se recarga completo", self.entity)
+            return self._sync_full(fetch, normalize)
+        if changed and self.support == UNKNOWN:
+            self.support = SUPPORTED
+            logger.info("El backend admite '%s' en /%s", self.param, self.entity)
+        return self._apply_delta(changed, deleted, normalize)
+
+    def _sync_full(self, fetch, normalize) -> Dict[str, Any]:
+        result = fetch(None)
+        if not result.get("success"):
+            return result
+        rows = self._rows_of(result.get("data"))
+        self._hashes = {}
+        for row in rows:
+            row_id = self.record_id(row)
+            if row_id is not None:
+                self._hashes[row_id] = row_hash(row)
+        self._high_water = self._high_water_key = None
+        self._advance(rows)
+        if self._high_water is None and self.support == UNKNOWN and rows:
+            self._mark_unsupported(f"los registros no traen '{self.timestamp_field}'")
+        self._persist(rows, replace=True)
+        received = len(rows)
+        rows = self._prepare(rows, normalize)
+        self._last_full = time.monotonic()
+        return {"success": True, "data": SyncDelta(FULL, rows, [], received)}
+
+    def _apply_hashed(self, rows: List[Record], normalize) -> Dict[str, Any]:
+        """Compara un listado completo con el anterior por hash de contenido."""
+        if any(self.record_id(row) is None for row in rows):
+            # Sin IDs no se puede casar fila a fila
+            return self._sync_full(lambda _params: {"success": True, "data": rows}, normalize)
+        hashes: Dict[Any, bytes] = {}
+        changed: List[Record] = []
+        for row in rows:
+            row_id = self.record_id(row)
+            digest = row_hash(row)
+            hashes[row_id] = digest
+            if self._hashes.get(row_id) != digest:
+                changed.append(row)
+        deleted = [row_id for row_id in self._hashes if row_id not in hashes]
+        self._hashes = hashes
+        self._advance(rows)
+        self._persist(changed, deleted, full=True)
+        delta = self._delta(changed, deleted, normalize, HASH, len(rows))
+        # Se ha visto el listado entero: cuenta como reconciliación completa
+        self._last_full = time.monotonic()
+        return {"success": True, "data": delta}
+
+    def _apply_delta(self, changed: List[Record], deleted: List[Any], normalize) -> Dict[str, Any]:
+        received = len(changed) + len(deleted)
+        live: List[Record] = []
+        removed: List[Any] = []
+        for row in changed:
+            row_id = self.record_id(row)
+            if _is_tombstone(row):
+                deleted.append(row_id)
+                continue
+            digest = row_hash(row)
+            # La marca es inclusiva: los registros del mismo instante vuelven a llegar
+            if self._hashes.get(row_id) != digest:
+                self._hashes[row_id] = digest
+                live.append(row)
+        for row_id in deleted:
+            known = self._known_id(row_id)
+            if known is not None:
+                del self._hashes[known]
+                removed.append(known)
+        self._advance(changed)
+        self._persist(live, removed)
+        return {"success": True, "data": self._delta(live, removed, normalize, DELTA, received)}
+
+    def _delta(self, changed: List[Record], deleted: List[Any], normalize,
+               mode: str, received: int) -> SyncDelta:
+        upserted = self._prepare(changed, normalize) if changed else []
+        if upserted or deleted:
+            logger.debug("Sync /%s (%s): %d cambios, %d bajas de %d filas recibidas",
+                         self.entity, mode, len(upserted), len(deleted), received)
+        return SyncDelta(mode, upserted, list(deleted), received)
+
+    def _prepare(self, rows: List[Record], normalize) -> List[Record]:
+        """Normaliza las filas para el llamador y copia el ID en "id"."""
+        if normalize is not None:
+            rows = normalize(rows)
+        for row in rows:
+            row_id = self.record_id(row)
+            if row_id is not None:
+                row["id"] = row_id
+        return rows
+
+    # =====================================================================
+    # AUXILIARES
+    # =====================================================================
+    def _confirms_delta(self, rows: List[Record]) -> bool:
+        """True si todas las filas son posteriores (o iguales) a la marca de agua."""
+        for row in rows:
+            key = parse_timestamp(row.get(self.timestamp_field))
+            if key is None or key < self._high_water_key:
+                return False
+        return True
+
+    def _mark_unsupported(self, reason: str):
+        if self.support != UNSUPPORTED:
+            logger.info("Sync incremental no disponible en /%s (%s); se compara por hash",
+                        self.entity, reason)
+        self.support = UNSUPPORTED
+
+    @staticmethod
+    def _rows_of(data: Any) -> List[Record]:
+        if isinstance(data, dict):
+            data = data.get("changed") or data.get("items") or data.get("data") or []
+        if not isinstance(data, list):
+            return [data] if isinstance(data, dict) else []
+        return [row for row in data if isinstance(row, dict)]
+
+    def _split_payload(self, data: Any) -> Tuple[List[Record], List[Any]]:
+        """Separa una respuesta delta en registros cambiados e IDs eliminados."""
+        deleted: List[Any] = []
+        if isinstance(data, dict):
+            for value in data.get("deleted") or data.get("deleted_ids") or []:
+                row_id = self.record_id(value) if isinstance(value, dict) else value
+                if row_id is not None:
+                    deleted.append(row_id)
+        return self._rows_of(data), deleted
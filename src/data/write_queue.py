@@ -0,0 +1,232 @@
+"""
+Cola persistente de escrituras hechas sin conexión (write-behind).
+
+Las altas, modificaciones y bajas que no pueden llegar al backend se
+guardan en la tabla ``outbox`` de la caché local, en orden, y se reenvían
+al recuperar la conexión (ver ``OfflineManager.replay``).
+
+Los registros creados sin conexión reciben un ID temporal negativo. Una
+modificación o baja posterior de ese registro se fusiona con el alta que
+sigue en cola, y cuando el alta se envía, ``remap`` sustituye el ID
+temporal por el real en las escrituras que quedan.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.data.local_store import LocalStore, dumps, loads
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+CONFLICT = "conflict"
+FAILED = "failed"
+
+
+def is_temp_id(value: Any) -> bool:
+    """True si ``value`` es un ID temporal asignado sin conexión."""
+    try:
+        return int(value) < 0
+    except (TypeError, ValueError):
+        return False
+
+
+def replace_ids(value: Any, mapping: Dict[int, Any], in_id: bool = False) -> Any:
+    """
+    Copia de ``value`` con los IDs temporales de ``mapping`` sustituidos.
+
+    Solo se tocan los campos cuyo nombre empieza por "id" (``id_factura``,
+    ``id_cliente``...), también dentro de objetos anidados.
+    """
+    if isinstance(value, dict):
+        return {key: replace_ids(item, mapping, str(key).lower().startswith("id"))
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [replace_ids(item, mapping, in_id) for item in value]
+    if in_id and isinstance(value, int) and not isinstance(value, bool) and value in mapping:
+        return mapping[value]
+    return value
+
+
+class QueuedWrite:
+    """
+    Escritura en cola.
+
+    Attributes:
+        seq: Orden de llegada (también define el ID temporal de las altas)
+        method: "POST", "PUT" o "DELETE"
+        entity: Entidad (ej: "clientes")
+        entity_id: ID del registro (temporal negativo en las altas)
+        payload: Cuerpo de la petición (None en las bajas)
+        base: Registro tal como se conocía al modificarlo (para detectar conflictos)
+        status: ``pending``, ``conflict`` o ``failed``
+        error: Motivo del conflicto o del error
+    """
+
+    __slots__ = ("seq", "method", "entity", "entity_id", "payload", "base",
+                 "status", "error", "created_at")
+
+    def __init__(self, seq: int, method: str, entity: str, entity_id: Any,
+                 payload: Optional[Dict], base: Optional[Dict], status: str = PENDING,
+                 error: Optional[str] = None, created_at: float = 0.0):
+        self.seq = seq
+        self.method = method
+        self.entity = entity
+        self.entity_id = entity_id
+        self.payload = payload
+        self.base = base
+        self.status = status
+        self.error = error
+        self.created_at = created_at
+
+    def __repr__(self) -> str:
+        return f"QueuedWrite(#{self.seq} {self.method} /{self.entity} id={self.entity_id} {self.status})"
+
+
+def _parse_id(value: Optional[str]) -> Any:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+class WriteQueue:
+    """
+    Escrituras pendientes guardadas en la ``LocalStore`` del usuario.
+
+    Args:
+        store: Caché local abierta
+    """
+
+    def __init__(self, store: LocalStore):
+        self.store = store
+        self._lock = threading.Lock()
+
+    # =====================================================================
+    # LECTURA
+    # =====================================================================
+    def entries(self, status: Optional[str] = PENDING, limit: Optional[int] = None) -> List[QueuedWrite]:
+        """Escrituras en orden (solo las de ``status``; None = todas)."""
+        sql = ("SELECT seq, method, entity, entity_id, payload, base, status, error, created_at "
+               "FROM outbox")
+        args: tuple = ()
+        if status is not None:
+            sql += " WHERE status = ?"
+            args = (status,)
+        sql += " ORDER BY seq"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        rows = self.store.query(sql, args)
+        return [
+            QueuedWrite(seq, method, entity, _parse_id(entity_id),
+                        loads(payload) if payload is not None else None,
+                        loads(base) if base is not None else None,
+                        row_status, error, created_at)
+            for seq, method, entity, entity_id, payload, base, row_status, error, created_at in rows
+        ]
+
+    def first(self) -> Optional[QueuedWrite]:
+        """Siguiente escritura pendiente (la más antigua)."""
+        entries = self.entries(limit=1)
+        return entries[0] if entries else None
+
+    def counts(self) -> Dict[str, int]:
+        rows = self.store.query("SELECT status, COUNT(*) FROM outbox GROUP BY status")
+        counts = {PENDING: 0, CONFLICT: 0, FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def __len__(self) -> int:
+        return self.counts()[PENDING]
+
+    # =====================================================================
+    # ESCRITURA
+    # =====================================================================
+    def enqueue(self, method: str, entity: str, entity_id: Any = None,
+                payload: Optional[Dict] = None, base: Optional[Dict] = None) -> Optional[QueuedWrite]:
+        """
+        Añade una escritura a la cola.
+
+        Args:
+            method: "POST", "PUT" o "DELETE"
+            entity: Entidad
+            entity_id: ID del registro (None en las altas)
+            payload: Cuerpo de la petición
+            base: Registro conocido antes del cambio (PUT/DELETE)
+
+        Returns:
+            La escritura en cola (el alta, si se ha fusionado con ella), o None
+            si se anula con un alta pendiente (baja de un registro no enviado)
+        """
+        method = method.upper()
+        with self._lock:
+            if method in ("PUT", "DELETE") and is_temp_id(entity_id):
+                return self._merge_into_create(method, entity, int(entity_id), payload)
+            now = time.time()
+            cursor = self.store.execute(
+                "INSERT INTO outbox (method, entity, entity_id, payload, base, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (method, entity, None if entity_id is None else str(entity_id),
+                 dumps(payload) if payload is not None else None,
+                 dumps(base) if base is not None else None, PENDING, now),
+            )
+            seq = cursor.lastrowid
+            if method == "POST":
+                # ID temporal: negativo y único en toda la cola
+                entity_id = -seq
+                self.store.execute("UPDATE outbox SET entity_id = ? WHERE seq = ?", (str(entity_id), seq))
+        logger.info("Escritura en cola sin conexión: %s /%s id=%s", method, entity, entity_id)
+        return QueuedWrite(seq, method, entity, entity_id, payload, base, PENDING, None, now)
+
+    def _merge_into_create(self, method: str, entity: str, temp_id: int,
+                           payload: Optional[Dict]) -> Optional[QueuedWrite]:
+        create = next((entry for entry in self.entries()
+                       if entry.method == "POST" and entry.entity == entity and entry.entity_id == temp_id), None)
+        if create is None:
+            logger.warning("No hay alta pendiente para el ID temporal %s de /%s", temp_id, entity)
+            return None
+        if method == "DELETE":
+            self.complete(create.seq)
+            return None
+        merged = dict(create.payload or {})
+        merged.update(payload or {})
+        self.store.execute("UPDATE outbox SET payload = ? WHERE seq = ?", (dumps(merged), create.seq))
+        create.payload = merged
+        return create
+
+    def complete(self, seq: int):
+        """Quita de la cola una escritura ya enviada (o anulada)."""
+        self.store.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+
+    def mark(self, seq: int, status: str, error: Optional[str] = None):
+        """Marca una escritura como conflicto o error (deja de reenviarse)."""
+        self.store.execute("UPDATE outbox SET status = ?, error = ? WHERE seq = ?", (status, error, seq))
+
+    def retry(self, seq: int):
+        """Vuelve a poner en cola una escritura en conflicto (el usuario la fuerza)."""
+        self.store.execute("UPDATE outbox SET status = ?, error = NULL, base = NULL WHERE seq = ?",
+                           (PENDING, seq))
+
+    def remap(self, temp_id: int, real_id: Any):
+        """Sustituye un ID temporal por el real en las escrituras pendientes."""
+        mapping = {temp_id: real_id}
+        with self._lock:
+            for entry in self.entries():
+                changed = False
+                entity_id = entry.entity_id
+                if entity_id == temp_id:
+                    entity_id, changed = real_id, True
+                payload = entry.payload
+                if payload is not None:
+                    replaced = replace_ids(payload, mapping)
+                    if replaced != payload:
+                        payload, changed = replaced, True
+                if changed:
+                    self.store.execute(
+                        "UPDATE outbox SET entity_id = ?, payload = ? WHERE seq = ?",
+                        (str(entity_id), dumps(payload) if payload is not None else None, entry.seq),
+                    )
@@ -1,5 +1,7 @@
 from matplotlib.figure import Figure
 
+from src.utils.perf import timed
+
 
 _PALETTE = [
     "#2563EB",  # azul principal
@@ -20,6 +22,7 @@ class ChartFactory:
         ax.spines["right"].set_visible(False)
 
     @staticmethod
+    @timed("chart.bar")
     def bar_chart(labels, values, title, ylabel):
         # Relación de aspecto similar a A4 apaisado para los gráficos de informes
         fig = Figure(figsize=(8.27, 4.8), dpi=110)
@@ -56,6 +59,7 @@ class ChartFactory:
         return fig
 
     @staticmethod
+    @timed("chart.pie")
     def pie_chart(labels, values, title):
         fig = Figure(figsize=(7.5, 5.5), dpi=110)
         ax = fig.add_subplot(111)
@@ -86,6 +90,7 @@ class ChartFactory:
         return fig
 
     @staticmethod
+    @timed("chart.line")
     def line_chart(labels, values, title, xlabel, ylabel):
         fig = Figure(figsize=(8.27, 4.8), dpi=110)
         ax = fig.add_subplot(111)
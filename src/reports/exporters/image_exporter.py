@@ -1,6 +1,10 @@
+from src.utils.perf import timed
+
+
 class ImageExporter:
 
     @staticmethod
+    @timed("export.png")
     def export(figure, path):
         # Exportar PNG con buena resolución manteniendo proporción A4
         figure.savefig(path, format="png", dpi=150, bbox_inches="tight")
@@ -1,5 +1,9 @@
+from src.utils.perf import timed
+
+
 class PDFExporter:
     @staticmethod
+    @timed("export.pdf")
     def export(figure, path):
         # Exportar siempre en formato vectorial PDF con márgenes ajustados
         figure.savefig(path, format="pdf", bbox_inches="tight")
@@ -13,6 +13,7 @@ import matplotlib.patches as mpatches
 from src.utils.export_helpers import DocumentExporter, create_document_base
 from src.reports.exporters.pdf_exporter import PDFExporter
 from src.reports.exporters.image_exporter import ImageExporter
+from src.utils.perf import timed
 
 
 class ReportExporter:
@@ -35,6 +36,7 @@ class ReportExporter:
         pass
     
     @staticmethod
+    @timed("export.report")
     def export_report(
         title: str,
         data: Any,
@@ -1,3 +1,14 @@
+"""
+Carga de datos de informes desde el backend
+"""
+
+import logging
+
+from src.utils.logging_config import truncated
+
+logger = logging.getLogger(__name__)
+
+
 class ReportLoader:
     """Carga datos de informes desde el backend."""
 
@@ -16,30 +27,27 @@ class ReportLoader:
             params["hasta"] = hasta
         # Petición API con fechas
         res = self.api.get("/informes/ventas-empleado", params=params)
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        logger.info(f"[REPORT_LOADER] Parámetros enviados: desde={desde}, hasta={hasta}")
-        logger.info(f"[REPORT_LOADER] Respuesta completa: {res}")
+        logger.debug("[REPORT_LOADER] Parámetros enviados: desde=%s, hasta=%s", desde, hasta)
+        logger.debug("[REPORT_LOADER] Respuesta completa: %s", truncated(res))
         
         if not res or not res.get("success"):
             error = res.get("error", "") if res else ""
-            logger.error(f"Error al obtener ventas por empleado: {error}")
+            logger.error("Error al obtener ventas por empleado: %s", error)
             return []
         
         data = res.get("data")
-        logger.info(f"[REPORT_LOADER] Data extraída: {data} (type: {type(data)})")
+        logger.debug("[REPORT_LOADER] Data extraída (type: %s): %s", type(data).__name__, truncated(data))
         
         if data is None:
             logger.warning("[REPORT_LOADER] Data es None, devolviendo lista vacía")
             return []
         
         if isinstance(data, list):
-            logger.info(f"[REPORT_LOADER] Datos recibidos: {len(data)} elementos")
+            logger.info("[REPORT_LOADER] Datos recibidos: %d elementos", len(data))
             if len(data) > 0:
-                logger.info(f"[REPORT_LOADER] Primer elemento: {data[0]}")
+                logger.debug("[REPORT_LOADER] Primer elemento: %s", truncated(data[0]))
         else:
-            logger.warning(f"[REPORT_LOADER] Data no es una lista, es: {type(data)}")
+            logger.warning("[REPORT_LOADER] Data no es una lista, es: %s", type(data))
         
         return data
 
@@ -55,12 +63,9 @@ class ReportLoader:
             params["hasta"] = hasta
         # Petición API con fechas
         res = self.api.get("/informes/presupuestos-estado", params=params)
-        import logging
-        logger = logging.getLogger(__name__)
-        
         if not res or not res.get("success"):
             error = res.get("error", "") if res else ""
-            logger.error(f"Error al obtener estado presupuestos: {error}")
+            logger.error("Error al obtener estado presupuestos: %s", error)
             return {}
         
         data = res.get("data")
@@ -72,7 +77,7 @@ class ReportLoader:
             logger.warning("[REPORT_LOADER] Backend devolvió lista vacía, esperado diccionario. Convirtiendo a {}")
             return {}
         
-        logger.info(f"[REPORT_LOADER] Datos recibidos: {data}")
+        logger.debug("[REPORT_LOADER] Datos recibidos: %s", truncated(data))
         return data
 
     # ================================================================
@@ -87,12 +92,9 @@ class ReportLoader:
             params["hasta"] = hasta
         # Petición API con fechas
         res = self.api.get("/informes/facturacion-mensual", params=params)
-        import logging
-        logger = logging.getLogger(__name__)
-        
         if not res or not res.get("success"):
             error = res.get("error", "") if res else ""
-            logger.error(f"Error al obtener facturación mensual: {error}")
+            logger.error("Error al obtener facturación mensual: %s", error)
             return {}
         
         data = res.get("data")
@@ -104,7 +106,7 @@ class ReportLoader:
             logger.warning("[REPORT_LOADER] Backend devolvió lista vacía, esperado diccionario. Convirtiendo a {}")
             return {}
         
-        logger.info(f"[REPORT_LOADER] Datos recibidos: {len(data)} meses")
+        logger.info("[REPORT_LOADER] Datos recibidos: %d meses", len(data))
         return data
 
     # ================================================================
@@ -119,19 +121,16 @@ class ReportLoader:
             params["hasta"] = hasta
         # Petición API con fechas
         res = self.api.get("/informes/ventas-producto", params=params)
-        import logging
-        logger = logging.getLogger(__name__)
-        
         if not res or not res.get("success"):
             error = res.get("error", "") if res else ""
-            logger.error(f"Error al obtener ventas por producto: {error}")
+            logger.error("Error al obtener ventas por producto: %s", error)
             return []
         
         data = res.get("data")
         if data is None:
             return []
         
-        logger.info(f"[REPORT_LOADER] Datos recibidos: {len(data) if isinstance(data, list) else 'dict'} elementos")
+        logger.info("[REPORT_LOADER] Datos recibidos: %s elementos", len(data) if isinstance(data, list) else "dict")
         return data
 
     # ================================================================
@@ -146,12 +145,9 @@ class ReportLoader:
             params["hasta"] = hasta
         # Petición API con fechas
         res = self.api.get("/informes/ratio-conversion", params=params)
-        import logging
-        logger = logging.getLogger(__name__)
-        
         if not res or not res.get("success"):
             error = res.get("error", "") if res else ""
-            logger.error(f"Error al obtener ratio conversión: {error}")
+            logger.error("Error al obtener ratio conversión: %s", error)
             return {}
         
         data = res.get("data")
@@ -163,6 +159,6 @@ class ReportLoader:
             logger.warning("[REPORT_LOADER] Backend devolvió lista vacía, esperado diccionario. Convirtiendo a {}")
             return {}
         
-        logger.info(f"[REPORT_LOADER] Datos recibidos: {data}")
+        logger.debug("[REPORT_LOADER] Datos recibidos: %s", truncated(data))
         return data
 
@@ -1,21 +1,51 @@
+import logging
 import customtkinter as ctk
 from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.api.scheduler import BACKGROUND
+from src.ui.widgets.stat_card import StatCardGrid
+from src.utils.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Tarjeta de estadística: (título, valor, color[, serie de tendencia])
+StatItem = Tuple[Any, ...]
+
+# Cada cuánto se comprueba si el dashboard vuelve a estar visible (ms)
+HIDDEN_CHECK_MS = 1000
 
 
 class DashboardBase(ctk.CTkFrame, ABC):
     """Base visual para Dashboard (título, layout, contenedores)
        Las subclases implementan:
-       - _load_stats()
+       - _fetch_stats()  -> lista de tarjetas (título, valor, color)
        - _build_quick_access(parent)
+       y definen STAT_COLUMNS y NAVIGATION_MAP (título -> método de navegación).
+
+       Las estadísticas se refrescan solas en segundo plano: el intervalo
+       (DASHBOARD_REFRESH_INTERVAL) se duplica mientras no cambia nada, hasta
+       DASHBOARD_REFRESH_MAX, y vuelve al mínimo en cuanto cambia algún valor.
+       Con la ventana minimizada u oculta no se pide nada.
     """
 
+    STAT_COLUMNS = 3
+    NAVIGATION_MAP: Dict[str, str] = {}
+
     def __init__(self, parent, api, navigation_callback=None):
         super().__init__(parent, fg_color="#23243a")
         self.api = api
         self.navigation = navigation_callback
 
+        # Tarjetas persistentes: los refrescos solo cambian sus valores
+        self.cards: Optional[StatCardGrid] = None
+        self._refresh_interval = Settings.DASHBOARD_REFRESH_INTERVAL
+        self._refresh_after: Optional[str] = None
+        self._refresh_job = None
+
         self._create_widgets()
         self._load_stats()
+        self._schedule_refresh()
 
     # ================================================================
     # Estructura general del dashboard
@@ -28,6 +58,156 @@ class DashboardBase(ctk.CTkFrame, ABC):
         self.stats_container = ctk.CTkFrame(stats_frame, fg_color="#252932")
         self.stats_container.pack(fill="both", expand=True, pady=4)
 
+    def _navigate(self, method_name):
+        """Navega a la ventana correspondiente"""
+        if not self.navigation:
+            return
+        method = getattr(self.navigation, method_name, None)
+        if method:
+            method()
+
+    def _on_card_click(self, title: str):
+        method_name = self.NAVIGATION_MAP.get(title)
+        if method_name:
+            self._navigate(method_name)
+
+    def destroy(self):
+        if self._refresh_after is not None:
+            try:
+                self.after_cancel(self._refresh_after)
+            except Exception:
+                pass
+            self._refresh_after = None
+        super().destroy()
+
+    # ================================================================
+    # Carga y refresco de estadísticas
+    # ================================================================
+    def _load_stats(self):
+        """Carga las estadísticas y pinta las tarjetas (en el hilo de la interfaz)."""
+        try:
+            items = self._fetch_stats()
+        except Exception as e:
+            logger.error(f"Error al cargar estadísticas del dashboard: {e}", exc_info=True)
+            self._show_stats_error(f"Error: {str(e)[:50]}")
+            return
+        if items is None:
+            self._show_stats_error("Error cargando estadísticas")
+            return
+        self._apply_stats(items)
+
+    def _apply_stats(self, items: List[StatItem]) -> bool:
+        """
+        Lleva a las tarjetas los valores de ``items``.
+
+        Las tarjetas existentes solo cambian su valor; se crean o quitan
+        tarjetas únicamente si cambia el conjunto (ver ``StatCardGrid``).
+
+        Returns:
+            True si algún valor ha cambiado
+        """
+        if self.cards is None:
+            for w in self.stats_container.winfo_children():
+                w.destroy()
+            self.cards = StatCardGrid(
+                self.stats_container,
+                columns=self.STAT_COLUMNS,
+                on_click=self._on_card_click if self.navigation else None,
+                clickable=list(self.NAVIGATION_MAP),
+            )
+            self.cards.pack(fill="both", expand=True, pady=8)
+        return self.cards.update_cards(items)
+
+    def _kpi_items(self) -> Tuple[List[StatItem], Optional[Dict[str, int]]]:
+        """
+        Tarjetas de indicadores con su tendencia (ver ``RESTClient.get_kpis``).
+
+        Returns:
+            (tarjetas, conteos de facturas/pagos/presupuestos que ya trae el
+            cálculo, para no volver a pedirlos); sin indicadores, ([], None)
+        """
+        result = self.api.get_kpis()
+        if not result.get("success"):
+            logger.warning("No se pudieron calcular los indicadores del dashboard: %s", result.get("error"))
+            return [], None
+        data = result["data"]
+        conversion = data.get("conversion")
+        items = [
+            ("Facturado este mes", f"€{data['revenue_month']:.2f}", "#43B64A", data["revenue_trend"]),
+            ("Pendiente de cobro", f"€{data['outstanding']:.2f}", "#FF9800", data["outstanding_trend"]),
+            ("Facturas vencidas", data["overdue"], "#ff2a2a", data["overdue_trend"]),
+            ("Conversión", f"{conversion * 100:.0f}%" if conversion is not None else "-", "#9933cc",
+             data["conversion_trend"]),
+        ]
+        return items, data.get("counts")
+
+    def _show_stats_error(self, text: str):
+        for w in self.stats_container.winfo_children():
+            w.destroy()
+        self.cards = None
+        ctk.CTkLabel(
+            self.stats_container,
+            text=text,
+            text_color="#ff2a2a"
+        ).pack()
+
+    def _schedule_refresh(self, delay: Optional[float] = None):
+        if not self._refresh_interval or not self.winfo_exists():
+            return
+        if delay is None:
+            delay = self._refresh_interval
+        self._refresh_after = self.after(int(delay * 1000), self._refresh_tick)
+
+    def _refresh_tick(self):
+        self._refresh_after = None
+        if not self.winfo_exists():
+            return
+        if not self.winfo_viewable():
+            # Minimizada u oculta: no se pide nada hasta que vuelva a verse
+            self._refresh_after = self.after(HIDDEN_CHECK_MS, self._refresh_tick)
+            return
+
+        scheduler = getattr(self.api, "scheduler", None)
+        if scheduler is not None and scheduler.ui_attached:
+            # En segundo plano (cede el paso a las cargas interactivas) y con el
+            # token de la vista: si se cambia de vista, el refresco se descarta
+            self._refresh_job = scheduler.submit(
+                lambda: self._fetch_stats(refresh=True),
+                priority=BACKGROUND,
+                token=scheduler.view_token,
+                callback=self._on_refreshed,
+                errback=self._on_refresh_error,
+            )
+            return
+        try:
+            items = self._fetch_stats(refresh=True)
+        except Exception as e:
+            self._on_refresh_error(e)
+            return
+        self._on_refreshed(items)
+
+    def _on_refreshed(self, items: Optional[List[StatItem]]):
+        self._refresh_job = None
+        if not self.winfo_exists():
+            return
+        if items is None:
+            self._on_refresh_error(None)
+            return
+        if self._apply_stats(items):
+            self._refresh_interval = Settings.DASHBOARD_REFRESH_INTERVAL
+        else:
+            self._refresh_interval = min(self._refresh_interval * 2, Settings.DASHBOARD_REFRESH_MAX)
+        self._schedule_refresh()
+
+    def _on_refresh_error(self, error: Optional[BaseException]):
+        self._refresh_job = None
+        if not self.winfo_exists():
+            return
+        # Se conservan las tarjetas actuales; se reintenta más espaciado
+        logger.warning("No se pudieron refrescar las estadísticas del dashboard: %s", error)
+        self._refresh_interval = min(self._refresh_interval * 2, Settings.DASHBOARD_REFRESH_MAX)
+        self._schedule_refresh()
+
     # ================================================================
     # Métodos abstractos
     # ================================================================
@@ -38,8 +218,16 @@ class DashboardBase(ctk.CTkFrame, ABC):
         pass
 
     @abstractmethod
-    def _load_stats(self):
-        """Carga estadísticas según rol"""
+    def _fetch_stats(self, refresh: bool = False) -> Optional[List[StatItem]]:
+        """
+        Obtiene las estadísticas según rol (puede ejecutarse fuera del hilo de la interfaz).
+
+        Args:
+            refresh: Es un refresco periódico (ignorar instantáneas en caché)
+
+        Returns:
+            Lista de tarjetas (título, valor, color), o None si falló la carga
+        """
         pass
 
     @abstractmethod
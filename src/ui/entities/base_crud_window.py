@@ -4,8 +4,14 @@ Ventana base para CRUD de entidades
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Dict, List, Optional
-
+from collections.abc import Mapping
+from typing import Callable, Dict, List, Optional
+
+from src.api.projection import fields_from_columns
+from src.data.local_store import LIST_VIEW, view_key
+from src.data.sync import EntitySync
+from src.utils.perf import span
+from src.utils.settings import Settings
 from src.widgets.data_table import DataTable
 from src.widgets.filter_panel import FilterPanel
 
@@ -13,6 +19,20 @@ from src.widgets.filter_panel import FilterPanel
 class BaseCRUDWindow(ttk.Frame):
     """Ventana base para operaciones CRUD con control de permisos."""
 
+    # Proyección del listado (ver src/api/projection.py). Sin ``list_id_field``
+    # se piden los registros completos.
+    list_id_field: Optional[str] = None
+    # Columnas calculadas en el cliente (no se piden al backend)
+    list_derived_columns: tuple = ()
+    # Campos del backend necesarios para calcular esas columnas
+    list_extra_fields: tuple = ()
+    # "Actualizar" incremental (ver src/data/sync.py) para las ventanas que
+    # cargan el listado con ``_sync_list``
+    list_sync: bool = True
+    # Claves del ID en los registros del backend, por orden de preferencia
+    ID_KEYS = ("id", "id_cliente", "id_empleado", "id_producto",
+               "id_factura", "id_Presupuesto", "id_pago")
+
     def __init__(self, parent, api, entity_name: str,
                  columns: List[Dict], filters: List[Dict] = None,
                  client_mode: bool = False):
@@ -37,6 +57,23 @@ class BaseCRUDWindow(ttk.Frame):
 
         # Data
         self.data = []
+        id_keys = (self.list_id_field, "id") if self.list_id_field else self.ID_KEYS
+        # El listado proyectado no se guarda con los registros completos de la
+        # entidad (los leen los indicadores y el modo sin conexión)
+        store_key = view_key(entity_name, LIST_VIEW) if self.list_id_field else None
+        self.sync = (EntitySync(entity_name, id_keys, store=getattr(api, "local_store", None),
+                                store_key=store_key)
+                     if self.list_sync else None)
+        # Almacén con el listado sincronizado: la única copia de los registros
+        # (la tabla lo muestra salvo cuando un filtro pone otro resultado)
+        self._synced_store = None
+        # Revisión del modo sin conexión con la que se cargó el listado
+        offline = getattr(api, "offline", None)
+        self._offline_revision = offline.revision if offline is not None else 0
+        # Sincronización en segundo plano en curso (ver ``_sync_list``)
+        self._sync_job = None
+        self._sync_again: Optional[bool] = None
+        self._pending_forget: list = []
 
         self._create_widgets()
         # self._load_data()
@@ -93,43 +130,187 @@ class BaseCRUDWindow(ttk.Frame):
     # =====================================================================
     # CARGA DE DATOS
     # =====================================================================
+    def _list_fields(self) -> Optional[List[str]]:
+        """Campos que necesita la tabla, derivados de sus columnas (None = todos)."""
+        if not self.list_id_field:
+            return None
+        extra = self.list_extra_fields
+        if self.sync is not None:
+            # La fecha de modificación hace falta para la marca de agua
+            extra = tuple(extra) + (Settings.API_SYNC_TIMESTAMP_FIELD,)
+        return fields_from_columns(self.columns, self.list_id_field,
+                                   self.list_derived_columns, extra)
+
+    def _sync_list(self, full: bool = False, on_done: Optional[Callable[[bool], None]] = None) -> bool:
+        """
+        Carga el listado de forma incremental y aplica los cambios a la tabla.
+
+        La primera llamada muestra lo guardado en la caché local (si lo hay)
+        o descarga todo; las siguientes solo piden lo modificado (ver
+        ``EntitySync``). Las filas nuevas o cambiadas pasan por
+        ``_normalize_rows`` antes de llegar a la tabla.
+
+        Con el planificador de peticiones activo (``MainWindow``), la descarga
+        se hace en segundo plano y se cancela si se cambia de vista.
+
+        Args:
+            full: Forzar una recarga completa
+            on_done: Recibe True/False al terminar (la carga puede ser asíncrona)
+
+        Returns:
+            False si la carga falló (los errores ya se han mostrado); True si
+            se cargaron los datos o la carga está en curso
+        """
+        if self._sync_job is not None:
+            # Ya hay una en curso: se repetirá al terminar
+            self._sync_again = bool(self._sync_again) or full
+            return True
+
+        if self._synced_store is None and self.sync.loaded:
+            # Sin almacén no hay dónde aplicar un delta
+            full = True
+        rows = None if full else self.sync.restore(self._normalize_timed)
+        if rows is not None:
+            # Lo guardado en la sesión anterior se muestra ya; la tabla se pinta
+            # antes de pedir los cambios al backend
+            self._synced_store = self.table.set_data(rows)
+            self.data = self.table.store
+            self.after(50, self._sync_list)
+            if on_done is not None:
+                on_done(True)
+            return True
+
+        offline = getattr(self.api, "offline", None)
+        if offline is not None:
+            if offline.active or offline.revision != self._offline_revision:
+                # Sin conexión la caché local ya incluye los cambios en cola; al
+                # reenviarlos, el backend sustituye los registros con ID temporal
+                full = True
+            self._offline_revision = offline.revision
+
+        fields = self._list_fields()
+
+        def run():
+            return self.sync.sync(
+                lambda params: self.api.get_all(self.entity_name, params=params, fields=fields,
+                                                refresh=True),
+                normalize=self._normalize_timed,
+                full=full,
+            )
+
+        scheduler = getattr(self.api, "scheduler", None)
+        if scheduler is not None and scheduler.ui_attached:
+            self._sync_job = scheduler.submit(
+                run,
+                callback=lambda result: self._apply_sync(result, on_done),
+                errback=lambda error: self._apply_sync({"success": False, "error": str(error)}, on_done),
+            )
+            return True
+        return self._apply_sync(run(), on_done)
+
+    def _apply_sync(self, result: Dict, on_done: Optional[Callable[[bool], None]] = None) -> bool:
+        """Lleva a la tabla el resultado de ``EntitySync.sync`` (en el hilo de la interfaz)."""
+        self._sync_job = None
+        if not self.winfo_exists():
+            return False
+        for entity_id in self._pending_forget:
+            self._forget_record(entity_id)
+        self._pending_forget = []
+
+        success = bool(result.get("success"))
+        if not success:
+            if not result.get("cancelled"):
+                messagebox.showerror("Error", f"Error al cargar datos: {result.get('error')}")
+        else:
+            delta = result["data"]
+            if delta.full or self._synced_store is None:
+                self._synced_store = self.table.set_data(delta.upserted)
+            elif self.table.store is not self._synced_store:
+                # La tabla muestra un resultado filtrado: se vuelve al listado
+                self._synced_store.apply_changes(delta.upserted, delta.deleted)
+                self.table.set_data(self._synced_store)
+            else:
+                self.table.apply_changes(delta.upserted, delta.deleted)
+            self.data = self.table.store
+        if on_done is not None:
+            on_done(success)
+        if self._sync_again is not None:
+            full, self._sync_again = self._sync_again, None
+            self._sync_list(full)
+        return success
+
+    def _forget_record(self, entity_id):
+        """Quita de la tabla y del listado sincronizado un registro ya eliminado."""
+        if self.sync is None:
+            return
+        if self._sync_job is not None:
+            # La sincronización en curso usa el listado: se quita al terminar
+            self._pending_forget.append(entity_id)
+            return
+        stored_id = self.sync.forget(entity_id)
+        if stored_id is None or self._synced_store is None:
+            return
+        if self.table.store is self._synced_store:
+            self.table.apply_changes([], [stored_id])
+        else:
+            self._synced_store.apply_changes([], [stored_id])
+
+    def _normalize_rows(self, rows: List[Dict]) -> List[Dict]:
+        """
+        Prepara para la tabla las filas recibidas del backend.
+
+        Las ventanas lo sobrescriben para añadir columnas calculadas
+        (nombres de cliente, importes redondeados...).
+        """
+        # Normalizar IDs: el backend Java usa id_cliente, id_empleado, etc.
+        # pero la tabla espera "id" genérico
+        for row in rows:
+            if isinstance(row, Mapping):
+                # Mapear id_cliente, id_empleado, etc. a "id" para la tabla
+                if "id_cliente" in row and "id" not in row:
+                    row["id"] = row["id_cliente"]
+                elif "id_empleado" in row and "id" not in row:
+                    row["id"] = row["id_empleado"]
+                elif "id_producto" in row and "id" not in row:
+                    row["id"] = row["id_producto"]
+                elif "id_factura" in row and "id" not in row:
+                    row["id"] = row["id_factura"]
+                elif "id_Presupuesto" in row and "id" not in row:
+                    row["id"] = row["id_Presupuesto"]
+                elif "id_pago" in row and "id" not in row:
+                    row["id"] = row["id_pago"]
+                
+                # Normalizar campos relacionados para presupuestos/facturas
+                # Si la tabla muestra cliente_id pero el backend devuelve id_cliente
+                if "id_cliente" in row and "cliente_id" not in row:
+                    row["cliente_id"] = row["id_cliente"]
+                if "id_empleado" in row and "empleado_id" not in row:
+                    row["empleado_id"] = row["id_empleado"]
+                
+                # Para presupuestos: normalizar presupuesto (el backend devuelve presupuesto, no total)
+                # Ya está correcto, solo asegurar que id_Presupuesto se normalice a id
+        return rows
+
+    def _normalize_timed(self, rows: List[Dict]) -> List[Dict]:
+        """``_normalize_rows`` cronometrado (span ``normalize.<entidad>``)."""
+        with span(f"normalize.{self.entity_name}", rows=len(rows)):
+            return self._normalize_rows(rows)
+
     def _load_data(self):
-        result = self.api.get_all(self.entity_name)
+        if self.sync is not None and not self.client_mode and not hasattr(self, "_apply_role_names"):
+            self._sync_list()
+            return
+
+        # El listado de la ventana no se sirve de la caché de referencia
+        result = self.api.get_all(self.entity_name, fields=self._list_fields(), refresh=True)
 
         if not result.get("success"):
             messagebox.showerror("Error", f"Error al cargar datos: {result.get('error')}")
             return
 
         data = result.get("data", [])
-        
-        # Normalizar IDs: el backend Java usa id_cliente, id_empleado, etc.
-        # pero la tabla espera "id" genérico
         if isinstance(data, list):
-            for row in data:
-                if isinstance(row, dict):
-                    # Mapear id_cliente, id_empleado, etc. a "id" para la tabla
-                    if "id_cliente" in row and "id" not in row:
-                        row["id"] = row["id_cliente"]
-                    elif "id_empleado" in row and "id" not in row:
-                        row["id"] = row["id_empleado"]
-                    elif "id_producto" in row and "id" not in row:
-                        row["id"] = row["id_producto"]
-                    elif "id_factura" in row and "id" not in row:
-                        row["id"] = row["id_factura"]
-                    elif "id_Presupuesto" in row and "id" not in row:
-                        row["id"] = row["id_Presupuesto"]
-                    elif "id_pago" in row and "id" not in row:
-                        row["id"] = row["id_pago"]
-                    
-                    # Normalizar campos relacionados para presupuestos/facturas
-                    # Si la tabla muestra cliente_id pero el backend devuelve id_cliente
-                    if "id_cliente" in row and "cliente_id" not in row:
-                        row["cliente_id"] = row["id_cliente"]
-                    if "id_empleado" in row and "empleado_id" not in row:
-                        row["empleado_id"] = row["id_empleado"]
-                    
-                    # Para presupuestos: normalizar presupuesto (el backend devuelve presupuesto, no total)
-                    # Ya está correcto, solo asegurar que id_Presupuesto se normalice a id
+            self._normalize_timed(data)
 
         # -------------------------------------------------------------
         # CLIENTE → Solo ve su propio registro (id == user_id)
@@ -144,7 +325,7 @@ class BaseCRUDWindow(ttk.Frame):
         if hasattr(self, "_apply_role_names"):
             self._apply_role_names()
         else:
-            self.table.set_data(self.data)
+            self.data = self.table.set_data(self.data)
 
 
     # =====================================================================
@@ -242,7 +423,7 @@ class BaseCRUDWindow(ttk.Frame):
         # Normalizar IDs igual que en _load_data para que la tabla siempre tenga columna 'id'
         if isinstance(self.data, list):
             for row in self.data:
-                if isinstance(row, dict):
+                if isinstance(row, Mapping):
                     # Mapear id_cliente, id_empleado, etc. a "id" genérico
                     if "id_cliente" in row and "id" not in row:
                         row["id"] = row["id_cliente"]
@@ -264,7 +445,7 @@ class BaseCRUDWindow(ttk.Frame):
             self._apply_role_names()
 
         # Mostrar en tabla
-        self.table.set_data(self.data)
+        self.data = self.table.set_data(self.data)
         logger.info("Datos establecidos en la tabla")
 
 
@@ -385,6 +566,7 @@ class BaseCRUDWindow(ttk.Frame):
 
         if result.get("success"):
             messagebox.showinfo("Éxito", "Registro eliminado.")
+            self._forget_record(entity_id)
             self._load_data()
         else:
             error_msg = result.get("error", "Error desconocido")
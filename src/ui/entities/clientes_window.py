@@ -4,6 +4,7 @@ Ventana de gestión de clientes
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+from collections.abc import Mapping
 from typing import Dict, Optional
 import json
 import customtkinter as ctk
@@ -241,7 +242,7 @@ class ClientesWindow(BaseCRUDWindow):
     def _load_data(self):
         """Carga los datos de clientes usando el método específico get_clientes"""
         # Usar el método específico get_clientes en lugar de get_all genérico
-        result = self.api.get_clientes()
+        result = self.api.get_clientes(refresh=True)
         
         if not result.get("success"):
             from tkinter import messagebox
@@ -258,7 +259,7 @@ class ClientesWindow(BaseCRUDWindow):
         
         # Normalizar IDs: el backend Java usa id_cliente, pero la tabla espera "id"
         for row in data:
-            if isinstance(row, dict):
+            if isinstance(row, Mapping):
                 if "id_cliente" in row and "id" not in row:
                     row["id"] = row["id_cliente"]
                 # Mantener id_cliente también para compatibilidad
@@ -273,7 +274,7 @@ class ClientesWindow(BaseCRUDWindow):
         self.data = data
         
         # Actualizar la tabla
-        self.table.set_data(self.data)
+        self.data = self.table.set_data(self.data)
     
     # =====================================================================
     # FORMULARIO: CREAR / EDITAR (MODO EMPLEADO/ADMIN)
@@ -4,6 +4,7 @@ Ventana de gestión de empleados
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+from collections.abc import Mapping
 from typing import Dict, Optional
 import logging
 
@@ -122,7 +123,7 @@ class EmpleadosWindow(BaseCRUDWindow):
             emp["rol_nombre"] = rol_nombre
 
         if hasattr(self, "table"):
-            self.table.set_data(self.data)
+            self.data = self.table.set_data(self.data)
 
     # =====================================================================
     # CAMPOS DEL FORMULARIO
@@ -470,7 +471,7 @@ class EmpleadosWindow(BaseCRUDWindow):
 
         # Normalizar IDs
         for row in filtered_data:
-            if isinstance(row, dict):
+            if isinstance(row, Mapping):
                 if "id_empleado" in row and "id" not in row:
                     row["id"] = row["id_empleado"]
 
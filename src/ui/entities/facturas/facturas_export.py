@@ -8,6 +8,7 @@ import matplotlib.pyplot as plt
 from src.utils.export_helpers import DocumentExporter, create_document_base
 from src.reports.exporters.pdf_exporter import PDFExporter
 from src.reports.exporters.image_exporter import ImageExporter
+from src.utils.perf import timed
 
 
 class FacturaExporter:
@@ -32,6 +33,7 @@ class FacturaExporter:
         """Exporta la factura a PNG."""
         self._generate_document(factura_data, path, "png")
     
+    @timed("export.factura")
     def _generate_document(self, factura_data: Dict, path: str, format: str):
         """Genera un documento PDF o PNG con los datos de la factura."""
         factura_id = factura_data.get("id_factura") or factura_data.get("id")
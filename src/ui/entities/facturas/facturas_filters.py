@@ -3,6 +3,7 @@ Módulo de filtrado de facturas.
 Maneja la lógica de filtrado local por nombre de cliente.
 """
 
+from collections.abc import Mapping
 from typing import Dict, List, Optional
 import logging
 
@@ -20,7 +21,7 @@ def normalize_factura_data(factura: Dict, clientes: List[Dict]) -> Dict:
     Returns:
         Diccionario con factura normalizada
     """
-    if not isinstance(factura, dict):
+    if not isinstance(factura, Mapping):
         return factura
     
     # Normalizar ID de factura
@@ -86,7 +87,7 @@ def filter_facturas_by_cliente(
     # Aplicar filtros
     filtered_data = []
     for row in normalized_facturas:
-        if not isinstance(row, dict):
+        if not isinstance(row, Mapping):
             continue
         
         # Filtro por nombre de cliente
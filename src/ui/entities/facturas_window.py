@@ -4,11 +4,14 @@ Ventana de gestión de facturas
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+from collections.abc import Mapping
 from typing import Dict, Optional
 from datetime import datetime
 
 from src.ui.entities.base_crud_window import BaseCRUDWindow
 from src.widgets.validated_entry import ValidatedEntry
+from src.widgets.search_picker import SearchPicker
+from src.data.search_index import SearchIndex, cliente_label
 from src.ui.entities.facturas.facturas_export import FacturaExporter
 from src.ui.entities.facturas.facturas_filters import filter_facturas_by_cliente, normalize_factura_data
 from src.ui.entities.facturas.facturas_pagos import FacturaPagoHandler
@@ -17,6 +20,13 @@ from src.ui.entities.facturas.facturas_pagos import FacturaPagoHandler
 class FacturasWindow(BaseCRUDWindow):
     """Ventana para gestionar facturas"""
 
+    # Listado proyectado: de las relaciones solo hacen falta los IDs
+    list_id_field = "id_factura"
+    list_derived_columns = ("cliente_nombre", "empleado_nombre")
+    # La fecha puede llegar como fecha_emision (ver ``_normalize_rows``)
+    list_extra_fields = ("fecha_emision", "num_factura", "notas", "cliente_pagador.id_cliente", "id_cliente",
+                         "empleado.id_empleado", "id_empleado")
+
     def __init__(self, parent, api, client_mode: bool = False):
 
         columns = [
@@ -36,6 +46,8 @@ class FacturasWindow(BaseCRUDWindow):
 
         self.clientes = []
         self.empleados = []
+        # Índice de búsqueda para el selector de cliente del formulario
+        self.index_clientes = SearchIndex(label=cliente_label)
         
         # Inicializar handler de pagos
         self.pago_handler = FacturaPagoHandler(api, self)
@@ -58,14 +70,16 @@ class FacturasWindow(BaseCRUDWindow):
     # =====================================================================
     # DATOS RELACIONADOS
     # =====================================================================
-    def _load_my_facturas(self):
+    def _load_my_facturas(self, refresh: bool = False):
         # Cargar clientes y empleados para normalizar datos
         if not self.clientes or not self.empleados:
             self._load_related()
         
-        res = self.api.get_my_facturas()
+        # Facturas del cliente desde la instantánea compartida con el dashboard
+        res = self.api.get_client_snapshot(refresh=refresh)
         if res.get("success"):
-            data = res.get("data", [])
+            # Copias: la normalización no debe modificar la instantánea en caché
+            data = [dict(f) for f in (res.get("data") or {}).get("facturas", []) if isinstance(f, dict)]
             
             # Normalizar datos usando el módulo de filtros
             if isinstance(data, list):
@@ -73,7 +87,7 @@ class FacturasWindow(BaseCRUDWindow):
                 
                 # Agregar nombre del empleado
                 for row in data:
-                    if isinstance(row, dict):
+                    if isinstance(row, Mapping):
                         empleado_id = row.get("empleado_id")
                         if empleado_id:
                             empleado = next(
@@ -102,7 +116,7 @@ class FacturasWindow(BaseCRUDWindow):
                                 pass
             
             self.data = data
-            self.table.set_data(self.data)
+            self.data = self.table.set_data(self.data)
 
     def _load_related(self):
         res_c = self.api.get_clientes()
@@ -113,6 +127,7 @@ class FacturasWindow(BaseCRUDWindow):
                 if isinstance(c, dict) and "id_cliente" in c and "id" not in c:
                     c["id"] = c["id_cliente"]
             self.clientes = clientes_data
+            self.index_clientes = SearchIndex(clientes_data, cliente_label)
 
         res_e = self.api.get_all("empleados")
         if res_e.get("success"):
@@ -127,71 +142,65 @@ class FacturasWindow(BaseCRUDWindow):
         """Carga datos de facturas"""
         # En modo cliente, cargar solo las facturas del cliente
         if self.client_mode:
-            self._load_my_facturas()
-            return
-        
-        result = self.api.get_all("facturas")
-        
-        if not result.get("success"):
-            messagebox.showerror("Error", f"Error al cargar datos: {result.get('error')}")
+            self._load_my_facturas(refresh=True)
             return
         
-        data = result.get("data", [])
-        
+        # Incremental: tras la primera carga solo llegan las facturas modificadas
+        self._sync_list()
+
+    def _normalize_rows(self, rows):
+        """Añade cliente, empleado y estado actualizado a las facturas recibidas."""
         # Normalizar datos usando el módulo de filtros
-        if isinstance(data, list):
-            data = [normalize_factura_data(row, self.clientes) for row in data]
-            
-            # Agregar nombre del empleado (no está en normalize_factura_data)
-            for row in data:
-                if isinstance(row, dict):
-                    empleado_id = row.get("empleado_id")
-                    if empleado_id:
-                        empleado = next(
-                            (e for e in self.empleados if e.get("id") == empleado_id or e.get("id_empleado") == empleado_id),
-                            None
-                        )
-                        if empleado:
-                            nombre = empleado.get("nombre", "")
-                            apellidos = empleado.get("apellidos", "")
-                            row["empleado_nombre"] = f"{nombre} {apellidos}".strip() or "N/A"
-                        else:
-                            row["empleado_nombre"] = f"ID {empleado_id}"
-                    else:
-                        row["empleado_nombre"] = "N/A"
-                    
-                    # Asegurar que fecha esté presente
-                    if "fecha" not in row or not row.get("fecha"):
-                        row["fecha"] = None
-                    
-                    # Redondear total a 2 decimales
-                    if "total" in row and row.get("total") is not None:
-                        try:
-                            total_value = float(row["total"])
-                            row["total"] = round(total_value, 2)
-                        except (ValueError, TypeError):
-                            pass  # Mantener el valor original si no es numérico
-                    
-                    # Actualizar estado automáticamente: PENDIENTE -> EMITIDA cuando llega la fecha
-                    estado_actual = row.get("estado", "").strip().upper()
-                    fecha_str = row.get("fecha")
-                    
-                    if estado_actual == "PENDIENTE" and fecha_str:
-                        try:
-                            fecha_factura = datetime.strptime(fecha_str, "%Y-%m-%d").date()
-                            hoy = datetime.now().date()
-                            if fecha_factura <= hoy:
-                                # Actualizar en el backend
-                                factura_id = row.get("id") or row.get("id_factura")
-                                if factura_id:
-                                    update_data = {"estado": "EMITIDA"}
-                                    self.api.update("facturas", factura_id, update_data)
-                                    row["estado"] = "EMITIDA"
-                        except (ValueError, TypeError):
-                            pass  # Ignorar errores de formato de fecha
+        data = [normalize_factura_data(row, self.clientes) for row in rows]
         
-        self.data = data
-        self.table.set_data(self.data)
+        # Agregar nombre del empleado (no está en normalize_factura_data)
+        for row in data:
+            if isinstance(row, Mapping):
+                empleado_id = row.get("empleado_id")
+                if empleado_id:
+                    empleado = next(
+                        (e for e in self.empleados if e.get("id") == empleado_id or e.get("id_empleado") == empleado_id),
+                        None
+                    )
+                    if empleado:
+                        nombre = empleado.get("nombre", "")
+                        apellidos = empleado.get("apellidos", "")
+                        row["empleado_nombre"] = f"{nombre} {apellidos}".strip() or "N/A"
+                    else:
+                        row["empleado_nombre"] = f"ID {empleado_id}"
+                else:
+                    row["empleado_nombre"] = "N/A"
+                
+                # Asegurar que fecha esté presente
+                if "fecha" not in row or not row.get("fecha"):
+                    row["fecha"] = None
+                
+                # Redondear total a 2 decimales
+                if "total" in row and row.get("total") is not None:
+                    try:
+                        total_value = float(row["total"])
+                        row["total"] = round(total_value, 2)
+                    except (ValueError, TypeError):
+                        pass  # Mantener el valor original si no es numérico
+                
+                # Actualizar estado automáticamente: PENDIENTE -> EMITIDA cuando llega la fecha
+                estado_actual = row.get("estado", "").strip().upper()
+                fecha_str = row.get("fecha")
+                
+                if estado_actual == "PENDIENTE" and fecha_str:
+                    try:
+                        fecha_factura = datetime.strptime(fecha_str, "%Y-%m-%d").date()
+                        hoy = datetime.now().date()
+                        if fecha_factura <= hoy:
+                            # Actualizar en el backend
+                            factura_id = row.get("id") or row.get("id_factura")
+                            if factura_id:
+                                update_data = {"estado": "EMITIDA"}
+                                self.api.update("facturas", factura_id, update_data)
+                                row["estado"] = "EMITIDA"
+                    except (ValueError, TypeError):
+                        pass  # Ignorar errores de formato de fecha
+        return data
 
     # =====================================================================
     # FILTRADO
@@ -210,7 +219,7 @@ class FacturasWindow(BaseCRUDWindow):
             return
         
         # Cargar todos los datos primero
-        result = self.api.get_all("facturas")
+        result = self.api.get_all("facturas", fields=self._list_fields())
         
         if not result.get("success"):
             logger.error(f"Error al cargar facturas: {result.get('error')}")
@@ -223,7 +232,7 @@ class FacturasWindow(BaseCRUDWindow):
         
         # Agregar nombre del empleado (no está en normalize_factura_data)
         for row in filtered_data:
-            if isinstance(row, dict):
+            if isinstance(row, Mapping):
                 empleado_id = row.get("empleado_id")
                 if empleado_id:
                     empleado = next(
@@ -254,7 +263,7 @@ class FacturasWindow(BaseCRUDWindow):
         logger.info(f"Datos filtrados: {len(filtered_data)} de {len(data)}")
         
         self.data = filtered_data
-        self.table.set_data(self.data)
+        self.data = self.table.set_data(self.data)
 
     # =====================================================================
     # FORMULARIO CAMPOS
@@ -383,22 +392,15 @@ class FacturasWindow(BaseCRUDWindow):
             if f["type"] == "select":
 
                 if f["name"] == "cliente_id":
-                    opts = []
-                    for c in self.clientes:
-                        # Usar id normalizado (puede ser id o id_cliente)
-                        cliente_id = c.get("id") or c.get("id_cliente")
-                        nombre = c.get("nombre", "")
-                        apellidos = c.get("apellidos", "")
-                        razon_social = c.get("razon_social", "")
-                        if razon_social:
-                            display_name = razon_social
-                        elif apellidos:
-                            display_name = f"{nombre} {apellidos}".strip()
-                        else:
-                            display_name = nombre or "N/A"
-                        opts.append(f"{cliente_id} - {display_name}")
-
-                elif f["name"] == "empleado_id":
+                    # Selector con búsqueda: puede haber miles de clientes
+                    picker = SearchPicker(main, index=self.index_clientes, width=30)
+                    picker.grid(row=i, column=1, padx=5, pady=4, sticky="ew")
+                    fields[f["name"]] = picker
+                    if item and item.get("cliente_id") is not None:
+                        picker.set_id(item["cliente_id"])
+                    continue
+
+                if f["name"] == "empleado_id":
                     opts = []
                     for e in self.empleados:
                         # Usar id normalizado (puede ser id o id_empleado)
@@ -423,8 +425,8 @@ class FacturasWindow(BaseCRUDWindow):
                 if item and item.get(f["name"]) is not None:
                     saved_value = item.get(f["name"])
                     
-                    # Para cliente_id y empleado_id, buscar por ID
-                    if f["name"] in ("cliente_id", "empleado_id"):
+                    # Para empleado_id, buscar por ID
+                    if f["name"] == "empleado_id":
                         import logging
                         logger = logging.getLogger(__name__)
                         logger.info(f"Precargando {f['name']}: saved_value={saved_value}, opts count={len(opts)}")
@@ -551,8 +553,14 @@ class FacturasWindow(BaseCRUDWindow):
 
             for name, widget in fields.items():
 
+                # Selector de cliente (guarda el ID directamente)
+                if isinstance(widget, SearchPicker):
+                    if widget.get_id() is not None:
+                        # El backend espera "id_cliente" en lugar de "cliente_id"
+                        data["id_cliente"] = int(widget.get_id())
+
                 # ValidatedEntry
-                if isinstance(widget, ValidatedEntry):
+                elif isinstance(widget, ValidatedEntry):
                     if not widget.validate_input():
                         messagebox.showerror("Error", f"El campo '{name}' no es válido")
                         return
@@ -572,10 +580,7 @@ class FacturasWindow(BaseCRUDWindow):
                 else:
                     value = widget.get()
                     if value != "":
-                        if name == "cliente_id":
-                            # El backend espera "id_cliente" en lugar de "cliente_id"
-                            data["id_cliente"] = int(value.split(" - ")[0])
-                        elif name == "empleado_id":
+                        if name == "empleado_id":
                             # El backend espera "id_empleado" en lugar de "empleado_id"
                             data["id_empleado"] = int(value.split(" - ")[0])
                         else:
@@ -733,5 +738,10 @@ class FacturasWindow(BaseCRUDWindow):
         # Abrir ventana modal usando el módulo de pagos
         self.pago_handler.abrir_ventana_pago(
             factura_id, cliente_id, cliente_nombre, num_factura, total, fecha, estado,
-            on_success_callback=self._load_data
+            on_success_callback=self._on_factura_pagada
         )
+
+    def _on_factura_pagada(self):
+        self._load_data()
+        # Lo habitual después es ir a Pagos: se precarga mientras tanto
+        self.api.prefetch.hint("Mis Pagos" if self.client_mode else "Pagos")
@@ -8,6 +8,7 @@ import matplotlib.pyplot as plt
 from src.utils.export_helpers import DocumentExporter, create_document_base
 from src.reports.exporters.pdf_exporter import PDFExporter
 from src.reports.exporters.image_exporter import ImageExporter
+from src.utils.perf import timed
 
 
 class PagoExporter:
@@ -32,6 +33,7 @@ class PagoExporter:
         """Exporta el pago a PNG."""
         self._generate_document(pago_data, path, "png")
     
+    @timed("export.pago")
     def _generate_document(self, pago_data: Dict, path: str, format: str):
         """Genera un documento PDF o PNG con los datos del pago."""
         pago_id = pago_data.get("id_pago") or pago_data.get("id")
@@ -3,6 +3,7 @@ Módulo de filtrado de pagos.
 Maneja la lógica de filtrado local por nombre de cliente.
 """
 
+from collections.abc import Mapping
 from typing import Dict, List, Optional
 import logging
 
@@ -21,7 +22,7 @@ def normalize_pago_data(pago: Dict, clientes: List[Dict], facturas: List[Dict])
     Returns:
         Diccionario con pago normalizado
     """
-    if not isinstance(pago, dict):
+    if not isinstance(pago, Mapping):
         return pago
     
     # Normalizar ID de pago
@@ -94,7 +95,7 @@ def filter_pagos_by_cliente(
     # Aplicar filtros
     filtered_data = []
     for row in normalized_pagos:
-        if not isinstance(row, dict):
+        if not isinstance(row, Mapping):
             continue
         
         # Filtro por nombre de cliente
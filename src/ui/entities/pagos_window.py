@@ -4,10 +4,13 @@ Ventana de gestión de pagos
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+from collections.abc import Mapping
 from typing import Dict, Optional
 
 from src.ui.entities.base_crud_window import BaseCRUDWindow
 from src.widgets.validated_entry import ValidatedEntry
+from src.widgets.search_picker import SearchPicker
+from src.data.search_index import SearchIndex, cliente_label, factura_label
 from src.ui.entities.pagos.pagos_export import PagoExporter
 from src.ui.entities.pagos.pagos_filters import filter_pagos_by_cliente, normalize_pago_data
 
@@ -15,6 +18,15 @@ from src.ui.entities.pagos.pagos_filters import filter_pagos_by_cliente, normali
 class PagosWindow(BaseCRUDWindow):
     """Ventana para gestionar pagos"""
 
+    # Listado proyectado: de las relaciones solo hacen falta los IDs
+    list_id_field = "id_pago"
+    list_derived_columns = ("cliente_nombre", "factura_id")
+    list_extra_fields = ("fecha_pago", "factura.id_factura", "id_factura",
+                         "cliente.id_cliente", "cliente_pagador.id_cliente", "id_cliente")
+    # Facturas para resolver y elegir la factura de cada pago
+    FACTURA_FIELDS = ("id_factura", "num_factura", "fecha", "fecha_emision", "total", "estado",
+                      "notas", "cliente_pagador.id_cliente", "id_cliente")
+
     def __init__(self, parent, api, client_mode: bool = False):
 
         columns = [
@@ -35,6 +47,9 @@ class PagosWindow(BaseCRUDWindow):
 
         self.facturas = []
         self.clientes = []
+        # Índices de búsqueda para los selectores del formulario
+        self.index_facturas = SearchIndex(label=factura_label)
+        self.index_clientes = SearchIndex(label=cliente_label)
 
         if client_mode:
             self._load_my_pagos()
@@ -50,14 +65,22 @@ class PagosWindow(BaseCRUDWindow):
     # =====================================================================
     # DATOS RELACIONADOS
     # =====================================================================
-    def _load_my_pagos(self):
-        # Cargar clientes y facturas para normalizar datos
-        if not self.clientes or not self.facturas:
-            self._load_related()
-        
-        res = self.api.get_my_pagos()
+    def _load_my_pagos(self, refresh: bool = False):
+        # Facturas y pagos del cliente desde la instantánea compartida con el dashboard
+        res = self.api.get_client_snapshot(refresh=refresh)
         if res.get("success"):
-            data = res.get("data", [])
+            snapshot = res.get("data") or {}
+            # Solo hacen falta las facturas del cliente para normalizar sus pagos
+            self.facturas = [dict(f) for f in snapshot.get("facturas", []) if isinstance(f, dict)]
+            for f in self.facturas:
+                if "id_factura" in f and "id" not in f:
+                    f["id"] = f["id_factura"]
+            self.index_facturas = SearchIndex(self.facturas, factura_label)
+            if not self.clientes:
+                self._load_clientes()
+            
+            # Copias: la normalización no debe modificar la instantánea en caché
+            data = [dict(p) for p in snapshot.get("pagos", []) if isinstance(p, dict)]
             
             # Normalizar datos usando el módulo de filtros
             if isinstance(data, list):
@@ -65,7 +88,7 @@ class PagosWindow(BaseCRUDWindow):
                 
                 # Asegurar que fecha esté presente y redondear importe
                 for row in data:
-                    if isinstance(row, dict):
+                    if isinstance(row, Mapping):
                         if "fecha" not in row or not row.get("fecha"):
                             row["fecha"] = row.get("fecha_pago") or None
                         
@@ -78,10 +101,10 @@ class PagosWindow(BaseCRUDWindow):
                                 pass
             
             self.data = data
-            self.table.set_data(self.data)
+            self.data = self.table.set_data(self.data)
 
     def _load_related(self):
-        res_f = self.api.get_all("facturas")
+        res_f = self.api.get_all("facturas", fields=self.FACTURA_FIELDS)
         if res_f.get("success"):
             facturas_data = res_f.get("data", [])
             # Normalizar IDs
@@ -89,7 +112,11 @@ class PagosWindow(BaseCRUDWindow):
                 if isinstance(f, dict) and "id_factura" in f and "id" not in f:
                     f["id"] = f["id_factura"]
             self.facturas = facturas_data
+            self.index_facturas = SearchIndex(facturas_data, factura_label)
+
+        self._load_clientes()
 
+    def _load_clientes(self):
         res_c = self.api.get_clientes()
         if res_c.get("success"):
             clientes_data = res_c.get("data", [])
@@ -98,42 +125,37 @@ class PagosWindow(BaseCRUDWindow):
                 if isinstance(c, dict) and "id_cliente" in c and "id" not in c:
                     c["id"] = c["id_cliente"]
             self.clientes = clientes_data
+            self.index_clientes = SearchIndex(clientes_data, cliente_label)
     
     def _load_data(self):
         """Carga datos de pagos"""
         # En modo cliente, cargar solo los pagos del cliente
         if self.client_mode:
-            self._load_my_pagos()
-            return
-        
-        result = self.api.get_all("pagos")
-        
-        if not result.get("success"):
-            messagebox.showerror("Error", f"Error al cargar datos: {result.get('error')}")
+            self._load_my_pagos(refresh=True)
             return
         
-        data = result.get("data", [])
-        
+        # Incremental: tras la primera carga solo llegan los pagos modificados
+        self._sync_list()
+
+    def _normalize_rows(self, rows):
+        """Añade cliente, factura y fecha a los pagos recibidos."""
         # Normalizar datos usando el módulo de filtros
-        if isinstance(data, list):
-            data = [normalize_pago_data(row, self.clientes, self.facturas) for row in data]
-            
-            # Asegurar que fecha esté presente y redondear importe
-            for row in data:
-                if isinstance(row, dict):
-                    if "fecha" not in row or not row.get("fecha"):
-                        row["fecha"] = row.get("fecha_pago") or None
-                    
-                    # Redondear importe a 2 decimales
-                    if "importe" in row and row.get("importe") is not None:
-                        try:
-                            importe_value = float(row["importe"])
-                            row["importe"] = round(importe_value, 2)
-                        except (ValueError, TypeError):
-                            pass  # Mantener el valor original si no es numérico
+        data = [normalize_pago_data(row, self.clientes, self.facturas) for row in rows]
         
-        self.data = data
-        self.table.set_data(self.data)
+        # Asegurar que fecha esté presente y redondear importe
+        for row in data:
+            if isinstance(row, Mapping):
+                if "fecha" not in row or not row.get("fecha"):
+                    row["fecha"] = row.get("fecha_pago") or None
+                
+                # Redondear importe a 2 decimales
+                if "importe" in row and row.get("importe") is not None:
+                    try:
+                        importe_value = float(row["importe"])
+                        row["importe"] = round(importe_value, 2)
+                    except (ValueError, TypeError):
+                        pass  # Mantener el valor original si no es numérico
+        return data
 
     # =====================================================================
     # FILTRADO
@@ -152,7 +174,7 @@ class PagosWindow(BaseCRUDWindow):
             return
         
         # Cargar todos los datos primero
-        result = self.api.get_all("pagos")
+        result = self.api.get_all("pagos", fields=self._list_fields())
         
         if not result.get("success"):
             logger.error(f"Error al cargar pagos: {result.get('error')}")
@@ -165,7 +187,7 @@ class PagosWindow(BaseCRUDWindow):
         
         # Asegurar que fecha esté presente y redondear importe
         for row in filtered_data:
-            if isinstance(row, dict):
+            if isinstance(row, Mapping):
                 if "fecha" not in row or not row.get("fecha"):
                     row["fecha"] = row.get("fecha_pago") or None
                 
@@ -180,7 +202,7 @@ class PagosWindow(BaseCRUDWindow):
         logger.info(f"Datos filtrados: {len(filtered_data)} de {len(data)}")
         
         self.data = filtered_data
-        self.table.set_data(self.data)
+        self.data = self.table.set_data(self.data)
 
     # =====================================================================
     # CAMPOS DEL FORMULARIO
@@ -289,30 +311,18 @@ class PagosWindow(BaseCRUDWindow):
             # ------------------ SELECTS ------------------
             if f["type"] == "select":
 
-                # Factura
-                if f["name"] == "factura_id":
-                    opts = [
-                        f"{fa.get('id')} - Total: €{fa.get('total', 0):.2f}"
-                        for fa in self.facturas
-                    ]
-
-                # Cliente
-                elif f["name"] == "cliente_id":
-                    opts = []
-                    for c in self.clientes:
-                        nombre = c.get("nombre", "")
-                        apellidos = c.get("apellidos", "")
-                        razon_social = c.get("razon_social", "")
-                        if razon_social:
-                            display_name = razon_social
-                        elif apellidos:
-                            display_name = f"{nombre} {apellidos}".strip()
-                        else:
-                            display_name = nombre or "N/A"
-                        opts.append(f"{c.get('id')} - {display_name}")
+                # Factura y cliente: selector con búsqueda sobre el índice local
+                if f["name"] in ("factura_id", "cliente_id"):
+                    index = self.index_facturas if f["name"] == "factura_id" else self.index_clientes
+                    picker = SearchPicker(main, index=index, width=30)
+                    picker.grid(row=i, column=1, sticky="ew", padx=5, pady=4)
+                    fields[f["name"]] = picker
+                    if item and item.get(f["name"]) is not None:
+                        picker.set_id(item[f["name"]])
+                    continue
 
                 # Método
-                elif f["name"] == "metodo_pago":
+                if f["name"] == "metodo_pago":
                     # Valores permitidos por el backend: TRANSFERENCIA, TARJETA, EFECTIVO
                     opts = ["TRANSFERENCIA", "TARJETA", "EFECTIVO"]
 
@@ -332,43 +342,18 @@ class PagosWindow(BaseCRUDWindow):
                 if item and item.get(f["name"]) is not None:
                     saved_value = item.get(f["name"])
                     
-                    # Para factura_id y cliente_id, buscar por ID
-                    if f["name"] in ("factura_id", "cliente_id"):
-                        try:
-                            saved_id_int = int(saved_value)
-                        except (ValueError, TypeError):
-                            saved_id_int = None
-                        
-                        found = False
-                        for op in opts:
-                            op_id_str = op.split(" - ")[0]
-                            try:
-                                op_id_int = int(op_id_str)
-                                if op_id_int == saved_id_int:
-                                    combo.set(op)
-                                    found = True
-                                    break
-                            except (ValueError, TypeError):
-                                if op_id_str == str(saved_value):
-                                    combo.set(op)
-                                    found = True
-                                    break
-                        
-                        if not found:
-                            combo.set(str(saved_value))
-                    else:
-                        # Para método_pago y estado, buscar por valor (case-insensitive)
-                        saved_str = str(saved_value).lower().strip()
-                        found = False
-                        for op in opts:
-                            if op.lower() == saved_str:
-                                combo.set(op)
-                                found = True
-                                break
-                        
-                        if not found:
-                            # Intentar con el valor tal cual
-                            combo.set(str(saved_value))
+                    # Para método_pago y estado, buscar por valor (case-insensitive)
+                    saved_str = str(saved_value).lower().strip()
+                    found = False
+                    for op in opts:
+                        if op.lower() == saved_str:
+                            combo.set(op)
+                            found = True
+                            break
+
+                    if not found:
+                        # Intentar con el valor tal cual
+                        combo.set(str(saved_value))
 
             # ------------------ DATE ------------------
             elif f["type"] == "date":
@@ -429,8 +414,13 @@ class PagosWindow(BaseCRUDWindow):
 
             for name, widget in fields.items():
 
+                # Selectores de factura/cliente (guardan el ID directamente)
+                if isinstance(widget, SearchPicker):
+                    if widget.get_id() is not None:
+                        data[name] = int(widget.get_id())
+
                 # ValidatedEntry
-                if isinstance(widget, ValidatedEntry):
+                elif isinstance(widget, ValidatedEntry):
                     if not widget.validate_input():
                         messagebox.showerror("Error", f"El campo '{name}' no es válido")
                         return
@@ -450,10 +440,7 @@ class PagosWindow(BaseCRUDWindow):
                 else:
                     value = widget.get()
                     if value != "":
-                        if name in ("factura_id", "cliente_id"):
-                            data[name] = int(value.split(" - ")[0])
-                        else:
-                            data[name] = value
+                        data[name] = value
 
             # Guardar
             if item:
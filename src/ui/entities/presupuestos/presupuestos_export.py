@@ -8,6 +8,7 @@ import matplotlib.pyplot as plt
 from src.utils.export_helpers import DocumentExporter, create_document_base
 from src.reports.exporters.pdf_exporter import PDFExporter
 from src.reports.exporters.image_exporter import ImageExporter
+from src.utils.perf import timed
 
 
 class PresupuestoExporter:
@@ -34,6 +35,7 @@ class PresupuestoExporter:
         """Exporta el presupuesto a PNG."""
         self._generate_document(presupuesto_data, path, "png")
     
+    @timed("export.presupuesto")
     def _generate_document(self, presupuesto_data: Dict, path: str, format: str):
         """Genera un documento PDF o PNG con los datos del presupuesto."""
         # Obtener datos completos del presupuesto
@@ -182,6 +182,12 @@ class PresupuestoFacturacion:
             
             if res.get("success"):
                 facturas = res.get("data", [])
+                if not isinstance(facturas, list):
+                    facturas = [facturas] if isinstance(facturas, dict) else []
+                # Mantener el índice presupuesto -> facturas sin volver a descargar
+                index = getattr(self.api, "presupuesto_facturas", None)
+                if index is not None:
+                    index.add(presupuesto_id, facturas)
                 
                 # Construir mensaje de éxito
                 mensaje = f"Se generaron {len(facturas)} facturas correctamente:\n\n"
@@ -214,22 +220,12 @@ class PresupuestoFacturacion:
             True si el presupuesto ya tiene facturas, False en caso contrario
         """
         try:
-            # Obtener todas las facturas
-            result = self.api.get_all("facturas")
+            # Antes de facturar se pregunta siempre al backend: un "no" del
+            # índice en memoria puede no conocer facturas de otro usuario
+            result = self.api.get_facturas_presupuesto(presupuesto_id, refresh=True)
             if not result.get("success"):
                 return False
-            
-            facturas = result.get("data", [])
-            if not isinstance(facturas, list):
-                return False
-            
-            # Buscar facturas que mencionen este presupuesto en las notas
-            for factura in facturas:
-                notas = factura.get("notas", "")
-                if isinstance(notas, str) and f"presupuesto #{presupuesto_id}" in notas.lower():
-                    return True
-            
-            return False
+            return bool(result.get("data"))
         except Exception:
             # En caso de error, permitir intentar (el backend también validará)
             return False
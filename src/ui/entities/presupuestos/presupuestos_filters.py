@@ -3,6 +3,7 @@ Módulo de filtrado de presupuestos.
 Maneja la lógica de filtrado local por nombre de cliente.
 """
 
+from collections.abc import Mapping
 from typing import Dict, List, Optional
 import logging
 
@@ -10,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 
 def normalize_presupuesto_data(presupuesto: Dict, clientes: List[Dict], normalize_estado_func=None) -> Dict:
-    if not isinstance(presupuesto, dict):
+    if not isinstance(presupuesto, Mapping):
         return presupuesto
     
     if "id_Presupuesto" in presupuesto and "id" not in presupuesto:
@@ -60,7 +61,7 @@ def filter_presupuestos_by_cliente(
     
     normalized_presupuestos = []
     for presupuesto in presupuestos:
-        if not isinstance(presupuesto, dict):
+        if not isinstance(presupuesto, Mapping):
             continue
         
         normalized = normalize_presupuesto_data(presupuesto.copy(), clientes)
@@ -91,7 +92,7 @@ def filter_presupuestos_by_cliente(
     # Aplicar filtros
     filtered_data = []
     for row in normalized_presupuestos:
-        if not isinstance(row, dict):
+        if not isinstance(row, Mapping):
             continue
         
         # Filtro por nombre
@@ -10,6 +10,9 @@ from datetime import datetime
 
 from src.ui.entities.base_crud_window import BaseCRUDWindow
 from src.widgets.validated_entry import ValidatedEntry
+from src.widgets.search_picker import SearchPicker
+from src.data.search_index import SearchIndex, cliente_label, producto_label
+from src.data.repository import RecordSet
 from src.ui.entities.presupuestos.presupuestos_export import PresupuestoExporter
 from src.ui.entities.presupuestos.presupuestos_filters import filter_presupuestos_by_cliente, normalize_presupuesto_data
 from src.ui.entities.presupuestos.presupuestos_facturacion import PresupuestoFacturacion
@@ -19,6 +22,12 @@ from src.ui.entities.cliente_form import abrir_formulario_cliente
 class PresupuestosWindow(BaseCRUDWindow):
     """Gestión de presupuestos."""
 
+    # Listado proyectado: el nombre del cliente se resuelve en local y el
+    # presupuesto completo se pide con get_by_id al editar, exportar o facturar
+    list_id_field = "id_Presupuesto"
+    list_derived_columns = ("cliente_nombre",)
+    list_extra_fields = ("id_cliente_pagador",)
+
     def __init__(self, parent, api, client_mode: bool = False):
         # Columnas según documentación del backend
         # El backend devuelve: id_Presupuesto, presupuesto, estado, fecha_apertura, fecha_cierre
@@ -44,12 +53,18 @@ class PresupuestosWindow(BaseCRUDWindow):
         # Instancia del módulo de facturación
         self.facturacion = PresupuestoFacturacion(api, self)
 
-        # Relaciones
-        self.clientes = []
+        # Relaciones (los clientes creados desde el formulario se integran con upsert)
+        self.clientes_set = RecordSet(("id_cliente", "id"))
+        self.clientes_set.subscribe(self._on_cliente_upsert)
+        self.clientes = self.clientes_set.records
         self.clientes_persona = []  # Solo personas para beneficiario
         self.clientes_empresa_persona = []  # Empresas y personas para pagador
         self.empleados = []
         self.productos = []
+        # Índices de búsqueda para los selectores del formulario
+        self.index_clientes = SearchIndex(label=cliente_label)
+        self.index_clientes_persona = SearchIndex(label=cliente_label)
+        self.index_productos = SearchIndex(label=producto_label)
         
         if client_mode:
             # En modo cliente, cargar solo los presupuestos del cliente
@@ -97,16 +112,13 @@ class PresupuestosWindow(BaseCRUDWindow):
         # Cargar clientes
         res_c = self.api.get_clientes()
         if res_c.get("success"):
-            clientes_data = res_c.get("data", [])
-            # Normalizar IDs de clientes para el combobox
-            for c in clientes_data:
-                if isinstance(c, dict):
-                    if "id_cliente" in c and "id" not in c:
-                        c["id"] = c["id_cliente"]
-            self.clientes = clientes_data
+            # Normaliza los IDs ("id_cliente" -> "id") y mantiene la misma lista
+            clientes_data = self.clientes_set.replace(res_c.get("data", []))
             # Filtrar por tipo
-            self.clientes_persona = [c for c in clientes_data if c.get("tipo_cliente", "").upper() == "PARTICULAR"]
+            self.clientes_persona = [c for c in clientes_data if self._es_particular(c)]
             self.clientes_empresa_persona = clientes_data  # Todos para pagador
+            self.index_clientes = SearchIndex(self.clientes_empresa_persona, cliente_label)
+            self.index_clientes_persona = SearchIndex(self.clientes_persona, cliente_label)
 
         # Cargar empleados
         res_e = self.api.get_all("empleados")
@@ -129,69 +141,69 @@ class PresupuestosWindow(BaseCRUDWindow):
                     if "id_producto" in p and "id" not in p:
                         p["id"] = p["id_producto"]
             self.productos = productos_data
+            self.index_productos = SearchIndex(productos_data, producto_label)
+
+    @staticmethod
+    def _es_particular(cliente: Dict) -> bool:
+        return (cliente.get("tipo_cliente") or "").upper() == "PARTICULAR"
+
+    def _on_cliente_upsert(self, cliente: Dict):
+        """Refresca listas e índices con un cliente creado o actualizado."""
+        self.index_clientes.update([cliente])
+        es_particular = self._es_particular(cliente)
+        en_personas = any(c is cliente for c in self.clientes_persona)
+        if es_particular:
+            if not en_personas:
+                self.clientes_persona.append(cliente)
+            self.index_clientes_persona.update([cliente])
+        elif en_personas:
+            self.clientes_persona[:] = [c for c in self.clientes_persona if c is not cliente]
+            self.index_clientes_persona.remove(cliente["id"])
 
     # =====================================================================
     # CARGA DE DATOS CON NOMBRES DE CLIENTES
     # =====================================================================
-    def _load_my_presupuestos(self):
+    def _load_my_presupuestos(self, refresh: bool = False):
         """Carga presupuestos del cliente actual"""
         # Cargar clientes primero para normalizar
         res_c = self.api.get_clientes()
         if res_c.get("success"):
-            clientes_data = res_c.get("data", [])
-            for c in clientes_data:
-                if isinstance(c, dict) and "id_cliente" in c and "id" not in c:
-                    c["id"] = c["id_cliente"]
-            self.clientes = clientes_data
+            self.clientes_set.replace(res_c.get("data", []))
         
-        # Cargar todos los presupuestos y filtrar por cliente
-        result = self.api.get_all("presupuestos")
+        # Presupuestos del cliente (ya filtrados) desde la instantánea compartida
+        result = self.api.get_client_snapshot(refresh=refresh)
         
         if not result.get("success"):
             messagebox.showerror("Error", f"Error al cargar datos: {result.get('error')}")
             return
         
-        data = result.get("data", [])
-        
-        # Filtrar presupuestos del cliente actual
-        cliente_id = getattr(self.api, "user_id", None)
-        if cliente_id and isinstance(data, list):
-            data = [
-                p for p in data
-                if isinstance(p, dict) and (
-                    p.get("id_cliente_pagador") == cliente_id or
-                    p.get("id_cliente_beneficiario") == cliente_id
-                )
-            ]
+        # Copias: la normalización no debe modificar la instantánea en caché
+        data = [dict(p) for p in (result.get("data") or {}).get("presupuestos", [])]
         
         if isinstance(data, list):
             data = [normalize_presupuesto_data(row, self.clientes) for row in data]
         
         self.data = data
-        self.table.set_data(self.data)
+        self.data = self.table.set_data(self.data)
+    
+    def _normalize_rows(self, rows):
+        """Agrega el nombre del cliente a los presupuestos recibidos."""
+        return [normalize_presupuesto_data(row, self.clientes) for row in rows]
     
     def _load_data(self):
         """Carga datos y agrega nombres de clientes"""
         # En modo cliente, cargar solo los presupuestos del cliente
         if self.client_mode:
-            self._load_my_presupuestos()
+            self._load_my_presupuestos(refresh=True)
             return
         
-        result = self.api.get_all("presupuestos")
-        
-        if not result.get("success"):
-            messagebox.showerror("Error", f"Error al cargar datos: {result.get('error')}")
+        # Incremental: tras la primera carga solo llegan los presupuestos modificados
+        self._sync_list(on_done=self._after_load)
+
+    def _after_load(self, success: bool):
+        """Actualiza el estado del botón después de cargar datos"""
+        if not success:
             return
-        
-        data = result.get("data", [])
-        
-        if isinstance(data, list):
-            data = [normalize_presupuesto_data(row, self.clientes) for row in data]
-        
-        self.data = data
-        self.table.set_data(self.data)
-        
-        # Actualizar estado del botón después de cargar datos
         selected = self.table.get_selected()
         if self.btn_generar_factura:
             if selected and isinstance(selected, dict) and selected.get("estado", "").upper() == "APROBADO":
@@ -216,7 +228,7 @@ class PresupuestosWindow(BaseCRUDWindow):
             return
         
         # Cargar todos los datos primero (el backend no soporta filtros)
-        result = self.api.get_all("presupuestos")
+        result = self.api.get_all("presupuestos", fields=self._list_fields())
         
         if not result.get("success"):
             logger.error(f"Error al cargar presupuestos: {result.get('error')}")
@@ -234,7 +246,7 @@ class PresupuestosWindow(BaseCRUDWindow):
         logger.info(f"Datos filtrados: {len(filtered_data)} de {len(data)}")
         
         self.data = filtered_data
-        self.table.set_data(self.data)
+        self.data = self.table.set_data(self.data)
         
         # Actualizar estado del botón después de filtrar
         selected = self.table.get_selected()
@@ -444,9 +456,14 @@ class PresupuestosWindow(BaseCRUDWindow):
             total,
             cliente_pagador_id,
             empleado_id,
-            on_success_callback=self._load_data
+            on_success_callback=self._on_factura_generada
         )
 
+    def _on_factura_generada(self):
+        self._load_data()
+        # Lo habitual después es ir a Facturas: se precarga mientras tanto
+        self.api.prefetch.hint("Facturas")
+
     # =====================================================================
     # FORMULARIO
     # =====================================================================
@@ -522,78 +539,40 @@ class PresupuestosWindow(BaseCRUDWindow):
                 row += 1
 
         # =====================================================================
-        # CLIENTE PAGADOR (empresa o persona + opción Nuevo cliente)
+        # CLIENTE PAGADOR (empresa o persona + botón Nuevo cliente)
         # =====================================================================
         ttk.Label(main, text="Cliente Pagador:").grid(row=row, column=0, sticky="w", padx=5, pady=4)
-        opts_pagador = [
-            f"{c.get('id', c.get('id_cliente', ''))} - {c.get('nombre', '')} ({c.get('tipo_cliente', 'N/A')})"
-            for c in self.clientes_empresa_persona
-        ]
-        # Insertar opción para crear un nuevo cliente pagador
-        opts_pagador.insert(0, "Nuevo cliente...")
-        combo_pagador = ttk.Combobox(main, values=opts_pagador, width=40, state="readonly")
-        combo_pagador.grid(row=row, column=1, sticky="ew", padx=5, pady=4)
-        fields["id_cliente_pagador"] = combo_pagador
-        
-        # Evento para detectar selección de "Nuevo cliente..."
-        def on_pagador_change(event):
-            valor = combo_pagador.get()
-            if valor == "Nuevo cliente...":
-                crear_nuevo_cliente_pagador()
-        
-        combo_pagador.bind("<<ComboboxSelected>>", on_pagador_change)
+        pagador_frame = ttk.Frame(main)
+        pagador_frame.grid(row=row, column=1, sticky="ew", padx=5, pady=4)
+        picker_pagador = SearchPicker(pagador_frame, index=self.index_clientes, width=40)
+        picker_pagador.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        fields["id_cliente_pagador"] = picker_pagador
         
         # Precargar si edita
         if item and item.get("id_cliente_pagador"):
-            try_id = str(item["id_cliente_pagador"])
-            for op in opts_pagador:
-                if op != "Nuevo cliente..." and op.split(" - ")[0] == try_id:
-                    combo_pagador.set(op)
-                    break
+            picker_pagador.set_id(item["id_cliente_pagador"])
         row += 1
 
         # =====================================================================
-        # CLIENTE BENEFICIARIO (solo persona + opción Nuevo cliente)
+        # CLIENTE BENEFICIARIO (solo persona + botón Nuevo cliente)
         # =====================================================================
         ttk.Label(main, text="Cliente Beneficiario:").grid(row=row, column=0, sticky="w", padx=5, pady=4)
-        opts_beneficiario = [
-            f"{c.get('id', c.get('id_cliente', ''))} - {c.get('nombre', '')}"
-            for c in self.clientes_persona
-        ]
-        opts_beneficiario.insert(0, "Nuevo cliente...")
-        combo_beneficiario = ttk.Combobox(main, values=opts_beneficiario, width=40, state="readonly")
-        combo_beneficiario.grid(row=row, column=1, sticky="ew", padx=5, pady=4)
-        fields["id_cliente_beneficiario"] = combo_beneficiario
-        
-        # Evento para detectar selección de "Nuevo cliente..."
-        def on_beneficiario_change(event):
-            valor = combo_beneficiario.get()
-            if valor == "Nuevo cliente...":
-                # Abrir ventana para crear nuevo cliente beneficiario
-                crear_nuevo_cliente_beneficiario()
-        
-        combo_beneficiario.bind("<<ComboboxSelected>>", on_beneficiario_change)
+        beneficiario_frame = ttk.Frame(main)
+        beneficiario_frame.grid(row=row, column=1, sticky="ew", padx=5, pady=4)
+        picker_beneficiario = SearchPicker(beneficiario_frame, index=self.index_clientes_persona, width=40)
+        picker_beneficiario.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        fields["id_cliente_beneficiario"] = picker_beneficiario
         
         # Función para crear nuevo cliente pagador (persona o empresa)
         def crear_nuevo_cliente_pagador():
             def on_success(cliente_guardado):
                 """Callback cuando el cliente se crea exitosamente."""
                 cliente_id = cliente_guardado.get("id_cliente") or cliente_guardado.get("id")
-                nombre = cliente_guardado.get("nombre", "")
-                tipo_cliente = cliente_guardado.get("tipo_cliente", "N/A")
                 
                 if cliente_id:
-                    # Recargar lista completa desde el backend
-                    self._load_related()
-                    # Reconstruir opciones de pagador
-                    nuevos_opts_pagador = [
-                        f"{c.get('id', c.get('id_cliente', ''))} - {c.get('nombre', '')} ({c.get('tipo_cliente', 'N/A')})"
-                        for c in self.clientes_empresa_persona
-                    ]
-                    nuevos_opts_pagador.insert(0, "Nuevo cliente...")
-                    combo_pagador["values"] = nuevos_opts_pagador
-                    nuevo_texto = f"{cliente_id} - {nombre} ({tipo_cliente})"
-                    combo_pagador.set(nuevo_texto)
+                    # Integrar el cliente en memoria; los índices se refrescan en _on_cliente_upsert
+                    self.clientes_set.upsert(cliente_guardado)
+                    picker_pagador.set_id(cliente_id, label=cliente_label(cliente_guardado))
             
             abrir_formulario_cliente(
                 parent=form,
@@ -608,20 +587,11 @@ class PresupuestosWindow(BaseCRUDWindow):
             def on_success(cliente_guardado):
                 """Callback cuando el cliente se crea exitosamente."""
                 cliente_id = cliente_guardado.get("id_cliente") or cliente_guardado.get("id")
-                nombre = cliente_guardado.get("nombre", "")
                 
                 if cliente_id:
-                    # Actualizar combobox y seleccionar
-                    nuevo_texto = f"{cliente_id} - {nombre}"
-                    # Actualizar la lista de opciones
-                    current_values = list(combo_beneficiario["values"])
-                    if "Nuevo cliente..." in current_values:
-                        current_values.remove("Nuevo cliente...")
-                    current_values.append(nuevo_texto)
-                    combo_beneficiario["values"] = current_values
-                    combo_beneficiario.set(nuevo_texto)
-                    # Recargar lista de clientes
-                    self._load_related()
+                    # Integrar el cliente en memoria y seleccionarlo
+                    self.clientes_set.upsert(cliente_guardado)
+                    picker_beneficiario.set_id(cliente_id, label=cliente_label(cliente_guardado))
             
             abrir_formulario_cliente(
                 parent=form,
@@ -631,13 +601,14 @@ class PresupuestosWindow(BaseCRUDWindow):
                 on_success=on_success
             )
         
+        ttk.Button(pagador_frame, text="Nuevo cliente...",
+                   command=crear_nuevo_cliente_pagador).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(beneficiario_frame, text="Nuevo cliente...",
+                   command=crear_nuevo_cliente_beneficiario).pack(side=tk.LEFT, padx=(5, 0))
+        
         # Precargar si edita
         if item and item.get("id_cliente_beneficiario"):
-            try_id = str(item["id_cliente_beneficiario"])
-            for op in opts_beneficiario:
-                if op != "Nuevo cliente..." and op.split(" - ")[0] == try_id:
-                    combo_beneficiario.set(op)
-                    break
+            picker_beneficiario.set_id(item["id_cliente_beneficiario"])
         row += 1
 
         # =====================================================================
@@ -682,13 +653,8 @@ class PresupuestosWindow(BaseCRUDWindow):
             
             ttk.Label(main_producto, text="Seleccionar Producto:").pack(pady=5)
             
-            opts_producto = [
-                f"{p.get('id', p.get('id_producto', ''))} - {p.get('nombre', '')} (€{p.get('precio', 0)})"
-                for p in self.productos
-            ]
-            
-            combo_producto = ttk.Combobox(main_producto, values=opts_producto, width=30, state="readonly")
-            combo_producto.pack(pady=5)
+            picker_producto = SearchPicker(main_producto, index=self.index_productos, width=40)
+            picker_producto.pack(pady=5, fill=tk.X)
             
             ttk.Label(main_producto, text="Cantidad:").pack(pady=5)
             entry_cantidad = ValidatedEntry(main_producto, validation_type="number", required=True, width=10)
@@ -696,8 +662,8 @@ class PresupuestosWindow(BaseCRUDWindow):
             entry_cantidad.pack(pady=5)
             
             def confirmar_producto():
-                valor = combo_producto.get()
-                if not valor:
+                producto_id = picker_producto.get_id()
+                if producto_id is None:
                     messagebox.showwarning("Advertencia", "Seleccione un producto")
                     return
                 
@@ -706,14 +672,13 @@ class PresupuestosWindow(BaseCRUDWindow):
                     return
                 
                 try:
-                    producto_id = int(valor.split(" - ")[0])
                     cantidad = int(entry_cantidad.get_value() or "1")
                     if cantidad <= 0:
                         messagebox.showerror("Error", "La cantidad debe ser mayor que 0")
                         return
                     
                     # Buscar producto para obtener precio
-                    producto = next((p for p in self.productos if p.get("id") == producto_id), None)
+                    producto = self.index_productos.get(producto_id)
                     if producto:
                         precio_unitario = float(producto.get("precio", 0))
                         subtotal = precio_unitario * cantidad
@@ -945,8 +910,8 @@ class PresupuestosWindow(BaseCRUDWindow):
                 return
             
             # Validar cliente beneficiario
-            beneficiario_val = combo_beneficiario.get()
-            if not beneficiario_val or beneficiario_val == "Nuevo cliente...":
+            beneficiario_id = picker_beneficiario.get_id()
+            if beneficiario_id is None:
                 messagebox.showerror("Error", "Debe seleccionar o crear un cliente beneficiario")
                 return
             
@@ -962,23 +927,20 @@ class PresupuestosWindow(BaseCRUDWindow):
                     data["id_empleado"] = item["id_empleado"]
 
             # Cliente pagador
-            pagador_val = combo_pagador.get()
-            if not pagador_val:
+            pagador_id = picker_pagador.get_id()
+            if pagador_id is None:
                 messagebox.showerror("Error", "Debe seleccionar un cliente pagador")
                 return
             try:
-                data["id_cliente_pagador"] = int(pagador_val.split(" - ")[0])
-            except (ValueError, IndexError):
+                data["id_cliente_pagador"] = int(pagador_id)
+            except (ValueError, TypeError):
                 messagebox.showerror("Error", "Error al procesar cliente pagador")
                 return
 
             # Cliente beneficiario
-            if beneficiario_val == "Nuevo cliente...":
-                messagebox.showerror("Error", "Debe crear primero el cliente beneficiario")
-                return
             try:
-                data["id_cliente_beneficiario"] = int(beneficiario_val.split(" - ")[0])
-            except (ValueError, IndexError):
+                data["id_cliente_beneficiario"] = int(beneficiario_id)
+            except (ValueError, TypeError):
                 messagebox.showerror("Error", "Error al procesar cliente beneficiario")
                 return
 
@@ -4,6 +4,7 @@ Ventana de gestión de productos
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+from collections.abc import Mapping
 from typing import Dict, Optional, List
 
 from src.ui.entities.base_crud_window import BaseCRUDWindow
@@ -167,7 +168,7 @@ class ProductosWindow(BaseCRUDWindow):
 
         # Normalizar IDs y campos
         for row in filtered_data:
-            if isinstance(row, dict):
+            if isinstance(row, Mapping):
                 # Normalizar id_producto a id
                 if "id_producto" in row and "id" not in row:
                     row["id"] = row["id_producto"]
@@ -196,7 +197,7 @@ class ProductosWindow(BaseCRUDWindow):
 
         self.data = filtered_data
         logger.info(f"Productos filtrados: {len(self.data)} registros")
-        self.table.set_data(self.data)
+        self.data = self.table.set_data(self.data)
     
     def _get_precio(self, producto: Dict) -> float:
         """Extrae el precio de un producto de forma segura"""
@@ -216,7 +217,7 @@ class ProductosWindow(BaseCRUDWindow):
         import logging
         logger = logging.getLogger(__name__)
         
-        result = self.api.get_all("productos")
+        result = self.api.get_all("productos", refresh=True)
 
         if not result.get("success"):
             messagebox.showerror("Error", f"Error al cargar datos: {result.get('error')}")
@@ -232,7 +233,7 @@ class ProductosWindow(BaseCRUDWindow):
         
         # Normalizar IDs y campos
         for row in data:
-            if isinstance(row, dict):
+            if isinstance(row, Mapping):
                 # Normalizar id_producto a id
                 if "id_producto" in row and "id" not in row:
                     row["id"] = row["id_producto"]
@@ -256,7 +257,7 @@ class ProductosWindow(BaseCRUDWindow):
         logger.debug(f"Primer producto (ejemplo): {data[0] if data else 'No hay datos'}")
         
         self.data = data
-        self.table.set_data(self.data)
+        self.data = self.table.set_data(self.data)
         
         # Actualizar opciones de filtros después de cargar
         self._update_filter_options()
@@ -110,6 +110,14 @@ class LoginWindow:
             messagebox.showerror("Error", error_msg)
             return
 
+        if result.get("offline"):
+            messagebox.showinfo(
+                "Modo sin conexión",
+                "No se pudo conectar con el servidor.\n\n"
+                "Se muestran los datos guardados en este equipo y los cambios "
+                "se enviarán automáticamente al recuperar la conexión."
+            )
+
         user_info = result.get("data", {})
         
         # Asegurar que el user_id esté disponible para los métodos del cliente
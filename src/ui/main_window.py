@@ -13,6 +13,8 @@ from src.ui.entities.facturas_window import FacturasWindow
 from src.ui.entities.pagos_window import PagosWindow
 from src.ui.reports_window import ReportsWindow
 from src.ui.help_window import HelpWindow
+from src.ui.widgets.perf_hud import PerfHud
+from src.utils.perf import recorder
 
 class MainWindow:
 
@@ -107,6 +109,8 @@ class MainWindow:
         self.root.bind("<Control-D>", lambda e: self.show_dashboard())
         self.root.bind("<Control-q>", lambda e: self._logout())
         self.root.bind("<Control-Q>", lambda e: self._logout())
+        # Panel de rendimiento (desarrollo): Ctrl+Shift+P
+        self.root.bind("<Control-P>", lambda e: self._toggle_perf_hud())
         
         # ---------------------------------------------------------
         # Crear contenedor raíz (SIEMPRE NUEVO)
@@ -275,6 +279,73 @@ class MainWindow:
         )
         self.statusbar.pack(side="bottom", fill="x")
 
+        # Estado de la conexión (solo visible sin conexión o con cambios pendientes)
+        self.connection_label = ctk.CTkLabel(
+            self.main_container,
+            text="",
+            anchor="w",
+            fg_color="#3a2f1a",
+            text_color="#ffb74d"
+        )
+        self._connection_shown = False
+        self._poll_connection()
+
+        # Panel de rendimiento (se crea la primera vez que se muestra)
+        self.perf_hud = None
+        self._perf_hud_shown = False
+
+        # Los resultados de las cargas en segundo plano se entregan en este hilo
+        self.api.scheduler.ui_attached = True
+        self._pump_scheduler()
+
+    # ---------------------------------------------------------
+    def _pump_scheduler(self):
+        if not hasattr(self, "main_container"):
+            self.api.scheduler.ui_attached = False
+            return
+        self.api.scheduler.dispatch()
+        self.root.after(20, self._pump_scheduler)
+
+    # ---------------------------------------------------------
+    def _poll_connection(self):
+        if not hasattr(self, "statusbar") or not self.statusbar.winfo_exists():
+            return
+        status = self.api.get_offline_status() if hasattr(self.api, "get_offline_status") else {}
+        parts = []
+        if status.get("offline"):
+            parts.append("Sin conexión")
+        elif status.get("replaying"):
+            parts.append("Enviando cambios…")
+        if status.get("pending"):
+            parts.append(f"{status['pending']} cambios pendientes")
+        if status.get("conflicts") or status.get("failed"):
+            parts.append(f"{status.get('conflicts', 0) + status.get('failed', 0)} cambios no enviados (conflicto)")
+        if parts:
+            self.connection_label.configure(text="  " + " · ".join(parts))
+            if not self._connection_shown:
+                self.connection_label.pack(side="bottom", fill="x", after=self.statusbar)
+                self._connection_shown = True
+        elif self._connection_shown:
+            self.connection_label.pack_forget()
+            self._connection_shown = False
+        self.root.after(3000, self._poll_connection)
+
+
+    # ---------------------------------------------------------
+    def _toggle_perf_hud(self):
+        if not hasattr(self, "statusbar") or not self.statusbar.winfo_exists():
+            return
+        if self._perf_hud_shown:
+            self.perf_hud.stop()
+            self.perf_hud.pack_forget()
+            self._perf_hud_shown = False
+            return
+        if self.perf_hud is None:
+            self.perf_hud = PerfHud(self.main_container)
+        self.perf_hud.pack(side="bottom", fill="x", after=self.statusbar)
+        self.perf_hud.start()
+        self._perf_hud_shown = True
+
 
     # ---------------------------------------------------------
     def _set_status(self, msg):
@@ -312,6 +383,8 @@ class MainWindow:
 
     # ---------------------------------------------------------
     def _clear_frame(self):
+        # Las cargas pendientes de la vista que se cierra ya no interesan
+        self.api.scheduler.cancel_view()
         if self.current_frame:
             self.current_frame.destroy()
             self.current_frame = None
@@ -331,6 +404,8 @@ class MainWindow:
     def show_dashboard(self):
         self._ensure_content_area()
         self._clear_frame()
+        self.api.prefetch.navigate("Dashboard")
+        recorder.set_view("Dashboard")
 
         if self.is_admin:
             self.current_frame = AdminDashboardView(self.content_area, self.api, self)
@@ -350,6 +425,9 @@ class MainWindow:
     def _load_window(self, cls, label):
         self._ensure_content_area()
         self._clear_frame()
+        # Aprende la transición y precarga en segundo plano la vista siguiente
+        self.api.prefetch.navigate(label)
+        recorder.set_view(label)
 
         self.current_frame = cls(self.content_area, self.api)
         self.current_frame.pack(fill="both", expand=True)
@@ -1,3 +1,5 @@
+import logging
+
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 
@@ -16,6 +18,9 @@ from src.ui.reports.report_definitions import (
 from src.reports.exporters.pdf_exporter import PDFExporter
 from src.reports.exporters.image_exporter import ImageExporter
 from src.reports.exporters.report_exporter import ReportExporter
+from src.utils.logging_config import truncated
+
+logger = logging.getLogger(__name__)
 
 
 class ReportsWindow(ctk.CTkFrame):
@@ -176,26 +181,23 @@ class ReportsWindow(ctk.CTkFrame):
     # CAMBIO DE TAB (solo cambia el informe activo, no hace consulta)
     # ================================================================
     def _switch_tab(self, name, desde=None, hasta=None):
-        import logging
-        logger = logging.getLogger(__name__)
-        
         self.active_tab = name
         
         # Solo hacer consulta si se pasan fechas explícitamente (desde el botón "Generar")
         # Si no se pasan fechas, solo cambiar el informe activo sin consultar
         if desde is None and hasta is None:
-            logger.info(f"[REPORTS_WINDOW] Cambiando a informe '{name}' sin generar datos")
+            logger.info("[REPORTS_WINDOW] Cambiando a informe '%s' sin generar datos", name)
             # Mostrar mensaje indicando que debe presionar "Generar"
             self._render_report(None, name)
             return
         
         # Si se pasan fechas, hacer la consulta
-        logger.info(f"[REPORTS_WINDOW] Generando informe '{name}' con fechas: desde={desde}, hasta={hasta}")
+        logger.info("[REPORTS_WINDOW] Generando informe '%s' con fechas: desde=%s, hasta=%s", name, desde, hasta)
         
         # Obtener método del loader desde las definiciones
         method_name = get_loader_method_name(name)
         if not method_name:
-            logger.warning(f"[REPORTS_WINDOW] No se encontró método para '{name}'")
+            logger.warning("[REPORTS_WINDOW] No se encontró método para '%s'", name)
             data = None
         else:
             # Llamar método del loader dinámicamente
@@ -203,7 +205,7 @@ class ReportsWindow(ctk.CTkFrame):
             if loader_method:
                 data = loader_method(desde, hasta)
             else:
-                logger.error(f"[REPORTS_WINDOW] Método '{method_name}' no existe en ReportLoader")
+                logger.error("[REPORTS_WINDOW] Método '%s' no existe en ReportLoader", method_name)
                 data = None
         
         # Guardar última data y título para zoom/export
@@ -245,9 +247,8 @@ class ReportsWindow(ctk.CTkFrame):
     # RENDERIZACIÓN DEL INFORME
     # ================================================================
     def _render_report(self, data, title):
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"[RENDER] Renderizando informe: {title}, data type: {type(data)}, data: {data}")
+        logger.info("[RENDER] Renderizando informe: %s, data type: %s", title, type(data).__name__)
+        logger.debug("[RENDER] data: %s", truncated(data))
 
         # El área scrolleable se limpia automáticamente por GraphicPanel
         desde = None
@@ -258,21 +259,21 @@ class ReportsWindow(ctk.CTkFrame):
 
         # Si data es None (no se ha generado informe aún), mostrar mensaje
         if data is None:
-            logger.info(f"[RENDER] No hay datos para {title}, mostrando mensaje inicial")
+            logger.info("[RENDER] No hay datos para %s, mostrando mensaje inicial", title)
             fig = ChartFactory.empty("Seleccione un período y presione 'Generar' para ver el informe")
         # Verificar si data es lista vacía o diccionario vacío
         elif (isinstance(data, list) and len(data) == 0) or (isinstance(data, dict) and len(data) == 0):
-            logger.warning(f"[RENDER] Datos vacíos para {title}, mostrando mensaje 'Sin datos disponibles'")
+            logger.warning("[RENDER] Datos vacíos para %s, mostrando mensaje 'Sin datos disponibles'", title)
             fig = ChartFactory.empty("Sin datos disponibles para el período seleccionado")
         else:
             # Obtener configuración del informe desde las definiciones
             chart_type = get_chart_type(title)
             chart_config = get_chart_config(title)
             
-            logger.info(f"[RENDER] chart_type: {chart_type}, chart_config: {chart_config is not None}")
+            logger.debug("[RENDER] chart_type: %s, chart_config: %s", chart_type, chart_config is not None)
             
             if not chart_type or not chart_config:
-                logger.error(f"[RENDER] Configuración no encontrada para {title}")
+                logger.error("[RENDER] Configuración no encontrada para %s", title)
                 fig = ChartFactory.empty("Configuración de informe no encontrada")
             else:
                 # Extraer datos usando la función extractor
@@ -280,21 +281,21 @@ class ReportsWindow(ctk.CTkFrame):
                 if data_extractor:
                     try:
                         labels, values = data_extractor(data)
-                        logger.info(f"[RENDER] Datos extraídos - labels: {len(labels) if labels else 0}, values: {len(values) if values else 0}")
+                        logger.debug("[RENDER] Datos extraídos - labels: %d, values: %d", len(labels) if labels else 0, len(values) if values else 0)
                     except Exception as e:
-                        logger.error(f"[RENDER] Error extrayendo datos: {e}", exc_info=True)
+                        logger.error("[RENDER] Error extrayendo datos: %s", e, exc_info=True)
                         labels, values = [], []
                 else:
-                    logger.warning(f"[RENDER] No hay data_extractor en chart_config")
+                    logger.warning("[RENDER] No hay data_extractor en chart_config")
                     labels, values = [], []
                 
                 # Verificar si hay datos después de extraer
                 if not labels or not values or len(labels) == 0 or len(values) == 0:
-                    logger.warning(f"[RENDER] No hay datos después de extraer para {title}")
+                    logger.warning("[RENDER] No hay datos después de extraer para %s", title)
                     fig = ChartFactory.empty("Sin datos disponibles para el período seleccionado")
                 else:
                     # Crear gráfico según el tipo
-                    logger.info(f"[RENDER] Creando gráfico tipo {chart_type} con {len(labels)} elementos")
+                    logger.info("[RENDER] Creando gráfico tipo %s con %d elementos", chart_type, len(labels))
                     if chart_type == "bar":
                         xlabel = chart_config.get("xlabel", "")
                         ylabel = chart_config.get("ylabel", "")
@@ -309,7 +310,7 @@ class ReportsWindow(ctk.CTkFrame):
                         fig = ChartFactory.line_chart(labels, values, title, xlabel, ylabel)
                     
                     else:
-                        logger.error(f"[RENDER] Tipo de gráfico '{chart_type}' no soportado")
+                        logger.error("[RENDER] Tipo de gráfico '%s' no soportado", chart_type)
                         fig = ChartFactory.empty("Tipo de gráfico no soportado: " + chart_type)
 
         # Texto del periodo dentro del gráfico y título descriptivo
@@ -330,7 +331,7 @@ class ReportsWindow(ctk.CTkFrame):
                                 transform=ax.transAxes
                             )
                 except Exception as e:
-                    logger.warning(f"[RENDER] No se pudo añadir texto del período: {e}")
+                    logger.warning("[RENDER] No se pudo añadir texto del período: %s", e)
             subtitle = f"{title} ({periodo_txt})"
 
         # Actualizar etiqueta de título de informe en la ventana
@@ -341,17 +342,17 @@ class ReportsWindow(ctk.CTkFrame):
         self.current_figure = fig
         scale = getattr(self.zoom, "scale", 1.0)
         fig.set_size_inches(8 * scale, 4 * scale)
-        logger.info(f"[RENDER] Figura configurada con tamaño: {8 * scale} x {4 * scale}")
+        logger.debug("[RENDER] Figura configurada con tamaño: %s x %s", 8 * scale, 4 * scale)
 
         # Mostrar usando GraphicPanel avanzado
         # CTkScrollableFrame tiene un inner_frame donde va el contenido
         parent_frame = self.scroll_area.inner_frame if hasattr(self.scroll_area, 'inner_frame') else self.scroll_area
-        logger.info(f"[RENDER] Mostrando gráfico en parent_frame: {parent_frame}")
+        logger.debug("[RENDER] Mostrando gráfico en parent_frame: %s", parent_frame)
         try:
             self.canvas_widget = GraphicPanel.display(parent_frame, fig)
-            logger.info(f"[RENDER] Gráfico mostrado correctamente")
+            logger.debug("[RENDER] Gráfico mostrado correctamente")
         except Exception as e:
-            logger.error(f"[RENDER] Error al mostrar gráfico: {e}", exc_info=True)
+            logger.error("[RENDER] Error al mostrar gráfico: %s", e, exc_info=True)
             raise
 
     # ================================================================
@@ -0,0 +1,141 @@
+"""
+Panel de rendimiento para desarrollo (se muestra sobre la barra de estado)
+"""
+
+import time
+from tkinter import filedialog, messagebox
+from typing import Optional
+
+import customtkinter as ctk
+
+from src.utils.perf import PerfRecorder, recorder as default_recorder
+
+# Operaciones y spans recientes que se listan
+HUD_OPERATIONS = 12
+HUD_RECENT = 8
+HUD_REFRESH_MS = 1000
+
+
+def format_bytes(size: float) -> str:
+    """1536 -> "1.5 KB"."""
+    if size < 1024:
+        return f"{size:.0f} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+class PerfHud(ctk.CTkFrame):
+    """
+    Últimos spans, p50/p95 por operación y peticiones/bytes de la vista
+    actual, refrescados cada segundo mientras el panel está visible.
+
+    Args:
+        master: Contenedor
+        recorder: Origen de los datos (por defecto el global de ``src.utils.perf``)
+    """
+
+    def __init__(self, master, recorder: Optional[PerfRecorder] = None, **kwargs):
+        kwargs.setdefault("fg_color", "#1b1d27")
+        super().__init__(master, corner_radius=0, **kwargs)
+        self.recorder = recorder or default_recorder
+        self._after_id = None
+        self._text = ""
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=8, pady=(6, 0))
+        ctk.CTkLabel(
+            header,
+            text="Rendimiento (Ctrl+Shift+P para ocultar)",
+            font=("Arial", 12, "bold"),
+            text_color="#9aa4bf"
+        ).pack(side="left")
+        ctk.CTkButton(header, text="Limpiar", width=80, height=24,
+                      command=self._clear).pack(side="right", padx=(6, 0))
+        ctk.CTkButton(header, text="Exportar traza", width=110, height=24,
+                      command=self._export).pack(side="right")
+
+        self.textbox = ctk.CTkTextbox(
+            self,
+            height=220,
+            font=("Consolas", 12),
+            fg_color="#1b1d27",
+            text_color="#d6dae6",
+            wrap="none"
+        )
+        self.textbox.pack(fill="x", padx=8, pady=6)
+        self.textbox.configure(state="disabled")
+
+    # =====================================================================
+    # REFRESCO
+    # =====================================================================
+    def start(self):
+        """Empieza a refrescar (al mostrar el panel)."""
+        self.stop()
+        self._refresh()
+
+    def stop(self):
+        """Deja de refrescar (al ocultarlo)."""
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+
+    def destroy(self):
+        self.stop()
+        super().destroy()
+
+    def _refresh(self):
+        text = self.render()
+        if text != self._text:
+            self._text = text
+            self.textbox.configure(state="normal")
+            self.textbox.delete("1.0", "end")
+            self.textbox.insert("1.0", text)
+            self.textbox.configure(state="disabled")
+        self._after_id = self.after(HUD_REFRESH_MS, self._refresh)
+
+    def render(self) -> str:
+        """Texto del panel."""
+        rec = self.recorder
+        if not rec.enabled:
+            return "Instrumentación desactivada (PERF_TRACE=false)"
+
+        view = rec.views().get(rec.view, {})
+        lines = [
+            f"Vista: {rec.view} · {view.get('requests', 0)} peticiones · "
+            f"{format_bytes(view.get('bytes', 0))} recibidos",
+            "",
+            f"{'Operación':<36}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'máx ms':>10}",
+        ]
+        summary = sorted(rec.summary().items(), key=lambda item: item[1]["p95_ms"], reverse=True)
+        for name, stats in summary[:HUD_OPERATIONS]:
+            lines.append(f"{name[:35]:<36}{stats['count']:>7}{stats['p50_ms']:>10.1f}"
+                         f"{stats['p95_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+
+        lines += ["", "Últimos spans"]
+        now = time.perf_counter()
+        for item in rec.recent(HUD_RECENT):
+            ago = now - (item.start + item.duration)
+            lines.append(f"  hace {ago:6.1f} s  {item.name[:40]:<41}{item.duration * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    # =====================================================================
+    # ACCIONES
+    # =====================================================================
+    def _clear(self):
+        self.recorder.clear()
+        self.stop()
+        self._refresh()
+
+    def _export(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Traza (chrome://tracing, Perfetto)", "*.json")],
+            initialfile=f"traza_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        if path:
+            try:
+                count = self.recorder.export(path)
+                messagebox.showinfo("Éxito", f"Traza exportada ({count} spans):\n{path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error al exportar la traza:\n{str(e)}")
@@ -0,0 +1,76 @@
+"""
+Mini gráficos de tendencia (sparklines) para las tarjetas del dashboard
+"""
+
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+import customtkinter as ctk
+from PIL import Image, ImageDraw
+
+SPARKLINE_SIZE = (96, 24)
+# Se dibuja a mayor tamaño y se reduce: línea suavizada sin antialiasing propio
+_SUPERSAMPLE = 3
+
+
+def _rgba(color: str, alpha: int = 255) -> Tuple[int, int, int, int]:
+    """"#RRGGBB" -> (r, g, b, alpha)."""
+    color = color.lstrip("#")
+    try:
+        return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16), alpha
+    except (ValueError, IndexError):
+        return 255, 255, 255, alpha
+
+
+def trend_key(values: Sequence[float]) -> Tuple[float, ...]:
+    """Clave de caché de una serie (redondeada: variaciones mínimas no generan otra imagen)."""
+    return tuple(round(float(v or 0), 2) for v in values)
+
+
+@lru_cache(maxsize=128)
+def render_sparkline(values: Tuple[float, ...], color: str,
+                     size: Tuple[int, int] = SPARKLINE_SIZE) -> Image.Image:
+    """
+    Dibuja la serie ``values`` como línea con relleno suave.
+
+    Args:
+        values: Serie (tupla, para poder cachearla; ver ``trend_key``)
+        color: Color de la línea ("#RRGGBB")
+        size: Tamaño final en píxeles
+
+    Returns:
+        Imagen RGBA de ``size`` con fondo transparente
+    """
+    width, height = size[0] * _SUPERSAMPLE, size[1] * _SUPERSAMPLE
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    if not values:
+        return image.resize(size)
+
+    draw = ImageDraw.Draw(image)
+    pad = 2 * _SUPERSAMPLE
+    low, high = min(values), max(values)
+    span = high - low
+    step = (width - 2 * pad) / max(len(values) - 1, 1)
+    points = []
+    for i, value in enumerate(values):
+        # Serie plana: línea a media altura
+        ratio = (value - low) / span if span else 0.5
+        points.append((pad + i * step, height - pad - ratio * (height - 2 * pad)))
+    if len(points) == 1:
+        points.append((width - pad, points[0][1]))
+
+    baseline = height - pad
+    draw.polygon(points + [(points[-1][0], baseline), (points[0][0], baseline)], fill=_rgba(color, 48))
+    draw.line(points, fill=_rgba(color), width=2 * _SUPERSAMPLE, joint="curve")
+    x, y = points[-1]
+    radius = 2 * _SUPERSAMPLE
+    draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=_rgba(color))
+    return image.resize(size, Image.LANCZOS)
+
+
+@lru_cache(maxsize=128)
+def sparkline_image(values: Tuple[float, ...], color: str,
+                    size: Tuple[int, int] = SPARKLINE_SIZE) -> ctk.CTkImage:
+    """``render_sparkline`` como ``CTkImage`` (compartida por las tarjetas con la misma serie)."""
+    image = render_sparkline(values, color, size)
+    return ctk.CTkImage(light_image=image, dark_image=image, size=size)
@@ -0,0 +1,182 @@
+"""
+Tarjetas de estadística del dashboard, persistentes y actualizables
+"""
+
+import customtkinter as ctk
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.ui.widgets.sparkline import sparkline_image, trend_key
+
+CARD_COLOR = "#29304a"
+CARD_HOVER_COLOR = "#2d3542"
+
+
+class StatCard(ctk.CTkFrame):
+    """
+    Tarjeta con un valor grande y su título, opcionalmente clicable y con un
+    mini gráfico de tendencia debajo (``set_trend``).
+
+    El valor se cambia con ``set_value`` sin recrear la tarjeta; solo se
+    reconfigura la etiqueta si el texto cambia.
+    """
+
+    def __init__(self, master, title: str, value: Any = "-", color: str = "white",
+                 on_click: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(master, fg_color=CARD_COLOR, corner_radius=12, **kwargs)
+
+        self.title = title
+        self._text = str(value)
+        self._color = color
+        self._on_click = on_click
+
+        self.value_label = ctk.CTkLabel(
+            self,
+            text=self._text,
+            font=("Arial", 24, "bold"),
+            text_color=color
+        )
+        self.value_label.pack(pady=(12, 4))
+
+        self.title_label = ctk.CTkLabel(
+            self,
+            text=title,
+            font=("Arial", 13),
+            text_color="white"
+        )
+        self.title_label.pack(pady=(0, 12))
+
+        # Mini gráfico de tendencia (se crea con la primera serie)
+        self.trend_label: Optional[ctk.CTkLabel] = None
+        self._trend: Optional[Tuple[float, ...]] = None
+
+        # Toda la tarjeta (marco y etiquetas) responde al ratón
+        if on_click is not None:
+            for widget in (self, self.value_label, self.title_label):
+                self._bind_click(widget)
+
+    def _bind_click(self, widget):
+        widget.bind("<Enter>", self._on_enter)
+        widget.bind("<Leave>", self._on_leave)
+        widget.bind("<Button-1>", self._on_press)
+
+    def set_value(self, value: Any, color: Optional[str] = None) -> bool:
+        """
+        Muestra ``value`` (y ``color``, si se indica).
+
+        Returns:
+            True si ha cambiado algo en pantalla
+        """
+        text = str(value)
+        changes = {}
+        if text != self._text:
+            changes["text"] = self._text = text
+        if color is not None and color != self._color:
+            changes["text_color"] = self._color = color
+        if changes:
+            self.value_label.configure(**changes)
+        return bool(changes)
+
+    def set_trend(self, values: Optional[Sequence[float]]) -> bool:
+        """
+        Muestra la serie ``values`` como sparkline (None o vacía = ocultarla).
+
+        Returns:
+            True si ha cambiado la imagen
+        """
+        key = trend_key(values) if values else None
+        if key == self._trend:
+            return False
+        self._trend = key
+        if key is None:
+            if self.trend_label is not None:
+                self.trend_label.pack_forget()
+            return True
+        image = sparkline_image(key, self._color)
+        if self.trend_label is None:
+            self.trend_label = ctk.CTkLabel(self, text="", image=image)
+            self.title_label.pack(pady=(0, 4))
+            if self._on_click is not None:
+                self._bind_click(self.trend_label)
+        else:
+            self.trend_label.configure(image=image)
+        self.trend_label.pack(pady=(0, 10))
+        return True
+
+    def _on_enter(self, _event=None):
+        self.configure(fg_color=CARD_HOVER_COLOR)
+
+    def _on_leave(self, _event=None):
+        self.configure(fg_color=CARD_COLOR)
+
+    def _on_press(self, _event=None):
+        if self._on_click is not None:
+            self._on_click()
+
+
+class StatCardGrid(ctk.CTkFrame):
+    """
+    Rejilla de ``StatCard`` identificadas por su título.
+
+    ``update_cards`` recibe la lista completa de tarjetas: las que ya existen solo
+    cambian su valor; se crean o destruyen tarjetas únicamente cuando cambia
+    el conjunto (y se recolocan si cambia el orden).
+
+    Args:
+        master: Contenedor
+        columns: Tarjetas por fila
+        on_click: Recibe el título de la tarjeta pulsada; ``clickable`` indica
+                  qué títulos responden (None = todas)
+    """
+
+    def __init__(self, master, columns: int = 3,
+                 on_click: Optional[Callable[[str], None]] = None,
+                 clickable: Optional[Sequence[str]] = None, **kwargs):
+        kwargs.setdefault("fg_color", "#252932")
+        super().__init__(master, **kwargs)
+        self.columns = columns
+        self._on_click = on_click
+        self._clickable = None if clickable is None else set(clickable)
+        self.cards: Dict[str, StatCard] = {}
+        self._order: List[str] = []
+
+        for i in range(columns):
+            self.grid_columnconfigure(i, weight=1)
+
+    def update_cards(self, items: Sequence[Tuple[str, Any, str]]) -> bool:
+        """
+        Lleva la rejilla al estado de ``items`` [(título, valor, color), ...];
+        un cuarto elemento opcional es la serie de tendencia de la tarjeta.
+
+        Returns:
+            True si ha cambiado algún valor o el conjunto de tarjetas
+        """
+        order = [item[0] for item in items]
+        changed = False
+
+        wanted = set(order)
+        for title in [t for t in self._order if t not in wanted]:
+            self.cards.pop(title).destroy()
+            changed = True
+
+        for title, value, color, *rest in items:
+            card = self.cards.get(title)
+            if card is None:
+                card = self.cards[title] = StatCard(self, title, value, color,
+                                                    on_click=self._click_handler(title))
+                changed = True
+            elif card.set_value(value, color):
+                changed = True
+            if card.set_trend(rest[0] if rest else None):
+                changed = True
+
+        if order != self._order:
+            for i, title in enumerate(order):
+                self.cards[title].grid(row=i // self.columns, column=i % self.columns,
+                                       padx=18, pady=14, sticky="nsew")
+            self._order = order
+        return changed
+
+    def _click_handler(self, title: str) -> Optional[Callable[[], None]]:
+        if self._on_click is None or (self._clickable is not None and title not in self._clickable):
+            return None
+        return lambda: self._on_click(title)
@@ -0,0 +1,116 @@
+"""
+Configuración de logging de la aplicación.
+
+- ``configure_logging``: configura el logger raíz según ``Settings.LOG_LEVEL``
+  (se llama una vez desde ``main.py``, no al importar módulos).
+- ``truncated``: representación perezosa y recortada de payloads; solo se
+  calcula si el mensaje llega a emitirse.
+- ``log_sampled``: emite uno de cada N mensajes repetitivos (por clave).
+
+Los mensajes deben usar formato perezoso con ``%s``:
+
+    logger.debug("Respuesta de %s: %s", endpoint, truncated(data))
+"""
+
+import logging
+import reprlib
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from src.utils.settings import Settings
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_configured = False
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Configura el logger raíz (idempotente).
+
+    Args:
+        level: Nivel (DEBUG, INFO, WARNING...). Por defecto ``Settings.LOG_LEVEL``
+    """
+    global _configured
+    level_name = (level or Settings.LOG_LEVEL or "INFO").upper()
+    numeric_level = getattr(logging, level_name, logging.INFO)
+    if not _configured:
+        logging.basicConfig(level=numeric_level, format=LOG_FORMAT)
+        _configured = True
+    logging.getLogger().setLevel(numeric_level)
+    # urllib3 registra cada conexión a DEBUG; solo interesa con WARNING o superior
+    logging.getLogger("urllib3").setLevel(max(numeric_level, logging.WARNING))
+
+
+# =====================================================================
+# PAYLOADS RECORTADOS
+# =====================================================================
+class _Truncated:
+    """Envoltorio que genera el texto recortado solo al formatear el mensaje."""
+
+    __slots__ = ("_value", "_limit")
+
+    def __init__(self, value: Any, limit: int):
+        self._value = value
+        self._limit = limit
+
+    def __str__(self) -> str:
+        value = self._value
+        repr_builder = reprlib.Repr()
+        repr_builder.maxlist = repr_builder.maxdict = 3
+        repr_builder.maxlevel = 3
+        is_container = isinstance(value, (list, tuple, dict))
+        # Dentro de listas/dicts cada texto se recorta más para ver varios elementos
+        repr_builder.maxstring = max(20, self._limit // 4) if is_container else self._limit
+        repr_builder.maxother = repr_builder.maxstring
+        text = repr_builder.repr(value)
+        if len(text) > self._limit:
+            text = text[:self._limit] + "..."
+        if is_container:
+            return f"<{type(value).__name__} de {len(value)} elementos> {text}"
+        return text
+
+    __repr__ = __str__
+
+
+def truncated(value: Any, limit: Optional[int] = None) -> _Truncated:
+    """
+    Devuelve un objeto que se formatea como ``value`` recortado.
+
+    Args:
+        value: Payload a registrar (dict, lista, texto...)
+        limit: Máximo de caracteres (por defecto ``Settings.LOG_PAYLOAD_MAX_CHARS``)
+    """
+    return _Truncated(value, limit or Settings.LOG_PAYLOAD_MAX_CHARS)
+
+
+# =====================================================================
+# MUESTREO
+# =====================================================================
+_sample_counters: Dict[str, int] = defaultdict(int)
+_sample_lock = threading.Lock()
+
+
+def log_sampled(logger: logging.Logger, level: int, key: str, msg: str, *args,
+                every: Optional[int] = None) -> None:
+    """
+    Registra el mensaje la primera vez y luego una de cada ``every`` veces.
+
+    Args:
+        logger: Logger destino
+        level: Nivel del mensaje
+        key: Identificador del mensaje repetitivo (ej: "request:GET /facturas")
+        msg: Mensaje con formato ``%s``
+        every: Frecuencia de muestreo (por defecto ``Settings.LOG_SAMPLE_EVERY``)
+    """
+    if not logger.isEnabledFor(level):
+        return
+    every = max(1, every or Settings.LOG_SAMPLE_EVERY)
+    with _sample_lock:
+        count = _sample_counters[key]
+        _sample_counters[key] = count + 1
+    if count % every == 0:
+        if every > 1:
+            msg = f"{msg} [muestreo 1/{every}, #{count + 1}]"
+        logger.log(level, msg, *args)
@@ -0,0 +1,211 @@
+"""
+Instrumentación de las rutas críticas (peticiones, decodificación JSON,
+normalización, tabla, gráficos y exportaciones).
+
+- ``span``: bloque cronometrado (``with span("table.refresh"): ...``).
+- ``timed``: lo mismo como decorador.
+- ``recorder``: guarda los últimos ``PERF_BUFFER_SIZE`` spans en un buffer
+  circular, da p50/p95 por operación, peticiones y bytes por vista, y
+  exporta las trazas a un fichero JSON que abren chrome://tracing o
+  Perfetto (formato Trace Event).
+
+Un span cuesta dos lecturas del reloj y una inserción en el buffer; con
+``PERF_TRACE=false`` no se registra nada.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from src.utils.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Duraciones que se guardan por operación para los percentiles
+_SAMPLES_PER_OPERATION = 512
+
+
+class Span:
+    """Operación cronometrada (tiempos en segundos de ``time.perf_counter``)."""
+
+    __slots__ = ("name", "start", "duration", "thread", "view", "attrs")
+
+    def __init__(self, name: str, start: float, thread: str, view: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+        self.thread = thread
+        self.view = view
+        # Datos adicionales (endpoint, filas, bytes...); se pueden completar dentro del bloque
+        self.attrs = attrs
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, {self.duration * 1000:.1f} ms)"
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class PerfRecorder:
+    """
+    Buffer circular de spans con agregados por operación y por vista.
+
+    Args:
+        capacity: Spans que se conservan (los más antiguos se descartan)
+        enabled: Registrar spans (por defecto ``Settings.PERF_TRACE``)
+    """
+
+    def __init__(self, capacity: Optional[int] = None, enabled: Optional[bool] = None):
+        self.enabled = Settings.PERF_TRACE if enabled is None else enabled
+        self._spans: Deque[Span] = deque(maxlen=capacity or Settings.PERF_BUFFER_SIZE)
+        self._durations: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._views: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        # Vista actual (la fija MainWindow al navegar); se anota en cada span
+        self.view = "-"
+        # Origen de ``Span.start`` para las trazas exportadas
+        self._epoch = time.perf_counter()
+
+    # =====================================================================
+    # REGISTRO
+    # =====================================================================
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Optional[Span]]:
+        """Cronometra el bloque como operación ``name``."""
+        if not self.enabled:
+            yield None
+            return
+        item = Span(name, time.perf_counter(), threading.current_thread().name, self.view, attrs)
+        try:
+            yield item
+        finally:
+            item.duration = time.perf_counter() - item.start
+            self.record(item)
+
+    def record(self, item: Span):
+        with self._lock:
+            self._spans.append(item)
+            samples = self._durations.get(item.name)
+            if samples is None:
+                samples = self._durations[item.name] = deque(maxlen=_SAMPLES_PER_OPERATION)
+            samples.append(item.duration)
+            self._counts[item.name] = self._counts.get(item.name, 0) + 1
+
+    def set_view(self, view: str):
+        """Vista a la que se atribuyen los spans y peticiones siguientes."""
+        self.view = view or "-"
+
+    def count_request(self, wire_bytes: int):
+        """Anota una respuesta HTTP (y sus bytes por la red) en la vista actual."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._views.get(self.view)
+            if stats is None:
+                stats = self._views[self.view] = {"requests": 0, "bytes": 0}
+            stats["requests"] += 1
+            stats["bytes"] += int(wire_bytes or 0)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._durations.clear()
+            self._counts.clear()
+            self._views.clear()
+
+    # =====================================================================
+    # CONSULTA
+    # =====================================================================
+    def recent(self, limit: int = 10) -> List[Span]:
+        """Los ``limit`` spans más recientes (el último primero)."""
+        with self._lock:
+            items = list(self._spans)[-limit:] if limit else []
+        items.reverse()
+        return items
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Por operación: ``count`` (total), ``p50_ms``, ``p95_ms`` y ``max_ms`` de las últimas muestras."""
+        with self._lock:
+            durations = {name: sorted(samples) for name, samples in self._durations.items()}
+            counts = dict(self._counts)
+        return {
+            name: {
+                "count": counts.get(name, 0),
+                "p50_ms": round(_percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+            }
+            for name, values in durations.items()
+        }
+
+    def views(self) -> Dict[str, Dict[str, int]]:
+        """Peticiones y bytes recibidos por vista."""
+        with self._lock:
+            return {view: dict(stats) for view, stats in self._views.items()}
+
+    # =====================================================================
+    # EXPORTACIÓN
+    # =====================================================================
+    def export(self, path: str) -> int:
+        """
+        Guarda los spans del buffer en ``path`` (JSON Trace Event).
+
+        Returns:
+            Número de spans exportados
+        """
+        with self._lock:
+            spans = list(self._spans)
+        pid = os.getpid()
+        events = []
+        for item in spans:
+            args = {"view": item.view}
+            args.update({key: value if isinstance(value, (int, float, str, bool)) else str(value)
+                         for key, value in item.attrs.items()})
+            events.append({
+                "name": item.name,
+                "cat": item.name.split(".", 1)[0].split(" ", 1)[0],
+                "ph": "X",
+                "ts": round((item.start - self._epoch) * 1e6, 1),
+                "dur": round(item.duration * 1e6, 1),
+                "pid": pid,
+                "tid": item.thread,
+                "args": args,
+            })
+        payload = {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"summary": self.summary(), "views": self.views()},
+        }
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False)
+        logger.info("Trazas de rendimiento exportadas a %s (%d spans)", path, len(events))
+        return len(events)
+
+
+recorder = PerfRecorder()
+
+
+def span(name: str, **attrs):
+    """Cronometra un bloque en el ``recorder`` global (ver ``PerfRecorder.span``)."""
+    return recorder.span(name, **attrs)
+
+
+def timed(name: str) -> Callable:
+    """Decorador: cada llamada a la función es un span ``name``."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with recorder.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -3,7 +3,8 @@ Configuración de la aplicación
 """
 
 import os
-from typing import Optional
+import sys
+from typing import Optional, Tuple
 
 
 class Settings:
@@ -14,6 +15,78 @@ class Settings:
     # Puede configurarse con variable de entorno: export API_BASE_URL="http://localhost:8080/crudxtart"
     API_BASE_URL: str = os.getenv("API_BASE_URL", "http://localhost:8080/crudxtart")
     API_TIMEOUT: int = int(os.getenv("API_TIMEOUT", "30"))
+    # Timeouts separados: conectar debe fallar rápido si el backend está caído;
+    # la lectura puede tardar más (listados e informes grandes)
+    API_CONNECT_TIMEOUT: float = float(os.getenv("API_CONNECT_TIMEOUT", "3.05"))
+    API_READ_TIMEOUT: float = float(os.getenv("API_READ_TIMEOUT", str(API_TIMEOUT)))
+    
+    # Resiliencia: reintentos (solo GET/PUT/DELETE) y circuit breaker por endpoint
+    API_RETRY_ATTEMPTS: int = int(os.getenv("API_RETRY_ATTEMPTS", "3"))
+    API_RETRY_BACKOFF: float = float(os.getenv("API_RETRY_BACKOFF", "0.3"))
+    API_RETRY_BACKOFF_MAX: float = float(os.getenv("API_RETRY_BACKOFF_MAX", "5"))
+    API_CIRCUIT_THRESHOLD: int = int(os.getenv("API_CIRCUIT_THRESHOLD", "5"))
+    API_CIRCUIT_RESET: float = float(os.getenv("API_CIRCUIT_RESET", "30"))
+    
+    # Pool de conexiones HTTP (requests/urllib3) y keep-alive
+    HTTP_POOL_CONNECTIONS: int = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+    HTTP_POOL_MAXSIZE: int = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+    HTTP_POOL_BLOCK: bool = os.getenv("HTTP_POOL_BLOCK", "false").lower() in ("1", "true", "yes")
+    HTTP_KEEPALIVE: bool = os.getenv("HTTP_KEEPALIVE", "true").lower() in ("1", "true", "yes")
+    HTTP_KEEPALIVE_IDLE: int = int(os.getenv("HTTP_KEEPALIVE_IDLE", "60"))
+    # Compresión de respuestas (gzip/deflate, y br/zstd si están instalados)
+    HTTP_COMPRESSION: bool = os.getenv("HTTP_COMPRESSION", "true").lower() in ("1", "true", "yes")
+    # Respuestas sin comprimir de al menos este tamaño se marcan en las métricas
+    HTTP_COMPRESSION_MIN_SIZE: int = int(os.getenv("HTTP_COMPRESSION_MIN_SIZE", "2048"))
+    
+    # Proyección de campos en listados: auto (detectar soporte), on u off
+    API_FIELD_SELECTION: str = os.getenv("API_FIELD_SELECTION", "auto")
+    API_FIELDS_PARAM: str = os.getenv("API_FIELDS_PARAM", "fields")
+    
+    # Sincronización incremental de listados: auto (detectar soporte), on u off (solo hash)
+    API_SYNC_MODE: str = os.getenv("API_SYNC_MODE", "auto")
+    API_SYNC_PARAM: str = os.getenv("API_SYNC_PARAM", "updated_since")
+    API_SYNC_TIMESTAMP_FIELD: str = os.getenv("API_SYNC_TIMESTAMP_FIELD", "updated_at")
+    # Cada cuántos segundos se recarga el listado completo para detectar bajas (0 = nunca)
+    API_SYNC_FULL_INTERVAL: float = float(os.getenv("API_SYNC_FULL_INTERVAL", "900"))
+    # Segundos que vale un "este presupuesto no tiene facturas" sin volver a preguntar
+    PRESUPUESTO_FACTURAS_TTL: float = float(os.getenv("PRESUPUESTO_FACTURAS_TTL", "60"))
+    
+    # Caché local persistente (SQLite) de listados entre sesiones
+    LOCAL_CACHE: bool = os.getenv("LOCAL_CACHE", "true").lower() in ("1", "true", "yes")
+    LOCAL_CACHE_DIR: str = os.getenv("LOCAL_CACHE_DIR", "")
+    # Segundos que los datos de referencia se consideran al día antes de revalidarlos
+    LOCAL_CACHE_TTL: float = float(os.getenv("LOCAL_CACHE_TTL", "300"))
+    
+    # Modo sin conexión: lecturas desde la caché local y escrituras en cola
+    OFFLINE_MODE: bool = os.getenv("OFFLINE_MODE", "true").lower() in ("1", "true", "yes")
+    # Segundos entre comprobaciones de si el backend vuelve a responder
+    OFFLINE_PROBE_INTERVAL: float = float(os.getenv("OFFLINE_PROBE_INTERVAL", "15"))
+    # Días que valen las credenciales del último login para entrar sin conexión
+    OFFLINE_LOGIN_DAYS: float = float(os.getenv("OFFLINE_LOGIN_DAYS", "7"))
+    
+    # Precarga en segundo plano de la vista siguiente más probable
+    PREFETCH: bool = os.getenv("PREFETCH", "true").lower() in ("1", "true", "yes")
+    # Segundos sin peticiones del usuario antes de precargar
+    PREFETCH_IDLE_DELAY: float = float(os.getenv("PREFETCH_IDLE_DELAY", "1.5"))
+    # Segundos que vale un resultado precargado (se usa una sola vez)
+    PREFETCH_TTL: float = float(os.getenv("PREFETCH_TTL", "30"))
+    
+    # Hilos del planificador de peticiones en segundo plano (uno queda para las interactivas)
+    API_SCHEDULER_WORKERS: int = int(os.getenv("API_SCHEDULER_WORKERS", "4"))
+    
+    # Refresco automático del dashboard: intervalo mínimo en segundos (0 = desactivado)
+    # y máximo al que se alarga mientras las estadísticas no cambian
+    DASHBOARD_REFRESH_INTERVAL: float = float(os.getenv("DASHBOARD_REFRESH_INTERVAL", "30"))
+    DASHBOARD_REFRESH_MAX: float = float(os.getenv("DASHBOARD_REFRESH_MAX", "300"))
+    # Indicadores del dashboard: meses de las tendencias y días tras los que una
+    # factura sin pagar cuenta como vencida
+    KPI_TREND_MONTHS: int = int(os.getenv("KPI_TREND_MONTHS", "12"))
+    KPI_OVERDUE_DAYS: int = int(os.getenv("KPI_OVERDUE_DAYS", "30"))
+    
+    # Instrumentación de rendimiento (spans de las rutas críticas y panel de
+    # desarrollo con Ctrl+Shift+P) y spans que se conservan para el panel y la traza
+    PERF_TRACE: bool = os.getenv("PERF_TRACE", "true").lower() in ("1", "true", "yes")
+    PERF_BUFFER_SIZE: int = int(os.getenv("PERF_BUFFER_SIZE", "2000"))
     
     # Application
     APP_NAME: str = "CRM XTART"
@@ -25,6 +98,10 @@ class Settings:
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Máximo de caracteres de un payload en los logs y frecuencia de muestreo
+    # de los mensajes repetitivos (1 = registrar todos)
+    LOG_PAYLOAD_MAX_CHARS: int = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "300"))
+    LOG_SAMPLE_EVERY: int = int(os.getenv("LOG_SAMPLE_EVERY", "50"))
     
     @classmethod
     def get_api_url(cls) -> str:
@@ -35,4 +112,22 @@ class Settings:
     def get_timeout(cls) -> int:
         """Obtiene el timeout para las peticiones"""
         return cls.API_TIMEOUT
+    
+    @classmethod
+    def get_cache_dir(cls) -> str:
+        """Directorio de la caché local (por defecto, el de datos de la aplicación del usuario)"""
+        if cls.LOCAL_CACHE_DIR:
+            return cls.LOCAL_CACHE_DIR
+        if os.name == "nt":
+            base = os.getenv("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+            return os.path.join(base, "CRM XTART")
+        if sys.platform == "darwin":
+            return os.path.expanduser("~/Library/Caches/CRM XTART")
+        base = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        return os.path.join(base, "crm-xtart")
+    
+    @classmethod
+    def get_timeouts(cls) -> Tuple[float, float]:
+        """Timeouts (conexión, lectura) en el formato de requests"""
+        return (cls.API_CONNECT_TIMEOUT, cls.API_READ_TIMEOUT)
 
@@ -4,8 +4,10 @@ Componente de tabla para mostrar datos
 
 import tkinter as tk
 from tkinter import ttk
-from typing import List, Dict, Optional, Callable
-import json
+from typing import List, Dict, Optional, Callable, Iterable, Union
+
+from src.data.column_store import ColumnStore
+from src.utils.perf import timed
 
 
 def normalize_column_header(name: str) -> str:
@@ -35,8 +37,9 @@ class DataTable(ttk.Frame):
         super().__init__(parent, **kwargs)
         
         self.columns = columns
-        self.data = []
-        self.filtered_data = []
+        # Datos en formato columnar; las filas visibles son índices sobre el almacén
+        self.store = ColumnStore()
+        self.visible_rows: List[int] = []
         self.on_select = on_select
         self.on_double_click = on_double_click
         self.current_page = 1
@@ -125,27 +128,75 @@ class DataTable(ttk.Frame):
         ttk.Button(pagination_frame, text="Siguiente ▶", 
                   command=self._next_page).pack(side=tk.LEFT, padx=2)
     
-    def set_data(self, data: List[Dict]):
-        """Establece los datos de la tabla"""
-        # Asegurar que data no sea None
-        if data is None:
-            data = []
-        self.data = data
-        self.filtered_data = data.copy() if data else []
+    @property
+    def data(self) -> ColumnStore:
+        """Datos completos de la tabla"""
+        return self.store
+    
+    def set_data(self, data: Union[List[Dict], ColumnStore, None]) -> ColumnStore:
+        """
+        Establece los datos de la tabla.
+        
+        Args:
+            data: Lista de diccionarios o ``ColumnStore`` ya construido
+        
+        Returns:
+            El ``ColumnStore`` que respalda la tabla (sin copias de los registros)
+        """
+        self.store = ColumnStore.from_rows(data)
+        self.visible_rows = list(range(len(self.store)))
         self.current_page = 1
         self._refresh_table()
+        return self.store
     
+    def apply_changes(self, rows: Iterable[Dict], deleted: Iterable = (),
+                      key: str = "id") -> ColumnStore:
+        """
+        Aplica un cambio incremental sin reconstruir el almacén.
+
+        Args:
+            rows: Registros nuevos o modificados (completos)
+            deleted: Valores de ``key`` de las filas eliminadas
+            key: Columna que identifica cada fila
+
+        Returns:
+            El ``ColumnStore`` que respalda la tabla
+        """
+        rows = list(rows)
+        deleted = list(deleted)
+        if not rows and not deleted:
+            return self.store
+        store = self.store
+        store.apply_changes(rows, deleted, key)
+
+        # Se muestran todas las filas, conservando la ordenación y la página
+        self.visible_rows = list(range(len(store)))
+        self._apply_sort()
+        total_pages = max(1, (len(self.visible_rows) + self.items_per_page - 1) // self.items_per_page)
+        self.current_page = min(self.current_page, total_pages)
+        self._refresh_table()
+        return store
+
     def filter_data(self, filter_func: Callable):
-        """Filtra los datos usando una función"""
-        self.filtered_data = [row for row in self.data if filter_func(row)]
+        """Filtra los datos usando una función (recibe una vista tipo dict de cada fila)"""
+        self.set_visible_rows(self.store.select(filter_func))
+    
+    def filter_contains(self, column: str, text: str):
+        """Filtra las filas cuyo valor en ``column`` contiene ``text``"""
+        if not text or not text.strip():
+            self.clear_filter()
+            return
+        self.set_visible_rows(self.store.select_contains(column, text))
+    
+    def set_visible_rows(self, rows: Iterable[int]):
+        """Muestra solo las filas indicadas (índices del almacén)"""
+        self.visible_rows = list(rows)
         self.current_page = 1
         self._refresh_table()
     
     def clear_filter(self):
         """Limpia el filtro"""
-        self.filtered_data = self.data.copy()
-        self.current_page = 1
-        self._refresh_table()
+        self.set_visible_rows(range(len(self.store)))
     
     def _sort_by_column(self, column: str):
         """Ordena por columna"""
@@ -155,41 +206,44 @@ class DataTable(ttk.Frame):
             self.sort_column = column
             self.sort_reverse = False
         
-        # Ordenar datos
+        self._apply_sort()
+        self._refresh_table()
+    
+    def _apply_sort(self):
+        """Ordena las filas visibles según la columna de ordenación actual"""
+        if self.sort_column is None:
+            return
         try:
-            self.filtered_data.sort(
-                key=lambda x: str(x.get(column, "")).lower(),
-                reverse=self.sort_reverse
+            self.visible_rows = self.store.sort_rows(
+                self.visible_rows, self.sort_column, reverse=self.sort_reverse
             )
         except Exception:
             pass
-        
-        self._refresh_table()
     
+    @timed("table.refresh")
     def _refresh_table(self):
         """Actualiza la visualización de la tabla"""
         # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
         
         # Calcular paginación
-        total_pages = max(1, (len(self.filtered_data) + self.items_per_page - 1) // self.items_per_page)
+        total_pages = max(1, (len(self.visible_rows) + self.items_per_page - 1) // self.items_per_page)
         start_idx = (self.current_page - 1) * self.items_per_page
         end_idx = start_idx + self.items_per_page
-        page_data = self.filtered_data[start_idx:end_idx]
+        page_rows = self.visible_rows[start_idx:end_idx]
         
-        # Insertar datos con tags para separadores y colores alternados
-        for idx, row in enumerate(page_data):
-            values = [str(row.get(col["name"], "")) for col in self.columns]
-            # Convertir el diccionario a JSON string para almacenarlo en los tags
-            # Tkinter solo acepta strings en los tags
-            json_str = json.dumps(row, ensure_ascii=False)
+        # Insertar filas usando el índice del almacén como identificador del item
+        column_names = [col["name"] for col in self.columns]
+        for idx, row_index in enumerate(page_rows):
+            values = [str(self.store.value(row_index, name, "")) for name in column_names]
             # Alternar colores de fila para mejor legibilidad
             row_tag = "evenrow" if idx % 2 == 0 else "oddrow"
-            self.tree.insert("", tk.END, values=values, tags=(json_str, row_tag))
+            self.tree.insert("", tk.END, iid=str(row_index), values=values, tags=(row_tag,))
         
         # Actualizar label de paginación
-        self.page_label.config(text=f"Página {self.current_page} de {total_pages} (Total: {len(self.filtered_data)})")
+        self.page_label.config(text=f"Página {self.current_page} de {total_pages} (Total: {len(self.visible_rows)})")
     
     def _prev_page(self):
         """Página anterior"""
@@ -199,54 +253,35 @@ class DataTable(ttk.Frame):
     
     def _next_page(self):
         """Página siguiente"""
-        total_pages = max(1, (len(self.filtered_data) + self.items_per_page - 1) // self.items_per_page)
+        total_pages = max(1, (len(self.visible_rows) + self.items_per_page - 1) // self.items_per_page)
         if self.current_page < total_pages:
             self.current_page += 1
             self._refresh_table()
     
     def _on_select(self, event):
         """Maneja la selección de una fila"""
-        selection = self.tree.selection()
-        if selection and self.on_select:
-            item = self.tree.item(selection[0])
-            tags = item.get("tags", [])
-            if tags:
-                try:
-                    # Parsear el JSON string almacenado en los tags
-                    row_data = json.loads(tags[0])
-                    self.on_select(row_data)
-                except json.JSONDecodeError:
-                    # Si hay error al parsear JSON, ignorar
-                    pass
+        if self.on_select:
+            row_data = self.get_selected()
+            if row_data is not None:
+                self.on_select(row_data)
     
     def _on_double_click(self, event):
         """Maneja el doble clic"""
-        selection = self.tree.selection()
-        if selection and self.on_double_click:
-            item = self.tree.item(selection[0])
-            tags = item.get("tags", [])
-            if tags:
-                try:
-                    # Parsear el JSON string almacenado en los tags
-                    row_data = json.loads(tags[0])
-                    self.on_double_click(row_data)
-                except json.JSONDecodeError:
-                    # Si hay error al parsear JSON, ignorar
-                    pass
+        if self.on_double_click:
+            row_data = self.get_selected()
+            if row_data is not None:
+                self.on_double_click(row_data)
     
     def get_selected(self) -> Optional[Dict]:
-        """Obtiene el elemento seleccionado"""
+        """Obtiene el elemento seleccionado (como diccionario independiente)"""
         selection = self.tree.selection()
         if selection:
-            item = self.tree.item(selection[0])
-            tags = item.get("tags", [])
-            if tags:
-                try:
-                    # Parsear el JSON string almacenado en los tags
-                    return json.loads(tags[0])
-                except json.JSONDecodeError:
-                    # Si hay error al parsear JSON, devolver None
-                    return None
+            try:
+                row_index = int(selection[0])
+            except ValueError:
+                return None
+            if 0 <= row_index < len(self.store):
+                return self.store.row_dict(row_index)
         return None
     
     def clear_selection(self):
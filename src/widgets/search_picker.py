@@ -0,0 +1,219 @@
+"""
+Selector con búsqueda incremental (typeahead) para listas grandes
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Optional
+
+from src.data.search_index import SearchIndex
+
+
+class SearchPicker(ttk.Frame):
+    """
+    Campo de texto con lista desplegable de coincidencias.
+
+    A diferencia de un ``ttk.Combobox`` con todas las opciones, solo muestra
+    los ``max_results`` primeros resultados del índice en cada pulsación, y
+    guarda el ID del registro elegido (``get_id``) en lugar de tener que
+    extraerlo del texto mostrado.
+    """
+
+    def __init__(self, parent, index: Optional[SearchIndex] = None,
+                 on_select: Optional[Callable[[Any], None]] = None,
+                 max_results: int = 15, width: int = 40, **kwargs):
+        """
+        Args:
+            parent: Widget padre
+            index: Índice de búsqueda con los registros seleccionables
+            on_select: Callback con el ID seleccionado
+            max_results: Máximo de coincidencias mostradas
+            width: Ancho del campo de texto
+        """
+        super().__init__(parent, **kwargs)
+        self.index = index or SearchIndex()
+        self.on_select = on_select
+        self.max_results = max_results
+        self._selected_id: Any = None
+        self._selected_label = ""
+        self._results = []
+        self._popup: Optional[tk.Toplevel] = None
+        self._listbox: Optional[tk.Listbox] = None
+        self._pending_search = None
+
+        self.var = tk.StringVar()
+        self.entry = ttk.Entry(self, textvariable=self.var, width=width)
+        self.entry.pack(fill=tk.X, expand=True)
+
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Down>", self._focus_results)
+        self.entry.bind("<Return>", self._select_first)
+        self.entry.bind("<Escape>", lambda e: self._hide_popup())
+        self.entry.bind("<FocusOut>", self._on_focus_out)
+        self.entry.bind("<Button-1>", lambda e: self._schedule_search())
+
+    # =====================================================================
+    # API PÚBLICA
+    # =====================================================================
+    def set_index(self, index: SearchIndex):
+        """Sustituye el índice (p. ej. tras crear un registro nuevo)."""
+        self.index = index
+        if self._selected_id is not None:
+            label = index.label_of(self._selected_id)
+            if label:
+                self._set_text(label)
+                self._selected_label = label
+
+    def get_id(self) -> Any:
+        """ID del registro seleccionado o None."""
+        return self._selected_id
+
+    def set_id(self, record_id: Any, label: Optional[str] = None):
+        """
+        Selecciona un registro por ID.
+
+        Args:
+            record_id: ID a seleccionar (None para limpiar)
+            label: Texto a mostrar si el ID no está en el índice
+        """
+        if record_id is None or record_id == "":
+            self.clear()
+            return
+        record_id = self.index.resolve_id(record_id)
+        text = self.index.label_of(record_id) or label or str(record_id)
+        self._selected_id = record_id
+        self._selected_label = text
+        self._set_text(text)
+
+    def clear(self):
+        self._selected_id = None
+        self._selected_label = ""
+        self._set_text("")
+
+    def get(self) -> str:
+        """Texto mostrado (compatibilidad con Combobox)."""
+        return self.var.get()
+
+    def configure_state(self, state: str):
+        self.entry.configure(state=state)
+
+    # =====================================================================
+    # BÚSQUEDA
+    # =====================================================================
+    def _set_text(self, text: str):
+        self.var.set(text)
+        self.entry.icursor(tk.END)
+
+    def _on_key(self, event):
+        if event.keysym in ("Down", "Up", "Return", "Escape", "Tab", "Shift_L", "Shift_R"):
+            return
+        # Cualquier edición invalida la selección anterior
+        if self.var.get() != self._selected_label:
+            self._selected_id = None
+            self._selected_label = ""
+        self._schedule_search()
+
+    def _schedule_search(self):
+        # Agrupar pulsaciones rápidas en una única búsqueda
+        if self._pending_search is not None:
+            self.after_cancel(self._pending_search)
+        self._pending_search = self.after(120, self._run_search)
+
+    def _run_search(self):
+        self._pending_search = None
+        if not self.winfo_exists():
+            return
+        self._results = self.index.search(self.var.get(), self.max_results)
+        if not self._results:
+            self._hide_popup()
+            return
+        self._show_popup()
+        self._listbox.delete(0, tk.END)
+        for _, label in self._results:
+            self._listbox.insert(tk.END, label)
+
+    # =====================================================================
+    # LISTA DESPLEGABLE
+    # =====================================================================
+    def _show_popup(self):
+        if self._popup is None or not self._popup.winfo_exists():
+            self._popup = tk.Toplevel(self)
+            self._popup.wm_overrideredirect(True)
+            self._popup.transient(self.winfo_toplevel())
+            self._listbox = tk.Listbox(self._popup, height=min(self.max_results, 10),
+                                       activestyle="dotbox", exportselection=False)
+            self._listbox.pack(fill=tk.BOTH, expand=True)
+            self._listbox.bind("<ButtonRelease-1>", self._select_current)
+            self._listbox.bind("<Return>", self._select_current)
+            self._listbox.bind("<Escape>", lambda e: (self._hide_popup(), self.entry.focus_set()))
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self._popup.geometry(f"{max(self.entry.winfo_width(), 200)}x{min(len(self._results), 10) * 18 + 6}+{x}+{y}")
+        self._popup.deiconify()
+        self._popup.lift()
+
+    def _hide_popup(self):
+        if self._popup is not None and self._popup.winfo_exists():
+            self._popup.withdraw()
+
+    def _focus_results(self, event=None):
+        if self._popup is not None and self._popup.winfo_exists() and self._results:
+            self._listbox.focus_set()
+            self._listbox.selection_clear(0, tk.END)
+            self._listbox.selection_set(0)
+            self._listbox.activate(0)
+        else:
+            self._schedule_search()
+        return "break"
+
+    def _select_first(self, event=None):
+        if self._pending_search is not None:
+            # Enter antes de que venza la espera: los resultados son del texto anterior
+            self.after_cancel(self._pending_search)
+            self._run_search()
+        if self._results and self._selected_id is None:
+            self._choose(0)
+        return "break"
+
+    def _select_current(self, event=None):
+        selection = self._listbox.curselection() if self._listbox else ()
+        if selection:
+            self._choose(selection[0])
+        return "break"
+
+    def _choose(self, position: int):
+        record_id, label = self._results[position]
+        self._selected_id = record_id
+        self._selected_label = label
+        self._set_text(label)
+        self._hide_popup()
+        self.entry.focus_set()
+        if self.on_select:
+            self.on_select(record_id)
+
+    def _on_focus_out(self, event):
+        # Retrasar para permitir el clic en la lista
+        self.after(150, self._hide_if_unfocused)
+
+    def _hide_if_unfocused(self):
+        if not self.winfo_exists():
+            return
+        try:
+            focused = self.focus_get()
+        except (KeyError, tk.TclError):
+            focused = None
+        if focused is not self._listbox and focused is not self.entry:
+            self._hide_popup()
+
+    def destroy(self):
+        if self._pending_search is not None:
+            try:
+                self.after_cancel(self._pending_search)
+            except tk.TclError:
+                pass
+        if self._popup is not None:
+            try:
+                self._popup.destroy()
+            except tk.TclError:
+                pass
+        super().destroy()
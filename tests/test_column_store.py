@@ -0,0 +1,69 @@
+"""
+Almacén columnar de la tabla (``ColumnStore`` y ``RowView``).
+"""
+
+from collections.abc import Mapping
+
+import pytest
+
+from src.data.column_store import ColumnStore
+
+ROWS = [
+    {"id": 1, "nombre": "beta", "importe": 10, "activo": True,
+     "cliente": {"id_cliente": 3, "nombre": "Ana"}, "tags": ["a"], "nota": None},
+    {"id": 2, "nombre": "Alfa", "importe": 2.5, "activo": False, "cliente": None, "tags": [], "extra": "x"},
+    {"id": 3, "nombre": None, "importe": None, "cliente": {"id_cliente": 10, "nombre": "Luis"}},
+    {"id": 4, "nombre": "ñu", "importe": "7", "activo": None},
+    {"id": 5},
+]
+
+
+def test_row_dict_devuelve_las_filas_originales():
+    store = ColumnStore.from_rows(ROWS)
+
+    for index, row in enumerate(ROWS):
+        restored = store.row_dict(index)
+        assert restored == row
+        assert list(restored) == list(row)
+        assert [type(value) for value in restored.values()] == [type(value) for value in row.values()]
+    assert store.to_rows() == ROWS
+
+
+@pytest.mark.parametrize("column", ["id", "nombre", "importe", "activo", "cliente", "tags", "extra", "otra"])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_misma_ordenacion_que_la_tabla_original(column, reverse):
+    store = ColumnStore.from_rows(ROWS)
+    expected = sorted(range(len(ROWS)), key=lambda i: str(ROWS[i].get(column, "")).lower(), reverse=reverse)
+
+    assert store.sort_rows(range(len(ROWS)), column, reverse=reverse) == expected
+
+
+def test_apply_changes_sustituye_anade_y_borra():
+    store = ColumnStore.from_rows(ROWS)
+
+    store.apply_changes(
+        [{"id": 2, "nombre": "Alfa 2", "importe": 3},
+         {"id": 6, "nombre": "nuevo", "cliente": {"id_cliente": 3, "nombre": "Ana"}}],
+        deleted=[1, 99],
+    )
+
+    rows = store.to_rows()
+    assert [row["id"] for row in rows] == [2, 3, 4, 5, 6]
+    # La fila modificada se sustituye entera: sin los campos que ya no trae
+    assert rows[0] == {"id": 2, "nombre": "Alfa 2", "importe": 3}
+    assert rows[-1] == {"id": 6, "nombre": "nuevo", "cliente": {"id_cliente": 3, "nombre": "Ana"}}
+    assert store.find("id", 6) == 4 and store.find("id", 1) is None
+
+
+def test_las_filas_son_mapping_y_escriben_en_el_almacen():
+    store = ColumnStore.from_rows(ROWS)
+
+    rows = [row for row in store if isinstance(row, Mapping)]
+    assert len(rows) == len(ROWS)
+
+    rows[2]["rol_nombre"] = "SIN ROL"
+    assert store.row_dict(2)["rol_nombre"] == "SIN ROL"
+    # ``copy`` da un diccionario independiente
+    copy = rows[0].copy()
+    copy["nombre"] = "otro"
+    assert isinstance(copy, dict) and store.value(0, "nombre") == "beta"
@@ -0,0 +1,115 @@
+"""
+Índice presupuesto → facturas alimentado por ``get_facturas_presupuesto``.
+"""
+
+import time
+
+from src.api.rest_helpers import RESTHelpers
+from src.data.presupuesto_index import PresupuestoFacturasIndex
+
+
+class FakeAPI:
+    """Backend mínimo: responde siempre ``facturas`` a ``GET /facturas``."""
+
+    def __init__(self, facturas):
+        self.facturas = facturas
+        self.presupuesto_facturas = PresupuestoFacturasIndex()
+        self.requests = []
+
+    def _request(self, method, endpoint, params=None):
+        self.requests.append((method, endpoint, params))
+        return {"success": True, "data": [dict(f) for f in self.facturas]}
+
+
+def test_backend_que_filtra_sin_campo_de_enlace():
+    # Respuesta filtrada que no incluye el campo de enlace: son de ese presupuesto
+    api = FakeAPI([
+        {"id_factura": 1, "total": 100},
+        {"id_factura": 2, "total": 250},
+    ])
+    helpers = RESTHelpers(api)
+
+    result = helpers.get_facturas_presupuesto(7)
+
+    assert [f["id_factura"] for f in result["data"]] == [1, 2]
+    assert api.presupuesto_facturas.tiene_facturas(7) is True
+    # Nada de esto dice que los demás presupuestos no tengan facturas
+    assert api.presupuesto_facturas.completo is False
+    assert api.presupuesto_facturas.tiene_facturas(8) is None
+
+
+def test_backend_que_ignora_el_filtro_con_otros_presupuestos():
+    api = FakeAPI([
+        {"id_factura": 1, "id_presupuesto": 7},
+        {"id_factura": 2, "id_presupuesto": 9},
+        {"id_factura": 3, "notas": "Factura manual"},
+    ])
+    helpers = RESTHelpers(api)
+
+    result = helpers.get_facturas_presupuesto(7)
+
+    assert [f["id_factura"] for f in result["data"]] == [1]
+    assert api.presupuesto_facturas.tiene_facturas(9) is True
+    # Una consulta filtrada nunca da el índice por completo
+    assert api.presupuesto_facturas.completo is False
+    assert api.presupuesto_facturas.tiene_facturas(10) is None
+    # Lo indexado responde al resto sin volver a preguntar
+    assert helpers.get_facturas_presupuesto(9)["data"][0]["id_factura"] == 2
+    assert len(api.requests) == 1
+
+
+def test_backend_que_filtra():
+    api = FakeAPI([{"id_factura": 1, "id_presupuesto": 7}])
+    helpers = RESTHelpers(api)
+
+    result = helpers.get_facturas_presupuesto(7)
+
+    assert [f["id_factura"] for f in result["data"]] == [1]
+    assert api.presupuesto_facturas.tiene_facturas(7) is True
+    # Solo se sabe de ese presupuesto
+    assert api.presupuesto_facturas.tiene_facturas(9) is None
+
+
+def test_presupuesto_sin_facturas():
+    helpers = RESTHelpers(FakeAPI([]))
+
+    assert helpers.get_facturas_presupuesto(7) == {"success": True, "data": []}
+    assert helpers.api.presupuesto_facturas.tiene_facturas(7) is False
+
+
+def test_id_de_presupuesto_no_numerico():
+    api = FakeAPI([{"id_factura": 1, "id_presupuesto": 7}])
+
+    result = RESTHelpers(api).get_facturas_presupuesto("abc")
+
+    assert result["success"] is True
+
+
+def test_refresh_pregunta_aunque_el_indice_diga_que_no():
+    api = FakeAPI([])
+    helpers = RESTHelpers(api)
+    helpers.get_facturas_presupuesto(7)
+
+    # Otro usuario factura el presupuesto
+    api.facturas = [{"id_factura": 5, "id_presupuesto": 7}]
+    assert helpers.get_facturas_presupuesto(7)["data"] == []
+    assert [f["id_factura"] for f in helpers.get_facturas_presupuesto(7, refresh=True)["data"]] == [5]
+    assert len(api.requests) == 2
+
+
+def test_las_respuestas_negativas_caducan(monkeypatch):
+    index = PresupuestoFacturasIndex(ttl=60)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    index.rebuild([{"id_factura": 1, "id_presupuesto": 7}])
+    index.mark_consultado(8)
+
+    assert index.tiene_facturas(8) is False
+    assert index.tiene_facturas(9) is False
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert index.completo is False
+    assert index.tiene_facturas(8) is None
+    assert index.tiene_facturas(9) is None
+    # Las positivas no caducan: las bajas se quitan con ``remove_factura``
+    assert index.tiene_facturas(7) is True
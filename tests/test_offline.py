@@ -0,0 +1,170 @@
+"""
+Modo sin conexión: reenvío de la cola, conflictos y credenciales.
+"""
+
+import time
+
+import pytest
+
+from src.api import offline
+from src.api.offline import NETWORK_CONNECTION, OfflineCredentials, OfflineManager, same_value
+from src.data.local_store import LocalStore
+from src.data.write_queue import CONFLICT, PENDING, WriteQueue
+from src.utils.settings import Settings
+
+
+def test_valores_equivalentes():
+    assert same_value(10, "10.00")
+    assert same_value(10, 10.0)
+    assert same_value({"id_cliente": 3, "nombre": "Ana"}, 3)
+    assert not same_value(10, "10.5")
+    assert not same_value("A-1", "a-1")
+    assert not same_value(True, 1.0)
+
+
+def test_solo_cuentan_los_campos_modificados():
+    base = {"id_cliente": 3, "nombre": "Ana", "telefono": "600000000"}
+    server = {"id_cliente": 3, "nombre": "Ana", "telefono": "699999999"}
+
+    # Otro usuario cambió el teléfono; sin conexión se cambió el nombre
+    assert not OfflineManager._changed_since(base, server, ["nombre"])
+    assert OfflineManager._changed_since(base, server, ["telefono"])
+    # Una baja compara el registro entero
+    assert OfflineManager._changed_since(base, server)
+
+
+def test_sin_falsos_conflictos_por_formato():
+    base = {"id_factura": 7, "total": 121, "id_cliente": 3}
+    server = {"id_factura": 7, "total": "121.00", "id_cliente": {"id_cliente": 3, "nombre": "Ana"}}
+
+    assert not OfflineManager._changed_since(base, server, ["total", "id_cliente"])
+    assert not OfflineManager._changed_since(base, server)
+
+
+def test_misma_marca_de_tiempo_no_es_conflicto():
+    base = {"id_pago": 1, "importe": 10, "updated_at": "2026-01-01T00:00:00"}
+    server = {"id_pago": 1, "importe": 12, "updated_at": "2026-01-01T00:00:00"}
+
+    assert not OfflineManager._changed_since(base, server, ["importe"])
+    server["updated_at"] = "2026-01-02T00:00:00"
+    assert OfflineManager._changed_since(base, server, ["importe"])
+
+
+# =====================================================================
+# REENVÍO DE LA COLA
+# =====================================================================
+class FakeAPI:
+    """Lo que usa ``OfflineManager`` del cliente REST, con respuestas fijas."""
+
+    def __init__(self, server=None, create=None):
+        self.server = server or {}
+        self.create = create or {"success": True, "data": {"id_cliente": 100}}
+        self.sent = []
+        self.reference_cache = self
+        self.helpers = self
+
+    def _send(self, method, endpoint, params=None):
+        record = self.server.get(params["id"])
+        return {"success": record is not None, "data": [record] if record else []}
+
+    def _create_now(self, entity, payload):
+        self.sent.append(("POST", entity, payload))
+        return self.create
+
+    def _update_now(self, entity, entity_id, payload):
+        self.sent.append(("PUT", entity, entity_id, payload))
+        return {"success": True, "data": payload}
+
+    def _delete_now(self, entity, entity_id):
+        self.sent.append(("DELETE", entity, entity_id))
+        return {"success": True}
+
+    def invalidate(self, entity):
+        pass
+
+    def invalidate_client_snapshot(self):
+        pass
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalStore(str(tmp_path / "cache.db"))
+    yield store
+    store.close()
+
+
+def manager_for(api, store):
+    manager = OfflineManager(api)
+    manager.store = store
+    manager.queue = WriteQueue(store)
+    return manager
+
+
+def test_replay_envia_en_orden_y_remapea(store):
+    api = FakeAPI()
+    manager = manager_for(api, store)
+    create = manager.queue.enqueue("POST", "clientes", payload={"nombre": "Ana"})
+    manager.queue.enqueue("POST", "facturas", payload={"id_cliente": create.entity_id})
+
+    summary = manager.replay()
+
+    assert summary == {"sent": 2, "conflicts": 0, "failed": 0, "pending": 0}
+    assert api.sent == [("POST", "clientes", {"nombre": "Ana"}),
+                        ("POST", "facturas", {"id_cliente": 100})]
+
+
+def test_replay_se_detiene_con_un_error_de_red(store):
+    api = FakeAPI(create={"success": False, "error": "Sin conexión", "network_error": NETWORK_CONNECTION})
+    manager = manager_for(api, store)
+    manager.queue.enqueue("POST", "clientes", payload={"nombre": "Ana"})
+    manager.queue.enqueue("POST", "clientes", payload={"nombre": "Luis"})
+
+    summary = manager.replay()
+
+    # La primera sigue pendiente y la segunda ni se intenta
+    assert summary == {"sent": 0, "conflicts": 0, "failed": 0, "pending": 2}
+    assert len(api.sent) == 1
+    assert [entry.status for entry in manager.queue.entries(None)] == [PENDING, PENDING]
+
+
+def test_replay_marca_el_conflicto(store):
+    base = {"id_cliente": 5, "nombre": "Ana", "telefono": "600"}
+    api = FakeAPI(server={5: {"id_cliente": 5, "nombre": "Ana María", "telefono": "600"}})
+    manager = manager_for(api, store)
+    manager.queue.enqueue("PUT", "clientes", 5, {"nombre": "Anabel"}, base=base)
+    manager.queue.enqueue("PUT", "clientes", 5, {"telefono": "611"}, base=base)
+
+    summary = manager.replay()
+
+    # El nombre cambió en el servidor; el teléfono no, y se envía
+    assert summary == {"sent": 1, "conflicts": 1, "failed": 0, "pending": 0}
+    assert api.sent == [("PUT", "clientes", 5, {"telefono": "611"})]
+    [conflict] = manager.conflicts()
+    assert conflict.status == CONFLICT and conflict.payload == {"nombre": "Anabel"}
+
+
+# =====================================================================
+# CREDENCIALES SIN CONEXIÓN
+# =====================================================================
+@pytest.fixture
+def credentials(tmp_path, monkeypatch):
+    monkeypatch.setattr(offline, "PBKDF2_ITERATIONS", 1000)
+    return OfflineCredentials(str(tmp_path / "offline_users.json"))
+
+
+def test_credenciales_correctas_e_incorrectas(credentials):
+    user = {"id": 1, "nombre": "Ana"}
+    credentials.remember("http://api", "Ana", "secreto", user)
+
+    assert credentials.verify("http://api", " ana ", "secreto") == user
+    assert credentials.verify("http://api", "Ana", "otra") is None
+    assert credentials.verify("http://api", "Luis", "secreto") is None
+    assert credentials.verify("http://otra-api", "Ana", "secreto") is None
+
+
+def test_credenciales_caducadas(credentials, monkeypatch):
+    credentials.remember("http://api", "Ana", "secreto", {"id": 1})
+    later = time.time() + (Settings.OFFLINE_LOGIN_DAYS + 1) * 86400
+    monkeypatch.setattr(offline.time, "time", lambda: later)
+
+    assert credentials.verify("http://api", "Ana", "secreto") is None
@@ -0,0 +1,49 @@
+"""
+GET aprendidos por vista y su precarga con la marca de agua actual.
+"""
+
+from src.api.prefetch import WATERMARK, NavigationModel, Prefetcher
+from src.data.local_store import LocalStore
+
+
+def learn(prefetcher, view, endpoint, params):
+    prefetcher.navigate(view)
+    with prefetcher.user_request(("GET", endpoint, ()), endpoint, params):
+        pass
+    prefetcher.navigate("Dashboard")
+    return prefetcher.model.loads[view]
+
+
+def test_no_se_aprende_la_marca_de_agua():
+    prefetcher = Prefetcher(api=None)
+
+    loads = learn(prefetcher, "Pagos", "/pagos", {"updated_since": "2026-01-01T00:00:00", "fields": "id_pago"})
+
+    assert loads == [("/pagos", {"updated_since": WATERMARK, "fields": "id_pago"})]
+
+
+def test_modelo_guardado_con_marcas_antiguas():
+    text = '{"transitions": {}, "loads": {"Pagos": [["/pagos", {"updated_since": "2025-12-01"}]]}}'
+
+    model = NavigationModel.from_json(text)
+
+    assert model.loads["Pagos"] == [("/pagos", {"updated_since": WATERMARK})]
+
+
+def test_la_precarga_usa_la_marca_actual_del_listado(tmp_path):
+    store = LocalStore(str(tmp_path / "cache.db"))
+    prefetcher = Prefetcher(api=None)
+    prefetcher.attach(store)
+    params = {"updated_since": WATERMARK, "fields": "id_pago"}
+
+    # Sin nada guardado la ventana pedirá el listado completo
+    assert prefetcher._resolve("/pagos", params) == {"fields": "id_pago"}
+
+    # La ventana (listado proyectado) y los indicadores guardan marcas distintas
+    store.write("pagos", high_water="2026-01-01T00:00:00")
+    store.write("pagos:list", high_water="2026-02-01T00:00:00")
+    assert prefetcher._resolve("/pagos", params) == {"updated_since": "2026-02-01T00:00:00",
+                                                     "fields": "id_pago"}
+    # Los GET que no son de sincronización no cambian
+    assert prefetcher._resolve("/facturas", {"cliente_id": 3}) == {"cliente_id": 3}
+    store.close()
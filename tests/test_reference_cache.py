@@ -0,0 +1,41 @@
+"""
+Listados de referencia: selectores desde caché, "Actualizar" desde el backend.
+"""
+
+from src.api.reference_cache import ReferenceCache
+
+
+class FakeBackend:
+    def __init__(self):
+        self.clientes = [{"id_cliente": 1, "nombre": "Ana"}]
+        self.calls = 0
+
+    def fetch(self, endpoint):
+        self.calls += 1
+        return {"success": True, "data": [dict(c) for c in self.clientes]}
+
+
+def test_get_sirve_de_memoria_dentro_del_ttl():
+    backend = FakeBackend()
+    cache = ReferenceCache(backend.fetch, ttl=300)
+
+    cache.get("clientes")
+    backend.clientes = [{"id_cliente": 1, "nombre": "Ana María"}]
+
+    assert cache.get("clientes")["data"][0]["nombre"] == "Ana"
+    assert backend.calls == 1
+
+
+def test_refresh_va_al_backend_y_actualiza_la_cache():
+    backend = FakeBackend()
+    cache = ReferenceCache(backend.fetch, ttl=300)
+    cache.get("clientes")
+
+    # Otro usuario edita el cliente
+    backend.clientes = [{"id_cliente": 1, "nombre": "Ana María"}]
+
+    assert cache.refresh("clientes")["data"][0]["nombre"] == "Ana María"
+    assert backend.calls == 2
+    # Los selectores ven ya el dato nuevo
+    assert cache.get("clientes")["data"][0]["nombre"] == "Ana María"
+    assert backend.calls == 2
@@ -0,0 +1,120 @@
+"""
+Planificador de peticiones: prioridades, hilo reservado, cancelación y admisión.
+"""
+
+import threading
+
+import pytest
+
+from src.api.scheduler import (BACKGROUND, INTERACTIVE, PREFETCH, CancellationToken, CancelledError,
+                               RequestScheduler, ScheduledRequest, current_priority, current_token,
+                               on_worker, request_context)
+
+
+@pytest.fixture
+def scheduler():
+    """Planificador sin hilos: los trabajos se sacan a mano con ``_next_job``."""
+    scheduler = RequestScheduler(workers=3)
+    scheduler._ensure_workers = lambda: None
+    yield scheduler
+    scheduler.close()
+
+
+def test_orden_por_prioridad_y_llegada(scheduler):
+    prefetch = scheduler.submit(lambda: None, PREFETCH)
+    background = scheduler.submit(lambda: None, BACKGROUND)
+    interactive = scheduler.submit(lambda: None, INTERACTIVE)
+    background_2 = scheduler.submit(lambda: None, BACKGROUND)
+
+    order = [scheduler._next_job() for _ in range(4)]
+
+    assert order == [interactive, background, background_2, prefetch]
+    assert scheduler._next_job() is None
+
+
+def test_el_ultimo_hilo_queda_para_las_interactivas(scheduler):
+    background = scheduler.submit(lambda: None, BACKGROUND)
+    scheduler._running[BACKGROUND] = 2
+
+    assert scheduler._next_job() is None
+
+    interactive = scheduler.submit(lambda: None, INTERACTIVE)
+    assert scheduler._next_job() is interactive
+    scheduler._running[BACKGROUND] = 1
+    assert scheduler._next_job() is background
+
+
+def test_cancel_view_descarta_lo_encolado_de_la_vista(scheduler):
+    old_token = scheduler.view_token
+    view_job = scheduler.submit(lambda: None, INTERACTIVE)
+    background = scheduler.submit(lambda: None, BACKGROUND)
+
+    new_token = scheduler.cancel_view()
+
+    assert new_token is scheduler.view_token and new_token is not old_token
+    assert old_token.cancelled
+    assert view_job.state == "cancelled"
+    with pytest.raises(CancelledError):
+        view_job.wait(0)
+    assert scheduler._next_job() is background
+    assert scheduler.stats()["by_priority"]["interactive"]["cancelled"] == 1
+
+
+def test_dispatch_omite_las_vistas_cerradas():
+    scheduler = RequestScheduler(workers=2)
+    scheduler.ui_attached = True
+    delivered = []
+    closed, current = CancellationToken(), CancellationToken()
+    for name, token in (("cerrada", closed), ("actual", current), ("sin vista", None)):
+        job = ScheduledRequest(lambda: None, INTERACTIVE, token, delivered.append, None)
+        job.result = name
+        scheduler._deliver(job)
+    closed.cancel()
+
+    assert delivered == []
+    assert scheduler.dispatch() == 2
+    assert delivered == ["actual", "sin vista"]
+
+
+def test_el_trabajo_corre_en_un_hilo_del_planificador():
+    scheduler = RequestScheduler(workers=2)
+    token = CancellationToken()
+
+    job = scheduler.submit(lambda: (current_priority(), current_token() is token, on_worker()),
+                           BACKGROUND, token=token)
+
+    assert job.wait(5) == (BACKGROUND, True, True)
+    assert not on_worker()
+    scheduler.close()
+
+
+def test_admit_retiene_el_segundo_plano_tras_las_interactivas():
+    scheduler = RequestScheduler(workers=2)
+    admitted = threading.Event()
+
+    def background():
+        with request_context(BACKGROUND):
+            with scheduler.admit():
+                admitted.set()
+
+    with scheduler.admit():
+        thread = threading.Thread(target=background)
+        thread.start()
+        assert not admitted.wait(0.2)
+        assert scheduler.stats()["interactive_in_flight"] == 1
+
+    assert admitted.wait(5)
+    thread.join(5)
+    assert scheduler.stats()["interactive_in_flight"] == 0
+
+
+def test_admit_no_deja_salir_lo_cancelado():
+    scheduler = RequestScheduler(workers=2)
+    token = CancellationToken()
+    token.cancel()
+
+    with request_context(INTERACTIVE, token):
+        with pytest.raises(CancelledError):
+            with scheduler.admit():
+                pass
+    assert scheduler.stats()["interactive_in_flight"] == 0
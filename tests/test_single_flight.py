@@ -0,0 +1,63 @@
+"""
+Agrupación de GET idénticos: cada llamador recibe sus propias filas.
+"""
+
+import threading
+
+from src.api.single_flight import SingleFlight, copy_result
+
+
+def test_llamadores_agrupados_no_comparten_filas():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"success": True, "data": [{"id_cliente": 1, "nombre": "Ana"}]}
+
+    results = {}
+
+    def caller(name):
+        results[name] = flight.do("clientes", fetch, share=copy_result)
+
+    leader = threading.Thread(target=caller, args=("leader",))
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=caller, args=("follower",))
+    follower.start()
+    # Se libera al líder cuando el seguidor ya está esperando
+    while flight.stats()["saved"] == 0:
+        threading.Event().wait(0.001)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(calls) == 1
+    # Uno normaliza sus filas en el sitio (como ``_normalize_rows``)
+    row = results["leader"]["data"][0]
+    row["id"] = row["id_cliente"]
+    row["nombre"] = row["nombre"].upper()
+
+    assert results["follower"]["data"] == [{"id_cliente": 1, "nombre": "Ana"}]
+    assert results["follower"] is not results["leader"]
+
+
+def test_llamada_no_compartida_sin_copias():
+    flight = SingleFlight()
+    result = {"success": True, "data": [{"id": 1}]}
+
+    assert flight.do("k", lambda: result, share=copy_result) is result
+
+
+def test_copy_result_copia_filas_y_sobre():
+    result = {"success": True, "data": [{"id": 1}]}
+    copied = copy_result(result)
+
+    copied["data"][0]["id"] = 2
+    copied["extra"] = True
+
+    assert result == {"success": True, "data": [{"id": 1}]}
@@ -0,0 +1,146 @@
+"""
+Sincronización incremental de listados (``EntitySync``).
+"""
+
+from src.data.column_store import ColumnStore
+from src.data.local_store import LocalStore
+from src.data.sync import DELTA, FULL, HASH, SUPPORTED, UNSUPPORTED, EntitySync
+
+
+def pago(pago_id, importe, updated_at):
+    return {"id_pago": pago_id, "importe": importe, "updated_at": updated_at}
+
+
+class Backend:
+    """``fetch`` de ``EntitySync``: responde con lo que haya en ``pages``."""
+
+    def __init__(self, *pages):
+        self.pages = list(pages)
+        self.params = []
+
+    def __call__(self, params):
+        self.params.append(params)
+        page = self.pages.pop(0)
+        if isinstance(page, dict) and "success" in page:
+            return page
+        return {"success": True, "data": page}
+
+
+def synced(*rows):
+    """``EntitySync`` de pagos tras una carga completa con ``rows``."""
+    sync = EntitySync("pagos", ("id_pago", "id"), mode="auto", full_interval=0)
+    delta = sync.sync(Backend(list(rows)))["data"]
+    assert delta.mode == FULL
+    return sync
+
+
+def test_restore_devuelve_las_filas_y_no_las_guarda(tmp_path):
+    store = LocalStore(str(tmp_path / "cache.db"))
+    first = EntitySync("pagos", ("id_pago", "id"), store=store)
+    first.sync(Backend([pago(1, 10, "2026-01-01T00:00:00"), pago(2, 20, "2026-01-02T00:00:00")]))
+    store.flush()
+
+    sync = EntitySync("pagos", ("id_pago", "id"), store=store)
+    rows = sync.restore()
+
+    assert [row["id"] for row in rows] == [1, 2]
+    assert sync.high_water == "2026-01-02T00:00:00"
+    # Solo la marca de agua y los hashes: las filas son del llamador
+    assert not any(isinstance(value, list) for value in vars(sync).values())
+    # La siguiente sincronización ya es incremental
+    backend = Backend([])
+    sync.sync(backend)
+    assert backend.params == [{"updated_since": "2026-01-02T00:00:00"}]
+    store.close()
+
+
+def test_el_delta_se_aplica_al_almacen_de_la_tabla():
+    sync = EntitySync("pagos", ("id_pago", "id"))
+    delta = sync.sync(Backend([pago(1, 10, "2026-01-01T00:00:00"), pago(2, 20, "2026-01-02T00:00:00")]))["data"]
+    table = ColumnStore.from_rows(delta.upserted)
+
+    delta = sync.sync(Backend([pago(2, 25, "2026-01-03T00:00:00"), pago(3, 30, "2026-01-03T00:00:00")]))["data"]
+    table.apply_changes(delta.upserted, delta.deleted)
+
+    assert [(row["id"], row["importe"]) for row in table.to_rows()] == [(1, 10), (2, 25), (3, 30)]
+
+
+def test_delta_con_los_registros_modificados():
+    sync = synced(pago(1, 10, "2026-01-01T00:00:00"), pago(2, 20, "2026-01-02T00:00:00"))
+    # La marca es inclusiva: el pago 2 vuelve a llegar sin cambios
+    backend = Backend([pago(2, 20, "2026-01-02T00:00:00"), pago(3, 30, "2026-01-03T00:00:00")])
+
+    delta = sync.sync(backend)["data"]
+
+    assert backend.params == [{"updated_since": "2026-01-02T00:00:00"}]
+    assert delta.mode == DELTA
+    assert [(row["id"], row["importe"]) for row in delta.upserted] == [(3, 30)]
+    assert delta.deleted == []
+    assert sync.support == SUPPORTED
+    assert sync.high_water == "2026-01-03T00:00:00"
+
+
+def test_bajas_por_marca_y_por_lista_de_eliminados():
+    sync = synced(pago(1, 10, "2026-01-01T00:00:00"), pago(2, 20, "2026-01-02T00:00:00"))
+    tombstone = dict(pago(1, 10, "2026-01-03T00:00:00"), deleted=True)
+
+    delta = sync.sync(Backend([tombstone]))["data"]
+    assert (delta.upserted, delta.deleted) == ([], [1])
+
+    # Respuesta con "deleted": los IDs pueden llegar como texto; los desconocidos se ignoran
+    delta = sync.sync(Backend({"changed": [pago(3, 30, "2026-01-04T00:00:00")],
+                               "deleted": ["2", 99]}))["data"]
+    assert [row["id"] for row in delta.upserted] == [3]
+    assert delta.deleted == [2]
+
+
+def test_vuelve_a_la_carga_completa():
+    sync = synced(pago(1, 10, "2026-01-01T00:00:00"))
+
+    delta = sync.sync(Backend([pago(1, 10, "2026-01-01T00:00:00")]), full=True)["data"]
+    assert delta.mode == FULL and [row["id"] for row in delta.upserted] == [1]
+
+    # Un delta con registros sin ID no se puede aplicar: se recarga el listado
+    backend = Backend([{"importe": 5, "updated_at": "2026-01-02T00:00:00"}],
+                      [pago(1, 10, "2026-01-01T00:00:00"), pago(2, 20, "2026-01-02T00:00:00")])
+    delta = sync.sync(backend)["data"]
+    assert backend.params == [{"updated_since": "2026-01-01T00:00:00"}, None]
+    assert delta.mode == FULL and [row["id"] for row in delta.upserted] == [1, 2]
+
+    # Pasado ``full_interval`` la reconciliación es completa
+    sync.full_interval = 60
+    sync._last_full -= 61
+    backend = Backend([pago(1, 10, "2026-01-01T00:00:00")])
+    assert sync.sync(backend)["data"].mode == FULL
+    assert backend.params == [None]
+
+
+def test_backend_que_rechaza_updated_since():
+    sync = synced(pago(1, 10, "2026-01-01T00:00:00"), pago(2, 20, "2026-01-02T00:00:00"))
+    backend = Backend({"success": False, "error": "Parámetro desconocido: updated_since"},
+                      [pago(2, 25, "2026-01-03T00:00:00")])
+
+    delta = sync.sync(backend)["data"]
+
+    assert backend.params == [{"updated_since": "2026-01-02T00:00:00"}, None]
+    assert delta.mode == HASH
+    assert [(row["id"], row["importe"]) for row in delta.upserted] == [(2, 25)]
+    assert delta.deleted == [1]
+    assert sync.support == UNSUPPORTED
+    # Ya no se vuelve a intentar el delta
+    backend = Backend([pago(2, 25, "2026-01-03T00:00:00")])
+    assert sync.sync(backend)["data"].changed == 0
+    assert backend.params == [None]
+
+
+def test_backend_que_ignora_updated_since():
+    sync = synced(pago(1, 10, "2026-01-01T00:00:00"), pago(2, 20, "2026-01-02T00:00:00"))
+    # Devuelve el listado entero, con registros anteriores a la marca
+    backend = Backend([pago(1, 10, "2026-01-01T00:00:00"), pago(2, 20, "2026-01-02T00:00:00"),
+                       pago(3, 30, "2026-01-03T00:00:00")])
+
+    delta = sync.sync(backend)["data"]
+
+    assert delta.mode == HASH
+    assert [row["id"] for row in delta.upserted] == [3]
+    assert sync.support == UNSUPPORTED
@@ -0,0 +1,64 @@
+"""
+Cola persistente de escrituras sin conexión (``WriteQueue``).
+"""
+
+import pytest
+
+from src.data.local_store import LocalStore
+from src.data.write_queue import WriteQueue, is_temp_id
+
+
+@pytest.fixture
+def queue(tmp_path):
+    store = LocalStore(str(tmp_path / "cache.db"))
+    yield WriteQueue(store)
+    store.close()
+
+
+def test_alta_con_id_temporal_y_en_orden(queue):
+    create = queue.enqueue("post", "clientes", payload={"nombre": "Ana"})
+    update = queue.enqueue("PUT", "clientes", 5, {"nombre": "Luis"}, base={"id_cliente": 5})
+
+    assert create.method == "POST"
+    assert is_temp_id(create.entity_id) and create.entity_id == -create.seq
+    assert [entry.seq for entry in queue.entries()] == [create.seq, update.seq]
+    assert queue.first().entity_id == create.entity_id
+    assert queue.entries()[1].base == {"id_cliente": 5}
+    assert len(queue) == 2
+
+
+def test_modificacion_de_un_alta_pendiente_se_fusiona(queue):
+    create = queue.enqueue("POST", "clientes", payload={"nombre": "Ana", "telefono": "600"})
+
+    merged = queue.enqueue("PUT", "clientes", create.entity_id, {"telefono": "611"})
+
+    assert merged.seq == create.seq
+    [entry] = queue.entries()
+    assert entry.method == "POST"
+    assert entry.payload == {"nombre": "Ana", "telefono": "611"}
+
+
+def test_baja_de_un_alta_pendiente_la_anula(queue):
+    create = queue.enqueue("POST", "clientes", payload={"nombre": "Ana"})
+
+    assert queue.enqueue("DELETE", "clientes", create.entity_id) is None
+    assert queue.entries() == []
+
+
+def test_remap_sustituye_el_id_temporal_en_las_siguientes(queue):
+    factura = queue.enqueue("POST", "facturas", payload={"id_cliente": 3})
+    linea = queue.enqueue("POST", "lineas_factura",
+                          payload={"id_factura": factura.entity_id, "orden": factura.entity_id,
+                                   "producto": {"id_producto": 9}})
+    update = queue.enqueue("PUT", "facturas", 70, {"estado": "pagada"})
+    queue.complete(factura.seq)
+
+    queue.remap(factura.entity_id, 120)
+
+    entries = {entry.seq: entry for entry in queue.entries()}
+    # Solo los campos "id*": una cantidad igual al ID temporal no cambia
+    assert entries[linea.seq].payload == {"id_factura": 120, "orden": factura.entity_id,
+                                          "producto": {"id_producto": 9}}
+    assert entries[update.seq].entity_id == 70
+    assert entries[update.seq].payload == {"estado": "pagada"}
+